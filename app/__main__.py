@@ -0,0 +1,7 @@
+"""Ermöglicht ``python -m app …`` als Kommandozeile ohne GUI (siehe `app.cli`)."""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
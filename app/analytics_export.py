@@ -0,0 +1,119 @@
+"""Spaltenorientierter Export für Auswertungen (Parquet bzw. JSONL).
+
+Jede Karte wird zu einer Zeile mit den Spalten aus ``CARD_COLUMNS``. Die Daten
+werden blockweise aus einem `CardRow`-Iterator gelesen; für Parquet werden
+daraus ``pyarrow``-RecordBatches, sodass auch sehr große Decks mit konstantem
+Speicher geschrieben werden. Der je Frage wiederholte Originaltext wird durch
+die Dictionary-Kodierung von Parquet nur einmal gespeichert.
+
+``pyarrow`` ist optional; ohne das Paket steht nur `to_jsonl` zur Verfügung.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List
+
+from .pipeline_models import CardRow
+
+CARD_COLUMNS = [
+    "card_index",
+    "row_index",
+    "frage",
+    "antwort",
+    "original",
+    "labels",
+    "source",
+    "start_page",
+    "end_page",
+]
+
+
+def iter_card_dicts(rows: Iterable[CardRow]) -> Iterator[Dict[str, object]]:
+    """Liefert je Karte ein Dict mit den Schlüsseln aus ``CARD_COLUMNS``."""
+    card_index = 0
+    for row_index, r in enumerate(rows):
+        for frage, antwort in zip(r.fragen, r.antworten):
+            yield {
+                "card_index": card_index,
+                "row_index": row_index,
+                "frage": frage,
+                "antwort": antwort,
+                "original": r.original,
+                "labels": list(r.labels),
+                "source": r.source,
+                "start_page": r.start_page,
+                "end_page": r.end_page,
+            }
+            card_index += 1
+
+
+def to_jsonl(rows: Iterable[CardRow], out_path: str | os.PathLike) -> int:
+    """Schreibt eine JSON-Zeile je Karte und gibt die Anzahl Karten zurück."""
+    path = Path(out_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    count = 0
+    with path.open("w", encoding="utf-8") as f:
+        for rec in iter_card_dicts(rows):
+            f.write(json.dumps(rec, ensure_ascii=False))
+            f.write("\n")
+            count += 1
+    return count
+
+
+def to_parquet(
+    rows: Iterable[CardRow], out_path: str | os.PathLike, batch_size: int = 50_000
+) -> int:
+    """Schreibt Karten als Parquet-Datei (``pyarrow`` erforderlich).
+
+    Returns:
+        Anzahl geschriebener Karten.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema(
+        [
+            ("card_index", pa.int64()),
+            ("row_index", pa.int64()),
+            ("frage", pa.string()),
+            ("antwort", pa.string()),
+            ("original", pa.string()),
+            ("labels", pa.list_(pa.string())),
+            ("source", pa.string()),
+            ("start_page", pa.int32()),
+            ("end_page", pa.int32()),
+        ]
+    )
+    path = Path(out_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    columns: Dict[str, List[object]] = {name: [] for name in CARD_COLUMNS}
+    count = 0
+    with pq.ParquetWriter(str(path), schema, compression="zstd") as writer:
+
+        def flush() -> None:
+            if columns["card_index"]:
+                writer.write_batch(pa.record_batch(columns, schema=schema))
+                for values in columns.values():
+                    values.clear()
+
+        for rec in iter_card_dicts(rows):
+            for name in CARD_COLUMNS:
+                columns[name].append(rec[name])
+            count += 1
+            if len(columns["card_index"]) >= batch_size:
+                flush()
+        flush()
+    return count
+
+
+def export_analytics(rows: Iterable[CardRow], out_path: str | os.PathLike) -> int:
+    """Wählt das Format anhand der Endung (``.parquet`` oder ``.jsonl``)."""
+    suffix = Path(out_path).suffix.lower()
+    if suffix == ".parquet":
+        return to_parquet(rows, out_path)
+    if suffix in (".jsonl", ".ndjson"):
+        return to_jsonl(rows, out_path)
+    raise ValueError(f"Unbekanntes Analyseformat: {suffix or out_path}")
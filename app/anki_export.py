@@ -0,0 +1,316 @@
+"""Direkter Export nach Anki (``.apkg``).
+
+Ein ``.apkg`` ist ein ZIP mit einer SQLite-Sammlung (``collection.anki2``,
+Schema 11) und einer ``media``-Datei. `to_apkg` baut die Sammlung streamend aus
+einem `CardRow`-Iterator: Notizen und Karten werden blockweise per
+``executemany`` in *einer* Transaktion eingefügt, Indizes erst danach angelegt.
+
+Jede Frage/Antwort wird eine Notiz des Notiztyps „Lernkarten (GSA)“ mit den
+Feldern *Frage*, *Antwort*, *Original* und *Quelle*; Labels werden zu Tags.
+Die Notiz-GUID ist ein Hash aus Deckname, Frage und Antwort. Ein erneuter
+Import desselben Decks aktualisiert daher vorhandene Notizen, statt Dubletten
+anzulegen.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import html
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+from typing import Iterable, List, Tuple
+
+from .pipeline_models import CardRow
+
+FIELDS = ["Frage", "Antwort", "Original", "Quelle"]
+MODEL_NAME = "Lernkarten (GSA)"
+BATCH_SIZE = 5000
+
+_SCHEMA = """
+CREATE TABLE col (
+    id integer primary key, crt integer not null, mod integer not null,
+    scm integer not null, ver integer not null, dty integer not null,
+    usn integer not null, ls integer not null, conf text not null,
+    models text not null, decks text not null, dconf text not null,
+    tags text not null
+);
+CREATE TABLE notes (
+    id integer primary key, guid text not null, mid integer not null,
+    mod integer not null, usn integer not null, tags text not null,
+    flds text not null, sfld integer not null, csum integer not null,
+    flags integer not null, data text not null
+);
+CREATE TABLE cards (
+    id integer primary key, nid integer not null, did integer not null,
+    ord integer not null, mod integer not null, usn integer not null,
+    type integer not null, queue integer not null, due integer not null,
+    ivl integer not null, factor integer not null, reps integer not null,
+    lapses integer not null, left integer not null, odue integer not null,
+    odid integer not null, flags integer not null, data text not null
+);
+CREATE TABLE revlog (
+    id integer primary key, cid integer not null, usn integer not null,
+    ease integer not null, ivl integer not null, lastIvl integer not null,
+    factor integer not null, time integer not null, type integer not null
+);
+CREATE TABLE graves (usn integer not null, oid integer not null, type integer not null);
+"""
+
+_INDEXES = """
+CREATE INDEX ix_notes_usn on notes (usn);
+CREATE INDEX ix_cards_usn on cards (usn);
+CREATE INDEX ix_revlog_usn on revlog (usn);
+CREATE INDEX ix_cards_nid on cards (nid);
+CREATE INDEX ix_cards_sched on cards (did, queue, due);
+CREATE INDEX ix_revlog_cid on revlog (cid);
+CREATE INDEX ix_notes_csum on notes (csum);
+"""
+
+_CSS = """.card { font-family: arial; font-size: 20px; text-align: left; color: black; }
+.original { font-size: 14px; color: #555; margin-top: 1em; }
+.quelle { font-size: 12px; color: #888; }"""
+
+_TAG_RE = re.compile(r"<[^>]+>")
+
+
+def _stable_id(*parts: str) -> int:
+    """Deterministische, positive 53-Bit-ID (Anki-IDs sind JS-kompatible Zahlen)."""
+    digest = hashlib.sha256("\x1f".join(parts).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") & ((1 << 53) - 1) or 1
+
+
+def note_guid(deck_name: str, frage: str, antwort: str) -> str:
+    """Stabile Notiz-GUID aus dem Inhalt (gleiche Karte → gleiche GUID)."""
+    data = f"{deck_name}\x1f{frage}\x1f{antwort}".encode("utf-8")
+    return hashlib.sha256(data).hexdigest()[:20]
+
+
+def _field(text: str) -> str:
+    return html.escape(text or "").replace("\n", "<br>")
+
+
+def _tag(label: str) -> str:
+    return re.sub(r"\s+", "_", label.strip())
+
+
+def _checksum(sort_field: str) -> int:
+    plain = html.unescape(_TAG_RE.sub("", sort_field))
+    return int(hashlib.sha1(plain.encode("utf-8")).hexdigest()[:8], 16)
+
+
+def _collection_json(
+    deck_id: int, deck_name: str, model_id: int, now: int
+) -> Tuple[str, str, str, str]:
+    model = {
+        "id": model_id,
+        "name": MODEL_NAME,
+        "type": 0,
+        "mod": now,
+        "usn": -1,
+        "sortf": 0,
+        "did": deck_id,
+        "tmpls": [
+            {
+                "name": "Karte 1",
+                "ord": 0,
+                "qfmt": "{{Frage}}",
+                "afmt": (
+                    "{{FrontSide}}<hr id=answer>{{Antwort}}"
+                    "<div class=original>{{Original}}</div><div class=quelle>{{Quelle}}</div>"
+                ),
+                "did": None,
+                "bqfmt": "",
+                "bafmt": "",
+            }
+        ],
+        "flds": [
+            {
+                "name": name,
+                "ord": i,
+                "sticky": False,
+                "rtl": False,
+                "font": "Arial",
+                "size": 20,
+                "media": [],
+            }
+            for i, name in enumerate(FIELDS)
+        ],
+        "css": _CSS,
+        "latexPre": "\\documentclass[12pt]{article}\n\\special{papersize=3in,5in}\n"
+        "\\usepackage[utf8]{inputenc}\n\\usepackage{amssymb,amsmath}\n\\pagestyle{empty}\n"
+        "\\setlength{\\parindent}{0in}\n\\begin{document}\n",
+        "latexPost": "\\end{document}",
+        "latexsvg": False,
+        "req": [[0, "any", [0]]],
+        "tags": [],
+        "vers": [],
+    }
+
+    def deck(did: int, name: str) -> dict:
+        return {
+            "id": did,
+            "name": name,
+            "mod": now,
+            "usn": -1,
+            "lrnToday": [0, 0],
+            "revToday": [0, 0],
+            "newToday": [0, 0],
+            "timeToday": [0, 0],
+            "collapsed": False,
+            "browserCollapsed": False,
+            "desc": "",
+            "dyn": 0,
+            "conf": 1,
+            "extendNew": 10,
+            "extendRev": 50,
+        }
+
+    decks = {"1": deck(1, "Default"), str(deck_id): deck(deck_id, deck_name)}
+    dconf = {
+        "1": {
+            "id": 1,
+            "name": "Default",
+            "mod": 0,
+            "usn": 0,
+            "maxTaken": 60,
+            "autoplay": True,
+            "timer": 0,
+            "replayq": True,
+            "dyn": False,
+            "new": {
+                "delays": [1, 10],
+                "ints": [1, 4, 7],
+                "initialFactor": 2500,
+                "order": 1,
+                "perDay": 20,
+                "bury": True,
+            },
+            "rev": {
+                "perDay": 200,
+                "ease4": 1.3,
+                "fuzz": 0.05,
+                "ivlFct": 1,
+                "maxIvl": 36500,
+                "bury": True,
+                "minSpace": 1,
+            },
+            "lapse": {"delays": [10], "mult": 0, "minInt": 1, "leechFails": 8, "leechAction": 0},
+        }
+    }
+    conf = {
+        "activeDecks": [1],
+        "curDeck": 1,
+        "newSpread": 0,
+        "collapseTime": 1200,
+        "timeLim": 0,
+        "estTimes": True,
+        "dueCounts": True,
+        "curModel": str(model_id),
+        "nextPos": 1,
+        "sortType": "noteFld",
+        "sortBackwards": False,
+        "addToCur": True,
+    }
+    return (
+        json.dumps(conf),
+        json.dumps({str(model_id): model}),
+        json.dumps(decks),
+        json.dumps(dconf),
+    )
+
+
+def _write_collection(conn: sqlite3.Connection, rows: Iterable[CardRow], deck_name: str) -> int:
+    now = int(time.time())
+    base_id = now * 1000
+    deck_id = _stable_id("deck", deck_name)
+    model_id = _stable_id("model", MODEL_NAME)
+
+    conf, models, decks, dconf = _collection_json(deck_id, deck_name, model_id, now)
+    conn.execute(
+        "INSERT INTO col VALUES (1, ?, ?, ?, 11, 0, 0, 0, ?, ?, ?, ?, '{}')",
+        (now, base_id, base_id, conf, models, decks, dconf),
+    )
+
+    notes: List[tuple] = []
+    cards: List[tuple] = []
+    count = 0
+
+    def flush() -> None:
+        conn.executemany("INSERT INTO notes VALUES (?,?,?,?,?,?,?,?,?,?,?)", notes)
+        conn.executemany("INSERT INTO cards VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)", cards)
+        notes.clear()
+        cards.clear()
+
+    for r in rows:
+        tags = " ".join(_tag(lb) for lb in r.labels if lb.strip())
+        tags = f" {tags} " if tags else ""
+        original = _field(r.original)
+        source = _field(r.source)
+        for frage, antwort in zip(r.fragen, r.antworten):
+            nid = base_id + count
+            q = _field(frage)
+            notes.append(
+                (
+                    nid,
+                    note_guid(deck_name, frage, antwort),
+                    model_id,
+                    now,
+                    -1,
+                    tags,
+                    "\x1f".join((q, _field(antwort), original, source)),
+                    q,
+                    _checksum(q),
+                    0,
+                    "",
+                )
+            )
+            # Neue Karte: type=0/queue=0, ``due`` = Reihenfolge im Stapel
+            cards.append(
+                (nid, nid, deck_id, 0, now, -1, 0, 0, count + 1, 0, 0, 0, 0, 0, 0, 0, 0, "")
+            )
+            count += 1
+            if len(notes) >= BATCH_SIZE:
+                flush()
+    flush()
+    # executescript würde die Transaktion vorzeitig committen.
+    for stmt in filter(str.strip, _INDEXES.split(";")):
+        conn.execute(stmt)
+    return count
+
+
+def to_apkg(
+    rows: Iterable[CardRow], out_path: str | os.PathLike, deck_name: str = "Lernkarten"
+) -> int:
+    """Schreibt Karten als Anki-Paket und gibt die Anzahl Notizen zurück."""
+    path = Path(out_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, db_path = tempfile.mkstemp(suffix=".anki2", dir=path.parent)
+    os.close(fd)
+    try:
+        conn = sqlite3.connect(db_path, isolation_level=None)
+        try:
+            # Temporäre Datei: Journal und fsync bringen hier nichts.
+            conn.execute("PRAGMA journal_mode=OFF")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.executescript(_SCHEMA)
+            conn.execute("BEGIN")
+            count = _write_collection(conn, rows, deck_name)
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+        # Stufe 1: die Sammlung ist groß und redundant (Originaltext je Notiz),
+        # höhere Stufen kosten vielfach Zeit bei kaum kleinerer Datei.
+        with zipfile.ZipFile(
+            path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=1
+        ) as zf:
+            zf.write(db_path, "collection.anki2")
+            zf.writestr("media", "{}")
+    finally:
+        os.unlink(db_path)
+    return count
@@ -0,0 +1,283 @@
+"""Stapelverarbeitung: viele Skripte gleichzeitig, ein gemeinsamer Client.
+
+``python -m app.batch`` nimmt Ordner und/oder Glob-Muster entgegen und
+verarbeitet die PDFs parallel mit `LernkartenPipeline.run`. Alle Dokumente
+teilen sich
+
+* einen `OpenAIClient` (ein Verbindungspool, über `OpenAIClient.for_owner`),
+* einen `FairRateLimiter` (gleichzeitige Anfragen, Anfragen und Tokens pro
+  Minute; Slots werden reihum nach Dokument vergeben, sodass ein großes Skript
+  die kleinen nicht aushungert) und
+* optional einen `ResponseCache`.
+
+Kleine Dateien werden zuerst gestartet. Auf stdout steht je Zeile ein
+JSON-Ereignis wie bei `app.cli` (``batch_start``, ``progress`` mit ``doc``,
+``document`` nach jedem Skript und ``summary`` mit Gesamtkosten und -zeit)::
+
+    python -m app.batch skripte/ --out-dir exports --docs 6 --rpm 500
+    python -m app.batch "sem3/*.pdf" "sem4/*.pdf" --format jsonl --cache
+
+Exit-Code 0, wenn alle Dokumente fertig sind, 1 bei mindestens einem Fehler,
+3 ohne passende PDFs und 130 nach SIGINT/SIGTERM.
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, TextIO
+
+from .cli import (
+    EXIT_CANCELLED,
+    EXIT_ERROR,
+    EXIT_INPUT,
+    EXIT_OK,
+    EventWriter,
+    _config_defaults,
+    _exit_code,
+    _stop_on_signals,
+)
+
+
+def find_documents(patterns: Sequence[str]) -> List[Path]:
+    """PDFs aus Ordnern bzw. Glob-Mustern, ohne Duplikate, kleinste zuerst."""
+    found: Dict[Path, None] = {}
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = sorted(Path(pattern).glob("*.pdf")) + sorted(Path(pattern).glob("*.PDF"))
+        else:
+            matches = [Path(p) for p in sorted(glob.glob(pattern, recursive=True))]
+        for path in matches:
+            if path.is_file() and path.suffix.lower() == ".pdf":
+                found.setdefault(path.resolve(), None)
+    return sorted(found, key=lambda p: (p.stat().st_size, str(p)))
+
+
+def _owner_names(paths: Sequence[Path]) -> List[str]:
+    """Eindeutige Kurznamen (Dateistamm, bei Gleichstand mit Zähler)."""
+    names: List[str] = []
+    seen: Dict[str, int] = {}
+    for p in paths:
+        n = seen.get(p.stem, 0)
+        seen[p.stem] = n + 1
+        names.append(p.stem if n == 0 else f"{p.stem}_{n + 1}")
+    return names
+
+
+def _totals(usage: Dict[str, Dict[str, int]]) -> Dict[str, Any]:
+    from .cost import usage_cost
+
+    tokens = {"input": 0, "output": 0, "cached": 0}
+    requests = cache_hits = 0
+    cost = 0.0
+    for model, u in usage.items():
+        for kind in tokens:
+            tokens[kind] += u[kind]
+        requests += u["requests"]
+        cache_hits += u["cache_hits"]
+        cost += usage_cost(model, u["input"], u["output"], u["cached"])
+    return {
+        "requests": requests,
+        "cache_hits": cache_hits,
+        "tokens": tokens,
+        "cost_usd": round(cost, 6),
+    }
+
+
+def run_batch(
+    paths: Sequence[Path],
+    client,
+    out_dir: str,
+    events: EventWriter,
+    stop: threading.Event,
+    *,
+    docs: int = 4,
+    fmt: str = "xlsx",
+    questions: int = 8,
+    language: str = "de",
+    workers: int = 3,
+) -> Dict[str, Any]:
+    """Verarbeitet ``paths`` mit bis zu ``docs`` Dokumenten gleichzeitig.
+
+    ``client`` ist der gemeinsame `OpenAIClient`; jedes Dokument erhält eine
+    Kopie mit eigenem ``owner``. Fehler eines Dokuments brechen den Stapel
+    nicht ab, sondern erscheinen im ``document``-Ereignis. Rückgabe ist die
+    Zusammenfassung (wie das ``summary``-Ereignis).
+    """
+    from .export_sinks import open_sink
+    from .pipeline import LernkartenPipeline
+
+    os.makedirs(out_dir, exist_ok=True)
+    names = _owner_names(paths)
+    results: Dict[str, Dict[str, Any]] = {}
+
+    def process(path: Path, name: str) -> None:
+        if stop.is_set():
+            results[name] = {"doc": name, "status": "cancelled"}
+            return
+        doc_client = client.for_owner(name)
+        pipe = LernkartenPipeline(client.settings, client=doc_client)
+        started = time.perf_counter()
+        events.emit("document_start", doc=name, pdf=str(path), bytes=path.stat().st_size)
+
+        def progress(stage: str, done: int, total: int) -> None:
+            events.emit("progress", doc=name, stage=stage, done=done, total=total)
+
+        info: Dict[str, Any] = {"doc": name, "pdf": str(path)}
+        try:
+            sink = open_sink(os.path.join(out_dir, f"{name}.{fmt}"))
+            try:
+                result = pipe.run(
+                    str(path),
+                    max_questions_per_chunk=questions,
+                    language=language,
+                    progress_cb=progress,
+                    stop_cb=stop.is_set,
+                    sink=sink,
+                    max_workers=workers,
+                )
+            finally:
+                sink.close()
+            info.update(
+                status="ok",
+                out=str(sink.path),
+                segments=len(result.labeled),
+                rows=len(result.rows),
+                cards=sum(len(r.fragen) for r in result.rows),
+            )
+        except Exception as exc:  # noqa: BLE001 - übrige Dokumente laufen weiter
+            code = _exit_code(exc)
+            info.update(
+                status="cancelled" if code == EXIT_CANCELLED else "error",
+                type=exc.__class__.__name__,
+                message=str(exc),
+            )
+        info["seconds"] = round(time.perf_counter() - started, 3)
+        info.update(_totals(doc_client.usage()))
+        results[name] = info
+        events.emit("document", **info)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, docs), thread_name_prefix="batch-doc") as pool:
+        for future in [pool.submit(process, p, n) for p, n in zip(paths, names)]:
+            future.result()
+    wall = time.perf_counter() - started
+
+    docs_done = [results[n] for n in names]
+    usage_all: Dict[str, Dict[str, int]] = {}
+    for n in names:
+        for model, u in client.usage(n).items():
+            acc = usage_all.setdefault(model, dict.fromkeys(u, 0))
+            for k, v in u.items():
+                acc[k] += v
+    doc_seconds = sum(d.get("seconds", 0.0) for d in docs_done)
+    summary = {
+        "documents": len(docs_done),
+        "ok": sum(d["status"] == "ok" for d in docs_done),
+        "failed": sum(d["status"] == "error" for d in docs_done),
+        "cancelled": sum(d["status"] == "cancelled" for d in docs_done),
+        "cards": sum(d.get("cards", 0) for d in docs_done),
+        "seconds": round(wall, 3),
+        # Summe der Einzelzeiten / Wanduhrzeit: Gewinn durch die Überlappung
+        "overlap": round(doc_seconds / wall, 2) if wall > 0 else None,
+        **_totals(usage_all),
+    }
+    events.emit("summary", **summary)
+    return summary
+
+
+def build_parser() -> argparse.ArgumentParser:
+    d = _config_defaults()
+    ap = argparse.ArgumentParser(
+        prog="python -m app.batch",
+        description="Viele Skripte gleichzeitig verarbeiten (gemeinsamer Client, Cache und Rate-Limit)",
+    )
+    ap.add_argument("inputs", nargs="+", help='Ordner oder Glob-Muster, z. B. "skripte/*.pdf"')
+    ap.add_argument("--out-dir", default="exports", help="Zielordner, je Skript <name>.<format>")
+    ap.add_argument("--format", default="xlsx", choices=["xlsx", "csv", "jsonl"])
+    ap.add_argument("--docs", type=int, default=4, help="gleichzeitig bearbeitete Dokumente")
+    ap.add_argument(
+        "--max-concurrent", type=int, default=d["workers"],
+        help="gleichzeitige API-Anfragen über alle Dokumente",
+    )
+    ap.add_argument("--rpm", type=float, help="Anfragen pro Minute (Standard: config.toml)")
+    ap.add_argument("--tpm", type=float, help="Tokens pro Minute (Standard: config.toml)")
+    cache = ap.add_mutually_exclusive_group()
+    cache.add_argument("--cache", dest="cache", action="store_true", default=None,
+                       help="Antwort-Cache nutzen")
+    cache.add_argument("--no-cache", dest="cache", action="store_false")
+    ap.add_argument("--cache-path", help="SQLite-Datei des Caches (Standard: config.toml)")
+    ap.add_argument("--questions", type=int, default=d["questions"], help="max. Karten je Segment")
+    ap.add_argument("--language", default=d["language"])
+    ap.add_argument("--classify-model", default=d["classify_model"])
+    ap.add_argument("--qa-model", default=d["qa_model"])
+    ap.add_argument("--base-url", help="anderer API-Endpunkt (z. B. Proxy oder Mock)")
+    return ap
+
+
+def main(argv: list[str] | None = None, stream: Optional[TextIO] = None) -> int:
+    from . import metrics
+    from .cache import ResponseCache
+    from .config import load_api_key
+    from .openai_client import OpenAIClient, OpenAISettings
+    from .ratelimit import FairRateLimiter
+
+    args = build_parser().parse_args(argv)
+    events = EventWriter(stream)
+    paths = find_documents(args.inputs)
+    if not paths:
+        events.emit("error", type="FileNotFoundError", message="Keine PDFs gefunden")
+        return EXIT_INPUT
+
+    cache = ResponseCache.from_config(args.cache, args.cache_path)
+    limiter = FairRateLimiter.from_config(
+        max_concurrent=args.max_concurrent,
+        requests_per_minute=args.rpm,
+        tokens_per_minute=args.tpm,
+    )
+    settings = OpenAISettings(
+        api_key=load_api_key()[0] or "none",
+        classify_model=args.classify_model,
+        qa_model=args.qa_model,
+        base_url=args.base_url,
+    )
+    client = OpenAIClient(settings, cache=cache, limiter=limiter)
+    events.emit(
+        "batch_start",
+        documents=[str(p) for p in paths],
+        docs=args.docs,
+        max_concurrent=limiter.max_concurrent,
+        cache=cache is not None,
+    )
+    stop = threading.Event()
+    try:
+        with _stop_on_signals(stop):
+            summary = run_batch(
+                paths,
+                client,
+                args.out_dir,
+                events,
+                stop,
+                docs=args.docs,
+                fmt=args.format,
+                questions=args.questions,
+                language=args.language,
+                # je Dokument so viele QA-Threads wie Slots; das Limit setzt der Limiter
+                workers=limiter.max_concurrent,
+            )
+    finally:
+        metrics.dump_run("batch")
+        if cache is not None:
+            cache.close()
+    if stop.is_set():
+        return EXIT_CANCELLED
+    return EXIT_ERROR if summary["failed"] else EXIT_OK
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,89 @@
+"""Persistenter Cache für API-Antworten (SQLite).
+
+Der Schlüssel ist ein SHA-256 über Modell, Nachrichten und die Parameter, die
+die Antwort beeinflussen (z. B. ``temperature``). Ein erneuter Lauf über
+dasselbe Skript – oder ein zweites Dokument mit identischen Abschnitten –
+kostet dann keine Anfrage mehr. Gespeichert wird nur der Antworttext
+erfolgreicher Anfragen.
+
+Eine Datei kann von mehreren Threads und Prozessen gleichzeitig genutzt
+werden (WAL-Modus); Zugriffe werden als ``cache_lookups_total{cache="responses"}``
+gezählt.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from . import metrics
+
+DEFAULT_CACHE_PATH = Path(__file__).resolve().parent / ".cache" / "responses.sqlite"
+
+
+class ResponseCache:
+    """Schlüssel-Wert-Speicher für Chat-Antworten."""
+
+    def __init__(self, path: str | Path = DEFAULT_CACHE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, model TEXT, content TEXT NOT NULL, created REAL)"
+        )
+        self._db.commit()
+
+    @classmethod
+    def from_config(
+        cls, enabled: Optional[bool] = None, path: str | Path | None = None
+    ) -> Optional["ResponseCache"]:
+        """Cache gemäß ``[cache]`` in ``config.toml`` oder ``None``, wenn deaktiviert.
+
+        ``enabled`` und ``path`` überschreiben ``responses`` bzw. ``path``
+        (z. B. GUI-Schalter, ``--cache``).
+        """
+        from .config import load_config
+
+        section = load_config().get("cache", {})
+        if not (section.get("responses", False) if enabled is None else enabled):
+            return None
+        return cls(path or section.get("path") or DEFAULT_CACHE_PATH)
+
+    @staticmethod
+    def key(model: str, messages: List[Dict[str, str]], **params: Any) -> str:
+        payload = json.dumps(
+            {"model": model, "messages": messages, "params": params},
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute("SELECT content FROM responses WHERE key = ?", (key,)).fetchone()
+        metrics.inc("cache_lookups_total", cache="responses", result="hit" if row else "miss")
+        return row[0] if row else None
+
+    def put(self, key: str, content: str, model: str = "") -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, model, content, created) VALUES (?, ?, ?, ?)",
+                (key, model, content, time.time()),
+            )
+            self._db.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,68 @@
+"""Kooperativer Abbruch für Hintergrundarbeit.
+
+Ein `CancelToken` wird an lang laufende Funktionen weitergereicht; diese
+prüfen ihn zwischen zwei Arbeitsschritten mit `CancelToken.check`, das dann
+`Cancelled` auslöst. `Cancelled` ist ein ``RuntimeError("Abgebrochen")`` –
+dieselbe Ausnahme, mit der `LernkartenPipeline` schon bisher abbricht.
+
+Mit `CancelToken.add_callback` lassen sich blockierende Vorgänge von außen
+beenden (z. B. offene HTTP-Verbindungen in `app.transport`).
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Callable, List
+
+from .logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class Cancelled(RuntimeError):
+    """Arbeit wurde über ein `CancelToken` abgebrochen."""
+
+    def __init__(self, message: str = "Abgebrochen"):
+        super().__init__(message)
+
+
+class CancelToken:
+    """Threadsicheres Abbruchsignal."""
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+
+    def cancel(self) -> None:
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for fn in callbacks:
+            try:
+                fn()
+            except Exception:  # noqa: BLE001 - ein Callback darf den Abbruch nicht verhindern
+                logger.exception("Fehler in Abbruch-Callback")
+
+    def add_callback(self, fn: Callable[[], None]) -> None:
+        """``fn()`` beim Abbruch aufrufen (sofort, falls schon abgebrochen)."""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(fn)
+                return
+        fn()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def check(self) -> None:
+        """Löst `Cancelled` aus, wenn abgebrochen wurde."""
+        if self._event.is_set():
+            raise Cancelled()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Schläft höchstens ``timeout`` Sekunden; ``True``, wenn dabei abgebrochen wurde."""
+        return self._event.wait(timeout)
@@ -0,0 +1,116 @@
+"""Spaltenweise Ablage für sehr große Decks.
+
+`CardRow` hält je Segment eine Liste von Fragen und Antworten – bequem, aber
+jede Karte kostet zwei ``str``-Objekte, zwei Listeneinträge und anteilig
+Zeile, Listen und Labels. `CardStore` legt Karten stattdessen in parallelen
+Arrays ab:
+
+* Fragen und Antworten als UTF-8 in je einem ``bytearray`` mit Offsets
+  (``array("Q")``) – ohne Objekt-Overhead je Text.
+* Den Originaltext je Segment genau einmal; Karten verweisen über
+  ``Segment.id`` darauf (``array("I")``).
+* Labels und Quellenangaben als Index in eine Tabelle (``array("I")``).
+
+Gelesen wird über `records` (Exportzeilen wie
+`excel_export.iter_records`) oder `rows` (wieder gruppierte `CardRow`s, z. B.
+für `excel_export.to_excel`). `LernkartenPipeline.run` füllt einen
+übergebenen Store direkt (``run(..., store=CardStore())``, CLI ``--columnar``).
+``python -m benchmarks.bench_card_memory`` vergleicht den Speicher je Karte.
+"""
+
+from __future__ import annotations
+
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .pipeline_models import CardRow
+
+
+class CardStore:
+    """Karten als parallele Arrays; ein Eintrag je Frage/Antwort-Paar."""
+
+    __slots__ = (
+        "_texts", "_text_ids", "_text_index", "_segment", "_q", "_q_end", "_a", "_a_end",
+        "_meta", "_meta_index", "_meta_of",
+    )
+
+    def __init__(self, rows: Iterable[CardRow] = ()):
+        self._texts: List[str] = []  # Originaltexte, je Segment einmal
+        self._text_ids: List[Optional[int]] = []  # Segment.id je Originaltext
+        self._text_index: Dict[int, int] = {}  # Segment.id → Position in _texts
+        self._segment = array("I")  # je Karte: Position in _texts
+        self._q = bytearray()
+        self._q_end = array("Q")
+        self._a = bytearray()
+        self._a_end = array("Q")
+        # (labels, source, start_page, end_page) wiederholen sich stark → Tabelle
+        self._meta: List[Tuple[Tuple[str, ...], str, Optional[int], Optional[int]]] = []
+        self._meta_index: Dict[tuple, int] = {}
+        self._meta_of = array("I")  # je Karte: Position in _meta
+        for row in rows:
+            self.add(row)
+
+    def __len__(self) -> int:
+        return len(self._segment)
+
+    def add(self, row: CardRow) -> None:
+        """Übernimmt alle Karten einer Zeile."""
+        if row.segment_id is not None and row.segment_id in self._text_index:
+            text = self._text_index[row.segment_id]
+        else:
+            text = len(self._texts)
+            self._texts.append(row.original)
+            self._text_ids.append(row.segment_id)
+            if row.segment_id is not None:
+                self._text_index[row.segment_id] = text
+        key = (tuple(row.labels), row.source, row.start_page, row.end_page)
+        meta = self._meta_index.get(key)
+        if meta is None:
+            meta = self._meta_index[key] = len(self._meta)
+            self._meta.append(key)
+        for q, a in zip(row.fragen, row.antworten):
+            self._segment.append(text)
+            self._meta_of.append(meta)
+            self._q += q.encode("utf-8")
+            self._q_end.append(len(self._q))
+            self._a += a.encode("utf-8")
+            self._a_end.append(len(self._a))
+
+    @staticmethod
+    def _slice(buf: bytearray, ends: array, i: int) -> str:
+        start = ends[i - 1] if i else 0
+        return buf[start:ends[i]].decode("utf-8")
+
+    def card(self, i: int) -> Tuple[str, str, str]:
+        """``(original, frage, antwort)`` der ``i``-ten Karte."""
+        return (
+            self._texts[self._segment[i]],
+            self._slice(self._q, self._q_end, i),
+            self._slice(self._a, self._a_end, i),
+        )
+
+    def records(self) -> Iterator[Tuple[str, str, str, str, str]]:
+        """Exportzeilen in der Reihenfolge von `excel_export.COLUMNS`."""
+        for i in range(len(self)):
+            original, q, a = self.card(i)
+            labels, source, _, _ = self._meta[self._meta_of[i]]
+            yield (original, q, a, ", ".join(labels), source)
+
+    def rows(self) -> Iterator[CardRow]:
+        """Karten wieder als `CardRow`s, je Folge gleicher Segmente und Metadaten eine."""
+        row: Optional[CardRow] = None
+        current = None
+        for i in range(len(self)):
+            original, q, a = self.card(i)
+            group = (self._segment[i], self._meta_of[i])
+            if group != current:
+                if row is not None:
+                    yield row
+                labels, source, start, end = self._meta[self._meta_of[i]]
+                segment_id = self._text_ids[self._segment[i]]
+                row = CardRow(original, [], [], list(labels), source, start, end, segment_id)
+                current = group
+            row.fragen.append(q)
+            row.antworten.append(a)
+        if row is not None:
+            yield row
@@ -10,6 +10,7 @@ Dieses Modul wird hauptsächlich von `pipeline.load_and_segment` verwendet.
 """
 
 from .models import count_tokens_rough
+from fnmatch import fnmatchcase
 import re, math
 
 def split_into_chunks(text: str, target_tokens: int = 600, overlap_tokens: int = 60, max_chars_per_chunk: int = 4000):
@@ -81,6 +82,80 @@ def is_heading_like(line: str) -> bool:
         return True
     return False
 
+_HEADING_NUMBER_RE = re.compile(r"^\s*(\d+(?:\.\d+)*)\.?\s")
+
+
+def heading_number(line: str) -> str | None:
+    """Liefert die Gliederungsnummer einer Überschrift (``"3.2"``) oder ``None``."""
+    m = _HEADING_NUMBER_RE.match(line + " ")
+    return m.group(1) if m else None
+
+
+def chapter_matches(number: str, pattern: str) -> bool:
+    """Prüft, ob eine Gliederungsnummer zu einem Kapitelmuster passt.
+
+    ``"3"`` und ``"3.*"`` wählen Kapitel 3 samt aller Unterkapitel,
+    ``"3.2"`` nur Abschnitt 3.2 samt Unterabschnitten. Andere Muster werden als
+    Glob (``fnmatch``) ausgewertet, z. B. ``"[34].*"``.
+    """
+    pattern = pattern.strip().removeprefix("Kapitel").removeprefix("chapter").strip()
+    base = pattern[:-2] if pattern.endswith(".*") else pattern.rstrip(".")
+    if any(c in base for c in "*?["):
+        return fnmatchcase(number, base) or fnmatchcase(number, pattern)
+    return number == base or number.startswith(base + ".")
+
+
+def chapter_key(number: str) -> tuple[int, ...]:
+    """Sortierschlüssel einer Gliederungsnummer: ``"3.10"`` → ``(3, 10)``."""
+    return tuple(int(part) for part in number.split("."))
+
+
+def select_chapters(pages, chapters, open_pages=None) -> list[tuple[int, str]]:
+    """Schneidet seitenweisen Text auf die gewählten Kapitel zu.
+
+    Nummerierte Überschriften (erkannt über `is_heading_like`) schalten die
+    Auswahl um: passt die Nummer auf eines der Muster in ``chapters``, werden
+    die folgenden Zeilen übernommen, bis eine nicht passende nummerierte
+    Überschrift mit höherer Nummer folgt (z. B. ``4`` nach ``3.2``). Kleinere
+    Nummern sind eher Aufzählungen im Fließtext („2 Liter …:“) und beenden das
+    Kapitel nicht. Seiten ohne ausgewählten Text entfallen.
+
+    Args:
+        pages: Folge ``(seitennummer, text)``.
+        chapters: Kapitelmuster, siehe `chapter_matches`.
+        open_pages: optional ``{seitennummer: kapitelnummer}`` für Seiten, die
+            laut PDF-Outline mitten in einem gewählten Kapitel beginnen. Dort ist
+            die Auswahl ab Seitenbeginn aktiv – auch wenn die Überschrift
+            außerhalb des gelesenen Seitenbereichs liegt. Ist ``open_pages``
+            gesetzt, beginnen alle übrigen Seiten inaktiv.
+
+    Returns:
+        Liste ``(seitennummer, text)`` nur mit ausgewählten Zeilen.
+    """
+    out = []
+    active = False
+    current: tuple[int, ...] | None = None  # Nummer des aktiven Kapitels
+    for no, text in pages:
+        if open_pages is not None:
+            number = open_pages.get(no)
+            active = number is not None
+            current = chapter_key(number) if number is not None else None
+        keep = []
+        for line in text.splitlines():
+            if is_heading_like(line):
+                number = heading_number(line)
+                if number is not None:
+                    key = chapter_key(number)
+                    if any(chapter_matches(number, c) for c in chapters):
+                        active, current = True, key
+                    elif active and (current is None or key > current):
+                        active = False
+            if active:
+                keep.append(line)
+        if keep:
+            out.append((no, "\n".join(keep)))
+    return out
+
 def smart_split(block: str, target_tokens: int, max_chars: int) -> list[str]:
     """Teilt einen Textblock anhand von Absätzen in tokenbegrenzte Stücke.
 
@@ -150,6 +225,31 @@ def split_by_sentences(text: str, target_tokens: int, max_chars: int) -> list[st
         out.append(buf)
     return out
 
+_BULLET_RE = re.compile(r"^\s*[-*•0-9]+[\.\)]")
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+(?=[A-ZÄÖÜ])")
+
+
+def split_sentences(paragraph: str) -> list[str]:
+    """Zerlegt einen Absatz in Sätze für die Klassifikation.
+
+    Besteht der Absatz nur aus Aufzählungszeilen (``-``, ``*``, ``•`` oder
+    ``1.``/``1)``), ist jede Zeile ein eigener Satz. Sonst werden Zeilenumbrüche
+    zu Leerzeichen und getrennt wird nach ``.``, ``!`` oder ``?``, wenn ein
+    Großbuchstabe folgt.
+
+    Args:
+        paragraph: Ein Absatz ohne Leerzeilen.
+
+    Returns:
+        Liste nichtleerer Sätze.
+    """
+    if "\n" in paragraph:
+        nonempty = [ln for ln in paragraph.splitlines() if ln.strip()]
+        if nonempty and all(_BULLET_RE.match(ln) for ln in nonempty):
+            return [ln.strip() for ln in nonempty]
+        paragraph = paragraph.replace("\n", " ")
+    return [s for s in _SENTENCE_END_RE.split(paragraph) if s.strip()]
+
 def take_last_sentences(text: str, approx_tokens: int = 60) -> str:
     """Gibt die letzten Sätze eines Textes bis zu einer Tokenobergrenze zurück.
 
@@ -0,0 +1,277 @@
+"""Kommandozeile ohne GUI: ``python -m app skript.pdf``.
+
+Führt denselben Ablauf wie die Oberfläche aus (Einlesen → Klassifikation →
+Filter → Lernkarten → Export, über `LernkartenPipeline.run`) und liest
+Modelle, Sprache und Fragen je Segment aus ``config.toml``. Tk/ttkbootstrap
+werden nie importiert; das Modul läuft damit in Containern, Cronjobs und CI.
+
+Auf stdout steht je Zeile ein JSON-Ereignis (``"event"``: ``start``,
+``segmented``, ``progress``, ``budget``, ``done`` oder ``error``); Log-Ausgaben gehen
+nach stderr. Der Exit-Code unterscheidet die Fehlerursachen (siehe
+``EXIT_*``), sodass Skripte gezielt reagieren können::
+
+    python -m app skript.pdf --out-dir exports --questions 6 | jq -c 'select(.event=="done")'
+    python -m app skript.pdf --dry-run        # nur segmentieren und Kosten schätzen
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, TextIO
+
+EXIT_OK = 0
+EXIT_ERROR = 1  # unerwarteter Fehler in der Pipeline
+EXIT_USAGE = 2  # ungültige Argumente (argparse)
+EXIT_INPUT = 3  # Datei fehlt oder ist nicht lesbar
+EXIT_AUTH = 4  # kein oder ungültiger API-Key, falsches Modell
+EXIT_QUOTA = 5  # Kontingent/Rate-Limit trotz Wiederholungen erschöpft
+EXIT_CANCELLED = 130  # SIGINT/SIGTERM
+
+
+class EventWriter:
+    """Schreibt Ereignisse als JSON-Zeilen (threadsicher, sofort geflusht)."""
+
+    def __init__(self, stream: Optional[TextIO] = None):
+        self.stream = stream if stream is not None else sys.stdout
+        self._lock = threading.Lock()
+
+    def emit(self, event: str, **fields: Any) -> None:
+        line = json.dumps({"event": event, "ts": round(time.time(), 3), **fields}, ensure_ascii=False)
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+
+def _config_defaults() -> Dict[str, Any]:
+    from .config import DEFAULT_CLASSIFY_MODEL, DEFAULT_LANGUAGE, DEFAULT_QA_MODEL, load_config
+
+    cfg = load_config()
+    models = cfg.get("models", {})
+    prompting = cfg.get("prompting", {})
+    return {
+        "classify_model": models.get("label_model", DEFAULT_CLASSIFY_MODEL),
+        "qa_model": models.get("qa_model", DEFAULT_QA_MODEL),
+        "workers": int(models.get("max_parallel_requests", 3)),
+        "language": prompting.get("language", DEFAULT_LANGUAGE),
+        "questions": int(prompting.get("max_questions_per_chunk_default", 8)),
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    d = _config_defaults()
+    ap = argparse.ArgumentParser(
+        prog="python -m app",
+        description="Lernkarten aus einem PDF-Skript erzeugen (ohne GUI, JSONL-Ereignisse auf stdout)",
+    )
+    ap.add_argument("pdf", help="Skript (PDF)")
+    out = ap.add_mutually_exclusive_group()
+    out.add_argument("--out", help="Exportdatei (.xlsx, .csv oder .jsonl)")
+    out.add_argument("--out-dir", default="exports", help="Ordner für <pdf>_<zeit>.xlsx")
+    ap.add_argument("--pages", help='Seitenauswahl, z. B. "120-180"')
+    ap.add_argument("--chapters", nargs="*", help='Kapitelmuster, z. B. "3.*" "4.2"')
+    ap.add_argument("--questions", type=int, default=d["questions"], help="max. Karten je Segment")
+    ap.add_argument("--language", default=d["language"])
+    ap.add_argument("--classify-model", default=d["classify_model"])
+    ap.add_argument("--qa-model", default=d["qa_model"])
+    ap.add_argument("--workers", type=int, default=d["workers"], help="parallele QA-Anfragen")
+    ap.add_argument("--budget", type=float, help="Kostengrenze in USD (senkt Fragen je Segment)")
+    ap.add_argument("--review", action="store_true", help="erst alles labeln, dann Karten erzeugen")
+    ap.add_argument("--anki", action="store_true", help="zusätzlich Anki-Paket (.apkg)")
+    ap.add_argument(
+        "--columnar", action="store_true", help="Karten spaltenweise halten (sehr große Decks)"
+    )
+    ap.add_argument("--base-url", help="anderer API-Endpunkt (z. B. Proxy oder Mock)")
+    ap.add_argument("--profile", action="store_true", help="Profiling nach <export>_profil/")
+    ap.add_argument("--dry-run", action="store_true", help="nur segmentieren und Kosten schätzen")
+    return ap
+
+
+def _export_path(args: argparse.Namespace) -> str:
+    if args.out:
+        return args.out
+    stamp = time.strftime("%Y%m%d_%H%M%S")
+    return os.path.join(args.out_dir, f"{Path(args.pdf).stem}_{stamp}.xlsx")
+
+
+def _exit_code(exc: BaseException) -> int:
+    from .openai_client import api_errors
+    from .pdf_ingest import pdf_errors
+
+    if isinstance(exc, (FileNotFoundError, IsADirectoryError, PermissionError) + pdf_errors()):
+        return EXIT_INPUT
+    status = getattr(exc, "status_code", None)
+    if status in (401, 403, 404) or isinstance(
+        exc, api_errors("AuthenticationError", "PermissionDeniedError", "NotFoundError")
+    ):
+        return EXIT_AUTH
+    if status == 429:
+        return EXIT_QUOTA
+    if isinstance(exc, RuntimeError) and str(exc) == "Abgebrochen":
+        return EXIT_CANCELLED
+    return EXIT_ERROR
+
+
+@contextmanager
+def _stop_on_signals(stop: threading.Event) -> Iterator[None]:
+    """SIGINT/SIGTERM setzen ``stop``; die Pipeline bricht dann geordnet ab."""
+    if threading.current_thread() is not threading.main_thread():
+        yield
+        return
+    previous = {sig: signal.getsignal(sig) for sig in (signal.SIGINT, signal.SIGTERM)}
+    for sig in previous:
+        signal.signal(sig, lambda signum, frame: stop.set())
+    try:
+        yield
+    finally:
+        for sig, handler in previous.items():
+            signal.signal(sig, handler)
+
+
+def run(args: argparse.Namespace, events: EventWriter, stop: threading.Event) -> int:
+    from . import metrics, profiling, tracing
+    from .card_store import CardStore
+    from .config import load_api_key
+    from .export_sinks import open_sink
+    from .openai_client import OpenAISettings
+    from .pipeline import LernkartenPipeline
+
+    if not os.path.isfile(args.pdf):
+        events.emit("error", type="FileNotFoundError", message=f"Datei nicht gefunden: {args.pdf}")
+        return EXIT_INPUT
+    api_key = load_api_key()[0]
+    if not api_key and not args.base_url and not args.dry_run:
+        events.emit("error", type="MissingApiKey", message="OPENAI_API_KEY ist nicht gesetzt")
+        return EXIT_AUTH
+
+    out_path = _export_path(args)
+    settings = OpenAISettings(
+        api_key=api_key or "none",
+        classify_model=args.classify_model,
+        qa_model=args.qa_model,
+        base_url=args.base_url,
+    )
+    pipe = LernkartenPipeline(settings)
+    events.emit(
+        "start",
+        pdf=args.pdf,
+        out=out_path,
+        classify_model=args.classify_model,
+        qa_model=args.qa_model,
+        questions=args.questions,
+        language=args.language,
+    )
+
+    profile = nullcontext()
+    if args.profile:
+        profile = profiling.profile_run(profiling.profile_dir_for(out_path))
+    try:
+        with tracing.trace_run("cli"), profile:
+            segments = pipe.load_and_segment(args.pdf, pages=args.pages, chapters=args.chapters)
+            avg = sum(pipe.tok.count(s.text) for s in segments) / max(len(segments), 1)
+            try:
+                est = pipe.estimate_cost(
+                    "", len(segments), int(avg), args.questions, args.classify_model, args.qa_model
+                )
+                estimate_usd = round(est.get("sum_usd", 0.0), 4)
+            except KeyError:  # kein Preis für das Modell hinterlegt
+                estimate_usd = None
+            events.emit(
+                "segmented",
+                pages=pipe.page_count,
+                segments=len(segments),
+                estimate_usd=estimate_usd,
+            )
+            if args.dry_run:
+                return EXIT_OK
+
+            def progress(stage: str, done: int, total: int) -> None:
+                events.emit("progress", stage=stage, done=done, total=total)
+
+            sink = open_sink(out_path)
+            try:
+                result = pipe.run(
+                    segments,
+                    max_questions_per_chunk=args.questions,
+                    language=args.language,
+                    review_cb=(lambda labeled: True) if args.review else None,
+                    progress_cb=progress,
+                    stop_cb=stop.is_set,
+                    sink=sink,
+                    max_workers=args.workers,
+                    budget_usd=args.budget,
+                    limit_by_budget=args.budget is not None,
+                    adjust_cb=lambda n: events.emit("budget", questions=n),
+                    store=CardStore() if args.columnar else None,
+                )
+            finally:
+                sink.close()
+            extra = {}
+            if args.anki:
+                apkg = os.path.splitext(str(sink.path))[0] + ".apkg"
+                pipe.export_anki(result.iter_rows(), apkg, deck_name=Path(args.pdf).stem)
+                extra["anki"] = apkg
+    except BaseException as exc:  # noqa: BLE001 - alles wird als Ereignis gemeldet
+        if isinstance(exc, KeyboardInterrupt):
+            code = EXIT_CANCELLED
+        elif isinstance(exc, Exception):
+            code = _exit_code(exc)
+        else:
+            raise
+        events.emit("error", type=exc.__class__.__name__, message=str(exc), exit_code=code)
+        return code
+    finally:
+        metrics.dump_run("cli")
+
+    snapshot = metrics.REGISTRY.to_dict()
+    tokens = {
+        kind: sum(
+            e["value"]
+            for e in snapshot.get("openai_tokens_total", [])
+            if e["labels"].get("kind") == kind
+        )
+        for kind in ("input", "output", "cached")
+    }
+    if not result.card_count and result.labeled:
+        # Die Pipeline überspringt fehlgeschlagene Anfragen; ohne eine einzige
+        # Karte entscheidet die häufigste Fehlerklasse über den Exit-Code.
+        errors: Dict[str, float] = {}
+        for e in snapshot.get("openai_errors_total", []):
+            errors[e["labels"].get("error", "")] = errors.get(e["labels"].get("error", ""), 0) + e["value"]
+        code = EXIT_ERROR
+        if errors:
+            worst = max(errors, key=errors.get)
+            code = {"429": EXIT_QUOTA, "auth": EXIT_AUTH}.get(worst, EXIT_ERROR)
+        events.emit(
+            "error",
+            type="NoCards",
+            message="Keine Lernkarten erzeugt",
+            api_errors=errors,
+            exit_code=code,
+        )
+        return code
+    events.emit(
+        "done",
+        out=str(sink.path),
+        segments=len(result.labeled),
+        rows=sum(1 for _ in result.iter_rows()),
+        cards=result.card_count,
+        seconds=round(result.seconds, 3),
+        tokens=tokens,
+        **extra,
+    )
+    return EXIT_OK
+
+
+def main(argv: list[str] | None = None, stream: Optional[TextIO] = None) -> int:
+    args = build_parser().parse_args(argv)
+    stop = threading.Event()
+    with _stop_on_signals(stop):
+        return run(args, EventWriter(stream), stop)
@@ -48,3 +48,25 @@ def estimate_cost_for_text(text: str, model: str, label_model: str, questions_pe
         "cost_qa_usd": cost_qa,
         "total_cost_usd": cost_label + cost_qa,
     }
+
+
+def usage_cost(model_name: str, in_tokens: int, out_tokens: int, cached_tokens: int = 0) -> float:
+    """Tatsächliche Kosten in USD für gemessenen Verbrauch (``resp.usage``).
+
+    Preise kommen aus `config.PRICES` bzw. – für dort fehlende Modelle – aus
+    ``[costs]`` in ``config.toml``; unbekannte Modelle kosten 0.
+    """
+    from .config import PRICES
+
+    price = PRICES.get(model_name)
+    if price is not None:
+        rates = (price.input_per_mtok_usd, price.cached_input_per_mtok_usd, price.output_per_mtok_usd)
+    else:
+        c = load_config().get("costs", {})
+        key_base = model_name.replace(".", "-")
+        rates = tuple(
+            c.get(f"{key_base}_{kind}_usd_per_mtok", 0)
+            for kind in ("input", "cached_input", "output")
+        )
+    uncached = max(in_tokens - cached_tokens, 0)
+    return (uncached * rates[0] + cached_tokens * rates[1] + out_tokens * rates[2]) / 1_000_000.0
@@ -3,53 +3,111 @@
 Wird von `pipeline.export_excel` sowie der GUI verwendet. Das Format der
 eingehenden ``rows`` entspricht der Struktur, die `pipeline.generate_cards`
 liefert.
+
+Die Karten werden zeilenweise aus einem Iterator geschrieben (openpyxl
+``write_only`` bzw. xlsxwriter ``constant_memory``), ohne pandas und ohne die
+Zeilen vorher zu sammeln. Der Speicherbedarf bleibt dadurch unabhängig von der
+Deckgröße flach. Der Originaltext steht in jeder Kartenzeile erneut in der
+Datei (openpyxl schreibt ``write_only`` als Inline-Strings, ohne
+Shared-Strings-Tabelle); ein Segment mit acht Fragen trägt ihn also achtmal.
 """
 
 from __future__ import annotations
-from typing import List
+import csv
+import re
+from itertools import chain
 from pathlib import Path
-try:
-    import pandas as pd  # optional
-except Exception:  # ImportError + env specifics
-    pd = None
+from typing import Iterable, Iterator, Sequence, Tuple
 
 from .pipeline_models import CardRow
 
-def to_excel(rows: List[CardRow], out_path: str) -> None:
-    """Schreibt eine Liste von Karten in ``out_path``."""
+COLUMNS = ["Original", "Frage", "Antwort", "Labels", "Quelle"]
+
+# Steuerzeichen aus PDF-Texten sind in XLSX-Zellen nicht erlaubt.
+_ILLEGAL_XLSX_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def iter_records(rows: Iterable[CardRow]) -> Iterator[Tuple[str, str, str, str, str]]:
+    """Liefert je Frage/Antwort-Paar eine Exportzeile in der Reihenfolge von ``COLUMNS``."""
+    for r in rows:
+        labels = ", ".join(r.labels)
+        for q, a in zip(r.fragen, r.antworten):
+            yield (r.original, q, a, labels, r.source)
+
+
+def _clean(value: str) -> str:
+    return _ILLEGAL_XLSX_CHARS.sub("", value)
+
+
+def write_xlsx_stream(rows: Iterable[CardRow], out_path: str | Path) -> int:
+    """Schreibt Karten streamend als XLSX und gibt die Anzahl Zeilen zurück.
+
+    Bevorzugt openpyxl (``write_only``), sonst xlsxwriter (``constant_memory``).
+    Ist keines von beiden installiert, wird ``ImportError`` ausgelöst.
+    """
+    return write_xlsx_records(iter_records(rows), out_path)
+
+
+def write_xlsx_records(records: Iterable[Sequence[str]], out_path: str | Path) -> int:
+    """Wie `write_xlsx_stream`, aber für fertige Exportzeilen (siehe ``COLUMNS``)."""
+    count = 0
+    try:
+        from openpyxl import Workbook
+    except ImportError:
+        Workbook = None
+
+    if Workbook is not None:
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("Lernkarten")
+        ws.append(COLUMNS)
+        for rec in records:
+            ws.append([_clean(v) for v in rec])
+            count += 1
+        wb.save(str(out_path))
+        return count
+
+    import xlsxwriter  # ImportError wird an den Aufrufer weitergereicht
+
+    wb = xlsxwriter.Workbook(str(out_path), {"constant_memory": True})
+    ws = wb.add_worksheet("Lernkarten")
+    ws.write_row(0, 0, COLUMNS)
+    for rec in records:
+        count += 1
+        ws.write_row(count, 0, [_clean(v) for v in rec])
+    wb.close()
+    return count
+
+
+def write_csv_stream(rows: Iterable[CardRow], out_path: str | Path) -> int:
+    """Schreibt Karten streamend als CSV (UTF-8) und gibt die Anzahl Zeilen zurück."""
+    count = 0
+    with Path(out_path).open("w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(COLUMNS)
+        for rec in iter_records(rows):
+            w.writerow(rec)
+            count += 1
+    return count
+
+
+def to_excel(rows: Iterable[CardRow], out_path: str) -> None:
+    """Schreibt Karten aus ``rows`` (Liste oder Iterator) in ``out_path``."""
 
     path = Path(out_path)
     path.parent.mkdir(parents=True, exist_ok=True)
 
-    if not rows:
+    it = iter(rows)
+    first = next(it, None)
+    if first is None:
         # leere Datei anlegen, aber nicht craschen
         path.touch()
         return
+    it = chain((first,), it)
 
-    data = [
-        {
-            "Original": r.original,
-            "Frage": q,
-            "Antwort": a,
-            "Labels": ", ".join(r.labels),
-            "Quelle": r.source,
-        }
-        for r in rows
-        for q, a in zip(r.fragen, r.antworten)
-    ]
-
-    if pd is not None:
-        try:
-            pd.DataFrame(data).to_excel(path, index=False)
-        except OSError as exc:
-            raise RuntimeError(f"Could not write Excel file {path}: {exc}") from exc
-    else:
+    try:
+        write_xlsx_stream(it, path)
+    except ImportError:
         # Fallback: CSV erzeugen, gleiche Basename
-        import csv
-        csv_path = path.with_suffix(".csv")
-        with csv_path.open("w", encoding="utf-8", newline="") as f:
-            w = csv.DictWriter(
-                f, fieldnames=["Original", "Frage", "Antwort", "Labels", "Quelle"]
-            )
-            w.writeheader()
-            w.writerows(data)
+        write_csv_stream(it, path.with_suffix(".csv"))
+    except OSError as exc:
+        raise RuntimeError(f"Could not write Excel file {path}: {exc}") from exc
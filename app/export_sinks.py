@@ -0,0 +1,241 @@
+"""Inkrementelle Export-Ziele, die während der Kartenerzeugung befüllt werden.
+
+`pipeline.generate_cards` übergibt jede fertige `CardRow` sofort an eine
+`ExportSink`. Dadurch liegt schon während des Laufs – und auch nach einem
+Absturz oder Abbruch – eine gültige Datei mit allen bisher erzeugten Karten
+vor.
+
+* `CsvSink` / `JsonlSink` hängen Zeilen an und schreiben sie periodisch
+  (alle ``flush_every`` Zeilen bzw. ``flush_interval`` Sekunden) auf die Platte.
+* `XlsxSink` sammelt die Zeilen in einer CSV-Zwischendatei
+  (``<name>.partial.csv``), die jederzeit geöffnet werden kann, und erzeugt die
+  XLSX-Datei erst beim Schließen – dann in Dokumentreihenfolge
+  (``CardRow.segment_id``), nicht in der Reihenfolge der Fertigstellung.
+
+`open_sink` wählt die passende Implementierung anhand der Dateiendung.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, Iterator, Protocol
+
+from .excel_export import COLUMNS, iter_records, write_xlsx_records
+from .logging_utils import get_logger
+from .pipeline_models import CardRow
+
+logger = get_logger(__name__)
+
+
+class ExportSink(Protocol):
+    """Schnittstelle für inkrementelle Exporte."""
+
+    path: Path
+
+    def write(self, row: CardRow) -> None:
+        ...
+
+    def flush(self) -> None:
+        ...
+
+    def close(self) -> None:
+        ...
+
+
+class _AppendSink:
+    """Gemeinsame Basis: Zeilen eines Laufs anhängen, periodisch flushen.
+
+    Eine vorhandene Datei wird beim Öffnen geleert – ein zweiter Lauf (oder ein
+    nach Absturz neu gestarteter Job) schreibt sonst Karten doppelt.
+    """
+
+    def __init__(self, path: str | os.PathLike, flush_every: int = 20, flush_interval: float = 2.0):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.rows_written = 0
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._fh = self.path.open("w", encoding="utf-8", newline="")
+        self._write_header()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def _write_header(self) -> None:
+        pass
+
+    def _write_row(self, row: CardRow) -> int:
+        raise NotImplementedError
+
+    def write(self, row: CardRow) -> None:
+        with self._lock:
+            if self._closed:
+                raise ValueError(f"Export-Ziel bereits geschlossen: {self.path}")
+            self.rows_written += self._write_row(row)
+            self._pending += 1
+            if (
+                self._pending >= self.flush_every
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            ):
+                self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._closed:
+                self._flush_locked()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._flush_locked()
+            self._fh.close()
+            self._closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class CsvSink(_AppendSink):
+    """Hängt Exportzeilen (Spalten wie `excel_export.COLUMNS`) an eine CSV an."""
+
+    def __init__(self, path: str | os.PathLike, **kwargs):
+        self._writer = None
+        super().__init__(path, **kwargs)
+
+    def _csv(self):
+        if self._writer is None:
+            self._writer = csv.writer(self._fh)
+        return self._writer
+
+    def _write_header(self) -> None:
+        self._csv().writerow(COLUMNS)
+
+    def _write_row(self, row: CardRow) -> int:
+        records = list(iter_records([row]))
+        self._csv().writerows(records)
+        return len(records)
+
+
+class JsonlSink(_AppendSink):
+    """Hängt je Karte ein JSON-Objekt (Schlüssel wie `excel_export.COLUMNS`) an."""
+
+    def _write_row(self, row: CardRow) -> int:
+        n = 0
+        for rec in iter_records([row]):
+            self._fh.write(json.dumps(dict(zip(COLUMNS, rec)), ensure_ascii=False) + "\n")
+            n += 1
+        return n
+
+
+class _SpoolSink(CsvSink):
+    """CSV-Zwischendatei mit vorangestellter Spalte ``Nr`` (``CardRow.segment_id``)."""
+
+    def _write_header(self) -> None:
+        self._csv().writerow(("Nr",) + tuple(COLUMNS))
+
+    def _write_row(self, row: CardRow) -> int:
+        nr = "" if row.segment_id is None else str(row.segment_id)
+        records = [(nr,) + rec for rec in iter_records([row])]
+        self._csv().writerows(records)
+        return len(records)
+
+
+def _spool_key(record: list) -> tuple:
+    # Zeilen ohne Segment-ID bleiben in Schreibreihenfolge hinter den übrigen
+    return (0, int(record[0])) if record[0] else (1, 0)
+
+
+def _read_spool(path: Path) -> Iterator[list]:
+    with path.open(encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        next(reader, None)  # Kopfzeile
+        yield from reader
+
+
+class XlsxSink:
+    """Schreibt während des Laufs eine CSV-Zwischendatei, beim Schließen die XLSX.
+
+    Die Zwischendatei enthält die Zeilen in der Reihenfolge der Fertigstellung
+    plus eine Spalte ``Nr``; die XLSX wird nach ``Nr`` sortiert geschrieben.
+    Ist die Zwischendatei schon sortiert, wird sie direkt durchgereicht, sonst
+    einmal in den Speicher gelesen. Ist kein XLSX-Writer installiert, bleibt
+    eine CSV ``<name>.csv`` neben dem gewünschten Ziel liegen (wie bei
+    `to_excel`).
+    """
+
+    def __init__(self, path: str | os.PathLike, **kwargs):
+        self.path = Path(path)
+        self.spool_path = self.path.with_suffix(".partial.csv")
+        self._spool = _SpoolSink(self.spool_path, **kwargs)
+
+    @property
+    def rows_written(self) -> int:
+        return self._spool.rows_written
+
+    def write(self, row: CardRow) -> None:
+        self._spool.write(row)
+
+    def flush(self) -> None:
+        self._spool.flush()
+
+    def close(self) -> None:
+        if self._spool.closed:
+            return
+        self._spool.close()
+        keys = [_spool_key(r) for r in _read_spool(self.spool_path)]
+        in_order = all(a <= b for a, b in zip(keys, keys[1:]))
+        sorted_records = None if in_order else sorted(_read_spool(self.spool_path), key=_spool_key)
+
+        def records() -> Iterable[list]:
+            rows = _read_spool(self.spool_path) if sorted_records is None else sorted_records
+            return (r[1:] for r in rows)
+
+        try:
+            write_xlsx_records(records(), self.path)
+        except ImportError:
+            csv_path = self.path.with_suffix(".csv")
+            logger.warning("Kein XLSX-Writer installiert, Export bleibt CSV: %s", csv_path)
+            with csv_path.open("w", encoding="utf-8", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(COLUMNS)
+                writer.writerows(records())
+            self.path = csv_path
+        self.spool_path.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def open_sink(path: str | os.PathLike, **kwargs) -> ExportSink:
+    """Öffnet ein Export-Ziel passend zur Dateiendung (``.csv``, ``.jsonl``, ``.xlsx``)."""
+    suffix = Path(path).suffix.lower()
+    if suffix == ".csv":
+        return CsvSink(path, **kwargs)
+    if suffix in (".jsonl", ".ndjson"):
+        return JsonlSink(path, **kwargs)
+    if suffix == ".xlsx":
+        return XlsxSink(path, **kwargs)
+    raise ValueError(f"Unbekanntes Exportformat: {suffix or path}")
@@ -17,23 +17,24 @@ from ttkbootstrap.tooltip import ToolTip
 from ttkbootstrap.toast import ToastNotification
 from ttkbootstrap.scrolled import ScrolledText
 
-try:
-    from openai import OpenAIError
-except ImportError:  # pragma: no cover - fallback if openai not installed
-    OpenAIError = Exception
-
 from .config import load_config, load_api_key
 from .pipeline import LernkartenPipeline
+from .openai_client import OpenAIClient, OpenAISettings, api_errors
+from .cache import ResponseCache
 from .cost import estimate_cost_for_text
-from .pdf_utils import try_extract_text
+from .ingest import BackgroundJob
+from .pdf_ingest import extract_pages_from_pdf
 from .models import count_tokens_rough
 from .logging_utils import get_logger
+from .ui_channel import UiChannel, append_capped
+from .ui_watchdog import UiWatchdog
 from .theme import make_root, attach_theme_toggle, DEFAULT_THEME, ALT_THEME
 
 logger = get_logger(__name__)
 
 APP_TITLE = "GSA Flashcards (GPT‑5 Serie)"
 LOG_MAX_LINES = 1000
+PREVIEW_MAX_CARDS = 200  # Ringpuffer der Vorschau, hält den Speicher bei großen Läufen flach
 
 def run_gui():
     cfg = load_config()
@@ -163,6 +164,8 @@ def run_gui():
 
     log_widget = ScrolledText(tab_log, wrap="word")
     log_widget.pack(fill="both", expand=True)
+    preview_widget = ScrolledText(tab_preview, wrap="word")
+    preview_widget.pack(fill="both", expand=True)
 
     # Status bar
     status = tb.Frame(root, padding=(10,6))
@@ -174,14 +177,39 @@ def run_gui():
 
     # ===== Functions =====
     def log(msg: str) -> None:
-        log_widget.insert("end", msg + "\n")
-        log_widget.see("end")
-        if int(log_widget.index('end-1c').split('.')[0]) > LOG_MAX_LINES:
-            log_widget.delete("1.0", "2.0")
+        append_capped(log_widget, msg + "\n", LOG_MAX_LINES)
+
+    def show_cards(cards) -> None:
+        text = "".join(f"F: {c.frage}\nA: {c.antwort}\n\n" for c in cards)
+        append_capped(preview_widget, text, PREVIEW_MAX_CARDS * 3)
+
+    stage_names = {
+        "pages": "Seiten gelesen",
+        "ocr": "Texterkennung (OCR)",
+        "tokens": "Tokens gezählt",
+        "classify": "Klassifikation",
+        "qa": "Lernkarten",
+    }
+
+    def show_progress(stage: str, done: int, total: int) -> None:
+        progress.configure(value=100 * done / max(total, 1))
+        status_var.set(f"{stage_names.get(stage, stage)} {done}/{total}")
+
+    # Worker-Threads melden nur an den Kanal; Widgets ändert allein der Tk-Thread
+    ui = UiChannel(
+        root,
+        max_cards=PREVIEW_MAX_CARDS,
+        on_progress=show_progress,
+        on_cards=show_cards,
+        on_log=lambda lines: log("\n".join(lines)),
+    ).start()
+    # Schätzung läuft im Hintergrund; eine neue Datei bricht sie ab
+    estimate_job = BackgroundJob(ui.call, name="estimate")
 
     def choose_file() -> None:
         p = filedialog.askopenfilename(filetypes=[("PDF/TXT","*.pdf *.txt"), ("Alle Dateien","*.*")])
         if p:
+            estimate_job.cancel()
             file_path_var.set(p)
 
     def choose_out() -> None:
@@ -198,16 +226,37 @@ def run_gui():
         if not p:
             ToastNotification(title="Fehler", message="Bitte zunächst eine Datei wählen.", bootstyle="danger").show_toast()
             return
-        raw = try_extract_text(p)
-        if not raw.strip():
-            ToastNotification(title="Fehler", message="Konnte keinen Text extrahieren.", bootstyle="danger").show_toast()
-            return
         model = model_var.get()
         label_model = label_model_var.get()
         thorough = thorough_var.get()
-        est = estimate_cost_for_text(raw, model=model, label_model=label_model, questions_per_chunk=thorough)
-        log(f"[SCHÄTZUNG] Tokens_in={est['in_tokens']:,} | Tokens_out≈{est['out_tokens']:,} | Chunks={est['chunks']}")
-        log(f"  Label‑Kosten (Nano)≈ ${est['cost_label_usd']:.4f}  | QA‑Kosten ({model})≈ ${est['cost_qa_usd']:.4f}  | Gesamt≈ ${est['total_cost_usd']:.4f}")
+
+        def work(token):
+            def on_page(done: int, total: int) -> None:
+                token.check()
+                ui.post_progress("pages", done, total)
+
+            pages = extract_pages_from_pdf(p, progress_cb=on_page)
+            token.check()
+            raw = "\n\n".join(txt for _, txt in pages)
+            if not raw.strip():
+                return None
+            est = estimate_cost_for_text(raw, model=model, label_model=label_model, questions_per_chunk=thorough)
+            ui.post_progress("tokens", est["chunks"], est["chunks"])
+            return est
+
+        def done(est) -> None:
+            if est is None:
+                ToastNotification(title="Fehler", message="Konnte keinen Text extrahieren.", bootstyle="danger").show_toast()
+                return
+            log(f"[SCHÄTZUNG] Tokens_in={est['in_tokens']:,} | Tokens_out≈{est['out_tokens']:,} | Chunks={est['chunks']}")
+            log(f"  Label‑Kosten (Nano)≈ ${est['cost_label_usd']:.4f}  | QA‑Kosten ({model})≈ ${est['cost_qa_usd']:.4f}  | Gesamt≈ ${est['total_cost_usd']:.4f}")
+
+        def failed(ex) -> None:
+            log(f"[FEHLER] {ex}")
+            ToastNotification(title="Fehler", message=f"{ex.__class__.__name__}: {ex}", bootstyle="danger").show_toast()
+
+        status_var.set("Lese & schätze ...")
+        estimate_job.submit(work, done, failed)
 
     def start() -> None:
         p = file_path_var.get().strip()
@@ -222,35 +271,40 @@ def run_gui():
             return
         outd = out_dir_var.get().strip() or "."
         os.makedirs(outd, exist_ok=True)
-        pipeline = LernkartenPipeline(
+        settings = OpenAISettings(
             api_key=api,
+            classify_model=label_model_var.get(),
             qa_model=model_var.get(),
-            label_model=label_model_var.get(),
-            use_cache=use_cache_var.get(),
-            budget_usd=float(budget_var.get() or 0),
-            limit_by_budget=limit_by_budget_var.get(),
-            questions_per_chunk=thorough_var.get(),
-            ui_logger=log,
-            ui_progress=lambda v: progress.configure(value=v),
-            ui_status=lambda s: status_var.set(s),
         )
+        cache = ResponseCache.from_config(use_cache_var.get())
+        pipeline = LernkartenPipeline(settings, client=OpenAIClient(settings, cache=cache))
         def worker():
             try:
-                out = pipeline.run(p, out_dir=outd)
-                root.after(
-                    0,
+                result = pipeline.run(
+                    p,
+                    out_dir=outd,
+                    max_questions_per_chunk=thorough_var.get(),
+                    budget_usd=float(budget_var.get() or 0),
+                    limit_by_budget=limit_by_budget_var.get(),
+                    adjust_cb=lambda n: ui.post_log(f"Fragen je Segment auf {n} reduziert (Budget)."),
+                    progress_cb=ui.post_progress,
+                    card_cb=ui.post_card,
+                )
+                out = result.out_path
+                ui.call(
                     lambda: ToastNotification(
                         title="Fertig", message=f"Export erstellt:\n{out}"
                     ).show_toast(),
                 )
-            except (OSError, ValueError, RuntimeError, OpenAIError) as ex:
+            except (OSError, ValueError, RuntimeError) + api_errors() as ex:
                 logger.exception("Fehler bei der Pipeline-Ausführung")
-                log(f"[FEHLER] {ex}")
-                root.after(
-                    0,
+                ui.post_log(f"[FEHLER] {ex}")
+                # ``ex`` existiert nach dem except-Block nicht mehr → Text vorher bilden
+                message = f"{ex.__class__.__name__}: {ex}"
+                ui.call(
                     lambda: ToastNotification(
                         title="Fehler",
-                        message=f"{ex.__class__.__name__}: {ex}",
+                        message=message,
                         bootstyle="danger",
                     ).show_toast(),
                 )
@@ -280,4 +334,5 @@ def run_gui():
         ).show_toast()
 
     root.protocol("WM_DELETE_WINDOW", on_close)
+    UiWatchdog.from_config(root)
     root.mainloop()
@@ -0,0 +1,158 @@
+"""Einlesen und Schätzen im Hintergrund, abbrechbar und mit Fortschritt.
+
+`ingest_pdf` bündelt, was die GUIs bisher im Tk-Thread erledigt haben:
+Seiten extrahieren, segmentieren, Gliederungen verwerfen und Tokens zählen.
+Fortschritt kommt stufenweise als ``progress_cb(stufe, fertig, gesamt)`` mit
+den Stufen ``"pages"``, ``"segments"`` und ``"tokens"``; zwischen den
+Schritten wird das `CancelToken` geprüft.
+
+`BackgroundJob` führt solche Funktionen in einem Daemon-Thread aus. Es gibt
+höchstens einen aktuellen Auftrag: ein neuer bricht den alten ab, und
+Ergebnisse abgebrochener Aufträge werden verworfen. Ergebnisse und Fehler
+werden über ``post`` (z. B. `UiChannel.call`) im Tk-Thread zugestellt.
+"""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional, Sequence
+
+from .cancel import CancelToken, Cancelled
+from .logging_utils import get_logger
+from .pipeline_models import Segment
+
+logger = get_logger(__name__)
+
+ProgressCb = Callable[[str, int, int], None]
+
+
+@dataclass
+class IngestResult:
+    path: str
+    segments: List[Segment]
+    page_count: int
+    full_text: str
+    token_counts: List[int] = field(default_factory=list)
+
+    @property
+    def avg_tokens(self) -> int:
+        return int(sum(self.token_counts) / max(1, len(self.token_counts)))
+
+
+def ingest_pdf(
+    path: str,
+    *,
+    pages: str | Sequence[int] | None = None,
+    chapters: Sequence[str] | None = None,
+    progress_cb: Optional[ProgressCb] = None,
+    token: Optional[CancelToken] = None,
+    tokenizer=None,
+) -> IngestResult:
+    """Extrahiert, segmentiert und zählt Tokens; löst bei Abbruch `Cancelled` aus."""
+    from . import tracing
+    from .pdf_ingest import load_pages, segment_pages
+    from .segment_filters import is_outline_segment
+    from .tokenizer_utils import Tokenizer
+
+    token = token or CancelToken()
+
+    def report(stage: str, done: int, total: int) -> None:
+        token.check()
+        if progress_cb:
+            progress_cb(stage, done, total)
+
+    with tracing.span("extract", path=path):
+        page_list = load_pages(
+            path, pages=pages, chapters=chapters,
+            progress_cb=lambda done, total: report("pages", done, total),
+            ocr_progress_cb=lambda done, total: report("ocr", done, total),
+            token=token,
+        )
+    token.check()
+    with tracing.span("segment"):
+        chunks = segment_pages(page_list)
+    # Verzeichnisse wie "Inhaltsverzeichnis" oder "Glossar" ignorieren
+    segments = [
+        Segment(text=text, start_page=start, end_page=end)
+        for text, start, end in chunks
+        if not is_outline_segment(text)
+    ]
+    report("segments", len(segments), len(segments))
+
+    tok = tokenizer or Tokenizer()
+    counts: List[int] = []
+    step = max(1, len(segments) // 100)
+    for i, s in enumerate(segments, 1):
+        counts.append(tok.count(s.text))
+        if i % step == 0 or i == len(segments):
+            report("tokens", i, len(segments))
+    return IngestResult(
+        path=path,
+        segments=segments,
+        page_count=len(page_list),
+        full_text="\n\n".join(txt for _, txt in page_list),
+        token_counts=counts,
+    )
+
+
+class BackgroundJob:
+    """Höchstens ein laufender Hintergrundauftrag; Ergebnisse kommen über ``post``.
+
+    ``post(fn, *args)`` muss ``fn(*args)`` im UI-Thread ausführen
+    (`UiChannel.call` oder ein Wrapper um ``root.after``).
+    """
+
+    def __init__(self, post: Callable[..., None], name: str = "background"):
+        self.post = post
+        self.name = name
+        self._token: Optional[CancelToken] = None
+        self._lock = threading.Lock()
+
+    @property
+    def busy(self) -> bool:
+        with self._lock:
+            return self._token is not None and not self._token.cancelled
+
+    def cancel(self) -> None:
+        with self._lock:
+            if self._token is not None:
+                self._token.cancel()
+                self._token = None
+
+    def submit(
+        self,
+        fn: Callable[[CancelToken], Any],
+        on_done: Callable[[Any], None],
+        on_error: Optional[Callable[[BaseException], None]] = None,
+    ) -> CancelToken:
+        """Bricht den laufenden Auftrag ab und startet ``fn(token)`` im Hintergrund."""
+        token = CancelToken()
+        with self._lock:
+            if self._token is not None:
+                self._token.cancel()
+            self._token = token
+
+        def run() -> None:
+            try:
+                result = fn(token)
+            except Cancelled:
+                return
+            except Exception as e:  # noqa: BLE001 - wird im UI-Thread gemeldet
+                if not token.cancelled:
+                    logger.warning("%s fehlgeschlagen: %s", self.name, e)
+                    if on_error is not None:
+                        self.post(self._deliver, token, on_error, e)
+                return
+            self.post(self._deliver, token, on_done, result)
+
+        threading.Thread(target=run, name=self.name, daemon=True).start()
+        return token
+
+    def _deliver(self, token: CancelToken, callback: Callable[[Any], None], value: Any) -> None:
+        # Im UI-Thread: nur zustellen, wenn inzwischen nichts Neueres gestartet wurde
+        with self._lock:
+            if token is not self._token or token.cancelled:
+                return
+            self._token = None
+        callback(value)
@@ -2,28 +2,136 @@
 
 Stellt `get_logger` bereit, das sowohl in der GUI als auch in Skripten für eine
 einheitliche Log-Ausgabe sorgt. Die Logdateien liegen im Unterordner ``.logs``.
+
+Log-Aufrufe landen über einen `QueueHandler` in einer Warteschlange; Datei und
+Konsole werden von einem `QueueListener` in dessen eigenem Thread bedient. So
+blockieren Worker-Threads der Pipeline nicht auf Datei- oder Konsolen-I/O.
+
+Optional schreibt `log_request` strukturierte Datensätze je API-Anfrage
+(Request-ID, Modell, Stufe, Latenz, Tokens, Wiederholungen) als JSON-Zeilen in
+``.logs/requests_<datum>.jsonl``; aktiviert wird das mit `enable_request_log`.
 """
 
+import atexit
+import datetime
+import json
 import logging
+import logging.handlers
 import pathlib
-import datetime
+import queue
+import threading
+from typing import Any, Dict, List, Optional
 
+LOG_DIR = pathlib.Path(__file__).resolve().parent / ".logs"
+
+_lock = threading.Lock()
+_listeners: List[logging.handlers.QueueListener] = []
+_request_logger: Optional[logging.Logger] = None
+_request_log_path: Optional[pathlib.Path] = None
+_request_listener: Optional[logging.handlers.QueueListener] = None
 
-def get_logger(name: str = "gsa") -> logging.Logger:
-    """Return a module-specific logger configured once for the application."""
 
-    log_dir = pathlib.Path(__file__).resolve().parent / ".logs"
-    log_dir.mkdir(exist_ok=True)
-    logfile = log_dir / f"gsa_{datetime.datetime.now().strftime('%Y%m%d')}.log"
+def _today() -> str:
+    return datetime.datetime.now().strftime("%Y%m%d")
 
+
+def _start_listener(*handlers: logging.Handler) -> logging.handlers.QueueHandler:
+    """Startet einen `QueueListener` für ``handlers`` und liefert den passenden `QueueHandler`."""
+    q: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(q, *handlers, respect_handler_level=True)
+    listener.start()
+    if not _listeners:
+        atexit.register(shutdown_logging)
+    _listeners.append(listener)
+    return logging.handlers.QueueHandler(q)
+
+
+def _configure_root() -> None:
+    root = logging.getLogger()
     # Configure root logger only once to avoid duplicate handlers
-    if not logging.getLogger().handlers:
-        logging.basicConfig(
-            level=logging.INFO,
-            format="%(asctime)s %(levelname)s %(message)s",
-            handlers=[
-                logging.FileHandler(logfile, encoding="utf-8"),
-                logging.StreamHandler(),
-            ],
-        )
+    if root.handlers:
+        return
+    with _lock:
+        if root.handlers:
+            return
+        LOG_DIR.mkdir(exist_ok=True)
+        fmt = logging.Formatter("%(asctime)s %(levelname)s %(message)s")
+        file_handler = logging.FileHandler(LOG_DIR / f"gsa_{_today()}.log", encoding="utf-8")
+        console = logging.StreamHandler()
+        for h in (file_handler, console):
+            h.setFormatter(fmt)
+        root.addHandler(_start_listener(file_handler, console))
+        root.setLevel(logging.INFO)
+
+
+def get_logger(name: str = "gsa") -> logging.Logger:
+    """Return a module-specific logger configured once for the application."""
+
+    _configure_root()
     return logging.getLogger(name)
+
+
+def shutdown_logging() -> None:
+    """Stoppt die Listener-Threads und schreibt ausstehende Einträge weg."""
+    with _lock:
+        while _listeners:
+            _listeners.pop().stop()
+
+
+def enable_request_log(path: Optional[str] = None) -> pathlib.Path:
+    """Aktiviert die JSONL-Datei mit einem Datensatz je API-Anfrage.
+
+    Ohne ``path`` wird ``.logs/requests_<datum>.jsonl`` verwendet. Mehrfache
+    Aufrufe sind unschädlich; der erste legt die Datei fest.
+    """
+    global _request_logger, _request_log_path, _request_listener
+    with _lock:
+        if _request_log_path is not None:
+            return _request_log_path
+        target = pathlib.Path(path) if path else LOG_DIR / f"requests_{_today()}.jsonl"
+        target.parent.mkdir(parents=True, exist_ok=True)
+        handler = logging.FileHandler(target, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger = logging.getLogger("gsa.requests")
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        queue_handler = _start_listener(handler)
+        logger.addHandler(queue_handler)
+        _request_listener = _listeners[-1]
+        _request_logger = logger
+        _request_log_path = target
+        return target
+
+
+def disable_request_log() -> None:
+    """Schließt das Request-Log (ausstehende Datensätze werden noch geschrieben)."""
+    global _request_logger, _request_log_path, _request_listener
+    with _lock:
+        if _request_logger is None:
+            return
+        for h in list(_request_logger.handlers):
+            _request_logger.removeHandler(h)
+        if _request_listener in _listeners:
+            _listeners.remove(_request_listener)
+            _request_listener.stop()
+            for h in _request_listener.handlers:
+                h.close()
+        _request_logger = _request_log_path = _request_listener = None
+
+
+def request_log_enabled() -> bool:
+    return _request_logger is not None
+
+
+def log_request(**fields: Any) -> None:
+    """Schreibt einen strukturierten Request-Datensatz, falls aktiviert.
+
+    Übliche Felder: ``request_id``, ``model``, ``stage``, ``latency_ms``,
+    ``prompt_tokens``, ``completion_tokens``, ``retries``, ``status``.
+    """
+    if _request_logger is None:
+        return
+    record: Dict[str, Any] = {"ts": datetime.datetime.now().isoformat(timespec="milliseconds")}
+    record.update(fields)
+    # Schon hier serialisieren: der QueueHandler macht aus ``msg`` ohnehin einen String.
+    _request_logger.info(json.dumps(record, ensure_ascii=False, default=str))
@@ -7,6 +7,7 @@ aus einem Skript heraus verwendet werden kann.
 
 from __future__ import annotations
 import os, sys, threading, time, re
+from contextlib import nullcontext
 from tkinter import (
     filedialog,
     simpledialog,
@@ -21,18 +22,13 @@ from tkinter import (
     TclError,
 )
 import ttkbootstrap as tb
-from ttkbootstrap import ttk
+try:
+    from ttkbootstrap import ttk
+except ImportError:  # neuere ttkbootstrap-Versionen patchen tkinter.ttk direkt
+    from tkinter import ttk
 from ttkbootstrap.scrolled import ScrolledText
 from ttkbootstrap.toast import ToastNotification
 from app.theme import make_root, attach_theme_toggle
-from pypdf.errors import PdfReadError
-try:
-    import openai
-    from openai import OpenAIError
-except ImportError:  # pragma: no cover - fallback if openai not installed
-    from types import SimpleNamespace
-    openai = SimpleNamespace(APIStatusError=Exception)  # type: ignore
-    OpenAIError = Exception
 
 from .config import (
     DEFAULT_CLASSIFY_MODEL,
@@ -44,12 +40,29 @@ from .config import (
     load_api_key,
 )
 from .pipeline import LernkartenPipeline
-from .openai_client import OpenAISettings
+from .openai_client import OpenAIClient, OpenAISettings, api_errors
+from .cache import ResponseCache
+from .export_sinks import open_sink
+from . import metrics, profiling, tracing
+from .pdf_ingest import pdf_errors
+from .cancel import CancelToken
+from .ingest import BackgroundJob
+from .ui_channel import UiChannel, append_capped
+from .ui_watchdog import UiWatchdog
 from .logging_utils import get_logger
 
 logger = get_logger(__name__)
 
 APP_TITLE = "Lernkarten-Generator (Installer-fix)"
+LOG_MAX_LINES = 2000
+PROGRESS_STAGES = {
+    "pages": "Seiten gelesen",
+    "ocr": "Texterkennung (OCR)",
+    "segments": "Segmente gebildet",
+    "tokens": "Tokens gezählt",
+    "classify": "Klassifikation",
+    "qa": "Lernkarten",
+}
 
 def safe_tk():
     try:
@@ -71,6 +84,11 @@ class App:
         self.qa_model = StringVar(value=DEFAULT_QA_MODEL)
         self.questions_per_chunk = IntVar(value=8)
         self.language = StringVar(value=DEFAULT_LANGUAGE)
+        self.page_range = StringVar(value="")
+        self.chapters = StringVar(value="")
+        self.export_anki = BooleanVar(value=False)
+        self.profile = BooleanVar(value=False)
+        self.review_labels = BooleanVar(value=True)
 
         self.progress = StringVar(value="Bereit.")
         self.cost_label = StringVar(value="—")
@@ -82,9 +100,24 @@ class App:
         self._pause_event = threading.Event()
         self._pause_event.set()
         self._total_pages = 0
+        self._seg_avg_tokens = 0
+        self._speculation = None
+        self._cancel_token = None
         self.export_title: str | None = None
+        self._out_path = ""
 
         self.build_ui()
+        # Worker-Threads melden nur an den Kanal; Widgets ändert allein der Tk-Thread
+        self.ui = UiChannel(
+            root,
+            on_progress=self._show_progress,
+            on_status=self.progress.set,
+            on_cards=lambda cards: self._show_card(cards[-1]),
+            on_log=lambda lines: self._append_log("\n".join(lines) + "\n"),
+        ).start()
+        # Einlesen läuft im Hintergrund; eine andere Datei bricht es ab
+        self._ingest = BackgroundJob(self.ui.call, name="ingest")
+        self.file_path.trace_add("write", lambda *_: self._reset_segments())
         if source in {"config", "file"}:
             ToastNotification(
                 title=APP_TITLE,
@@ -126,51 +159,70 @@ class App:
         ttk.Label(frm, text="Sprache:").grid(row=4, column=0, sticky=W)
         ttk.Combobox(frm, textvariable=self.language, values=("de","en")).grid(row=4, column=1, sticky=W)
 
-        # Row 5: Slider
-        ttk.Label(frm, text="Max. Karten pro Segment:").grid(row=5, column=0, sticky=W, pady=(8,0))
+        # Row 5: Auswahl (nur diese Seiten/Kapitel verarbeiten)
+        ttk.Label(frm, text="Seiten / Kapitel:").grid(row=5, column=0, sticky=W)
+        sel = ttk.Frame(frm)
+        sel.grid(row=5, column=1, sticky=W)
+        ttk.Entry(sel, textvariable=self.page_range, width=14).grid(row=0, column=0)
+        ttk.Entry(sel, textvariable=self.chapters, width=14).grid(row=0, column=1, padx=(5, 0))
+        ttk.Label(frm, text="z. B. 120-180 | 3.*, 4.2").grid(row=5, column=2, sticky=W)
+
+        # Row 6: Slider
+        ttk.Label(frm, text="Max. Karten pro Segment:").grid(row=6, column=0, sticky=W, pady=(8,0))
         scale = ttk.Scale(frm, from_=2, to=24, orient="horizontal", command=self.on_scale)
         scale.set(self.questions_per_chunk.get())
-        scale.grid(row=5, column=1, sticky=(E,W), pady=(8,0))
+        scale.grid(row=6, column=1, sticky=(E,W), pady=(8,0))
         self.scale_widget = scale
 
-        # Row 6: Kosten
-        ttk.Label(frm, text="Kosten-Schaetzung:").grid(row=6, column=0, sticky=W)
-        ttk.Label(frm, textvariable=self.cost_label).grid(row=6, column=1, sticky=W)
+        # Row 7: Kosten
+        ttk.Label(frm, text="Kosten-Schaetzung:").grid(row=7, column=0, sticky=W)
+        ttk.Label(frm, textvariable=self.cost_label).grid(row=7, column=1, sticky=W)
+        opts = ttk.Frame(frm)
+        opts.grid(row=7, column=2, sticky=W)
+        ttk.Checkbutton(opts, text="Zusätzlich Anki-Paket (.apkg)", variable=self.export_anki).grid(
+            row=0, column=0, sticky=W
+        )
+        ttk.Checkbutton(opts, text="Profiling (neben dem Export)", variable=self.profile).grid(
+            row=1, column=0, sticky=W
+        )
+        ttk.Checkbutton(opts, text="Labels vor den Lernkarten prüfen", variable=self.review_labels).grid(
+            row=2, column=0, sticky=W
+        )
 
-        # Row 7: Buttons
+        # Row 8: Buttons
         btns = ttk.Frame(frm)
-        btns.grid(row=7, column=0, columnspan=3, sticky=W, pady=(10,5))
+        btns.grid(row=8, column=0, columnspan=3, sticky=W, pady=(10,5))
         ttk.Button(btns, text="1) Segmentieren & Schaetzen", command=self.segment_and_estimate).grid(row=0, column=0, padx=5)
         ttk.Button(btns, text="2) Start (Labeln + Lernkarten + Export)", command=self.start_pipeline).grid(row=0, column=1, padx=5)
         ttk.Button(btns, text="Pause", command=self.pause).grid(row=0, column=2, padx=5)
         ttk.Button(btns, text="Fortsetzen", command=self.resume).grid(row=0, column=3, padx=5)
         ttk.Button(btns, text="Abbrechen", command=self.cancel).grid(row=0, column=4, padx=5)
 
-        # Row 8: Log
-        ttk.Label(frm, text="Protokoll:").grid(row=8, column=0, sticky=W)
+        # Row 9: Log
+        ttk.Label(frm, text="Protokoll:").grid(row=9, column=0, sticky=W)
         self.log = ScrolledText(frm, wrap="word")
-        self.log.grid(row=9, column=0, columnspan=3, sticky=(N,S,E,W))
-        frm.rowconfigure(9, weight=1)
+        self.log.grid(row=10, column=0, columnspan=3, sticky=(N,S,E,W))
+        frm.rowconfigure(10, weight=1)
 
         # Footer progress bar + status
         self.progress_bar = ttk.Progressbar(frm, mode="determinate")
-        self.progress_bar.grid(row=10, column=0, columnspan=3, sticky=(E,W), pady=(5,0))
-        ttk.Label(frm, textvariable=self.progress).grid(row=11, column=0, columnspan=3, sticky=(W))
+        self.progress_bar.grid(row=11, column=0, columnspan=3, sticky=(E,W), pady=(5,0))
+        ttk.Label(frm, textvariable=self.progress).grid(row=12, column=0, columnspan=3, sticky=(W))
 
-        # Row 12+: Vorschau der aktuellen Karte
-        ttk.Label(frm, text="Originaltext:").grid(row=12, column=0, sticky=W, pady=(8,0))
+        # Row 13+: Vorschau der aktuellen Karte
+        ttk.Label(frm, text="Originaltext:").grid(row=13, column=0, sticky=W, pady=(8,0))
         self.preview_orig = tb.Text(frm, wrap="word")
-        self.preview_orig.grid(row=13, column=0, columnspan=3, sticky=(E,W))
+        self.preview_orig.grid(row=14, column=0, columnspan=3, sticky=(E,W))
         self.preview_orig.configure(state="disabled")
 
-        ttk.Label(frm, text="Frage:").grid(row=14, column=0, sticky=W, pady=(4,0))
+        ttk.Label(frm, text="Frage:").grid(row=15, column=0, sticky=W, pady=(4,0))
         self.preview_frage = tb.Text(frm, wrap="word")
-        self.preview_frage.grid(row=15, column=0, columnspan=3, sticky=(E,W))
+        self.preview_frage.grid(row=16, column=0, columnspan=3, sticky=(E,W))
         self.preview_frage.configure(state="disabled")
 
-        ttk.Label(frm, text="Antwort:").grid(row=16, column=0, sticky=W, pady=(4,0))
+        ttk.Label(frm, text="Antwort:").grid(row=17, column=0, sticky=W, pady=(4,0))
         self.preview_antwort = tb.Text(frm, wrap="word")
-        self.preview_antwort.grid(row=17, column=0, columnspan=3, sticky=(E,W))
+        self.preview_antwort.grid(row=18, column=0, columnspan=3, sticky=(E,W))
         self.preview_antwort.configure(state="disabled")
 
     def on_scale(self, val):
@@ -189,26 +241,47 @@ class App:
             self.file_path.set(p)
 
     def logln(self, msg):
-        self.log.insert(END, msg + "\n")
-        self.log.see(END)
+        """Logzeile aus beliebigem Thread; erscheint beim nächsten Bild."""
+        self.ui.post_log(msg)
+
+    def _append_log(self, text: str):
+        append_capped(self.log, text, LOG_MAX_LINES)
 
     def update_preview(self, original: str, frage: str, antwort: str):
-        snippet = original.strip()
+        """Karte für die Vorschau; pro Bild wird nur die neueste angezeigt."""
+        self.ui.post_card(original, frage, antwort)
+
+    def _show_card(self, card):
+        snippet = card.original.strip()
         if len(snippet) > 200:
             snippet = snippet[:200] + "…"
+        for widget, content in (
+            (self.preview_orig, snippet),
+            (self.preview_frage, card.frage),
+            (self.preview_antwort, card.antwort),
+        ):
+            widget.configure(state="normal")
+            widget.delete("1.0", END)
+            widget.insert(END, content)
+            widget.configure(state="disabled")
+
+    def _show_progress(self, stage, i, total):
+        self.progress_bar.configure(value=i, maximum=total)
+        self.progress.set(f"{PROGRESS_STAGES.get(stage, stage)} {i}/{total}")
+
+    def _toast(self, message, bootstyle="info"):
+        """Toast aus beliebigem Thread (wird im Tk-Thread angezeigt)."""
+        self.ui.call(
+            lambda: ToastNotification(title=APP_TITLE, message=message, bootstyle=bootstyle).show_toast()
+        )
 
-        def do_update():
-            for widget, content in (
-                (self.preview_orig, snippet),
-                (self.preview_frage, frage),
-                (self.preview_antwort, antwort),
-            ):
-                widget.configure(state="normal")
-                widget.delete("1.0", END)
-                widget.insert(END, content)
-                widget.configure(state="disabled")
-
-        self.root.after(0, do_update)
+    def _reset_segments(self):
+        """Neue Datei: laufendes Einlesen abbrechen, alte Segmente verwerfen."""
+        self._ingest.cancel()
+        self._stop_speculation()
+        self._segments = None
+        self._full_text = ""
+        self._seg_avg_tokens = 0
 
     def segment_and_estimate(self):
         path = self.file_path.get().strip()
@@ -216,72 +289,95 @@ class App:
             ToastNotification(title=APP_TITLE, message="Bitte eine PDF-Datei waehlen.", bootstyle="danger").show_toast()
             return
         self.progress.set("Lese & segmentiere ...")
-        self.root.update()
-
-        try:
-            from .pdf_ingest import extract_text_from_pdf, segment_text
-            from .segment_filters import is_outline_segment
-            from .pipeline_models import Segment
-            from pypdf import PdfReader
-
-            txt = extract_text_from_pdf(path)
-            self._full_text = txt
-            segs = segment_text(txt)
-            # Verzeichnisse wie "Inhaltsverzeichnis" oder "Glossar" ignorieren
-            segs = [s for s in segs if not is_outline_segment(s)]
-            # Wandelt jeden Textabschnitt in ein Segment-Objekt um:
-            self._segments = [Segment(text=s) for s in segs]
+        chapters = [c.strip() for c in self.chapters.get().split(",") if c.strip()]
+        page_range = self.page_range.get().strip() or None
+
+        def work(token):
+            from .ingest import ingest_pdf
+            from .pipeline_models import format_page_span
+
+            with tracing.trace_run("segment"):
+                result = ingest_pdf(
+                    path,
+                    pages=page_range,
+                    chapters=chapters or None,
+                    progress_cb=self.ui.post_progress,
+                    token=token,
+                )
             # Save segments to a text file for reference
             segments_path = os.path.join(os.path.dirname(__file__), "..", "segments.txt")
             segments_path = os.path.abspath(segments_path)
             with open(segments_path, "w", encoding="utf-8") as f:
-                for i, segment_text in enumerate(segs, start=1):
-                    f.write(f"Segment {i}:\n{segment_text}\n\n")
-            try:
-                reader = PdfReader(path)
-                self._total_pages = len(reader.pages)
-            except (PdfReadError, OSError):
-                self._total_pages = 0
-            self.logln(f"Segmentiert: {len(segs)} Segmente.")
-            self.progress.set(f"Segmentierung fertig: {len(segs)} Segmente.")
-            self.update_cost_label()
-        except (OSError, ValueError, PdfReadError) as e:
-            logger.exception("Fehler bei Segmentierung")
-            ToastNotification(
-                title=APP_TITLE,
-                message=f"Fehler bei Segmentierung: {e.__class__.__name__}: {e}",
-                bootstyle="danger",
-            ).show_toast()
-            self.progress.set("Fehler.")
+                for i, seg in enumerate(result.segments, start=1):
+                    f.write(
+                        f"Segment {i} ({format_page_span(seg.start_page, seg.end_page)}):\n"
+                        f"{seg.text}\n\n"
+                    )
+            return result
+
+        self._ingest.submit(work, self._on_ingested, self._on_ingest_error)
+
+    def _on_ingested(self, result):
+        self._total_pages = result.page_count
+        self._full_text = result.full_text
+        self._segments = result.segments
+        self._seg_avg_tokens = result.avg_tokens
+        self.logln(f"Segmentiert: {len(result.segments)} Segmente aus {self._total_pages} Seiten.")
+        self.progress.set(f"Segmentierung fertig: {len(result.segments)} Segmente.")
+        self.update_cost_label()
+        self._start_speculation()
+
+    def _settings(self) -> OpenAISettings:
+        return OpenAISettings(
+            api_key=self.api_key.get().strip(),
+            classify_model=self.classify_model.get().strip(),
+            qa_model=self.qa_model.get().strip(),
+        )
+
+    def _start_speculation(self):
+        """Optional die ersten Segmente klassifizieren, während die Schätzung gelesen wird."""
+        from .speculative import SpeculativeClassifier
+
+        self._stop_speculation()
+        settings = self._settings()
+        if not settings.api_key or not self._segments:
             return
+        client = OpenAIClient(settings, cache=ResponseCache.from_config(), cancel=CancelToken())
+        self._speculation = SpeculativeClassifier.from_config(client, self._segments)
+
+    def _stop_speculation(self):
+        if self._speculation is not None:
+            self._speculation.stop()
+            self._speculation = None
+
+    def _on_ingest_error(self, e):
+        if not isinstance(e, (OSError, ValueError) + pdf_errors()):
+            logger.error("Unerwarteter Fehler bei Segmentierung: %r", e)
+        ToastNotification(
+            title=APP_TITLE,
+            message=f"Fehler bei Segmentierung: {e.__class__.__name__}: {e}",
+            bootstyle="danger",
+        ).show_toast()
+        self.progress.set("Fehler.")
 
     def update_cost_label(self):
         if not self._segments or not self._full_text:
             self.cost_label.set("— (erst segmentieren)")
             return
         try:
-            from .tokenizer_utils import Tokenizer
-            from .pipeline import LernkartenPipeline
-            from .config import PRICES
-            tok = Tokenizer()
-            # Wenn self._segments Segment-Objekte enthält, .text zum Zählen verwenden:
-            seg_token_counts = [tok.count(s.text) for s in self._segments]
-            seg_avg = int(sum(seg_token_counts)/max(1, len(seg_token_counts)))
+            # Token-Durchschnitt stammt aus dem Einlesen; hier wird nicht neu gezählt
+            seg_avg = self._seg_avg_tokens
             n_segments = len(self._segments)
             qpc = self.questions_per_chunk.get()
 
-            # settings nur fuer Schaetzung
-            settings = OpenAISettings(api_key="DUMMY",
-                                      classify_model=self.classify_model.get(),
-                                      qa_model=self.qa_model.get())
-            pipe = LernkartenPipeline(settings)
-            est = pipe.estimate_cost(
+            # reine Rechnung – kein Client und keine Pipeline je Schätzung
+            est = LernkartenPipeline.estimate_cost(
                 self._full_text,
                 n_segments,
                 seg_avg,
                 qpc,
-                settings.classify_model,
-                settings.qa_model,
+                self.classify_model.get(),
+                self.qa_model.get(),
             )
             s = (f"Klassifikation ({est['classification']['model']}): "
                  f"{est['classification']['input_tokens']:,} in / {est['classification']['output_tokens']:,} out → ${est['classification']['usd']:.4f};  "
@@ -314,6 +410,9 @@ class App:
 
     def cancel(self):
         self._stop_flag = True
+        if self._cancel_token is not None:
+            # beendet Wartepausen und schließt laufende Anfragen sofort
+            self._cancel_token.cancel()
         self.progress.set("Abbruch angefordert …")
 
     def pause(self):
@@ -325,145 +424,147 @@ class App:
         self.progress.set("Fortsetzen …")
 
     def on_close(self):
+        self._stop_speculation()
         self.api_key.set("")
         self.root.destroy()
 
+    def _export_path(self) -> str:
+        export_dir = os.path.join(os.path.dirname(__file__), "..", "exports")
+        os.makedirs(export_dir, exist_ok=True)
+        timestamp = time.strftime("%Y%m%d_%H%M")
+        title = self.export_title or "Lernkarten"
+        title = re.sub(r"[^A-Za-z0-9_-]+", "_", title)
+        filename = f"{title}_{timestamp}.xlsx"
+        return os.path.abspath(os.path.join(export_dir, filename))
+
     def _run_pipeline_thread(self):
+        # Ein Trace je Lauf (nur wenn ``[tracing] enabled`` gesetzt ist)
+        self._out_path = self._export_path()
+        profile = nullcontext()
+        if self.profile.get():
+            profile = profiling.profile_run(profiling.profile_dir_for(self._out_path))
+            self.logln(f"Profiling: {profiling.profile_dir_for(self._out_path)}")
+        with tracing.trace_run("pipeline"), profile:
+            self._run_pipeline()
+        path = metrics.dump_run("pipeline")
+        if path is not None:
+            self.logln(f"Metriken: {path}")
+
+    def _run_pipeline(self):
         try:
-            settings = OpenAISettings(
-                api_key=self.api_key.get().strip(),
-                classify_model=self.classify_model.get().strip(),
-                qa_model=self.qa_model.get().strip(),
-            )
-            pipe = LernkartenPipeline(settings)
-
-            # Labeln
-            self.progress.set("Labeln (Nano) …")
-            self.logln("Starte Klassifikation (Nano)…")
-            self.progress_bar.configure(value=0, maximum=len(self._segments))
-
-            seg_objs = [s for s in self._segments]
+            settings = self._settings()
+            spec, self._speculation = self._speculation, None
+            preclassified = {}
+            if spec is not None:
+                # Vorab-Ergebnisse und vorgewärmten Pool übernehmen, falls noch passend
+                preclassified = spec.take(self._segments, settings)
+            if spec is not None and spec.settings == settings:
+                client = spec.client
+            else:
+                client = OpenAIClient(
+                    settings, cache=ResponseCache.from_config(), cancel=CancelToken()
+                )
+            self._cancel_token = client.cancel
+            if self._stop_flag:  # Abbruch kam, bevor der Client stand
+                self._cancel_token.cancel()
+            if preclassified:
+                self.logln(
+                    f"Vorab klassifiziert: {len(preclassified)} Segmente (≈ ${spec.spent_usd():.4f})."
+                )
+            pipe = LernkartenPipeline(settings, client=client)
 
-            def cls_cb(i, total):
-                self.progress_bar.configure(value=i, maximum=total)
-                self.progress.set(f"Klassifikation {i}/{total}")
+            self.ui.post_status("Labeln (Nano) …")
+            self.logln("Starte Klassifikation (Nano) und Lernkarten …")
+            self.ui.post_progress("classify", 0, len(self._segments))
 
-            rows = []
-            try:
-                seg_objs = pipe.classify(
-                    seg_objs,
-                    progress_cb=cls_cb,
-                    stop_cb=lambda: self._stop_flag,
-                    pause_event=self._pause_event,
-                )
+            def write_labeled(labeled):
                 # Save labeled text passages to a file for reference
                 labeled_path = os.path.join(os.path.dirname(__file__), "..", "labeled_passages.txt")
                 labeled_path = os.path.abspath(labeled_path)
                 with open(labeled_path, "w", encoding="utf-8") as f:
-                    for i, s in enumerate(seg_objs, start=1):
+                    for s in labeled:
                         label = getattr(s, "label", "")
                         f.write(f"[{label}] {s.text}\n\n")
-
-                from .segment_filters import is_outline_segment, looks_like_outline_list
-
-                for s in seg_objs:
-                    text = s.text.strip()
-                    label = getattr(s, "label", "")
-                    if is_outline_segment(text) or looks_like_outline_list(text, label):
-                        s.keep = False
-
-                filtered = [s for s in seg_objs if s.keep]
-                removed = len(seg_objs) - len(filtered)
+                kept = sum(1 for s in labeled if s.keep)
                 self.logln(
-                    f"Gefiltert: {removed} Segmente verworfen (Ueberschrift/Gliederung/Vorwort). "
-                    f"{len(filtered)} verbleiben."
+                    f"Gefiltert: {len(labeled) - kept} Segmente verworfen (Ueberschrift/Gliederung/Vorwort). "
+                    f"{kept} verbleiben."
                 )
 
+            def review_cb(labeled):
                 # Warten auf Bestaetigung vor der Kartenerstellung
-                ToastNotification(
-                    title=APP_TITLE,
-                    message=(
-                        "Labeln fertig. Bitte pruefen und 'Fortsetzen' klicken, um die Lernkarten zu erzeugen."
-                    ),
-                    bootstyle="info",
-                ).show_toast()
-                self.progress.set("Warten auf Bestaetigung …")
+                write_labeled(labeled)
+                self._toast(
+                    "Labeln fertig. Bitte pruefen und 'Fortsetzen' klicken, um die Lernkarten zu erzeugen."
+                )
+                self.ui.post_status("Warten auf Bestaetigung …")
                 self._pause_event.clear()
                 while not self._pause_event.wait(timeout=0.5):
                     if self._stop_flag:
-                        return
-
-                # Lernkarten
-                self.progress.set("Erzeuge Lernkarten …")
-                self.logln("Fragen/Antworten werden generiert …")
-                self.progress_bar.configure(value=0, maximum=len(filtered))
-
-                def gen_cb(i, total, card_count):
-                    self.progress_bar.configure(value=i, maximum=total)
-                    page = int((i / max(1, total)) * self._total_pages) + 1 if self._total_pages else i
-                    self.progress.set(
-                        f"Segment {i}/{total} (Seite ~{page}) – Karten {card_count}"
-                    )
+                        return False
+                self.ui.post_status("Erzeuge Lernkarten …")
+                return True
 
-                def card_cb(orig, frage, antwort):
-                    self.update_preview(orig, frage, antwort)
-
-                rows = pipe.generate_cards(
-                    filtered,
-                    self.questions_per_chunk.get(),
-                    self.language.get(),
-                    progress_cb=gen_cb,
-                    stop_cb=lambda: self._stop_flag,
-                    pause_event=self._pause_event,
-                    card_cb=card_cb,
-                )
-            except openai.APIStatusError as e:
+            rows = []
+            try:
+                # Karten landen laufend im Export, damit auch ein abgebrochener
+                # Lauf eine lesbare Datei hinterlaesst. Ohne Pruefschritt
+                # beginnt die Kartenerzeugung, sobald ein Segment gelabelt ist.
+                sink = open_sink(self._out_path)
+                self.logln(f"Zwischenstand: {sink.spool_path}")
+                try:
+                    result = pipe.run(
+                        self._segments,
+                        max_questions_per_chunk=self.questions_per_chunk.get(),
+                        language=self.language.get(),
+                        review_cb=review_cb if self.review_labels.get() else None,
+                        progress_cb=self.ui.post_progress,
+                        stop_cb=lambda: self._stop_flag,
+                        pause_event=self._pause_event,
+                        card_cb=self.update_preview,
+                        sink=sink,
+                        preclassified=preclassified,
+                    )
+                finally:
+                    sink.close()
+                rows = result.rows
+                if not self.review_labels.get():
+                    write_labeled(result.labeled)
+                out_path = str(sink.path)
+            except api_errors("APIStatusError") as e:
                 msg = str(e)
                 if e.status_code == 429 and (
                     "insufficient_quota" in msg or "exceeded your current quota" in msg
                 ):
-                    self.progress.set(
+                    self.ui.post_status(
                         "Fehler: Kein Guthaben/Budget im OpenAI-Projekt. Bitte Billing/Usage prüfen."
                     )
-                    ToastNotification(
-                        title=APP_TITLE,
-                        message=(
-                            "OpenAI: insufficient_quota (429). Konto/Budget auf dem Dashboard freischalten."
-                        ),
-                        bootstyle="danger",
-                    ).show_toast()
+                    self._toast(
+                        "OpenAI: insufficient_quota (429). Konto/Budget auf dem Dashboard freischalten.",
+                        "danger",
+                    )
                     return
                 raise
 
-            # Export
-            export_dir = os.path.join(os.path.dirname(__file__), "..", "exports")
-            os.makedirs(export_dir, exist_ok=True)
-            timestamp = time.strftime("%Y%m%d_%H%M")
-            title = self.export_title or "Lernkarten"
-            title = re.sub(r"[^A-Za-z0-9_-]+", "_", title)
-            filename = f"{title}_{timestamp}.xlsx"
-            out_path = os.path.abspath(os.path.join(export_dir, filename))
-            pipe.export_excel(rows, out_path)
-            self.progress.set(f"Fertig. Export: {out_path}")
+            self.logln(f"{sum(len(r.fragen) for r in rows)} Karten erzeugt.")
+            if self.export_anki.get():
+                apkg_path = os.path.splitext(out_path)[0] + ".apkg"
+                pipe.export_anki(rows, apkg_path, deck_name=self.export_title or "Lernkarten")
+                self.logln(f"Anki-Paket: {apkg_path}")
+            self.ui.post_status(f"Fertig. Export: {out_path}")
             self.logln(f"Exportiert nach: {out_path}")
-            ToastNotification(
-                title=APP_TITLE,
-                message=f"Fertig! Datei gespeichert:\n{out_path}",
-                bootstyle="success",
-            ).show_toast()
-        except (OSError, ValueError, RuntimeError, OpenAIError) as e:
+            self._toast(f"Fertig! Datei gespeichert:\n{out_path}", "success")
+        except (OSError, ValueError, RuntimeError) + api_errors() as e:
             logger.exception("Fehler in der Pipeline")
-            ToastNotification(
-                title=APP_TITLE,
-                message=f"Fehler: {e.__class__.__name__}: {e}",
-                bootstyle="danger",
-            ).show_toast()
-            self.progress.set("Fehler.")
+            self._toast(f"Fehler: {e.__class__.__name__}: {e}", "danger")
+            self.ui.post_status("Fehler.")
 
 def main():
     root = safe_tk()
     style = tb.Style()
     attach_theme_toggle(root, style)
+    metrics.install_signal_dump()
+    UiWatchdog.from_config(root)
     App(root)
     root.mainloop()
 
@@ -0,0 +1,250 @@
+"""Prozessinterne Metriken: Zähler und Histogramme mit Labels.
+
+Die Pipeline zählt hier API-Anfragen je Modell und Stufe, Latenzen,
+Token-Verbrauch (Eingabe, Ausgabe, gecacht), 429/5xx-Fehler, Wiederholungen
+samt Wartezeit sowie Cache-Treffer. Am Ende eines Laufs oder jederzeit
+zwischendurch lässt sich der Stand mit `dump` als Prometheus-Text oder JSON
+speichern.
+
+Mit ``[metrics] export = "json"`` bzw. ``"prometheus"`` in ``config.toml``
+schreibt `dump_run` nach jedem GUI-Lauf eine Datei nach ``app/.logs``; auf
+POSIX-Systemen erzeugt ``kill -USR1 <pid>`` zusätzlich jederzeit einen
+Schnappschuss (`install_signal_dump`).
+
+Alle Operationen sind threadsicher und kosten je Aufruf nur ein Lock und ein
+Dict-Lookup.
+"""
+
+from __future__ import annotations
+
+import bisect
+import datetime
+import json
+import math
+import os
+import random
+import signal
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+# Sekunden; passend für API-Latenzen von wenigen ms bis zu Timeouts.
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class Histogram:
+    """Kumulative Buckets (für Prometheus) plus Stichprobe für exakte Quantile.
+
+    Bis ``max_samples`` Werte werden alle behalten, danach per Reservoir
+    Sampling eine gleichverteilte Stichprobe.
+    """
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS, max_samples: int = 10_000):
+        self.buckets = tuple(sorted(buckets))
+        self.bucket_counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max_samples = max_samples
+        self.samples: List[float] = []
+
+    def observe(self, value: float) -> None:
+        self.bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if len(self.samples) < self.max_samples:
+            self.samples.append(value)
+        else:
+            j = random.randrange(self.count)
+            if j < self.max_samples:
+                self.samples[j] = value
+
+    def quantile(self, q: float) -> float:
+        if not self.samples:
+            return math.nan
+        ordered = sorted(self.samples)
+        idx = min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))
+        return ordered[idx]
+
+    def summary(self) -> Dict[str, float]:
+        out = {"count": self.count, "sum": round(self.sum, 6)}
+        for q in QUANTILES:
+            out[f"p{int(q * 100)}"] = round(self.quantile(q), 6)
+        return out
+
+
+class MetricsRegistry:
+    """Sammelt Zähler und Histogramme, jeweils nach Name und Labels getrennt."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self._help: Dict[str, str] = {}
+
+    def describe(self, name: str, text: str) -> None:
+        """Hinterlegt einen Hilfetext für die Prometheus-Ausgabe."""
+        self._help[name] = text
+
+    def inc(self, name: str, value: float = 1, **labels: object) -> None:
+        key = _key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: object) -> None:
+        key = _key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = Histogram()
+            hist.observe(value)
+
+    def counter(self, name: str, **labels: object) -> float:
+        with self._lock:
+            return self._counters.get(name, {}).get(_key(labels), 0)
+
+    def histogram(self, name: str, **labels: object) -> Optional[Histogram]:
+        with self._lock:
+            return self._histograms.get(name, {}).get(_key(labels))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def to_dict(self) -> Dict[str, List[Dict[str, object]]]:
+        """Stand als JSON-taugliches Dict (Histogramme mit p50/p95/p99)."""
+        with self._lock:
+            out: Dict[str, List[Dict[str, object]]] = {}
+            for name, series in sorted(self._counters.items()):
+                out[name] = [{"labels": dict(k), "value": v} for k, v in series.items()]
+            for name, series in sorted(self._histograms.items()):
+                out[name] = [{"labels": dict(k), **h.summary()} for k, h in series.items()]
+            return out
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2, ensure_ascii=False)
+
+    def to_prometheus(self) -> str:
+        """Stand im Prometheus-Textformat (Version 0.0.4)."""
+
+        def fmt(labels: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+            pairs = labels + extra
+            if not pairs:
+                return ""
+            body = ",".join(
+                '{}="{}"'.format(k, v.replace("\\", "\\\\").replace('"', '\\"')) for k, v in pairs
+            )
+            return "{" + body + "}"
+
+        lines: List[str] = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} counter")
+                for k, v in series.items():
+                    lines.append(f"{name}{fmt(k)} {v:g}")
+            for name, series in sorted(self._histograms.items()):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} histogram")
+                for k, h in series.items():
+                    cumulative = 0
+                    for bound, n in zip(h.buckets, h.bucket_counts):
+                        cumulative += n
+                        lines.append(f"{name}_bucket{fmt(k, (('le', f'{bound:g}'),))} {cumulative}")
+                    lines.append(f"{name}_bucket{fmt(k, (('le', '+Inf'),))} {h.count}")
+                    lines.append(f"{name}_sum{fmt(k)} {h.sum:g}")
+                    lines.append(f"{name}_count{fmt(k)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path: str | os.PathLike) -> Path:
+        """Schreibt den Stand nach ``path``; ``.json`` → JSON, sonst Prometheus-Text."""
+        out = Path(path)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        text = self.to_json() if out.suffix.lower() == ".json" else self.to_prometheus()
+        out.write_text(text, encoding="utf-8")
+        return out
+
+
+REGISTRY = MetricsRegistry()
+REGISTRY.describe("openai_requests_total", "API-Anfragen nach Modell, Stufe und Status")
+REGISTRY.describe("openai_request_seconds", "Dauer je API-Anfrage inkl. Wiederholungen")
+REGISTRY.describe("openai_tokens_total", "Tokens laut resp.usage (input, output, cached)")
+REGISTRY.describe("openai_errors_total", "Fehlgeschlagene Versuche nach Fehlerklasse")
+REGISTRY.describe("openai_retries_total", "Wiederholte Versuche in safe_request")
+REGISTRY.describe("openai_retry_sleep_seconds_total", "Summe der Backoff-Pausen")
+REGISTRY.describe("cache_lookups_total", "Cache-Zugriffe nach Cache und Ergebnis (hit/miss)")
+REGISTRY.describe("ratelimit_wait_seconds", "Wartezeit auf einen Slot im gemeinsamen Rate-Limit")
+
+inc = REGISTRY.inc
+observe = REGISTRY.observe
+dump = REGISTRY.dump
+
+
+def error_class(err: Exception) -> str:
+    """Grobe Fehlerklasse für Labels: ``429``, ``auth``, ``5xx``, ``4xx`` oder der Klassenname.
+
+    ``auth`` steht für 401/403/404 (Key, Berechtigung, Modell) – wie
+    `app.cli._exit_code`; übrige Client-Fehler (z. B. 400) bleiben ``4xx``.
+    """
+    code = getattr(err, "status_code", None)
+    if code == 429:
+        return "429"
+    if code in (401, 403, 404):
+        return "auth"
+    if isinstance(code, int) and 500 <= code < 600:
+        return "5xx"
+    if isinstance(code, int) and 400 <= code < 500:
+        return "4xx"
+    return err.__class__.__name__
+
+
+DEFAULT_DUMP_DIR = Path(__file__).resolve().parent / ".logs"
+_SUFFIX = {"json": ".json", "prometheus": ".prom"}
+
+
+def _export_format() -> str:
+    from .config import load_config
+
+    return str(load_config().get("metrics", {}).get("export", "") or "").lower()
+
+
+def dump_run(label: str, fmt: Optional[str] = None) -> Optional[Path]:
+    """Speichert den Stand am Ende eines Laufs, falls ``[metrics] export`` gesetzt ist."""
+    fmt = _export_format() if fmt is None else fmt
+    if fmt not in _SUFFIX:
+        return None
+    stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    return dump(DEFAULT_DUMP_DIR / f"metrics_{label}_{stamp}{_SUFFIX[fmt]}")
+
+
+def install_signal_dump(fmt: str = "prometheus") -> bool:
+    """Registriert ``SIGUSR1`` → `dump_run` (nur POSIX, nur im Haupt-Thread).
+
+    Der Handler läuft im Haupt-Thread, womöglich mitten in `inc`/`observe` mit
+    gehaltenem Registry-Lock. Er startet deshalb nur einen Thread, der den
+    Stand schreibt, sobald das Lock frei ist.
+    """
+    sig = getattr(signal, "SIGUSR1", None)
+    if sig is None or threading.current_thread() is not threading.main_thread():
+        return False
+    signal.signal(sig, lambda *_: _dump_in_background(fmt))
+    return True
+
+
+def _dump_in_background(fmt: str) -> threading.Thread:
+    t = threading.Thread(
+        target=dump_run, args=("snapshot", fmt), name="metrics-dump", daemon=True
+    )
+    t.start()
+    return t
@@ -7,38 +7,26 @@ Pipeline-Abstraktion nötig ist.
 """
 
 import os, time, hashlib, json, math
+from functools import lru_cache
 from typing import Dict, Any
 
 
 def _get_openai_client():
-    # Import on demand to avoid hard dependency at import time
-    try:
-        from openai import OpenAI
-    except ImportError as ex:
-        raise RuntimeError(
-            "OpenAI-Python-Client nicht installiert. Bitte 'python install.py' ausführen."
-        ) from ex
+    # Geteilter Client aus `app.transport`: ein warmer Pool für den ganzen Prozess
+    from .transport import shared_openai
+
     api_key = os.environ.get("OPENAI_API_KEY")
     if not api_key:
         raise RuntimeError("OPENAI_API_KEY ist nicht gesetzt (wird zur Laufzeit aus GUI übergeben).")
-    return OpenAI(api_key=api_key)
-
-def set_api_key_for_process(api_key: str):
-    os.environ["OPENAI_API_KEY"] = api_key.strip()
+    return shared_openai(api_key, os.environ.get("OPENAI_BASE_URL") or None)
 
-def count_tokens_rough(text: str) -> int:
-    # Try tiktoken; fallback: ~4 chars/token heuristic
-    try:
-        import tiktoken
-        enc = tiktoken.get_encoding("cl100k_base")
-        return len(enc.encode(text))
-    except Exception:
-        return max(1, math.ceil(len(text) / 4))
+def _create(model: str, system_prompt: str, user_prompt: str, temperature: float, max_output_tokens: int):
+    # Timeouts und Wiederholungen wie bei allen anderen Aufrufen über safe_request
+    from .openai_client import safe_request
 
-def call_json_chat(model: str, system_prompt: str, user_prompt: str, temperature: float = 0.1, max_output_tokens: int = 600) -> Dict[str, Any]:
     client = _get_openai_client()
-    # JSON mode if available:
-    response = client.chat.completions.create(
+    return safe_request(
+        client.chat.completions.create,
         model=model,
         messages=[
             {"role": "system", "content": system_prompt},
@@ -47,6 +35,31 @@ def call_json_chat(model: str, system_prompt: str, user_prompt: str, temperature
         temperature=temperature,
         max_tokens=max_output_tokens,
     )
+
+def set_api_key_for_process(api_key: str):
+    os.environ["OPENAI_API_KEY"] = api_key.strip()
+
+@lru_cache(maxsize=1)
+def _cl100k():
+    # tiktoken erst beim ersten Zählen laden und das Encoding wiederverwenden
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None
+
+def count_tokens_rough(text: str) -> int:
+    # Try tiktoken; fallback: ~4 chars/token heuristic
+    enc = _cl100k()
+    if enc is not None:
+        try:
+            return len(enc.encode(text))
+        except Exception:
+            pass
+    return max(1, math.ceil(len(text) / 4))
+
+def call_json_chat(model: str, system_prompt: str, user_prompt: str, temperature: float = 0.1, max_output_tokens: int = 600) -> Dict[str, Any]:
+    response = _create(model, system_prompt, user_prompt, temperature, max_output_tokens)
     raw = response.choices[0].message.content
     try:
         data = json.loads(raw)
@@ -59,16 +72,7 @@ def call_json_chat(model: str, system_prompt: str, user_prompt: str, temperature
     return {"data": data, "usage": usage_dict}
 
 def call_text_chat(model: str, system_prompt: str, user_prompt: str, temperature: float = 0.2, max_output_tokens: int = 800) -> Dict[str, Any]:
-    client = _get_openai_client()
-    response = client.chat.completions.create(
-        model=model,
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ],
-        temperature=temperature,
-        max_tokens=max_output_tokens,
-    )
+    response = _create(model, system_prompt, user_prompt, temperature, max_output_tokens)
     content = response.choices[0].message.content
     usage = getattr(response, "usage", None)
     usage_dict = {"prompt_tokens": None, "completion_tokens": None, "total_tokens": None}
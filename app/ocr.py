@@ -0,0 +1,200 @@
+"""OCR-Fallback für Seiten ohne Textschicht (z. B. gescannte Handouts).
+
+`ocr_pages` rastert nur die übergebenen Seiten (``pypdfium2``) und lässt sie
+lokal von Tesseract (``pytesseract``) erkennen. Die Erkennung läuft in einem
+Prozesspool, weil Tesseract CPU-gebunden ist. Ergebnisse werden über den
+SHA-256 des gerasterten Seitenbilds im Ordner ``.cache/ocr`` abgelegt, sodass
+wiederholte Läufe dieselbe Seite nicht erneut erkennen müssen.
+
+Fortschritt meldet ``progress_cb(fertig, gesamt)`` je erkannter Seite; ein
+`app.cancel.CancelToken` wird zwischen den Seiten geprüft, beim Abbruch
+werden noch nicht begonnene Seiten im Pool verworfen.
+
+Alle Abhängigkeiten sind optional: fehlen sie, wird eine Warnung geloggt und
+die Seiten bleiben leer wie bisher.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from . import metrics
+from .cancel import CancelToken, Cancelled
+from .logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent / ".cache" / "ocr"
+
+
+@dataclass
+class OcrStats:
+    pages: int = 0
+    cached: int = 0
+    seconds: float = 0.0
+    workers: int = 1
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages / self.seconds if self.seconds > 0 else 0.0
+
+
+def _render_pages(
+    path: str, page_numbers: Iterable[int], resolution: int
+) -> Iterator[Tuple[int, bytes]]:
+    """Rastert die angegebenen Seiten und liefert ``(seitennummer, png_bytes)``."""
+    import pypdfium2 as pdfium
+
+    doc = pdfium.PdfDocument(path)
+    try:
+        for no in page_numbers:
+            image = doc[no - 1].render(scale=resolution / 72).to_pil()
+            buf = io.BytesIO()
+            image.save(buf, format="PNG")
+            yield no, buf.getvalue()
+    finally:
+        doc.close()
+
+
+def _ocr_png(png: bytes, language: str) -> str:
+    """Erkennt Text in einem PNG-Bild. Läuft im Worker-Prozess."""
+    import pytesseract
+    from PIL import Image
+
+    with Image.open(io.BytesIO(png)) as image:
+        return pytesseract.image_to_string(image, lang=language)
+
+
+def ocr_pages(
+    path: str,
+    page_numbers: Iterable[int],
+    language: str = "deu",
+    resolution: int = 300,
+    workers: int | None = None,
+    cache_dir: str | os.PathLike | None = DEFAULT_CACHE_DIR,
+    progress_cb: Optional[Callable[[int, int], None]] = None,
+    token: Optional[CancelToken] = None,
+) -> Tuple[Dict[int, str], OcrStats]:
+    """Erkennt den Text der angegebenen Seiten per Tesseract.
+
+    Args:
+        path: Pfad zur PDF.
+        page_numbers: 1-basierte Seitennummern ohne Textschicht.
+        language: Tesseract-Sprachcode(s), z. B. ``"deu"`` oder ``"deu+eng"``.
+        resolution: Rasterauflösung in DPI.
+        workers: Anzahl Prozesse; ``None``/``0`` = Anzahl CPUs, ``1`` = im
+            aufrufenden Prozess.
+        cache_dir: Ablage für erkannte Texte; ``None`` deaktiviert den Cache.
+        progress_cb: ``progress_cb(fertig, gesamt)`` nach jeder Seite; eine dort
+            ausgelöste Ausnahme bricht wie ``token`` ab.
+        token: wird zwischen den Seiten geprüft; beim Abbruch `Cancelled`.
+
+    Returns:
+        ``({seitennummer: text}, OcrStats)``.
+    """
+    numbers: List[int] = sorted(set(page_numbers))
+    workers = workers or os.cpu_count() or 1
+    stats = OcrStats(workers=workers)
+    if not numbers:
+        return {}, stats
+
+    cache = Path(cache_dir) if cache_dir is not None else None
+    if cache is not None:
+        cache.mkdir(parents=True, exist_ok=True)
+
+    def cache_file(digest: str) -> Path | None:
+        return cache / f"{digest}_{language}.txt" if cache is not None else None
+
+    results: Dict[int, str] = {}
+    pending = {}
+
+    def page_done(no: int, text: str, cached: Path | None) -> None:
+        results[no] = text
+        if cached is not None:
+            cached.write_text(text, encoding="utf-8")
+        if progress_cb:
+            progress_cb(len(results), len(numbers))
+
+    started = time.perf_counter()
+    finished = False
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        for no, png in _render_pages(path, numbers, resolution):
+            if token is not None:
+                token.check()
+            digest = hashlib.sha256(png).hexdigest()
+            cached = cache_file(digest)
+            if cached is not None and cached.exists():
+                stats.cached += 1
+                metrics.inc("cache_lookups_total", cache="ocr", result="hit")
+                page_done(no, cached.read_text(encoding="utf-8"), None)
+                continue
+            if cached is not None:
+                metrics.inc("cache_lookups_total", cache="ocr", result="miss")
+            if pool is None:
+                page_done(no, _ocr_png(png, language), cached)
+            else:
+                pending[pool.submit(_ocr_png, png, language)] = (no, cached)
+        while pending:
+            if token is not None:
+                token.check()
+            ready, _ = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+            for fut in ready:
+                no, cached = pending.pop(fut)
+                page_done(no, fut.result(), cached)
+        finished = True
+    finally:
+        if pool is not None:
+            # Beim Abbruch nicht auf laufende Seiten warten, ausstehende verwerfen
+            pool.shutdown(wait=finished, cancel_futures=True)
+
+    stats.pages = len(numbers)
+    stats.seconds = time.perf_counter() - started
+    logger.info(
+        "OCR: %d Seiten (%d aus Cache) in %.1f s – %.2f Seiten/s mit %d Worker(n)",
+        stats.pages,
+        stats.cached,
+        stats.seconds,
+        stats.pages_per_second,
+        stats.workers,
+    )
+    return results, stats
+
+
+def fill_empty_pages(
+    path: str,
+    pages: List[Tuple[int, str]],
+    **kwargs,
+) -> List[Tuple[int, str]]:
+    """Ersetzt textlose Seiten in ``pages`` durch ihr OCR-Ergebnis.
+
+    Seiten mit vorhandener Textschicht werden nicht angefasst. Fehlen
+    OCR-Abhängigkeiten, wird gewarnt und ``pages`` unverändert zurückgegeben.
+    ``kwargs`` gehen an `ocr_pages`; `Cancelled` wird weitergereicht.
+    """
+    empty = [no for no, txt in pages if not txt.strip()]
+    if not empty:
+        return pages
+    try:
+        texts, _ = ocr_pages(path, empty, **kwargs)
+    except Cancelled:
+        raise
+    except ImportError as err:
+        logger.warning(
+            "%d Seite(n) ohne Text, OCR nicht verfügbar (pytesseract/pypdfium2 fehlen): %s",
+            len(empty),
+            err,
+        )
+        return pages
+    except (OSError, RuntimeError) as err:
+        # z. B. Tesseract-Binary nicht gefunden
+        logger.warning("OCR fehlgeschlagen: %s", err)
+        return pages
+    return [(no, texts.get(no, txt) if not txt.strip() else txt) for no, txt in pages]
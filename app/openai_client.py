@@ -4,74 +4,111 @@ Methoden werden von `pipeline.LernkartenPipeline` genutzt und greifen auf Werte
 `config.toml` zurück (`DEFAULT_*`)."""
 
 from __future__ import annotations
-from typing import List, Dict, Any, Optional, Callable
+from typing import List, Dict, Any, Optional, Callable, Tuple
 from dataclasses import dataclass
+from functools import lru_cache
+from types import SimpleNamespace
+import copy
 import json
+import sys
+import threading
 import time
+import uuid
 
+from .cancel import CancelToken, Cancelled
 from .pipeline_models import QAItem
+from .config import (
+    DEFAULT_CLASSIFY_MODEL,
+    DEFAULT_QA_MODEL,
+    DEFAULT_LANGUAGE,
+    load_config,
+)
+from .logging_utils import enable_request_log, get_logger, log_request
+from .transport import abort_scope, shared_openai
+from . import metrics, tracing
 
-try:  # pragma: no cover - optional dependency
-    from openai import (
-        OpenAIError,
-        BadRequestError,
-        APIConnectionError,
-        APITimeoutError,
-    )
-except ImportError:  # pragma: no cover
-    OpenAIError = Exception  # type: ignore
-    BadRequestError = OpenAIError  # type: ignore
+# Das openai-SDK (samt httpx/pydantic) braucht beim Import eine halbe Sekunde
+# und mehr. Es wird daher erst beim ersten API-Aufruf bzw. bei der ersten
+# Fehlerbehandlung geladen; `OpenAIError` & Co. bleiben über ``__getattr__``
+# als Modulattribute erreichbar.
+_ERROR_NAMES = ("OpenAIError", "BadRequestError", "APIConnectionError", "APITimeoutError")
 
-    class APIConnectionError(OpenAIError):  # type: ignore
-        """Fallbackklasse bei fehlendem openai-Paket."""
 
-        pass
+@lru_cache(maxsize=1)
+def _errors() -> SimpleNamespace:
+    """Fehlerklassen des openai-SDK (bzw. Fallbacks, falls es fehlt)."""
+    try:  # pragma: no cover - optional dependency
+        import openai
 
-    class APITimeoutError(OpenAIError):  # type: ignore
-        """Fallbackklasse bei fehlendem openai-Paket."""
+        return SimpleNamespace(**{name: getattr(openai, name) for name in _ERROR_NAMES})
+    except ImportError:  # pragma: no cover
+        base = Exception
 
-        pass
+        class APIConnectionError(base):  # type: ignore
+            """Fallbackklasse bei fehlendem openai-Paket."""
 
-# optionale Low-Level-Transport-Errors
-try:
-    import httpx  # type: ignore
-except Exception:  # pragma: no cover
-    httpx = None  # type: ignore
-try:
-    import httpcore  # type: ignore
-except Exception:  # pragma: no cover
-    httpcore = None  # type: ignore
+        class APITimeoutError(base):  # type: ignore
+            """Fallbackklasse bei fehlendem openai-Paket."""
+
+        return SimpleNamespace(
+            OpenAIError=base,
+            BadRequestError=base,
+            APIConnectionError=APIConnectionError,
+            APITimeoutError=APITimeoutError,
+        )
+
+
+def __getattr__(name: str):
+    if name in _ERROR_NAMES:
+        return getattr(_errors(), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-from .config import (
-    DEFAULT_CLASSIFY_MODEL,
-    DEFAULT_QA_MODEL,
-    DEFAULT_LANGUAGE,
-    load_config,
-)
-from .logging_utils import get_logger
 
-_cfg = load_config()
-_REQ_TIMEOUT = int(_cfg["models"].get("request_timeout_sec", 60))
-_MAX_RETRIES = int(_cfg["models"].get("max_retries", 5))
-_BASE_BACKOFF = float(_cfg["models"].get("base_backoff_seconds", 1.0))
+def api_errors(*names: str) -> Tuple[type, ...]:
+    """Fehlerklassen für ``except``-Klauseln, ohne das SDK dafür zu importieren.
+
+    Ist ``openai`` noch nicht geladen, kann auch keiner seiner Fehler
+    aufgetreten sein; dann wird ein leeres Tupel geliefert. Ohne Namen wird
+    ``OpenAIError`` verwendet.
+    """
+    if "openai" not in sys.modules:
+        return ()
+    import openai
+
+    return tuple(getattr(openai, name) for name in names or ("OpenAIError",))
+
+
+@lru_cache(maxsize=1)
+def _request_config() -> Tuple[int, int, float]:
+    """``(timeout, max_retries, base_backoff)`` aus ``config.toml``, beim ersten Bedarf gelesen."""
+    models = load_config().get("models", {})
+    return (
+        int(models.get("request_timeout_sec", 60)),
+        int(models.get("max_retries", 5)),
+        float(models.get("base_backoff_seconds", 1.0)),
+    )
 
 
 def _is_transient(e: Exception) -> bool:
     """Gibt True zurück, wenn sich ein erneuter Versuch lohnt (temporärer Fehler)."""
 
+    errs = _errors()
     # Netzwerk-/Timeoutfehler vom OpenAI-SDK sind transient
-    if isinstance(e, (APIConnectionError, APITimeoutError)):
+    if isinstance(e, (errs.APIConnectionError, errs.APITimeoutError)):
         return True
 
     code = getattr(e, "status_code", None)
-    if isinstance(e, OpenAIError) and code == 429:
+    if isinstance(e, errs.OpenAIError) and code == 429:
         msg = str(e)
         if "insufficient_quota" in msg or "exceeded your current quota" in msg:
             return False
         return True
-    if isinstance(e, OpenAIError) and code in (500, 502, 503, 504):
+    if isinstance(e, errs.OpenAIError) and code in (500, 502, 503, 504):
         return True
-    # Tieferliegende Transport-/Protokollfehler (Keep-Alive abgebrochen etc.)
+    # Tieferliegende Transport-/Protokollfehler (Keep-Alive abgebrochen etc.);
+    # nur prüfen, wenn die Transportbibliotheken überhaupt geladen wurden.
+    httpx = sys.modules.get("httpx")
+    httpcore = sys.modules.get("httpcore")
     if httpx and isinstance(
         e,
         (
@@ -86,19 +123,69 @@ def _is_transient(e: Exception) -> bool:
     return False
 
 
-def safe_request(call: Callable[..., Any], *args, **kwargs):
-    """Wrap OpenAI client calls with timeout and exponential backoff."""
+def _retry_after(e: Exception) -> Optional[float]:
+    """Wartezeit aus ``e.retry_after`` oder dem ``Retry-After``-Header der Antwort."""
+    value = getattr(e, "retry_after", None)
+    if value is None:
+        headers = getattr(getattr(e, "response", None), "headers", None)
+        if headers is not None:
+            try:
+                ms = headers.get("retry-after-ms")
+                value = float(ms) / 1000 if ms else headers.get("retry-after")
+            except (AttributeError, TypeError, ValueError):
+                value = None
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None  # z. B. HTTP-Datum statt Sekunden
+
+
+@lru_cache(maxsize=1)
+def _init_request_log() -> bool:
+    """Aktiviert das JSONL-Request-Log, wenn ``[logging] request_log`` gesetzt ist."""
+    setting = load_config().get("logging", {}).get("request_log", False)
+    if not setting:
+        return False
+    enable_request_log(setting if isinstance(setting, str) else None)
+    return True
+
 
-    kwargs.setdefault("timeout", _REQ_TIMEOUT)
-    for attempt in range(_MAX_RETRIES):
+def safe_request(
+    call: Callable[..., Any],
+    *args,
+    on_retry: Optional[Callable[[int, Exception, float], None]] = None,
+    cancel: Optional[CancelToken] = None,
+    **kwargs,
+):
+    """Wrap OpenAI client calls with timeout and exponential backoff.
+
+    ``on_retry(versuch, fehler, wartezeit)`` wird vor jeder Wartepause aufgerufen.
+    Mit ``cancel`` endet eine Wartepause sofort beim Abbruch, und ein Fehler der
+    abgebrochenen Anfrage wird zu `Cancelled`.
+    """
+
+    timeout, max_retries, base_backoff = _request_config()
+    kwargs.setdefault("timeout", timeout)
+    for attempt in range(max_retries):
+        if cancel is not None:
+            cancel.check()
         try:
-            return call(*args, **kwargs)
+            with tracing.span("attempt", cat="network", attempt=attempt + 1):
+                return call(*args, **kwargs)
+        except Cancelled:
+            raise
         except Exception as e:  # pragma: no cover - network errors hard to test
+            if cancel is not None and cancel.cancelled:
+                # Verbindung wurde beim Abbruch geschlossen (`app.transport`)
+                raise Cancelled() from e
+            metrics.inc(
+                "openai_errors_total", model=kwargs.get("model", ""), error=metrics.error_class(e)
+            )
             # Bekannter, nicht-transienter Fehler: temperature wird vom Modell nicht unterstützt
             # (z. B. o1/o3/o4-mini → nur Standardwert 1 erlaubt).
             # -> verständliche Meldung erzeugen und ggf. einmal ohne temperature neu versuchen.
             try:
-                is_bad_req = isinstance(e, BadRequestError)
+                is_bad_req = isinstance(e, _errors().BadRequestError)
             except Exception:
                 is_bad_req = False
             msg = str(e)
@@ -118,10 +205,18 @@ def safe_request(call: Callable[..., Any], *args, **kwargs):
                     "oder auf 1.0 stellen."
                 )
                 raise RuntimeError(f"{friendly}\nOriginal: {msg}") from e
-            if _is_transient(e) and attempt < _MAX_RETRIES - 1:
-                retry_after = getattr(e, "retry_after", None)
-                sleep = float(retry_after or (_BASE_BACKOFF * (2**attempt)))
-                time.sleep(min(sleep, 30.0))
+            if _is_transient(e) and attempt < max_retries - 1:
+                retry_after = _retry_after(e)
+                sleep = min(float(retry_after or (base_backoff * (2**attempt))), 30.0)
+                metrics.inc("openai_retries_total", model=kwargs.get("model", ""))
+                metrics.inc("openai_retry_sleep_seconds_total", sleep)
+                if on_retry is not None:
+                    on_retry(attempt + 1, e, sleep)
+                with tracing.span("retry_sleep", cat="retry", seconds=sleep):
+                    if cancel is None:
+                        time.sleep(sleep)
+                    elif cancel.wait(sleep):
+                        raise Cancelled() from e
                 continue
             raise
 
@@ -134,38 +229,197 @@ class OpenAISettings:
     classify_model: str = DEFAULT_CLASSIFY_MODEL
     qa_model: str = DEFAULT_QA_MODEL
     temperature: float = 0.2
+    # Abweichender API-Endpunkt (z. B. lokaler Mock für Benchmarks); None = OpenAI
+    base_url: Optional[str] = None
 
 class OpenAIClient:
-    def __init__(self, settings: OpenAISettings):
+    """API-Zugriff mit optionalem Antwort-Cache und gemeinsamem Rate-Limit.
+
+    ``cache`` (`app.cache.ResponseCache`) liefert bereits gestellte Anfragen
+    ohne API-Aufruf; ``limiter`` (`app.ratelimit.FairRateLimiter`) vergibt die
+    Slots für jeden einzelnen Versuch unter ``owner``. Über `for_owner`
+    entstehen Kopien, die Verbindungspool, Cache, Limiter und
+    Verbrauchszählung teilen – so laufen mehrere Dokumente gleichzeitig
+    über einen Client (`app.batch`).
+    """
+
+    def __init__(
+        self,
+        settings: OpenAISettings,
+        cache=None,
+        limiter=None,
+        owner: str = "default",
+        cancel: Optional[CancelToken] = None,
+    ):
         self.settings = settings
+        self.cache = cache
+        self.limiter = limiter
+        self.owner = owner
+        # Abbruch beendet Wartepausen und schließt die eigenen laufenden Anfragen
+        self.cancel = cancel
         # verzögerte Initialisierung, falls Paket fehlt
         self._client = None
+        # owner -> Modell -> Zähler; von allen Kopien aus `for_owner` geteilt
+        self._usage: Dict[str, Dict[str, Dict[str, int]]] = {}
+        self._usage_lock = threading.Lock()
+
+    def for_owner(self, owner: str) -> "OpenAIClient":
+        """Kopie für ein weiteres Dokument mit demselben Verbindungspool."""
+        self._get_client()
+        other = copy.copy(self)
+        other.owner = owner
+        return other
+
+    def with_cancel(self, cancel: CancelToken) -> "OpenAIClient":
+        """Kopie, deren Anfragen ``cancel`` sofort abbricht.
+
+        Die Kopie teilt Pool, Cache, Limiter und Verbrauchszählung; ein Abbruch
+        schließt nur die Verbindungen ihrer eigenen laufenden Anfragen.
+        """
+        other = copy.copy(self)
+        other.cancel = cancel
+        return other
+
+    def _account(self, model: str, **counts: Optional[int]) -> None:
+        with self._usage_lock:
+            per_model = self._usage.setdefault(self.owner, {}).setdefault(
+                model,
+                {"requests": 0, "cache_hits": 0, "input": 0, "output": 0, "cached": 0},
+            )
+            for name, n in counts.items():
+                if isinstance(n, int):
+                    per_model[name] += n
+
+    def usage(self, owner: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+        """Verbrauch je Modell für ``owner`` (Standard: der eigene)."""
+        with self._usage_lock:
+            return copy.deepcopy(self._usage.get(owner or self.owner, {}))
 
     def _get_client(self):
-        if self._client is None:
-            try:
-                from openai import OpenAI
-            except ImportError as e:
-                raise RuntimeError(
-                    "Das 'openai'-Paket ist nicht installiert. Bitte fuehre "
-                    "'python install.py' aus (oder starte ueber 'run.bat')."
-                ) from e
-            # SDK-Retries bleiben 0 (wir steuern sie selbst in safe_request),
-            # aber ein sinnvoller Default-Timeout kommt aus der Config.
-            self._client = OpenAI(
-                api_key=self.settings.api_key,
-                max_retries=0,
-                timeout=_REQ_TIMEOUT,
+        closed = getattr(self._client, "is_closed", None)
+        if self._client is None or (closed is not None and closed()):  # nach transport.clear()
+            # Ein Pool je (API-Key, Endpunkt) für den ganzen Prozess (`app.transport`)
+            self._client = shared_openai(
+                self.settings.api_key,
+                self.settings.base_url,
+                max_connections=self.limiter.max_concurrent if self.limiter is not None else None,
             )
         return self._client
 
+    def warm(self) -> bool:
+        """Baut vorab eine Verbindung (TCP/TLS) im Pool auf; kostet keine Tokens.
+
+        Fragt ``GET /models`` ab. Die Antwort ist egal – danach liegt eine offene
+        Verbindung im Pool, sodass die erste echte Anfrage keinen Handshake zahlt.
+        """
+        client = self._get_client()
+        try:
+            client.with_options(max_retries=0, timeout=10).models.list()
+        except Exception as e:  # noqa: BLE001 - nur ein Versuch, Fehler sind unkritisch
+            logger.debug("Vorwärmen der Verbindung fehlgeschlagen: %s", e)
+            return False
+        return True
+
+    def _chat(self, stage: str, model: str, messages: List[Dict[str, str]], **kwargs) -> str:
+        """Führt eine Chat-Completion über `safe_request` aus und liefert den Antworttext.
+
+        Jede Anfrage erzeugt (falls aktiviert) einen Datensatz im Request-Log
+        mit Latenz, Token-Verbrauch und Anzahl Wiederholungen.
+        """
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.key(model, messages, **kwargs)
+            content = self.cache.get(cache_key)
+            if content is not None:
+                self._account(model, cache_hits=1)
+                return content
+
+        client = self._get_client()
+        _init_request_log()
+        request_id = uuid.uuid4().hex[:12]
+        retries = []
+        call = client.chat.completions.create
+        if self.limiter is not None:
+            # grobe Schätzung (≈ 4 Zeichen je Token) genügt für das Tokens-pro-Minute-Limit
+            est_tokens = sum(len(m.get("content", "")) for m in messages) // 4
+
+            def call(*args, _create=call, **kw):
+                with self.limiter.slot(self.owner, est_tokens, self.cancel):
+                    return _create(*args, **kw)
+
+        def on_retry(attempt: int, err: Exception, sleep: float) -> None:
+            retries.append(attempt)
+            if self.limiter is not None and getattr(err, "status_code", None) == 429:
+                # Limit gilt für alle Dokumente: gemeinsam pausieren statt weiter anfragen
+                self.limiter.pause(sleep)
+            logger.info(
+                "%s-Anfrage %s: Versuch %d fehlgeschlagen (%s), warte %.1f s",
+                stage, request_id, attempt, err.__class__.__name__, sleep,
+            )
+
+        started = time.perf_counter()
+        status = "error"
+        resp = None
+        try:
+            with tracing.span(
+                f"openai.{stage}", cat="request", model=model, request_id=request_id
+            ) as sp:
+                with abort_scope(self.cancel):
+                    resp = safe_request(
+                        call,
+                        model=model,
+                        messages=messages,
+                        on_retry=on_retry,
+                        cancel=self.cancel,
+                        **kwargs,
+                    )
+                sp.set(retries=len(retries))
+            status = "ok"
+        finally:
+            elapsed = time.perf_counter() - started
+            usage = getattr(resp, "usage", None)
+            prompt_tokens = getattr(usage, "prompt_tokens", None)
+            completion_tokens = getattr(usage, "completion_tokens", None)
+            details = getattr(usage, "prompt_tokens_details", None)
+            cached_tokens = getattr(details, "cached_tokens", None)
+            metrics.inc("openai_requests_total", model=model, stage=stage, status=status)
+            metrics.observe("openai_request_seconds", elapsed, model=model, stage=stage)
+            for kind, n in (
+                ("input", prompt_tokens),
+                ("output", completion_tokens),
+                ("cached", cached_tokens),
+            ):
+                if isinstance(n, int):
+                    metrics.inc("openai_tokens_total", n, model=model, stage=stage, kind=kind)
+            self._account(
+                model,
+                requests=1,
+                input=prompt_tokens,
+                output=completion_tokens,
+                cached=cached_tokens,
+            )
+            log_request(
+                request_id=request_id,
+                model=model,
+                stage=stage,
+                latency_ms=round(elapsed * 1000, 1),
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                cached_tokens=cached_tokens,
+                retries=len(retries),
+                status=status,
+            )
+        content = resp.choices[0].message.content
+        if cache_key is not None and content:
+            self.cache.put(cache_key, content, model)
+        return content
+
     def classify_segment(self, text: str) -> Dict[str, Any]:
         """
         Ruft das Nano-Modell auf, um den Segmenttyp zu bestimmen.
         Rueckgabe-Format:
         {"label": "Definition|Fakt|Beispiel|Aufzaehlung|Ueberschrift/Vorwort", "keep": bool, "reason": str}
         """
-        client = self._get_client()
         system = (
             "Du bist ein strenger Klassifizierer. "
             "Gib eine kompakte JSON-Antwort mit Schluesseln: label, keep, reason. "
@@ -177,16 +431,15 @@ class OpenAIClient:
             "oder aehnliches handelt, setze keep=false. Sonst keep=true.\n\n"
             f"---\n{text}\n---"
         )
-        resp = safe_request(
-            client.chat.completions.create,
-            model=self.settings.classify_model,
+        content = self._chat(
+            "classify",
+            self.settings.classify_model,
             # WICHTIG: manche Modelle erlauben nur den Default (1) → temperature nicht setzen
-            messages=[
+            [
                 {"role": "system", "content": system},
                 {"role": "user", "content": user},
             ],
         )
-        content = resp.choices[0].message.content
         try:
             data = json.loads(content)
         except json.JSONDecodeError:
@@ -199,7 +452,6 @@ class OpenAIClient:
         Erzeugt n_questions Lernkarten (Frage/Antwort) fuer den gegebenen Text.
         Rueckgabe: [QAItem(frage="...", antwort="..."), ...]
         """
-        client = self._get_client()
         system = (
             f"Du erstellst pruefungsreife Lernkarten ({language}). "
             "Sehr praezise, faktenbasiert, konsistent mit dem Eingangstext. "
@@ -212,16 +464,15 @@ class OpenAIClient:
             "Antworten moeglichst kurz, klar und eindeutig.\n\n"
             f"=== TEXT BEGINN ===\n{text}\n=== TEXT ENDE ==="
         )
-        resp = safe_request(
-            client.chat.completions.create,
-            model=self.settings.qa_model,
-            temperature=self.settings.temperature,
-            messages=[
+        content = self._chat(
+            "qa",
+            self.settings.qa_model,
+            [
                 {"role": "system", "content": system},
                 {"role": "user", "content": user},
             ],
+            temperature=self.settings.temperature,
         )
-        content = resp.choices[0].message.content
         try:
             data = json.loads(content)
             if isinstance(data, dict) and "items" in data:
@@ -1,31 +1,68 @@
 """Extraktion und grobe Segmentierung von PDF-Dateien.
 
-`extract_text_from_pdf` versucht zunächst ``pdfplumber`` zu verwenden und fällt
-bei fehlender Installation auf ``pypdf`` zurück. Die Funktion `segment_text`
-nimmt die Rohtexte entgegen und zerlegt sie in Abschnitte, bevor das feinere
-Chunking (`app.chunking`) angewendet wird.
+`extract_pages_from_pdf` versucht zunächst ``pdfplumber`` zu verwenden und
+fällt bei fehlender Installation auf ``pypdf`` zurück. Die Funktion
+`segment_text` nimmt die Rohtexte entgegen und zerlegt sie in Abschnitte, bevor
+das feinere Chunking (`app.chunking`) angewendet wird; `segment_pages` macht
+dasselbe seitenweise und merkt sich, von welchen Seiten ein Segment stammt.
 """
 
 from __future__ import annotations
 import re
-from typing import List, Tuple, Iterable, Optional
+from typing import Callable, Dict, List, Tuple, Iterable, Optional, Sequence
 import io
+import sys
 
+from .cancel import CancelToken
+from .config import load_config
 from .logging_utils import get_logger
 
 logger = get_logger(__name__)
 
 
+def pdf_errors() -> Tuple[type, ...]:
+    """Lesefehler von ``pypdf`` für ``except``-Klauseln, ohne ``pypdf`` zu importieren.
+
+    PDF-Bibliotheken werden erst beim Einlesen geladen; ist ``pypdf`` noch nicht
+    importiert, kann auch kein ``PdfReadError`` aufgetreten sein.
+    """
+    if "pypdf" not in sys.modules:
+        return ()
+    from pypdf.errors import PdfReadError
+
+    return (PdfReadError,)
+
+
 # Wir versuchen zuerst pdfplumber; faellt auf pypdf zurueck.
-def extract_text_from_pdf(path: str) -> str:
+def extract_pages_from_pdf(
+    path: str,
+    page_numbers: Optional[Iterable[int]] = None,
+    progress_cb: Optional[Callable[[int, int], None]] = None,
+) -> List[Tuple[int, str]]:
+    """Liest eine PDF seitenweise ein.
+
+    Liefert eine Liste ``(seitennummer, text)`` mit 1-basierten Seitennummern.
+    Seiten ohne extrahierbaren Text erscheinen mit leerem String, damit die
+    Seitenzählung vollständig bleibt. Mit ``page_numbers`` werden nur diese
+    Seiten geöffnet und geparst; Nummern außerhalb des Dokuments werden
+    ignoriert.
+
+    ``progress_cb(fertig, gesamt)`` wird nach jeder Seite aufgerufen; eine
+    dort ausgelöste Ausnahme (z. B. `app.cancel.Cancelled`) bricht das
+    Einlesen ab.
+    """
+    wanted = sorted(set(page_numbers)) if page_numbers is not None else None
     try:
         import pdfplumber
-        full = []
-        with pdfplumber.open(path) as pdf:
+        pages: List[Tuple[int, str]] = []
+        with pdfplumber.open(path, pages=wanted) as pdf:
+            total = len(pdf.pages)
             for page in pdf.pages:
                 txt = page.extract_text() or ""
-                full.append(txt)
-        return "\n\n".join(full)
+                pages.append((page.page_number, txt))
+                if progress_cb:
+                    progress_cb(len(pages), total)
+        return pages
     except (ImportError, OSError) as err:
         # Fallback: pypdf
         logger.warning("pdfplumber nicht verfügbar oder Fehler beim Lesen: %s", err)
@@ -39,16 +76,159 @@ def extract_text_from_pdf(path: str) -> str:
             )
             logger.error(msg)
             raise ImportError(msg) from err2
-        full = []
+        pages = []
         reader = PdfReader(path)
-        for page in reader.pages:
+        total = len(reader.pages)
+        numbers = [n for n in wanted if 1 <= n <= total] if wanted is not None else range(1, total + 1)
+        for no in numbers:
             try:
-                txt = page.extract_text() or ""
+                txt = reader.pages[no - 1].extract_text() or ""
             except (PdfReadError, KeyError) as err2:
                 logger.warning("Textseite konnte nicht extrahiert werden: %s", err2)
                 txt = ""
-            full.append(txt)
-        return "\n\n".join(full)
+            pages.append((no, txt))
+            if progress_cb:
+                progress_cb(len(pages), len(numbers))
+        return pages
+
+
+def parse_page_range(spec: str) -> List[int]:
+    """Wandelt eine Angabe wie ``"120-180, 200"`` in eine sortierte Seitenliste.
+
+    Bereiche sind inklusiv und 1-basiert. Ungültige Angaben lösen
+    ``ValueError`` aus.
+    """
+    numbers: set[int] = set()
+    for part in spec.replace(";", ",").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        m = re.fullmatch(r"(\d+)\s*[-–]\s*(\d+)|(\d+)", part)
+        if not m:
+            raise ValueError(f"Ungültige Seitenangabe: {part!r}")
+        if m.group(3):
+            first = last = int(m.group(3))
+        else:
+            first, last = int(m.group(1)), int(m.group(2))
+        if first < 1 or last < first:
+            raise ValueError(f"Ungültiger Seitenbereich: {part!r}")
+        numbers.update(range(first, last + 1))
+    if not numbers:
+        raise ValueError("Leere Seitenangabe")
+    return sorted(numbers)
+
+
+def _outline_pages(path: str, chapters: Sequence[str]) -> Optional[List[Tuple[str, int, int]]]:
+    """Ermittelt die Seiten gewählter Kapitel über das PDF-Inhaltsverzeichnis.
+
+    Nutzt die Lesezeichen (Outline) der PDF, ohne Seiteninhalte zu parsen, und
+    liefert je passendem Eintrag ``(nummer, erste_seite, letzte_seite)``. Gibt
+    ``None`` zurück, wenn keine Outline vorhanden ist oder kein Eintrag passt –
+    der Aufrufer fällt dann auf die Textsuche zurück.
+    """
+    try:
+        from pypdf import PdfReader
+        from pypdf.errors import PdfReadError
+    except ImportError:
+        return None
+    from .chunking import chapter_matches, heading_number
+
+    try:
+        reader = PdfReader(path)
+        flat: List[Tuple[int, Optional[str], int]] = []
+
+        def walk(items, level):
+            for it in items:
+                if isinstance(it, list):
+                    walk(it, level + 1)
+                    continue
+                number = heading_number(getattr(it, "title", "") or "")
+                flat.append((level, number, reader.get_destination_page_number(it) + 1))
+
+        walk(reader.outline, 0)
+        total = len(reader.pages)
+    except (PdfReadError, OSError, KeyError, ValueError) as err:
+        logger.warning("PDF-Outline nicht lesbar: %s", err)
+        return None
+
+    spans: List[Tuple[str, int, int]] = []
+    for idx, (level, number, first) in enumerate(flat):
+        if number is None or not any(chapter_matches(number, c) for c in chapters):
+            continue
+        last = total
+        for next_level, _, next_page in flat[idx + 1 :]:
+            if next_level <= level:
+                # Das Folgekapitel kann mitten auf der Seite beginnen.
+                last = max(first, next_page)
+                break
+        spans.append((number, first, last))
+    return spans or None
+
+
+def load_pages(
+    path: str,
+    pages: Optional[str | Iterable[int]] = None,
+    chapters: Optional[Sequence[str]] = None,
+    ocr: Optional[bool] = None,
+    progress_cb: Optional[Callable[[int, int], None]] = None,
+    ocr_progress_cb: Optional[Callable[[int, int], None]] = None,
+    token: Optional[CancelToken] = None,
+) -> List[Tuple[int, str]]:
+    """Liest nur den gewünschten Teil einer PDF ein.
+
+    ``pages`` ist eine Seitenangabe (``"120-180"`` oder Iterable von Nummern),
+    ``chapters`` eine Liste von Kapitelmustern wie ``"3"`` oder ``"3.*"``.
+    Kapitel werden – falls vorhanden – über die PDF-Outline auf Seiten
+    abgebildet, sodass nur diese Seiten geparst werden; anschließend wird der
+    Text zeilengenau über `chunking.select_chapters` zugeschnitten.
+
+    Seiten ohne Textschicht werden per OCR (`app.ocr`) erkannt, wenn ``ocr``
+    gesetzt ist bzw. – bei ``None`` – ``[ocr] enabled`` in ``config.toml``.
+    ``progress_cb`` wie bei `extract_pages_from_pdf`; ``ocr_progress_cb`` und
+    ``token`` gehen an `app.ocr.ocr_pages` (Fortschritt und Abbruch je Seite).
+    """
+    numbers: Optional[List[int]] = None
+    open_pages: Optional[Dict[int, str]] = None
+    if pages is not None:
+        numbers = parse_page_range(pages) if isinstance(pages, str) else sorted(set(pages))
+    if chapters:
+        spans = _outline_pages(path, chapters)
+        if spans is not None:
+            from .chunking import chapter_key
+
+            outline = {p for _, first, last in spans for p in range(first, last + 1)}
+            numbers = sorted(outline) if numbers is None else sorted(set(numbers) & outline)
+            # Seiten, die innerhalb eines Kapitels beginnen – dessen Überschrift
+            # muss dann nicht im gelesenen Bereich liegen
+            open_pages = {}
+            for number, first, last in spans:
+                for p in range(first + 1, last + 1):
+                    if p not in open_pages or chapter_key(number) > chapter_key(open_pages[p]):
+                        open_pages[p] = number
+    result = extract_pages_from_pdf(path, numbers, progress_cb)
+    ocr_cfg = load_config().get("ocr", {})
+    if ocr if ocr is not None else ocr_cfg.get("enabled", False):
+        from .ocr import fill_empty_pages
+
+        result = fill_empty_pages(
+            path,
+            result,
+            language=ocr_cfg.get("language", "deu"),
+            resolution=int(ocr_cfg.get("resolution", 300)),
+            workers=int(ocr_cfg.get("workers", 0)) or None,
+            progress_cb=ocr_progress_cb,
+            token=token,
+        )
+    if chapters:
+        from .chunking import select_chapters
+
+        result = select_chapters(result, chapters, open_pages)
+    return result
+
+
+def extract_text_from_pdf(path: str) -> str:
+    """Liest eine PDF ein und liefert den Text aller Seiten als einen String."""
+    return "\n\n".join(txt for _, txt in extract_pages_from_pdf(path))
 
 def normalize_whitespace(s: str) -> str:
     s = s.replace("\r", "\n")
@@ -73,32 +253,67 @@ def segment_text(
     als eigene Segmente behandelt oder – falls ``keep_headings`` ``False`` ist –
     verworfen.
     """
+    return [
+        chunk
+        for chunk, _, _ in _segment_paragraphs(
+            ((p, 0) for p in _paragraphs(text)), min_len, max_len, keep_headings
+        )
+    ]
+
+
+def segment_pages(
+    pages: Iterable[Tuple[int, str]],
+    min_len: int = 300,
+    max_len: int = 1200,
+    keep_headings: bool = True,
+) -> List[Tuple[str, int, int]]:
+    """Wie `segment_text`, behält aber die Seitenherkunft bei.
+
+    ``pages`` ist eine Folge ``(seitennummer, text)`` wie von
+    `extract_pages_from_pdf` geliefert. Rückgabe sind Tripel
+    ``(segmenttext, start_seite, end_seite)``; ein Segment, das über einen
+    Seitenumbruch hinweg gesammelt wurde, erhält die volle Spanne.
+    """
+    paragraphs = ((p, no) for no, txt in pages for p in _paragraphs(txt))
+    return _segment_paragraphs(paragraphs, min_len, max_len, keep_headings)
+
+
+def _paragraphs(text: str) -> List[str]:
     text = normalize_whitespace(text)
-    paragraphs = [p.strip() for p in re.split(r"\n\s*\n", text) if p.strip()]
+    return [p.strip() for p in re.split(r"\n\s*\n", text) if p.strip()]
+
 
-    segments: List[str] = []
+def _segment_paragraphs(
+    paragraphs: Iterable[Tuple[str, int]],
+    min_len: int,
+    max_len: int,
+    keep_headings: bool,
+) -> List[Tuple[str, int, int]]:
+    segments: List[Tuple[str, int, int]] = []
     buf: List[str] = []
+    buf_pages: List[int] = []
     cur_len = 0
 
     def flush():
-        nonlocal buf, cur_len, segments
+        nonlocal buf, buf_pages, cur_len
         if buf:
             chunk = "\n\n".join(buf).strip()
             if chunk:
-                segments.append(chunk)
-        buf, cur_len = [], 0
+                segments.append((chunk, buf_pages[0], buf_pages[-1]))
+        buf, buf_pages, cur_len = [], [], 0
 
-    for p in paragraphs:
+    for p, page in paragraphs:
         if HEADING_RE.match(p):
             flush()
             if keep_headings:
-                segments.append(p)
+                segments.append((p, page, page))
             continue
 
         plen = len(p)
         if cur_len + plen > max_len and cur_len >= min_len:
             flush()
         buf.append(p)
+        buf_pages.append(page)
         cur_len += plen
         if cur_len >= min_len:
             flush()
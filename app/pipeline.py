@@ -7,23 +7,27 @@ Standardwerte stammen aus ``config.toml`` und werden beim Erstellen der
 """
 
 from __future__ import annotations
-from typing import List, Dict, Any, Tuple, Callable, Optional
+from typing import List, Dict, Any, Tuple, Callable, Iterable, Iterator, Mapping, Optional, Sequence
 from dataclasses import dataclass
 from concurrent.futures import ThreadPoolExecutor, as_completed
-import re
+import os
+import queue
+import threading
+import time
+from . import metrics, profiling, tracing
+from .cancel import Cancelled
+from .card_store import CardStore
 from .tokenizer_utils import Tokenizer
 from .logging_utils import get_logger
-try:
-    from openai import OpenAIError  # type: ignore
-except Exception:  # pragma: no cover
-    OpenAIError = Exception  # type: ignore
 logger = get_logger(__name__)
 
 from .config import PRICES, ESTIMATE
-from .openai_client import OpenAIClient, OpenAISettings
-from .pdf_ingest import extract_text_from_pdf, segment_text
+from .openai_client import OpenAIClient, OpenAISettings, api_errors
+from .chunking import split_sentences
+from .pdf_ingest import load_pages, segment_pages
 from .excel_export import to_excel
-from .pipeline_models import Segment, QAItem, CardRow
+from .export_sinks import ExportSink
+from .pipeline_models import Segment, QAItem, CardRow, format_page_span
 
 @dataclass
 class CostBreakdown:
@@ -31,29 +35,78 @@ class CostBreakdown:
     total_output_tokens: int
     usd: float
 
+
+@dataclass
+class RunResult:
+    """Ergebnis von `LernkartenPipeline.run`."""
+
+    rows: List[CardRow]
+    labeled: List[Segment]  # alle klassifizierten Segmente, auch verworfene (keep=False)
+    out_path: Optional[str] = None
+    seconds: float = 0.0
+    store: Optional[CardStore] = None  # mit ``run(store=...)``: Karten dort, ``rows`` bleibt leer
+
+    def iter_rows(self) -> Iterator[CardRow]:
+        """Alle Zeilen in Ursprungsreihenfolge, gleich ob in ``rows`` oder ``store``."""
+        return self.store.rows() if self.store is not None else iter(self.rows)
+
+    @property
+    def card_count(self) -> int:
+        if self.store is not None:
+            return len(self.store)
+        return sum(len(r.fragen) for r in self.rows)
+
+
+_DONE = object()  # Ende-Marke in den Queues von `run`
+
 class LernkartenPipeline:
-    def __init__(self, settings: OpenAISettings):
+    def __init__(self, settings: OpenAISettings, client: Optional[OpenAIClient] = None):
         self.settings = settings
-        self.client = OpenAIClient(settings)
+        # ``client`` erlaubt einen geteilten Client (Cache, Rate-Limit), z. B. in `app.batch`
+        self.client = client if client is not None else OpenAIClient(settings)
         self.tok = Tokenizer()
+        # Anzahl der zuletzt eingelesenen (ggf. ausgewählten) Seiten, aus demselben
+        # Durchlauf wie die Segmentierung (kein zweites Öffnen der Datei nötig).
+        self.page_count = 0
 
-    def load_and_segment(self, path: str) -> List[Segment]:
+    @profiling.profiled()
+    def load_and_segment(
+        self,
+        path: str,
+        pages: str | Sequence[int] | None = None,
+        chapters: Sequence[str] | None = None,
+    ) -> List[Segment]:
         """Liest eine PDF ein und segmentiert sie in grobe Abschnitte.
 
         Die feine Chunking-Logik (`app.chunking`) wird später angewendet; hier
-        erfolgt nur eine heuristische Absatz-Zerlegung über `pdf_ingest.segment_text`.
+        erfolgt nur eine heuristische Absatz-Zerlegung über `pdf_ingest.segment_pages`.
+        Jedes Segment trägt die Seitenspanne, aus der es stammt.
+
+        Mit ``pages`` (z. B. ``"120-180"``) und/oder ``chapters`` (z. B.
+        ``["3.*"]``) wird nur der gewählte Teil des Dokuments eingelesen, sodass
+        Extraktion und API-Kosten mit der Auswahl statt mit dem Dokument wachsen.
         """
 
-        raw = extract_text_from_pdf(path)
-        chunks = segment_text(raw)
+        with tracing.span("extract", path=path) as sp:
+            pages = load_pages(path, pages=pages, chapters=chapters)
+            sp.set(pages=len(pages))
+        self.page_count = len(pages)
+        with tracing.span("segment") as sp:
+            chunks = segment_pages(pages)
+            sp.set(segments=len(chunks))
         # Filter obvious table-of-contents segments like "Inhaltsverzeichnis" or
         # "Glossar" early so that they never reach the classifier.  Those
         # headings typically do not contain meaningful learning content.
         from .segment_filters import is_outline_segment
 
-        chunks = [c for c in chunks if not is_outline_segment(c)]
-        return [Segment(text=c) for c in chunks]
+        return [
+            Segment(text=c, start_page=start, end_page=end)
+            for c, start, end in chunks
+            if not is_outline_segment(c)
+        ]
 
+    @tracing.traced()
+    @profiling.profiled()
     def classify(
         self,
         segments: List[Segment],
@@ -64,78 +117,93 @@ class LernkartenPipeline:
         """Klassifiziert Segmente und erlaubt Fortschritts-Callbacks sowie Stop/Pause."""
         out = []
         self._dropped_segments = 0
-        bullet_pattern = r'^\s*[-*•0-9]+[\.\)]'
         total = len(segments)
         for i, s in enumerate(segments, 1):
             if stop_cb and stop_cb():
                 raise RuntimeError("Abgebrochen")
             if pause_event:
                 pause_event.wait()
-            got_any = False
-            paragraphs = [p for p in s.text.split("\n\n") if p.strip()]
-            for para in paragraphs:
-                label_seq: List[Tuple[str, str]] = []
-                # Split paragraph into sentences (treat bullet list items as separate sentences)
-                if "\n" in para:
-                    lines = para.splitlines()
-                    nonempty = [ln for ln in lines if ln.strip()]
-                    if nonempty and all(re.match(bullet_pattern, ln) for ln in nonempty):
-                        sentences = [ln.strip() for ln in nonempty]
-                    else:
-                        para_text = para.replace("\n", " ")
-                        sentences = re.split(r'(?<=[.!?])\s+(?=[A-ZÄÖÜ])', para_text)
-                else:
-                    sentences = re.split(r'(?<=[.!?])\s+(?=[A-ZÄÖÜ])', para)
-                for sentence in [sent for sent in sentences if sent.strip()]:
-                    try:
-                        data = self.client.classify_segment(sentence[:5000])
-                    except OpenAIError as e:
-                        # Transienter API-/Netzfehler → nicht abbrechen, Satz durchwinken
-                        logger.warning(
-                            "Klassifikation uebersprungen (API-Fehler): %s", e
-                        )
-                        data = {
-                            "label": "Fakt",
-                            "keep": True,
-                            "reason": "fallback_after_error",
-                        }
-                    except Exception as e:
-                        logger.warning(
-                            "Klassifikation uebersprungen (Fehler): %s", e
-                        )
-                        data = {
-                            "label": "Fakt",
-                            "keep": True,
-                            "reason": "fallback_after_error",
-                        }
-                    label = data.get("label", "Fakt")
-                    keep_flag = bool(data.get("keep", True))
-                    if not keep_flag:
-                        continue
-                    label_seq.append((label, sentence.strip()))
-                if not label_seq:
-                    continue
-                got_any = True
-                # Group consecutive sentences with the same label
-                current_label, current_text = label_seq[0]
-                for label, text_part in label_seq[1:]:
-                    if label == current_label:
-                        current_text += " " + text_part
-                    else:
-                        seg_new = Segment(text=current_text, keep=True)
-                        seg_new.label = current_label
-                        out.append(seg_new)
-                        current_label = label
-                        current_text = text_part
-                seg_new = Segment(text=current_text, keep=True)
-                seg_new.label = current_label
-                out.append(seg_new)
-            if not got_any:
+            parts = self._classify_segment(s)
+            if not parts:
                 self._dropped_segments += 1
+            out.extend(parts)
             if progress_cb:
                 progress_cb(i, total)
         return out
 
+    def _classify_segment(self, s: Segment) -> List[Segment]:
+        """Klassifiziert ein Segment satzweise und fasst gleich gelabelte Sätze zusammen.
+
+        Liefert je Absatz ein neues `Segment` pro Folge gleicher Labels (mit
+        Seitenspanne des Ursprungs); eine leere Liste, wenn nichts behalten wird.
+        """
+        out: List[Segment] = []
+        paragraphs = [p for p in s.text.split("\n\n") if p.strip()]
+        for para in paragraphs:
+            label_seq: List[Tuple[str, str]] = []
+            for sentence in split_sentences(para):
+                try:
+                    data = self.client.classify_segment(sentence[:5000])
+                except Cancelled:
+                    raise
+                except api_errors() as e:
+                    # Transienter API-/Netzfehler → nicht abbrechen, Satz durchwinken
+                    metrics.inc("pipeline_fallbacks_total", stage="classify", reason="api")
+                    logger.warning(
+                        "Klassifikation uebersprungen (API-Fehler): %s", e
+                    )
+                    data = {
+                        "label": "Fakt",
+                        "keep": True,
+                        "reason": "fallback_after_error",
+                    }
+                except Exception as e:
+                    metrics.inc("pipeline_fallbacks_total", stage="classify", reason="other")
+                    logger.warning(
+                        "Klassifikation uebersprungen (Fehler): %s", e
+                    )
+                    data = {
+                        "label": "Fakt",
+                        "keep": True,
+                        "reason": "fallback_after_error",
+                    }
+                label = data.get("label", "Fakt")
+                keep_flag = bool(data.get("keep", True))
+                if not keep_flag:
+                    continue
+                label_seq.append((label, sentence.strip()))
+            if not label_seq:
+                continue
+            # Group consecutive sentences with the same label
+            current_label, current_text = label_seq[0]
+            for label, text_part in label_seq[1:]:
+                if label == current_label:
+                    current_text += " " + text_part
+                else:
+                    out.append(
+                        Segment(
+                            text=current_text,
+                            keep=True,
+                            start_page=s.start_page,
+                            end_page=s.end_page,
+                            label=current_label,
+                        )
+                    )
+                    current_label = label
+                    current_text = text_part
+            out.append(
+                Segment(
+                    text=current_text,
+                    keep=True,
+                    start_page=s.start_page,
+                    end_page=s.end_page,
+                    label=current_label,
+                )
+            )
+        return out
+
+    @tracing.traced()
+    @profiling.profiled()
     def generate_cards(
         self,
         segments: List[Segment],
@@ -149,40 +217,23 @@ class LernkartenPipeline:
         budget_usd: float | None = None,
         limit_by_budget: bool = False,
         adjust_cb: Optional[Callable[[int], None]] = None,
+        sink: Optional[ExportSink] = None,
     ) -> List[CardRow]:
         """Generiert Lernkarten dynamisch je nach Segmentlänge.
 
         Bei kleinen Inputs wird sequenziell gearbeitet; ab vier Segmenten wird
-        standardmäßig parallelisiert (max. ``max_workers`` Threads)."""
+        standardmäßig parallelisiert (max. ``max_workers`` Threads).
+
+        Ist ``sink`` gesetzt, wird jede fertige Zeile sofort dorthin geschrieben
+        (Reihenfolge der Fertigstellung); geschlossen wird der Sink vom Aufrufer."""
         rows: List[CardRow] = []
         card_count = 0
         total = len(segments)
 
         if limit_by_budget and budget_usd and budget_usd > 0:
-            kept = [s for s in segments if s.keep]
-            if kept:
-                token_counts = [self.tok.count(s.text) for s in kept]
-                seg_avg = int(sum(token_counts) / len(token_counts))
-                est = self.estimate_cost(
-                    "",
-                    len(kept),
-                    seg_avg,
-                    max_questions_per_chunk,
-                    self.settings.classify_model,
-                    self.settings.qa_model,
-                )
-                total_cost = est.get("sum_usd", 0.0)
-                if total_cost > budget_usd:
-                    factor = budget_usd / total_cost
-                    scaled = max(1, int(max_questions_per_chunk * factor))
-                    if scaled < max_questions_per_chunk:
-                        max_questions_per_chunk = scaled
-                        if adjust_cb:
-                            adjust_cb(scaled)
-                        logger.info(
-                            "Fragen pro Segment automatisch auf %s reduziert, um Budget einzuhalten.",
-                            scaled,
-                        )
+            max_questions_per_chunk = self._scale_for_budget(
+                [s for s in segments if s.keep], max_questions_per_chunk, budget_usd, adjust_cb
+            )
 
         # --- Sequenziell: kleine Inputs oder Parallelisierung deaktiviert ---
         if total < 4 or max_workers <= 1:
@@ -195,8 +246,7 @@ class LernkartenPipeline:
                     raise RuntimeError("Abgebrochen")
                 if pause_event:
                     pause_event.wait()
-                tokens = self.tok.count(s.text)
-                n_questions = max(1, min(max_questions_per_chunk, tokens // 100))
+                n_questions = self._n_questions(s, max_questions_per_chunk)
                 items: List[QAItem] = self.client.gen_qa_for_chunk(
                     s.text[:8000], n_questions, language=language
                 )
@@ -212,14 +262,10 @@ class LernkartenPipeline:
                     if card_cb:
                         card_cb(s.text, x.frage, x.antwort)
                 card_count += len(items)
-                rows.append(
-                    CardRow(
-                        original=s.text,
-                        fragen=fragen,
-                        antworten=antworten,
-                        labels=[s.label] if getattr(s, "label", None) else [],
-                    )
-                )
+                row = self._card_row(s, fragen, antworten)
+                rows.append(row)
+                if sink is not None:
+                    sink.write(row)
                 if progress_cb:
                     progress_cb(i, total, card_count)
             return rows
@@ -237,10 +283,9 @@ class LernkartenPipeline:
                     continue
                 if pause_event:
                     pause_event.wait()
-                tokens = self.tok.count(s.text)
-                n_questions = max(1, min(max_questions_per_chunk, tokens // 100))
+                n_questions = self._n_questions(s, max_questions_per_chunk)
                 fut = ex.submit(
-                    self.client.gen_qa_for_chunk, s.text[:8000], n_questions, language
+                    self._qa_task, time.perf_counter(), i, s.text[:8000], n_questions, language
                 )
                 futures[fut] = (i, s)
 
@@ -248,7 +293,10 @@ class LernkartenPipeline:
                 i, s = futures[fut]
                 try:
                     items: List[QAItem] = fut.result()
+                except Cancelled:
+                    raise
                 except Exception as e:
+                    metrics.inc("pipeline_fallbacks_total", stage="qa", reason="error")
                     logger.warning("OpenAI-Fehler: %s", e)
                     items = None
                 if not items:
@@ -263,12 +311,9 @@ class LernkartenPipeline:
                     if card_cb:
                         card_cb(s.text, x.frage, x.antwort)
                 card_count += len(items)
-                indexed_rows[i] = CardRow(
-                    original=s.text,
-                    fragen=fragen,
-                    antworten=antworten,
-                    labels=[s.label] if getattr(s, "label", None) else [],
-                )
+                indexed_rows[i] = self._card_row(s, fragen, antworten)
+                if sink is not None:
+                    sink.write(indexed_rows[i])
                 if progress_cb:
                     progress_cb(i, total, card_count)
 
@@ -277,9 +322,314 @@ class LernkartenPipeline:
             rows.append(indexed_rows[i])
         return rows
 
+    @tracing.traced()
+    def run(
+        self,
+        source: str | os.PathLike | Sequence[Segment],
+        out_dir: str | None = None,
+        *,
+        out_path: str | None = None,
+        pages: str | Sequence[int] | None = None,
+        chapters: Sequence[str] | None = None,
+        max_questions_per_chunk: int = 8,
+        language: str = "de",
+        review_cb: Optional[Callable[[List[Segment]], bool]] = None,
+        progress_cb: Optional[Callable[[str, int, int], None]] = None,
+        stop_cb: Optional[Callable[[], bool]] = None,
+        pause_event: Any | None = None,
+        card_cb: Optional[Callable[[str, str, str], None]] = None,
+        sink: Optional[ExportSink] = None,
+        max_workers: int = 3,
+        queue_size: int = 16,
+        budget_usd: float | None = None,
+        limit_by_budget: bool = False,
+        adjust_cb: Optional[Callable[[int], None]] = None,
+        preclassified: Optional[Mapping[int, List[Segment]]] = None,
+        store: Optional[CardStore] = None,
+    ) -> RunResult:
+        """Kompletter Lauf: Einlesen → Klassifikation → Filter → Lernkarten → Export.
+
+        Die Stufen laufen überlappend: Ein Thread liest ein (oder übernimmt
+        bereits segmentierte ``source``-Segmente) und klassifiziert Segment für
+        Segment; jedes behaltene Teilsegment geht sofort über eine auf
+        ``queue_size`` begrenzte Queue an ``max_workers`` QA-Threads. Die
+        Gesamtdauer nähert sich so der langsameren Stufe statt der Summe beider.
+
+        Mit ``review_cb`` gibt es wieder eine Schranke: Die Kartenerzeugung
+        beginnt erst, wenn alle Segmente klassifiziert sind und
+        ``review_cb(labeled)`` ``True`` liefert; der Callback darf ``keep``
+        einzelner Segmente ändern, ``False`` bricht ab.
+
+        ``progress_cb(stufe, fertig, gesamt)`` meldet ``"classify"`` (gesamt =
+        Eingangssegmente) und ``"qa"`` (gesamt = bisher eingereihte Segmente).
+        ``progress_cb``, ``card_cb``, ``stop_cb``, ``sink`` und Export laufen im
+        aufrufenden Thread. ``review_cb`` und ``adjust_cb`` dagegen laufen im
+        Producer-Thread ``run-classify``; ``review_cb`` darf dort blockieren (z. B. bis der Nutzer die
+        Prüfung abschließt); die Kartenerzeugung wartet so lange. Mit
+        ``out_path`` bzw. ``out_dir`` und ohne ``sink`` wird am Ende nach Excel
+        exportiert. Die Zeilen kommen wie bei `generate_cards` in
+        Ursprungsreihenfolge zurück.
+
+        Mit ``store`` (z. B. ``CardStore()`` für große Decks) wandern fertige
+        Zeilen in Ursprungsreihenfolge spaltenweise in den Store, sobald alle
+        früheren Segmente fertig sind; ``RunResult.rows`` bleibt dann leer,
+        gelesen wird über ``RunResult.store`` bzw. `RunResult.iter_rows`.
+
+        ``preclassified`` (Index in ``source`` → Teilsegmente) übernimmt bereits
+        klassifizierte Segmente, z. B. aus `app.speculative.SpeculativeClassifier`;
+        für sie wird keine Anfrage mehr gestellt.
+        """
+        started = time.perf_counter()
+        stop = threading.Event()
+        qa_q: queue.Queue = queue.Queue(maxsize=max(1, queue_size))
+        events: queue.Queue = queue.Queue()
+        labeled: List[Segment] = []
+        errors: List[BaseException] = []
+        n_workers = max(1, max_workers)
+        enqueued = [0]
+
+        def wait_if_paused() -> None:
+            if pause_event is not None:
+                while not pause_event.wait(timeout=0.1) and not stop.is_set():
+                    pass
+
+        def enqueue(s: Segment) -> bool:
+            item = (enqueued[0] + 1, s, time.perf_counter())
+            while not stop.is_set():
+                try:
+                    qa_q.put(item, timeout=0.1)
+                except queue.Full:
+                    continue
+                enqueued[0] += 1
+                return True
+            return False
+
+        def produce() -> None:
+            nonlocal max_questions_per_chunk
+            try:
+                if isinstance(source, (str, os.PathLike)):
+                    segments = self.load_and_segment(str(source), pages=pages, chapters=chapters)
+                else:
+                    segments = list(source)
+                if limit_by_budget and budget_usd and budget_usd > 0:
+                    max_questions_per_chunk = self._scale_for_budget(
+                        segments, max_questions_per_chunk, budget_usd, adjust_cb
+                    )
+                self._dropped_segments = 0
+                with tracing.span("classify", segments=len(segments)), profiling.stage("classify"):
+                    for i, seg in enumerate(segments, 1):
+                        if stop.is_set():
+                            return
+                        wait_if_paused()
+                        parts = preclassified.get(i - 1) if preclassified else None
+                        if parts is None:
+                            parts = self._classify_segment(seg)
+                        if not parts:
+                            self._dropped_segments += 1
+                        for part in parts:
+                            part.keep = self._passes_filters(part)
+                            part.id = len(labeled)
+                            labeled.append(part)
+                            if part.keep and review_cb is None and not enqueue(part):
+                                return
+                        events.put(("classify", i, len(segments)))
+                if review_cb is not None:
+                    if not review_cb(labeled):
+                        stop.set()
+                        return
+                    for part in labeled:
+                        if part.keep and not enqueue(part):
+                            return
+            except BaseException as e:  # im Aufrufer erneut ausgelöst
+                errors.append(e)
+                stop.set()
+            finally:
+                for _ in range(n_workers):
+                    qa_q.put(_DONE)
+
+        def consume() -> None:
+            try:
+                with profiling.worker("qa"):
+                    while True:
+                        item = qa_q.get()
+                        if item is _DONE:
+                            return
+                        if stop.is_set():
+                            continue  # Queue leeren, damit der Producer nicht blockiert
+                        i, seg, submitted = item
+                        wait_if_paused()
+                        try:
+                            items = self._qa_task(
+                                submitted,
+                                i,
+                                seg.text[:8000],
+                                self._n_questions(seg, max_questions_per_chunk),
+                                language,
+                            )
+                        except Cancelled:
+                            stop.set()
+                            continue
+                        except Exception as e:
+                            metrics.inc("pipeline_fallbacks_total", stage="qa", reason="error")
+                            logger.warning("OpenAI-Fehler: %s", e)
+                            items = None
+                        events.put(("qa", i, seg, items))
+            finally:
+                events.put(_DONE)
+
+        threads = [threading.Thread(target=produce, name="run-classify", daemon=True)]
+        threads += [
+            threading.Thread(target=consume, name=f"run-qa-{n}", daemon=True)
+            for n in range(n_workers)
+        ]
+        # Eigene Stufe für die Kartenerzeugung: QA-Threads rechnen sich ihr zu,
+        # die Klassifikation misst der Producer-Thread als ``classify``.
+        with profiling.stage("qa"):
+            for t in threads:
+                t.start()
+
+            indexed_rows: Dict[int, CardRow] = {}
+            # mit ``store``: fertige Einträge bis zur Lücke davor, ``None`` = keine Karten
+            ready: Dict[int, Optional[CardRow]] = {}
+            next_row = 1
+            card_count = qa_done = finished = 0
+            cancel = getattr(self.client, "cancel", None)
+            while finished < n_workers:
+                if not stop.is_set() and (
+                    (stop_cb and stop_cb()) or (cancel is not None and cancel.cancelled)
+                ):
+                    stop.set()
+                try:
+                    event = events.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if event is _DONE:
+                    finished += 1
+                    continue
+                if event[0] == "classify":
+                    if progress_cb:
+                        progress_cb("classify", event[1], event[2])
+                    continue
+                _, i, seg, items = event
+                qa_done += 1
+                row = None
+                if items:
+                    row = self._card_row(seg, [x.frage for x in items], [x.antwort for x in items])
+                    if card_cb:
+                        for x in items:
+                            card_cb(seg.text, x.frage, x.antwort)
+                    card_count += len(items)
+                    if store is None:
+                        indexed_rows[i] = row
+                    if sink is not None:
+                        sink.write(row)
+                if store is not None:
+                    ready[i] = row
+                    while next_row in ready:
+                        done_row = ready.pop(next_row)
+                        if done_row is not None:
+                            store.add(done_row)
+                        next_row += 1
+                if progress_cb:
+                    progress_cb("qa", qa_done, max(enqueued[0], qa_done))
+            for t in threads:
+                t.join()
+        if errors:
+            raise errors[0]
+        if stop.is_set():
+            raise RuntimeError("Abgebrochen")
+
+        rows = [indexed_rows[i] for i in sorted(indexed_rows)]
+        if out_path is None and out_dir is not None:
+            stem = (
+                os.path.splitext(os.path.basename(source))[0]
+                if isinstance(source, (str, os.PathLike))
+                else "Lernkarten"
+            )
+            out_path = os.path.join(out_dir, f"{stem}_{time.strftime('%Y%m%d_%H%M')}.xlsx")
+        if sink is not None:
+            out_path = str(getattr(sink, "path", out_path) or "") or None
+        elif out_path is not None:
+            self.export_excel(store.rows() if store is not None else rows, out_path)
+        return RunResult(
+            rows=rows,
+            labeled=labeled,
+            out_path=out_path,
+            seconds=time.perf_counter() - started,
+            store=store,
+        )
+
+    @staticmethod
+    def _passes_filters(s: Segment) -> bool:
+        """Verwirft Gliederungen/Verzeichnisse, die die Klassifikation durchgelassen hat."""
+        from .segment_filters import is_outline_segment, looks_like_outline_list
+
+        text = s.text.strip()
+        label = s.label
+        return s.keep and not (is_outline_segment(text) or looks_like_outline_list(text, label))
+
+    def _n_questions(self, s: Segment, max_questions_per_chunk: int) -> int:
+        """Fragen je Segment: eine pro ~100 Tokens, höchstens ``max_questions_per_chunk``."""
+        return max(1, min(max_questions_per_chunk, self.tok.count(s.text) // 100))
+
+    def _scale_for_budget(
+        self,
+        segments: Sequence[Segment],
+        max_questions_per_chunk: int,
+        budget_usd: float,
+        adjust_cb: Optional[Callable[[int], None]] = None,
+    ) -> int:
+        """Senkt die Fragen je Segment, bis die Schätzung für ``segments`` ins Budget passt."""
+        if not segments:
+            return max_questions_per_chunk
+        token_counts = [self.tok.count(s.text) for s in segments]
+        seg_avg = int(sum(token_counts) / len(token_counts))
+        est = self.estimate_cost(
+            "",
+            len(segments),
+            seg_avg,
+            max_questions_per_chunk,
+            self.settings.classify_model,
+            self.settings.qa_model,
+        )
+        total_cost = est.get("sum_usd", 0.0)
+        if total_cost > budget_usd:
+            factor = budget_usd / total_cost
+            scaled = max(1, int(max_questions_per_chunk * factor))
+            if scaled < max_questions_per_chunk:
+                if adjust_cb:
+                    adjust_cb(scaled)
+                logger.info(
+                    "Fragen pro Segment automatisch auf %s reduziert, um Budget einzuhalten.",
+                    scaled,
+                )
+                return scaled
+        return max_questions_per_chunk
+
+    def _qa_task(
+        self, submitted: float, index: int, text: str, n_questions: int, language: str
+    ) -> List[QAItem]:
+        """Worker-Aufgabe; die Zeit bis zum Start landet als ``queue_wait`` im Trace."""
+        tracing.complete("queue_wait", submitted, time.perf_counter(), cat="queue", segment=index)
+        with profiling.worker():
+            return self.client.gen_qa_for_chunk(text, n_questions, language)
+
+    @staticmethod
+    def _card_row(s: Segment, fragen: List[str], antworten: List[str]) -> CardRow:
+        return CardRow(
+            original=s.text,
+            fragen=fragen,
+            antworten=antworten,
+            labels=[s.label] if s.label else [],
+            source=format_page_span(s.start_page, s.end_page),
+            start_page=s.start_page,
+            end_page=s.end_page,
+            segment_id=s.id,
+        )
+
     # === Kosten-Schaetzung ===
+    @staticmethod
     def estimate_cost(
-        self,
         full_text: str,
         n_segments: int,
         seg_avg_tokens: int,
@@ -325,9 +675,25 @@ class LernkartenPipeline:
     def tokens_in_text(self, text: str) -> int:
         return self.tok.count(text)
 
-    def export_excel(self, rows: List[CardRow], out_path: str) -> None:
+    @tracing.traced("export_excel")
+    @profiling.profiled("export_excel")
+    def export_excel(self, rows: Iterable[CardRow], out_path: str) -> None:
         to_excel(rows, out_path)
 
+    @tracing.traced("export_anki")
+    @profiling.profiled("export_anki")
+    def export_anki(self, rows: Iterable[CardRow], out_path: str, deck_name: str = "Lernkarten") -> int:
+        from .anki_export import to_apkg
+
+        return to_apkg(rows, out_path, deck_name=deck_name)
+
+    @tracing.traced("export_analytics")
+    @profiling.profiled("export_analytics")
+    def export_analytics(self, rows: List[CardRow], out_path: str) -> int:
+        from .analytics_export import export_analytics
+
+        return export_analytics(rows, out_path)
+
 
 # Übergangs-Alias für alte Imports, bitte mittelfristig entfernen:
 Pipeline = LernkartenPipeline
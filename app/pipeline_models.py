@@ -1,24 +1,45 @@
 from dataclasses import dataclass
-from typing import List
+from typing import List, Optional
 
 
-@dataclass
+def format_page_span(start_page: Optional[int], end_page: Optional[int]) -> str:
+    """Formatiert eine Seitenspanne für die Spalte ``Quelle`` (z. B. ``S. 3–4``)."""
+    if not start_page:
+        return ""
+    if not end_page or end_page == start_page:
+        return f"S. {start_page}"
+    return f"S. {start_page}–{end_page}"
+
+
+# Alle Modelle verwenden ``__slots__`` statt eines Attribut-Dicts je Instanz;
+# bei 100 000 Karten macht das einen spürbaren Teil des Speichers aus. Für sehr
+# große Decks gibt es zusätzlich die spaltenweise `app.card_store.CardStore`.
+
+
+@dataclass(slots=True)
 class Segment:
     text: str
     keep: bool = True
+    start_page: Optional[int] = None
+    end_page: Optional[int] = None
+    label: str = ""  # Ergebnis der Klassifikation
+    id: Optional[int] = None  # Position in ``RunResult.labeled``; Karten verweisen darauf
 
 
-@dataclass
+@dataclass(slots=True)
 class QAItem:
     frage: str
     antwort: str
     labels: list[str] | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class CardRow:
-    original: str
+    original: str  # Verweis auf ``Segment.text`` (dasselbe Objekt, keine Kopie)
     fragen: List[str]
     antworten: List[str]
     labels: List[str]
     source: str = ""
+    start_page: Optional[int] = None
+    end_page: Optional[int] = None
+    segment_id: Optional[int] = None  # ``Segment.id`` des Ursprungs
@@ -0,0 +1,466 @@
+"""Profiling-Modus für Pipeline-Läufe.
+
+Innerhalb von `profile_run` misst jede mit `profiled` (bzw. `stage`)
+markierte Stufe der `LernkartenPipeline` (Einlesen, Klassifikation,
+Kartenerzeugung, Export) – auch in `LernkartenPipeline.run`, wo
+Klassifikation (``classify``) und Kartenerzeugung (``qa``) überlappend laufen
+
+* CPU-Zeit je Funktion mit ``cProfile`` → ``<stufe>.pstats``; die Arbeit der
+  QA-Worker-Threads (`worker`) wird in die Statistik der Stufe eingerechnet,
+* Speicher mit ``tracemalloc`` → ``<stufe>_alloc.txt`` mit den ``top_n``
+  Codezeilen, die während der Stufe am meisten Speicher belegt haben,
+* optional per Stichprobe (``sampling=True``) alle Threads alle
+  ``interval`` Sekunden → ``<stufe>.folded`` im Format von ``flamegraph.pl``
+  bzw. speedscope.
+
+Ab Python 3.12 erlaubt cProfile nur einen aktiven Profiler je Prozess. Er
+gehört dann der zuerst begonnenen Stufe; gleichzeitig laufende Stufen (in
+``run`` die Klassifikation) werden per Stichprobe ihrer Threads gemessen.
+
+Beim Verlassen von `profile_run` entstehen ``summary.txt`` (Tabelle) und
+``summary.json``. Die Ergebnisse der Pipeline bleiben unverändert; es wird nur
+beobachtet. Ohne aktiven Lauf kosten die Dekoratoren einen Funktionsaufruf und
+eine ``None``-Prüfung.
+
+Die GUI bietet dafür eine Checkbox (Ausgabe neben dem Export in
+``<export>_profil/``); ohne GUI::
+
+    python -m app.profiling skript.pdf --out exports/skript.xlsx --sampling
+
+Die ``.pstats``-Dateien lassen sich mit ``python -m pstats`` oder snakeviz
+öffnen.
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, TypeVar
+
+from .logging_utils import get_logger
+
+if TYPE_CHECKING:  # cProfile/pstats erst bei Bedarf laden (Startzeit)
+    import cProfile
+
+logger = get_logger(__name__)
+
+_TRACEMALLOC_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+class _Sampler(threading.Thread):
+    """Zählt Aufrufstapel aller Threads in festen Abständen (``sys._current_frames``)."""
+
+    def __init__(self, interval: float, threads: Optional[List[int]] = None):
+        super().__init__(name="profiling-sampler", daemon=True)
+        self.interval = interval
+        self.threads = threads  # nur diese Threads (Idents) zählen; ``None`` = alle
+        self.stacks: Counter[str] = Counter()
+        self._halt = threading.Event()
+
+    def run(self) -> None:
+        own = threading.get_ident()
+        names = {}
+        while not self._halt.wait(self.interval):
+            if len(names) != threading.active_count():
+                names = {t.ident: t.name for t in threading.enumerate()}
+            wanted = None if self.threads is None else set(self.threads)
+            for ident, frame in sys._current_frames().items():
+                if ident == own or (wanted is not None and ident not in wanted):
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self) -> None:
+        self._halt.set()
+        self.join()
+
+    def write(self, path: Path) -> None:
+        with path.open("w", encoding="utf-8") as f:
+            for stack, n in self.stacks.most_common():
+                f.write(f"{stack} {n}\n")
+
+    def top_function(self) -> str:
+        """Häufigste innerste Funktion der Stichproben."""
+        leaves: Counter[str] = Counter()
+        for stack, n in self.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += n
+        return leaves.most_common(1)[0][0] if leaves else ""
+
+
+# Ab Python 3.12 baut cProfile auf ``sys.monitoring``: prozessweit darf nur ein
+# Profiler aktiv sein (ein zweites ``enable()`` wirft ``ValueError``), dafür
+# sieht er alle Threads.
+_SHARED_CPROFILE = sys.version_info >= (3, 12)
+
+
+class _Stage:
+    __slots__ = ("workers", "threads", "n_workers")
+
+    def __init__(self) -> None:
+        self.workers: List[cProfile.Profile] = []  # Worker-Profile (bis 3.11)
+        self.threads: List[int] = [threading.get_ident()]  # für die Stichproben
+        self.n_workers = 0
+
+
+class Profiler:
+    """Misst Stufen eines Laufs und schreibt die Berichte nach ``out_dir``."""
+
+    def __init__(
+        self,
+        out_dir: str | os.PathLike,
+        top_n: int = 25,
+        sampling: bool = False,
+        interval: float = 0.005,
+    ):
+        self.out_dir = Path(out_dir)
+        self.top_n = top_n
+        self.sampling = sampling
+        self.interval = interval
+        self.rows: List[Dict[str, Any]] = []
+        # laufende Stufen (Einfügereihenfolge)
+        self._stages: Dict[str, _Stage] = {}
+        self._local = threading.local()  # ``busy``: dieser Thread wird schon gemessen
+        self._lock = threading.Lock()
+        self._seen: Counter[str] = Counter()
+        self._cprofile_owner: Optional[str] = None  # ab 3.12: Stufe mit dem cProfile
+        self._warned = False
+
+    def _label(self, name: str) -> str:
+        self._seen[name] += 1
+        n = self._seen[name]
+        return name if n == 1 else f"{name}_{n}"
+
+    def _start_cprofile(self, name: str) -> Optional[cProfile.Profile]:
+        """Startet cProfile im aktuellen Thread, falls möglich."""
+        import cProfile
+
+        with self._lock:
+            if _SHARED_CPROFILE and self._cprofile_owner is not None:
+                prof = None
+            else:
+                prof = cProfile.Profile()
+                try:
+                    prof.enable()
+                except ValueError:  # anderes Profiling-Werkzeug aktiv
+                    prof = None
+                else:
+                    if _SHARED_CPROFILE:
+                        self._cprofile_owner = name
+            warn, self._warned = prof is None and not self._warned, self._warned or prof is None
+        if warn:
+            logger.warning(
+                "Profiling: Stufe %r ohne cProfile (ab Python 3.12 nur ein Profiler je "
+                "Prozess, er läuft schon für %r) – gemessen werden Zeit, Speicher und "
+                "Stichproben ihrer Threads",
+                name,
+                self._cprofile_owner,
+            )
+        return prof
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Profiliert den Block als Stufe ``name``.
+
+        Stufen in verschiedenen Threads dürfen gleichzeitig laufen (`run`:
+        Klassifikation und QA); ihre Speicherzahlen überschneiden sich dann.
+        Innerhalb eines Threads zählen verschachtelte Stufen zur äußeren, eine
+        gleichnamige Stufe in einem anderen Thread wird als deren Worker
+        eingerechnet.
+
+        Bis Python 3.11 bekommt jeder Thread ein eigenes cProfile, die Stufen
+        bleiben getrennt. Ab 3.12 gibt es nur ein cProfile je Prozess: Es gehört
+        der zuerst begonnenen Stufe und enthält auch die Arbeit gleichzeitig
+        laufender Stufen; diese werden stattdessen per Stichprobe (nur ihre
+        Threads) profiliert.
+        """
+        if getattr(self._local, "busy", False):
+            yield
+            return
+        with self._lock:
+            join = name in self._stages
+            if not join:
+                state = self._stages[name] = _Stage()
+                label = self._label(name)
+        if join:
+            with self.worker(name):
+                yield
+            return
+
+        self._local.busy = True
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot().filter_traces(_TRACEMALLOC_FILTERS)
+        mem_before = tracemalloc.get_traced_memory()[0]
+        wall, cpu = time.perf_counter(), time.process_time()
+        prof = self._start_cprofile(name)
+        sampler = None
+        if self.sampling or prof is None:
+            sampler = _Sampler(self.interval, state.threads)
+            sampler.start()
+        try:
+            yield
+        finally:
+            if prof is not None:
+                prof.disable()
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            if sampler is not None:
+                sampler.stop()
+            mem_after, mem_peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot().filter_traces(_TRACEMALLOC_FILTERS)
+            with self._lock:
+                self._stages.pop(name)
+                if self._cprofile_owner == name:
+                    self._cprofile_owner = None
+            self._local.busy = False
+            self._write_stage(
+                label, prof, state, before, after, sampler,
+                wall=wall, cpu=cpu, mem_net=mem_after - mem_before, mem_peak=mem_peak - mem_before,
+            )
+
+    @contextmanager
+    def worker(self, name: Optional[str] = None) -> Iterator[None]:
+        """Profiliert einen Worker-Thread und rechnet ihn der Stufe ``name`` zu.
+
+        Ohne ``name`` zählt er zur zuletzt begonnenen laufenden Stufe. Läuft die
+        Stufe nicht oder wird der Thread schon gemessen, ist das ein No-op. Ab
+        Python 3.12 startet ein Worker kein eigenes cProfile (siehe `stage`).
+        """
+        if getattr(self._local, "busy", False):
+            yield
+            return
+        with self._lock:
+            if name is None:
+                target = next(reversed(self._stages), None)
+            else:
+                target = name if name in self._stages else None
+            state = self._stages[target] if target is not None else None
+            if state is not None:
+                state.threads.append(threading.get_ident())
+                state.n_workers += 1
+        if state is None:
+            yield
+            return
+        prof = None
+        if not _SHARED_CPROFILE:
+            import cProfile
+
+            prof = cProfile.Profile()
+            prof.enable()
+        self._local.busy = True
+        try:
+            yield
+        finally:
+            self._local.busy = False
+            if prof is not None:
+                prof.disable()
+                with self._lock:
+                    state.workers.append(prof)
+
+    def _write_stage(
+        self,
+        label: str,
+        prof: Optional[cProfile.Profile],
+        state: _Stage,
+        before: tracemalloc.Snapshot,
+        after: tracemalloc.Snapshot,
+        sampler: Optional[_Sampler],
+        **numbers: float,
+    ) -> None:
+        import pstats
+
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        stats = None
+        top_func = sampler.top_function() if sampler is not None else ""
+        if prof is not None:
+            stats = pstats.Stats(prof)
+            for w in state.workers:
+                stats.add(w)
+            stats.dump_stats(self.out_dir / f"{label}.pstats")
+            top = max(stats.stats.items(), key=lambda kv: kv[1][2], default=None)  # tottime
+            if top is not None:
+                (filename, line, func), _ = top
+                top_func = f"{os.path.basename(filename)}:{line}({func})"
+
+        with (self.out_dir / f"{label}_alloc.txt").open("w", encoding="utf-8") as f:
+            f.write(f"# {label}: Top {self.top_n} Allokationen (Zuwachs während der Stufe)\n")
+            for diff in after.compare_to(before, "lineno")[: self.top_n]:
+                f.write(f"{diff}\n")
+            if stats is not None:
+                f.write(f"\n# {label}: Top {self.top_n} Funktionen nach Eigenzeit\n")
+                stats.stream = f
+                stats.sort_stats("tottime").print_stats(self.top_n)
+        if sampler is not None:
+            sampler.write(self.out_dir / f"{label}.folded")
+
+        self.rows.append(
+            {
+                "stage": label,
+                "wall_s": round(numbers["wall"], 3),
+                "cpu_s": round(numbers["cpu"], 3),
+                "calls": stats.total_calls if stats is not None else None,
+                "worker_threads": state.n_workers,
+                "alloc_net_mib": round(numbers["mem_net"] / 2**20, 2),
+                "alloc_peak_mib": round(max(0, numbers["mem_peak"]) / 2**20, 2),
+                "samples": sum(sampler.stacks.values()) if sampler is not None else None,
+                "top_function": top_func,
+            }
+        )
+
+    def write_summary(self) -> Path:
+        """Schreibt ``summary.json`` und eine Tabelle ``summary.txt``."""
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        (self.out_dir / "summary.json").write_text(
+            json.dumps(self.rows, indent=2, ensure_ascii=False), encoding="utf-8"
+        )
+        cols = ["stage", "wall_s", "cpu_s", "calls", "alloc_net_mib", "alloc_peak_mib", "top_function"]
+        table = [cols] + [[str(r[c]) for c in cols] for r in self.rows]
+        widths = [max(len(row[i]) for row in table) for i in range(len(cols))]
+        lines = ["  ".join(v.ljust(w) for v, w in zip(row, widths)).rstrip() for row in table]
+        lines.insert(1, "  ".join("-" * w for w in widths))
+        out = self.out_dir / "summary.txt"
+        out.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        return out
+
+
+_profiler: Optional[Profiler] = None
+
+
+def active() -> Optional[Profiler]:
+    """Der aktuell messende `Profiler` oder ``None``."""
+    return _profiler
+
+
+@contextmanager
+def profile_run(
+    out_dir: str | os.PathLike, top_n: int = 25, sampling: bool = False
+) -> Iterator[Profiler]:
+    """Schaltet das Profiling für alle Stufen innerhalb des Blocks ein."""
+    global _profiler
+    if _profiler is not None:
+        raise RuntimeError("Es läuft bereits ein Profiling")
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    prof = _profiler = Profiler(out_dir, top_n=top_n, sampling=sampling)
+    try:
+        yield prof
+    finally:
+        _profiler = None
+        if started:
+            tracemalloc.stop()
+        out = prof.write_summary()
+        logger.info("Profil gespeichert: %s", out)
+
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def profiled(name: Optional[str] = None) -> Callable[[F], F]:
+    """Dekorator: misst jeden Aufruf als Stufe (Name = Funktionsname)."""
+
+    def deco(fn: F) -> F:
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            prof = _profiler
+            if prof is None:
+                return fn(*args, **kwargs)
+            with prof.stage(label):
+                return fn(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return deco
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Block als eigene Stufe messen; ohne aktiven Lauf ein No-op."""
+    prof = _profiler
+    if prof is None:
+        yield
+        return
+    with prof.stage(name):
+        yield
+
+
+@contextmanager
+def worker(name: Optional[str] = None) -> Iterator[None]:
+    """Für Worker-Threads einer Stufe; ohne aktiven Lauf ein No-op."""
+    prof = _profiler
+    if prof is None:
+        yield
+        return
+    with prof.worker(name):
+        yield
+
+
+def profile_dir_for(export_path: str | os.PathLike) -> Path:
+    """Ablageort neben dem Export: ``karten.xlsx`` → ``karten_profil/``."""
+    p = Path(export_path)
+    return p.with_name(f"{p.stem}_profil")
+
+
+def main(argv: list[str] | None = None) -> int:
+    from .config import DEFAULT_CLASSIFY_MODEL, DEFAULT_LANGUAGE, DEFAULT_QA_MODEL, load_api_key
+    from .openai_client import OpenAISettings
+    from .pipeline import LernkartenPipeline
+    from .segment_filters import is_outline_segment, looks_like_outline_list
+
+    ap = argparse.ArgumentParser(description="Pipeline-Lauf mit Profiling ohne GUI")
+    ap.add_argument("pdf")
+    ap.add_argument("--out", help="Excel-Export (Standard: <pdf>.xlsx)")
+    ap.add_argument("--profile-dir", help="Standard: <export>_profil neben dem Export")
+    ap.add_argument("--pages", help='Seitenauswahl, z. B. "120-180"')
+    ap.add_argument("--questions", type=int, default=8, help="max. Karten je Segment")
+    ap.add_argument("--language", default=DEFAULT_LANGUAGE)
+    ap.add_argument("--classify-model", default=DEFAULT_CLASSIFY_MODEL)
+    ap.add_argument("--qa-model", default=DEFAULT_QA_MODEL)
+    ap.add_argument("--base-url", help="anderer API-Endpunkt, z. B. benchmarks.mock_openai")
+    ap.add_argument("--top", type=int, default=25, help="Einträge je Allokations-/Funktionsliste")
+    ap.add_argument("--sampling", action="store_true", help="zusätzlich Stichproben-Profil")
+    args = ap.parse_args(argv)
+
+    out = args.out or str(Path(args.pdf).with_suffix(".xlsx"))
+    profile_dir = args.profile_dir or profile_dir_for(out)
+    settings = OpenAISettings(
+        api_key=load_api_key()[0] or ("mock" if args.base_url else ""),
+        classify_model=args.classify_model,
+        qa_model=args.qa_model,
+        base_url=args.base_url,
+    )
+    pipe = LernkartenPipeline(settings)
+    with profile_run(profile_dir, top_n=args.top, sampling=args.sampling) as prof:
+        segments = pipe.load_and_segment(args.pdf, pages=args.pages)
+        labeled = pipe.classify(segments)
+        for s in labeled:
+            if is_outline_segment(s.text.strip()) or looks_like_outline_list(s.text, getattr(s, "label", "")):
+                s.keep = False
+        rows = pipe.generate_cards([s for s in labeled if s.keep], args.questions, args.language)
+        pipe.export_excel(rows, out)
+    print((Path(profile_dir) / "summary.txt").read_text(encoding="utf-8"), end="")
+    print(f"Export: {out}\nProfil: {prof.out_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+"""Gemeinsames, faires Rate-Limit für API-Anfragen mehrerer Dokumente.
+
+`FairRateLimiter` begrenzt gleichzeitig laufende Anfragen sowie Anfragen und
+Tokens pro Minute. Wartende Anfragen werden reihum nach ``owner`` (z. B.
+Dokumentname) bedient: Ein großes Skript mit hundert wartenden Segmenten
+bekommt nicht mehr Slots als ein kleines mit einem, solange beide warten.
+
+Meldet die API trotzdem 429, hält `pause` alle Vergaben für die
+``Retry-After``-Zeit an, statt dass jeder Thread einzeln weiterfeuert.
+
+Wartende Anfragen lassen sich über ein `app.cancel.CancelToken` abbrechen:
+`acquire` wacht beim Abbruch sofort auf, nimmt sein Ticket aus der
+Warteschlange und löst `app.cancel.Cancelled` aus.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+import weakref
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, Optional
+
+from . import metrics
+from .cancel import Cancelled
+
+
+class _Bucket:
+    """Token-Bucket mit ``per_minute`` Einheiten Kapazität und stetiger Auffüllung."""
+
+    def __init__(self, per_minute: float, clock: Callable[[], float]):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self._clock = clock
+        self._last = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self.level = min(self.capacity, self.level + (now - self._last) * self.rate)
+        self._last = now
+
+    def wait_time(self, amount: float) -> float:
+        """Sekunden, bis ``amount`` verfügbar ist (0 = sofort)."""
+        if self.capacity <= 0:
+            return 0.0
+        self._refill()
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount: float) -> None:
+        if self.capacity > 0:
+            self.level -= min(amount, self.capacity)
+
+
+class FairRateLimiter:
+    """Vergibt Anfrage-Slots reihum nach ``owner`` unter globalen Limits.
+
+    Args:
+        max_concurrent: gleichzeitig laufende Anfragen (``max_parallel_requests``).
+        requests_per_minute: 0 = unbegrenzt.
+        tokens_per_minute: geschätzte Eingabe-Tokens je Minute, 0 = unbegrenzt.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 3,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_concurrent = max(1, int(max_concurrent))
+        self._clock = clock
+        self._requests = _Bucket(requests_per_minute, clock)
+        self._tokens = _Bucket(tokens_per_minute, clock)
+        self._cond = threading.Condition()
+        self._waiting: Dict[str, Deque[object]] = {}
+        self._rotation: Deque[str] = deque()
+        self._active = 0
+        self._paused_until = 0.0
+        self._hooked: "weakref.WeakSet[Any]" = weakref.WeakSet()  # Tokens mit Weck-Callback
+
+    @classmethod
+    def from_config(cls, **overrides) -> "FairRateLimiter":
+        """Limits aus ``[models]`` in ``config.toml``; Schlüsselwörter überschreiben."""
+        from .config import load_config
+
+        models = load_config().get("models", {})
+        kwargs = {
+            "max_concurrent": models.get("max_parallel_requests", 3),
+            "requests_per_minute": models.get("requests_per_minute", 0),
+            "tokens_per_minute": models.get("tokens_per_minute", 0),
+        }
+        kwargs.update({k: v for k, v in overrides.items() if v is not None})
+        return cls(**kwargs)
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    def _wait_time(self, owner: str, ticket: object, tokens: float) -> float | None:
+        """``None`` = auf Benachrichtigung warten, sonst Sekunden bis zur Vergabe."""
+        if self._rotation[0] != owner or self._waiting[owner][0] is not ticket:
+            return None
+        if self._active >= self.max_concurrent:
+            return None
+        return max(
+            self._paused_until - self._clock(),
+            self._requests.wait_time(1),
+            self._tokens.wait_time(tokens),
+            0.0,
+        )
+
+    def _wake_on_cancel(self, cancel: Any) -> None:
+        """Ein Callback je Token weckt beim Abbruch alle Wartenden."""
+        with self._cond:
+            if cancel in self._hooked:
+                return
+            self._hooked.add(cancel)
+
+        def wake() -> None:
+            with self._cond:
+                self._cond.notify_all()
+
+        cancel.add_callback(wake)
+
+    def _dequeue(self, owner: str, ticket: object) -> None:
+        queue = self._waiting[owner]
+        was_head = queue[0] is ticket
+        queue.remove(ticket)
+        if was_head and self._rotation[0] == owner:
+            self._rotation.popleft()
+            if queue:
+                self._rotation.append(owner)  # hinten anstellen: nächster Owner ist dran
+        if not queue:
+            del self._waiting[owner]
+            if owner in self._rotation:
+                self._rotation.remove(owner)
+
+    def acquire(
+        self, owner: str = "default", tokens: float = 0, cancel: Optional[Any] = None
+    ) -> float:
+        """Blockiert bis zur Vergabe eines Slots und liefert die Wartezeit in Sekunden.
+
+        Wird ``cancel`` währenddessen abgebrochen, verlässt die Anfrage die
+        Warteschlange und `Cancelled` wird ausgelöst.
+        """
+        if cancel is not None:
+            cancel.check()
+            self._wake_on_cancel(cancel)
+        ticket = object()
+        started = self._clock()
+        with self._cond:
+            queue = self._waiting.get(owner)
+            if queue is None:
+                queue = self._waiting[owner] = deque()
+                self._rotation.append(owner)
+            queue.append(ticket)
+            while True:
+                if cancel is not None and cancel.cancelled:
+                    self._dequeue(owner, ticket)
+                    self._cond.notify_all()  # ggf. ist jetzt ein anderer Owner dran
+                    raise Cancelled()
+                wait = self._wait_time(owner, ticket, tokens)
+                if wait == 0:
+                    break
+                self._cond.wait(timeout=wait)
+            self._dequeue(owner, ticket)
+            self._active += 1
+            self._requests.take(1)
+            self._tokens.take(tokens)
+            self._cond.notify_all()
+        waited = self._clock() - started
+        metrics.observe("ratelimit_wait_seconds", waited)
+        return waited
+
+    def release(self) -> None:
+        with self._cond:
+            self._active -= 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(
+        self, owner: str = "default", tokens: float = 0, cancel: Optional[Any] = None
+    ) -> Iterator[None]:
+        self.acquire(owner, tokens, cancel)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def pause(self, seconds: float) -> None:
+        """Hält alle Vergaben für ``seconds`` an (z. B. nach 429 mit Retry-After)."""
+        with self._cond:
+            self._paused_until = max(self._paused_until, self._clock() + seconds)
+            self._cond.notify_all()
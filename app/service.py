@@ -0,0 +1,520 @@
+"""Lokaler Job-Dienst: HTTP-API vor einer persistenten SQLite-Warteschlange.
+
+Statt je Skript eine GUI kalt zu starten, läuft ``python -m app.service`` dauerhaft
+und nimmt PDFs per HTTP entgegen::
+
+    curl --data-binary @skript.pdf "http://127.0.0.1:8765/jobs?questions=6&format=jsonl"
+    → {"id": "3f2a…", "status": "queued", ...}
+    curl http://127.0.0.1:8765/jobs/3f2a…          # Status und Fortschritt
+    curl -O http://127.0.0.1:8765/jobs/3f2a…/export  # Ergebnis, sobald "done"
+    curl -X DELETE http://127.0.0.1:8765/jobs/3f2a…  # abbrechen
+
+Aufträge liegen in ``<data-dir>/jobs.sqlite``, Uploads und Exporte daneben. Nach
+einem Neustart werden unterbrochene Jobs (``running``) wieder eingereiht. Ein
+fester Pool von Worker-Threads arbeitet die Warteschlange ab; jeder Worker
+behält seine `LernkartenPipeline` (Tokenizer) über alle Jobs, und alle teilen
+einen `OpenAIClient` mit Verbindungspool, `FairRateLimiter` und optional dem
+`ResponseCache` (siehe `app.batch`).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, cast
+from urllib.parse import parse_qs, urlsplit
+
+from .cancel import CancelToken
+from .logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_DATA_DIR = Path(__file__).resolve().parent / ".service"
+EXPORT_FORMATS = ("xlsx", "csv", "jsonl")
+_TERMINAL = ("done", "error", "cancelled")
+
+
+class JobStore:
+    """Persistente Job-Warteschlange in SQLite (threadsicher, WAL-Modus).
+
+    Status: ``queued`` → ``running`` → ``done`` | ``error`` | ``cancelled``.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY, name TEXT, status TEXT NOT NULL, params TEXT NOT NULL,"
+            " pdf_path TEXT NOT NULL, out_path TEXT, progress TEXT, result TEXT, error TEXT,"
+            " created REAL NOT NULL, started REAL, finished REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created)")
+        self._db.commit()
+
+    def _execute(self, sql: str, args: tuple = ()) -> sqlite3.Cursor:
+        with self._lock:
+            cur = self._db.execute(sql, args)
+            self._db.commit()
+            return cur
+
+    @staticmethod
+    def _row(row: Optional[sqlite3.Row]) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        job = dict(row)
+        for key in ("params", "progress", "result"):
+            job[key] = json.loads(job[key]) if job[key] else None
+        return job
+
+    def submit(self, pdf_path: str, params: Dict[str, Any], name: str = "", job_id: str = "") -> str:
+        job_id = job_id or uuid.uuid4().hex[:12]
+        self._execute(
+            "INSERT INTO jobs (id, name, status, params, pdf_path, created) VALUES (?, ?, 'queued', ?, ?, ?)",
+            (job_id, name, json.dumps(params), pdf_path, time.time()),
+        )
+        return job_id
+
+    def claim(self) -> Optional[Dict[str, Any]]:
+        """Ältesten wartenden Job atomar auf ``running`` setzen und liefern.
+
+        ``BEGIN IMMEDIATE`` sperrt auch gegen andere Prozesse auf derselben
+        Datei (wie `app.workqueue.WorkQueue.claim`); ``UPDATE … RETURNING``
+        gäbe es erst ab SQLite 3.35.
+        """
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute(
+                    "SELECT * FROM jobs WHERE status = 'queued' ORDER BY created LIMIT 1"
+                ).fetchone()
+                if row is not None:
+                    started = time.time()
+                    self._db.execute(
+                        "UPDATE jobs SET status = 'running', started = ? WHERE id = ?",
+                        (started, row["id"]),
+                    )
+            except BaseException:
+                self._db.rollback()
+                raise
+            self._db.commit()
+        job = self._row(row)
+        if job is not None:
+            job.update(status="running", started=started)
+        return job
+
+    def requeue_running(self) -> int:
+        """Nach einem Neustart: unterbrochene Jobs wieder einreihen."""
+        return self._execute(
+            "UPDATE jobs SET status = 'queued', started = NULL, progress = NULL WHERE status = 'running'"
+        ).rowcount
+
+    def progress(self, job_id: str, **progress: Any) -> None:
+        self._execute("UPDATE jobs SET progress = ? WHERE id = ?", (json.dumps(progress), job_id))
+
+    def finish(
+        self,
+        job_id: str,
+        status: str,
+        *,
+        out_path: Optional[str] = None,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        self._execute(
+            "UPDATE jobs SET status = ?, out_path = ?, result = ?, error = ?, finished = ? WHERE id = ?",
+            (status, out_path, json.dumps(result) if result else None, error, time.time(), job_id),
+        )
+
+    def cancel(self, job_id: str) -> bool:
+        """Wartenden Job sofort abbrechen; ``False``, wenn er nicht mehr wartet."""
+        return bool(
+            self._execute(
+                "UPDATE jobs SET status = 'cancelled', finished = ? WHERE id = ? AND status = 'queued'",
+                (time.time(), job_id),
+            ).rowcount
+        )
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row(row)
+
+    def list(self, limit: int = 100) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT * FROM jobs ORDER BY created DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [job for job in map(self._row, rows) if job is not None]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class JobService:
+    """Worker-Pool über einem `JobStore` mit gemeinsamem, warmem API-Client."""
+
+    def __init__(self, data_dir: str | Path, client, workers: int = 2):
+        self.data_dir = Path(data_dir)
+        (self.data_dir / "uploads").mkdir(parents=True, exist_ok=True)
+        (self.data_dir / "exports").mkdir(parents=True, exist_ok=True)
+        self.store = JobStore(self.data_dir / "jobs.sqlite")
+        self.client = client
+        self.n_workers = max(1, workers)
+        self._wakeup = threading.Event()
+        self._shutdown = threading.Event()
+        self._stops: Dict[str, CancelToken] = {}
+        self._stops_lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> "JobService":
+        requeued = self.store.requeue_running()
+        if requeued:
+            logger.info("%d unterbrochene Jobs wieder eingereiht", requeued)
+        for i in range(self.n_workers):
+            t = threading.Thread(target=self._worker, name=f"service-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        return self
+
+    def stop(self, timeout: float = 30.0) -> None:
+        """Beendet die Worker; laufende Jobs werden abgebrochen und beim nächsten Start wiederholt."""
+        self._shutdown.set()
+        self._wakeup.set()
+        with self._stops_lock:
+            for token in self._stops.values():
+                token.cancel()
+        for t in self._threads:
+            t.join(timeout)
+        self.store.close()
+
+    def submit(self, data: bytes, params: Dict[str, Any], name: str = "") -> Dict[str, Any]:
+        job_id = uuid.uuid4().hex[:12]
+        pdf = self.data_dir / "uploads" / f"{job_id}.pdf"
+        pdf.write_bytes(data)
+        self.store.submit(str(pdf), params, name=name, job_id=job_id)
+        self._wakeup.set()
+        job = self.store.get(job_id)
+        assert job is not None
+        return job
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        if not self.store.cancel(job_id):
+            with self._stops_lock:
+                token = self._stops.get(job_id)
+            if token is not None:
+                token.cancel()
+        return self.store.get(job_id)
+
+    def _worker(self) -> None:
+        from .pipeline import LernkartenPipeline
+
+        # Pipeline (Tokenizer) je Worker einmal anlegen und für alle Jobs behalten
+        pipe = LernkartenPipeline(self.client.settings, client=self.client)
+        while not self._shutdown.is_set():
+            job = self.store.claim()
+            if job is None:
+                self._wakeup.wait(1.0)
+                self._wakeup.clear()
+                continue
+            self._run_job(pipe, job)
+
+    def _run_job(self, pipe, job: Dict[str, Any]) -> None:
+        from .cli import EXIT_CANCELLED, _exit_code
+        from .export_sinks import open_sink
+
+        job_id, params = job["id"], job["params"]
+        token = CancelToken()
+        with self._stops_lock:
+            self._stops[job_id] = token
+        # DELETE schließt nur die laufenden Anfragen dieses Jobs, der Pool bleibt geteilt
+        pipe.client = self.client.for_owner(job_id).with_cancel(token)
+        last = [0.0]
+
+        def progress(stage: str, done: int, total: int) -> None:
+            now = time.monotonic()
+            if done == total or now - last[0] >= 0.5:  # DB nicht mit jedem Segment beschreiben
+                last[0] = now
+                self.store.progress(job_id, stage=stage, done=done, total=total)
+
+        fmt = params.get("format", "xlsx")
+        out = self.data_dir / "exports" / f"{job_id}.{fmt}"
+        started = time.perf_counter()
+        try:
+            sink = open_sink(str(out))
+            try:
+                result = pipe.run(
+                    job["pdf_path"],
+                    pages=params.get("pages"),
+                    max_questions_per_chunk=int(params.get("questions", 8)),
+                    language=params.get("language", "de"),
+                    progress_cb=progress,
+                    stop_cb=lambda: token.cancelled,
+                    sink=sink,
+                    max_workers=self.client.limiter.max_concurrent if self.client.limiter else 3,
+                )
+            finally:
+                sink.close()
+            usage = pipe.client.usage()
+            self.store.finish(
+                job_id,
+                "done",
+                out_path=str(sink.path),
+                result={
+                    "segments": len(result.labeled),
+                    "rows": len(result.rows),
+                    "cards": sum(len(r.fragen) for r in result.rows),
+                    "seconds": round(time.perf_counter() - started, 3),
+                    "usage": usage,
+                },
+            )
+        except Exception as exc:  # noqa: BLE001 - Fehler gehören zum Job, nicht zum Dienst
+            if self._shutdown.is_set():
+                return  # bleibt "running" → beim nächsten Start wieder eingereiht
+            status = "cancelled" if _exit_code(exc) == EXIT_CANCELLED else "error"
+            logger.warning("Job %s: %s", job_id, exc)
+            self.store.finish(job_id, status, error=f"{exc.__class__.__name__}: {exc}")
+        finally:
+            with self._stops_lock:
+                self._stops.pop(job_id, None)
+
+
+def _public(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Job für die API, ohne lokale Pfade."""
+    return {k: v for k, v in job.items() if k not in ("pdf_path", "out_path")}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    @property
+    def _server(self) -> "_Server":
+        return cast("_Server", self.server)
+
+    @property
+    def service(self) -> JobService:
+        return self._server.service
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 - API von http.server
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def _send(self, status: int, body: Any) -> None:
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _error(self, status: int, message: str) -> None:
+        self._send(status, {"error": message})
+
+    def _route(self) -> tuple:
+        url = urlsplit(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        return parts, query
+
+    def do_GET(self) -> None:  # noqa: N802 - API von http.server
+        parts, query = self._route()
+        if parts == ["health"]:
+            self._send(200, {"status": "ok", "workers": self.service.n_workers})
+        elif parts == ["jobs"]:
+            self._send(200, [_public(j) for j in self.service.store.list(int(query.get("limit", 100)))])
+        elif len(parts) in (2, 3) and parts[0] == "jobs":
+            job = self.service.store.get(parts[1])
+            if job is None:
+                self._error(404, "Job nicht gefunden")
+            elif len(parts) == 2:
+                self._send(200, _public(job))
+            elif parts[2] != "export":
+                self._error(404, "Unbekannter Pfad")
+            elif job["status"] != "done":
+                self._error(409, f"Job ist {job['status']}")
+            else:
+                self._send_file(Path(job["out_path"]), job.get("name") or job["id"])
+        else:
+            self._error(404, "Unbekannter Pfad")
+
+    def _send_file(self, path: Path, name: str) -> None:
+        if not path.is_file():
+            self._error(410, "Export nicht mehr vorhanden")
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(path.stat().st_size))
+        self.send_header(
+            "Content-Disposition", f'attachment; filename="{Path(name).stem}{path.suffix}"'
+        )
+        self.end_headers()
+        with open(path, "rb") as f:
+            while chunk := f.read(1 << 16):
+                self.wfile.write(chunk)
+
+    def do_POST(self) -> None:  # noqa: N802 - API von http.server
+        parts, query = self._route()
+        if parts != ["jobs"]:
+            self._error(404, "Unbekannter Pfad")
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        data = self.rfile.read(length)
+        if not data.startswith(b"%PDF"):
+            self._error(400, "Anfragekörper ist kein PDF")
+            return
+        fmt = query.get("format", "xlsx")
+        if fmt not in EXPORT_FORMATS:
+            self._error(400, f"format muss eines von {', '.join(EXPORT_FORMATS)} sein")
+            return
+        try:
+            params = {
+                "questions": int(query.get("questions", self._server.defaults["questions"])),
+                "language": query.get("language", self._server.defaults["language"]),
+                "pages": query.get("pages"),
+                "format": fmt,
+            }
+        except ValueError:
+            self._error(400, "questions muss eine Zahl sein")
+            return
+        job = self.service.submit(data, params, name=query.get("name", ""))
+        self._send(201, _public(job))
+
+    def do_DELETE(self) -> None:  # noqa: N802 - API von http.server
+        parts, _ = self._route()
+        if len(parts) != 2 or parts[0] != "jobs":
+            self._error(404, "Unbekannter Pfad")
+            return
+        job = self.service.cancel(parts[1])
+        if job is None:
+            self._error(404, "Job nicht gefunden")
+        else:
+            self._send(202, _public(job))
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, addr, service: JobService, defaults: Dict[str, Any]):
+        super().__init__(addr, _Handler)
+        self.service = service
+        self.defaults = defaults
+
+
+class ServiceServer:
+    """HTTP-Server plus Worker-Pool in Hintergrund-Threads (Port 0 = frei wählen)."""
+
+    def __init__(self, service: JobService, host: str = "127.0.0.1", port: int = 8765):
+        from .cli import _config_defaults
+
+        d = _config_defaults()
+        self.service = service
+        self._server = _Server(
+            (host, port), service, {"questions": d["questions"], "language": d["language"]}
+        )
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        if isinstance(host, bytes):
+            host = host.decode()
+        return f"http://{host}:{port}"
+
+    def start(self) -> "ServiceServer":
+        self.service.start()
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="service-http", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+        self.service.stop()
+
+    def __enter__(self) -> "ServiceServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def build_service(
+    data_dir: str | Path = DEFAULT_DATA_DIR,
+    *,
+    workers: int = 2,
+    base_url: Optional[str] = None,
+    cache: Optional[bool] = None,
+    max_concurrent: Optional[int] = None,
+) -> JobService:
+    """`JobService` mit Client, Limiter und Cache gemäß ``config.toml``."""
+    from .cache import ResponseCache
+    from .cli import _config_defaults
+    from .config import load_api_key
+    from .openai_client import OpenAIClient, OpenAISettings
+    from .ratelimit import FairRateLimiter
+
+    d = _config_defaults()
+    settings = OpenAISettings(
+        api_key=load_api_key()[0] or "none",
+        classify_model=d["classify_model"],
+        qa_model=d["qa_model"],
+        base_url=base_url,
+    )
+    client = OpenAIClient(
+        settings,
+        cache=ResponseCache.from_config(cache),
+        limiter=FairRateLimiter.from_config(max_concurrent=max_concurrent),
+    )
+    return JobService(data_dir, client, workers=workers)
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m app.service", description=__doc__.splitlines()[0])
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--data-dir", default=str(DEFAULT_DATA_DIR), help="Jobs, Uploads und Exporte")
+    ap.add_argument("--workers", type=int, default=2, help="gleichzeitig bearbeitete Jobs")
+    ap.add_argument("--max-concurrent", type=int, help="gleichzeitige API-Anfragen über alle Jobs")
+    ap.add_argument("--base-url", help="anderer API-Endpunkt (z. B. Proxy oder Mock)")
+    cache = ap.add_mutually_exclusive_group()
+    cache.add_argument("--cache", dest="cache", action="store_true", default=None)
+    cache.add_argument("--no-cache", dest="cache", action="store_false")
+    args = ap.parse_args(argv)
+
+    service = build_service(
+        args.data_dir,
+        workers=args.workers,
+        base_url=args.base_url,
+        cache=args.cache,
+        max_concurrent=args.max_concurrent,
+    )
+    server = ServiceServer(service, host=args.host, port=args.port)
+    server.service.start()
+    print(f"Lernkarten-Dienst unter {server.url} (Strg+C beendet)", flush=True)
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+        service.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,180 @@
+"""Spekulative Vorab-Klassifikation, während die Kostenschätzung gelesen wird.
+
+Nach „Segmentieren & Schätzen“ vergeht meist eine Weile bis zum Start; das
+Netz ist so lange ungenutzt, und die ersten Klassifikationsanfragen zahlen
+den TLS-Aufbau. `SpeculativeClassifier` nutzt diese Zeit:
+
+1. `OpenAIClient.warm` öffnet eine Verbindung im Pool.
+2. Die ersten ``segments`` Segmente werden im Hintergrund klassifiziert – über
+   denselben Client (und damit ggf. den `ResponseCache`), den der Lauf später
+   verwendet.
+3. Beim Start übergibt `take` die fertigen Ergebnisse an
+   ``LernkartenPipeline.run(preclassified=...)``.
+
+Die Ausgaben sind durch ``max_usd`` gedeckelt (gemessener Verbrauch laut
+``resp.usage``): Vor jeder einzelnen Anfrage – die Klassifikation fragt je
+Satz – wird geprüft, ob eine weitere im Schnitt noch unter die Grenze passt.
+Ein angebrochenes Segment wird verworfen. Eingeschaltet wird das mit
+``[speculative] enabled = true``.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Dict, List, Optional, Sequence
+
+from . import metrics
+from .cancel import Cancelled
+from .logging_utils import get_logger
+from .pipeline_models import Segment
+
+logger = get_logger(__name__)
+
+metrics.REGISTRY.describe(
+    "speculative_segments_total", "Vorab klassifizierte Segmente (used, discarded)"
+)
+
+
+class _BudgetReached(Cancelled):
+    """Die nächste Anfrage würde ``max_usd`` überschreiten."""
+
+
+class _BudgetClient:
+    """Reicht alles an den Client durch, prüft aber vor jeder Klassifikation das Budget."""
+
+    def __init__(self, client, check) -> None:
+        self._client = client
+        self._check = check
+
+    def classify_segment(self, text: str):
+        self._check()
+        return self._client.classify_segment(text)
+
+    def __getattr__(self, name: str):
+        return getattr(self._client, name)
+
+
+class SpeculativeClassifier:
+    """Klassifiziert die ersten Segmente vorab im Hintergrund.
+
+    Args:
+        client: `OpenAIClient`, den auch der spätere Lauf verwendet (geteilter
+            Pool und Cache); die Vorab-Anfragen laufen als Owner ``"speculative"``.
+        segments: Segmente aus der Segmentierung (Liste, wie sie an ``run`` geht).
+        max_segments: höchstens so viele Segmente vorab klassifizieren.
+        max_usd: Obergrenze der spekulativen Ausgaben.
+    """
+
+    def __init__(
+        self,
+        client,
+        segments: Sequence[Segment],
+        *,
+        max_segments: int = 20,
+        max_usd: float = 0.01,
+    ):
+        from .pipeline import LernkartenPipeline
+
+        self.client = client
+        self.settings = client.settings
+        self.segments = segments
+        self.max_segments = max(0, max_segments)
+        self.max_usd = max_usd
+        self._spec_client = client.for_owner("speculative")
+        self._pipeline = LernkartenPipeline(
+            self.settings, client=_BudgetClient(self._spec_client, self._check_budget)
+        )
+        self._results: Dict[int, List[Segment]] = {}
+        self._lock = threading.Lock()
+        self._halt = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_config(cls, client, segments: Sequence[Segment]) -> Optional["SpeculativeClassifier"]:
+        """Gestartete Vorab-Klassifikation gemäß ``[speculative]`` oder ``None``."""
+        from .config import load_config
+
+        section = load_config().get("speculative", {})
+        max_usd = float(section.get("max_usd", 0.01))
+        max_segments = int(section.get("segments", 20))
+        if not section.get("enabled", False) or max_usd <= 0 or max_segments <= 0:
+            return None
+        return cls(client, segments, max_segments=max_segments, max_usd=max_usd).start()
+
+    def start(self) -> "SpeculativeClassifier":
+        self._thread = threading.Thread(target=self._run, name="speculative", daemon=True)
+        self._thread.start()
+        return self
+
+    def spent_usd(self) -> float:
+        """Bisherige Ausgaben der Vorab-Anfragen (Cache-Treffer kosten nichts)."""
+        from .cost import usage_cost
+
+        return sum(
+            usage_cost(model, u["input"], u["output"], u["cached"])
+            for model, u in self._spec_client.usage().items()
+        )
+
+    def _check_budget(self) -> None:
+        """Vor jeder Anfrage: passt eine weitere im Schnitt noch unter ``max_usd``?"""
+        spent = self.spent_usd()
+        requests = sum(u["requests"] for u in self._spec_client.usage().values())
+        if spent >= self.max_usd or (requests and spent + spent / requests > self.max_usd):
+            raise _BudgetReached()
+
+    def _run(self) -> None:
+        self._spec_client.warm()
+        done = 0
+        for i, seg in enumerate(self.segments[: self.max_segments]):
+            if self._halt.is_set():
+                break
+            try:
+                parts = self._pipeline._classify_segment(seg)
+            except _BudgetReached:
+                logger.info("Vorab-Klassifikation gestoppt: Budget $%.4f erreicht", self.max_usd)
+                break
+            except Cancelled:
+                break
+            except Exception as e:  # noqa: BLE001 - der echte Lauf klassifiziert dann selbst
+                logger.warning("Vorab-Klassifikation abgebrochen: %s", e)
+                break
+            with self._lock:
+                self._results[i] = parts
+            done += 1
+        logger.info(
+            "Vorab klassifiziert: %d Segmente für $%.4f", done, self.spent_usd()
+        )
+
+    def stop(self) -> None:
+        """Beendet die Vorab-Klassifikation und verwirft ihre Ergebnisse.
+
+        Hat der Client ein `CancelToken`, wird auch die laufende Anfrage abgebrochen;
+        der Client ist danach nicht mehr verwendbar.
+        """
+        self._halt.set()
+        if self.client.cancel is not None:
+            self.client.cancel.cancel()
+        self._discard()
+
+    def _discard(self) -> None:
+        with self._lock:
+            discarded, self._results = len(self._results), {}
+        if discarded:
+            metrics.inc("speculative_segments_total", discarded, status="discarded")
+
+    def take(self, segments: Sequence[Segment], settings=None) -> Dict[int, List[Segment]]:
+        """Beendet die Vorab-Klassifikation und liefert ihre Ergebnisse für ``run``.
+
+        Das laufende Segment wird noch fertig klassifiziert. Passen ``segments``
+        oder ``settings`` (Modelle, API-Key) nicht mehr, wird nichts übernommen.
+        """
+        self._halt.set()
+        if self._thread is not None:
+            self._thread.join()
+        if segments is not self.segments or (settings is not None and settings != self.settings):
+            self._discard()  # Thread ist beendet, der Client bleibt verwendbar
+            return {}
+        with self._lock:
+            results, self._results = self._results, {}
+        metrics.inc("speculative_segments_total", len(results), status="used")
+        return results
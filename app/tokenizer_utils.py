@@ -6,6 +6,7 @@ Textabschnitten abzuschätzen.
 """
 
 from __future__ import annotations
+import threading
 from typing import Iterable, Optional
 
 from .logging_utils import get_logger
@@ -26,12 +27,30 @@ class Tokenizer:
     Kapselt optional tiktoken-Nutzung, faellt auf Heuristik zurueck.
     """
     def __init__(self, encoding_name: str = "o200k_base"):
+        # tiktoken wird erst beim ersten Zählen geladen (Import + Encoding-Datei
+        # kosten spürbar Startzeit).
+        self.encoding_name = encoding_name
         self._enc = None
+        self._loaded = False
+        # QA-Worker zählen parallel; ohne Lock sähen sie ``_loaded`` schon
+        # gesetzt, während ``_enc`` noch ``None`` ist, und zählten heuristisch.
+        self._lock = threading.Lock()
+
+    def _encoding(self):
+        if self._loaded:
+            return self._enc
+        with self._lock:
+            if not self._loaded:
+                self._load()
+                self._loaded = True
+        return self._enc
+
+    def _load(self) -> None:
         try:
             import tiktoken
             # o200k_base abwaerts-kompatibel; faellt auf cl100k_base zurueck
             try:
-                self._enc = tiktoken.get_encoding(encoding_name)
+                self._enc = tiktoken.get_encoding(self.encoding_name)
             except Exception:
                 try:
                     self._enc = tiktoken.get_encoding("cl100k_base")
@@ -44,10 +63,11 @@ class Tokenizer:
             logger.warning("tiktoken konnte keine Encoding laden; heuristische Tokenisierung wird verwendet")
 
     def count(self, text: str) -> int:
-        if self._enc is None:
+        enc = self._encoding()
+        if enc is None:
             return approximate_token_count(text)
         try:
-            return len(self._enc.encode(text or ""))
+            return len(enc.encode(text or ""))
         except ValueError:
             logger.warning("Fehler bei der Tokenisierung, falle auf Heuristik zurueck")
             return approximate_token_count(text)
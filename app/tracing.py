@@ -0,0 +1,189 @@
+"""Leichtgewichtige Zeitmessung je Pipeline-Stufe als Chrome-/Perfetto-Trace.
+
+`span` misst einen Abschnitt als *complete event* (``"ph": "X"``) mit Thread-ID,
+sodass parallele QA-Anfragen in ``chrome://tracing`` bzw. ui.perfetto.dev als
+eigene Spuren erscheinen. `trace_run` schaltet die Aufzeichnung für einen Lauf
+ein und schreibt beim Verlassen eine JSON-Datei.
+
+Ist keine Aufzeichnung aktiv, liefert `span` ein gemeinsames No-op-Objekt; die
+Instrumentierung kostet dann nur einen Funktionsaufruf und eine ``None``-Prüfung.
+"""
+
+from __future__ import annotations
+
+import datetime
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar
+
+from .logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_TRACE_DIR = Path(__file__).resolve().parent / ".traces"
+
+
+class Tracer:
+    """Sammelt Trace-Events eines Laufs im Speicher."""
+
+    def __init__(self) -> None:
+        self.events: List[Dict[str, Any]] = []
+        self._t0 = time.perf_counter()
+        self._pid = os.getpid()
+        self._threads: Dict[int, str] = {}
+
+    def now_us(self, t: Optional[float] = None) -> float:
+        """Zeitpunkt (``perf_counter``-Sekunden) in µs seit Beginn des Laufs."""
+        return ((time.perf_counter() if t is None else t) - self._t0) * 1e6
+
+    def complete(
+        self, name: str, start: float, end: float, cat: str = "stage", **args: Any
+    ) -> None:
+        """Trägt einen Abschnitt mit expliziten ``perf_counter``-Zeiten ein."""
+        thread = threading.current_thread()
+        self._threads.setdefault(thread.ident or 0, thread.name)
+        # list.append ist unter dem GIL atomar; Worker-Threads brauchen kein Lock.
+        self.events.append(
+            {
+                "name": name,
+                "cat": cat,
+                "ph": "X",
+                "ts": round(self.now_us(start), 1),
+                "dur": round((end - start) * 1e6, 1),
+                "pid": self._pid,
+                "tid": thread.ident or 0,
+                "args": args,
+            }
+        )
+
+    def to_json(self) -> Dict[str, Any]:
+        meta = [
+            {"name": "thread_name", "ph": "M", "pid": self._pid, "tid": tid, "args": {"name": name}}
+            for tid, name in self._threads.items()
+        ]
+        return {"traceEvents": meta + self.events, "displayTimeUnit": "ms"}
+
+    def save(self, path: str | os.PathLike) -> Path:
+        out = Path(path)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        with out.open("w", encoding="utf-8") as f:
+            json.dump(self.to_json(), f, ensure_ascii=False)
+        return out
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "cat", "args", "start")
+
+    def __init__(self, tracer: Tracer, name: str, cat: str, args: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self) -> "_Span":
+        self.start = time.perf_counter()
+        return self
+
+    def set(self, **args: Any) -> None:
+        """Ergänzt Argumente, die erst innerhalb des Abschnitts bekannt werden."""
+        self.args.update(args)
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.tracer.complete(self.name, self.start, time.perf_counter(), self.cat, **self.args)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def set(self, **args: Any) -> None:
+        return None
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+
+_NULL_SPAN = _NullSpan()
+_tracer: Optional[Tracer] = None
+
+
+def active() -> Optional[Tracer]:
+    """Der aktuell aufzeichnende `Tracer` oder ``None``."""
+    return _tracer
+
+
+def span(name: str, cat: str = "stage", **args: Any):
+    """Kontextmanager für einen gemessenen Abschnitt (No-op ohne aktiven Trace)."""
+    tracer = _tracer
+    if tracer is None:
+        return _NULL_SPAN
+    return _Span(tracer, name, cat, args)
+
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def traced(name: Optional[str] = None, cat: str = "stage") -> Callable[[F], F]:
+    """Dekorator: misst jeden Aufruf der Funktion als Span (Name = Funktionsname)."""
+
+    def deco(fn: F) -> F:
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            tracer = _tracer
+            if tracer is None:
+                return fn(*args, **kwargs)
+            with _Span(tracer, label, cat, {}):
+                return fn(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return deco
+
+
+def complete(name: str, start: float, end: float, cat: str = "stage", **args: Any) -> None:
+    """Trägt einen bereits gemessenen Abschnitt ein, z. B. Wartezeit in der Queue."""
+    tracer = _tracer
+    if tracer is not None:
+        tracer.complete(name, start, end, cat, **args)
+
+
+def _enabled_in_config() -> bool:
+    from .config import load_config
+
+    return bool(load_config().get("tracing", {}).get("enabled", False))
+
+
+@contextmanager
+def trace_run(label: str, path: str | os.PathLike | None = None) -> Iterator[Optional[Tracer]]:
+    """Zeichnet alle Spans innerhalb des Blocks auf und speichert sie als Trace.
+
+    Ohne ``path`` wird nur aufgezeichnet, wenn ``[tracing] enabled`` in
+    ``config.toml`` gesetzt ist; die Datei landet dann in ``app/.traces``.
+    Läuft bereits eine Aufzeichnung, wird sie mitbenutzt.
+    """
+    global _tracer
+    if _tracer is not None or (path is None and not _enabled_in_config()):
+        yield _tracer
+        return
+    if path is None:
+        stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = DEFAULT_TRACE_DIR / f"trace_{label}_{stamp}.json"
+    tracer = _tracer = Tracer()
+    try:
+        with span(label, cat="run"):
+            yield tracer
+    finally:
+        _tracer = None
+        out = tracer.save(path)
+        logger.info("Trace gespeichert: %s (%d Events)", out, len(tracer.events))
@@ -0,0 +1,260 @@
+"""HTTP-Transport und prozessweit geteilte OpenAI-Clients.
+
+`shared_openai` liefert je ``(api_key, base_url)`` einen einzigen
+``openai.OpenAI``-Client mit einem httpx-Pool. Alle Aufrufwege –
+`OpenAIClient`, `app.models`/`app.labeling`, Vorab-Klassifikation, Stapel
+und Dienst – nutzen damit dieselben warmen Verbindungen:
+
+* Verbindungslimits richten sich nach der Parallelität (``[models]
+  max_parallel_requests`` bzw. ``max_concurrent`` des Rate-Limiters);
+  Keep-Alive-Verbindungen bleiben ``keepalive_expiry_sec`` offen.
+* ``http2 = true`` schaltet HTTP/2 ein, sofern das Paket ``h2`` installiert ist.
+* Timeouts kommen wie in `safe_request` aus ``request_timeout_sec``; SDK und
+  Transport wiederholen nichts selbst, Wiederholungen macht allein `safe_request`.
+
+Abbruch: Ein blockierender Lesevorgang lässt sich in httpx nicht von außen
+beenden, auch ``Client.close()`` weckt ihn nicht. Das Netzwerk-Backend merkt
+sich deshalb, welcher Stream gerade für welches `CancelToken` liest oder
+schreibt (`abort_scope`). Beim Abbruch bekommen genau diese Sockets ein
+``shutdown(SHUT_RDWR)`` – laufende Anfragen des Tokens scheitern sofort, alle
+anderen Anfragen im selben Pool laufen weiter.
+
+Das gilt nur für HTTP/1.1, wo eine Verbindung genau eine Anfrage trägt. Unter
+HTTP/2 teilen sich Anfragen verschiedener Tokens eine Verbindung; ein
+``shutdown`` träfe alle. Mit ``http2 = true`` entfällt der Socket-Abbruch
+deshalb: Ein abgebrochener Job wartet die laufende Antwort (höchstens
+``request_timeout_sec``) ab, `safe_request` stellt danach keine Anfrage mehr.
+"""
+
+from __future__ import annotations
+
+import socket
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+_local = threading.local()
+_streams: "weakref.WeakSet[_AbortableStream]" = weakref.WeakSet()
+_streams_lock = threading.Lock()
+_hooked: "weakref.WeakSet[Any]" = weakref.WeakSet()  # Tokens mit Abbruch-Callback
+
+_clients: Dict[Tuple[str, Optional[str]], Tuple[Any, int]] = {}
+_retired: List[Any] = []  # durch größere Pools ersetzte Clients, geschlossen in `clear`
+_clients_lock = threading.Lock()
+
+
+def _httpx():
+    try:
+        import httpx
+    except ImportError:  # manche openai-Builds liefern httpx als ``httpx2`` mit
+        import httpx2 as httpx
+    return httpx
+
+
+def _shutdown(sock: Optional[socket.socket]) -> None:
+    if sock is None:
+        return
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass  # bereits geschlossen
+
+
+class _AbortableStream:
+    """Reicht alles an den eigentlichen Stream durch und merkt sich das aktuelle Token."""
+
+    def __init__(self, inner: Any):
+        self._inner = inner
+        self.token: Any = None
+        with _streams_lock:
+            _streams.add(self)
+
+    def _claim(self) -> None:
+        token = getattr(_local, "token", None)
+        if token is None or self.token is token:
+            return
+        self.token = token
+        _local.streams.append(self)
+        if token.cancelled:
+            _shutdown(self.get_extra_info("socket"))
+
+    def read(self, max_bytes: int, timeout: float | None = None) -> bytes:
+        self._claim()
+        return self._inner.read(max_bytes, timeout)
+
+    def write(self, buffer: bytes, timeout: float | None = None) -> None:
+        self._claim()
+        self._inner.write(buffer, timeout)
+
+    def close(self) -> None:
+        self._inner.close()
+
+    def start_tls(self, *args: Any, **kwargs: Any) -> "_AbortableStream":
+        stream = _AbortableStream(self._inner.start_tls(*args, **kwargs))
+        stream._claim()
+        return stream
+
+    def get_extra_info(self, info: str) -> Any:
+        return self._inner.get_extra_info(info)
+
+
+class _AbortableBackend:
+    """Netzwerk-Backend (httpcore), dessen Streams `abort_scope` zuordnen kann."""
+
+    def __init__(self, inner: Any):
+        self._inner = inner
+
+    def connect_tcp(self, *args: Any, **kwargs: Any) -> _AbortableStream:
+        return _AbortableStream(self._inner.connect_tcp(*args, **kwargs))
+
+    def connect_unix_socket(self, *args: Any, **kwargs: Any) -> _AbortableStream:
+        return _AbortableStream(self._inner.connect_unix_socket(*args, **kwargs))
+
+    def sleep(self, seconds: float) -> None:
+        self._inner.sleep(seconds)
+
+
+def _abort(token: Any) -> None:
+    with _streams_lock:
+        streams = [s for s in _streams if s.token is token]
+    for stream in streams:
+        _shutdown(stream.get_extra_info("socket"))
+
+
+@contextmanager
+def abort_scope(token: Any) -> Iterator[None]:
+    """Anfragen dieses Threads innerhalb des Blocks bricht ``token`` sofort ab."""
+    if token is None:
+        yield
+        return
+    with _streams_lock:
+        hook = token not in _hooked
+        _hooked.add(token)
+    if hook:
+        token.add_callback(lambda: _abort(token))
+    outer = getattr(_local, "token", None), getattr(_local, "streams", None)
+    _local.token, _local.streams = token, []
+    try:
+        yield
+    finally:
+        for stream in _local.streams:
+            if stream.token is token:
+                stream.token = None  # Verbindung geht frei zurück in den Pool
+        _local.token, _local.streams = outer
+
+
+def _http_settings() -> Dict[str, Any]:
+    from .config import load_config
+
+    models = load_config().get("models", {})
+    return {
+        # QA-Worker plus der Klassifikations-Thread von `LernkartenPipeline.run`
+        "max_connections": int(models.get("max_parallel_requests", 3)) + 1,
+        "keepalive_expiry": float(models.get("keepalive_expiry_sec", 60)),
+        "http2": bool(models.get("http2", False)),
+    }
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def http_client(max_connections: Optional[int] = None) -> Any:
+    """httpx-Client mit abbrechbaren Verbindungen und Limits nach ``config.toml``."""
+    from .openai_client import _request_config
+
+    httpx = _httpx()
+    opts = _http_settings()
+    size = max(1, max_connections or opts["max_connections"])
+    http2 = opts["http2"]
+    if http2 and not _http2_available():
+        logger.warning("HTTP/2 angefordert, aber Paket 'h2' fehlt – verwende HTTP/1.1")
+        http2 = False
+    transport = httpx.HTTPTransport(
+        http2=http2,
+        retries=0,  # Wiederholungen macht safe_request
+        limits=httpx.Limits(
+            max_connections=size,
+            max_keepalive_connections=size,
+            keepalive_expiry=opts["keepalive_expiry"],
+        ),
+    )
+    # httpx bietet keinen öffentlichen Parameter für das Netzwerk-Backend
+    pool = getattr(transport, "_pool", None)
+    backend = getattr(pool, "_network_backend", None)
+    if http2:
+        pass  # HTTP/2 multiplext Tokens auf einer Verbindung, siehe Moduldoku
+    elif backend is None:
+        logger.warning(
+            "httpx-Netzwerk-Backend nicht gefunden – Abbruch wirkt erst nach dem Timeout"
+        )
+    else:
+        pool._network_backend = _AbortableBackend(backend)
+    timeout = _request_config()[0]
+    return httpx.Client(
+        transport=transport,
+        timeout=httpx.Timeout(timeout, connect=min(10.0, timeout)),
+    )
+
+
+def shared_openai(
+    api_key: str, base_url: Optional[str] = None, *, max_connections: Optional[int] = None
+) -> Any:
+    """Der gemeinsame ``openai.OpenAI``-Client für ``(api_key, base_url)``.
+
+    Verlangt ein Aufrufer mehr Verbindungen als der bestehende Pool hat (z. B.
+    Stapelbetrieb mit ``--max-concurrent``), wird der Eintrag durch einen
+    größeren ersetzt; laufende Anfragen auf dem alten Pool laufen zu Ende, der
+    alte Client wird in `clear` geschlossen.
+    """
+    try:
+        from openai import OpenAI
+    except ImportError as e:
+        raise RuntimeError(
+            "Das 'openai'-Paket ist nicht installiert. Bitte fuehre "
+            "'python install.py' aus (oder starte ueber 'run.bat')."
+        ) from e
+    from .openai_client import _request_config
+
+    size = max_connections or _http_settings()["max_connections"]
+    key = (api_key, base_url or None)
+    with _clients_lock:
+        entry = _clients.get(key)
+        if entry is None or entry[1] < size:
+            if entry is not None:
+                _retired.append(entry[0])
+            # SDK-Retries bleiben 0 (wir steuern sie selbst in safe_request)
+            client = OpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                max_retries=0,
+                timeout=_request_config()[0],
+                http_client=http_client(size),
+            )
+            entry = _clients[key] = (client, size)
+    return entry[0]
+
+
+def clear() -> None:
+    """Schließt alle geteilten und ersetzten Clients (z. B. nach einem Wechsel des API-Keys).
+
+    Nur aufrufen, wenn keine Anfragen mehr laufen.
+    """
+    with _clients_lock:
+        clients = [client for client, _ in _clients.values()] + _retired
+        _clients.clear()
+        _retired.clear()
+    for client in clients:
+        try:
+            client.close()
+        except Exception as e:  # noqa: BLE001 - Aufräumen darf nicht scheitern
+            logger.debug("Client ließ sich nicht schließen: %s", e)
@@ -0,0 +1,162 @@
+"""Threadsicherer, gedrosselter Kanal für GUI-Aktualisierungen.
+
+Die Pipeline ruft ``progress_cb`` und ``card_cb`` aus Worker-Threads für jedes
+Segment und jede Karte auf. Direkt auf Tk-Widgets angewendet, flutet das die
+Ereignisschleife (und Tk ist nicht threadsicher). `UiChannel` sammelt die
+Meldungen stattdessen unter einem Lock und wendet sie im Tk-Thread per
+``root.after`` mit fester Bildrate an:
+
+* Fortschritt und Status werden zusammengefasst – pro Bild zählt nur der
+  letzte Stand je Stufe.
+* Karten und Logzeilen kommen gebündelt in einem Aufruf an.
+* Von den Karten werden höchstens ``max_cards`` behalten (Ringpuffer
+  `recent`); bei 50 000 Karten bleibt der Speicher der Vorschau konstant.
+
+Beispiel::
+
+    channel = UiChannel(root, on_progress=..., on_cards=..., on_log=...).start()
+    pipe.run(..., progress_cb=channel.post_progress, card_cb=channel.post_card)
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from .logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class PreviewCard:
+    original: str
+    frage: str
+    antwort: str
+
+
+class UiChannel:
+    """Sammelt Meldungen aus beliebigen Threads und liefert sie im Tk-Thread aus.
+
+    Args:
+        root: Tk-Wurzel (bzw. jedes Objekt mit ``after(ms, fn)``).
+        fps: Aktualisierungen pro Sekunde.
+        max_cards: Größe des Karten-Ringpuffers.
+        on_progress: ``(stufe, fertig, gesamt)`` – letzter Stand je Stufe.
+        on_status: ``(text)`` – letzter Statustext.
+        on_cards: ``(karten)`` – neue Karten seit dem letzten Bild (höchstens ``max_cards``).
+        on_log: ``(zeilen)`` – neue Logzeilen seit dem letzten Bild.
+    """
+
+    def __init__(
+        self,
+        root: Any,
+        *,
+        fps: float = 20.0,
+        max_cards: int = 200,
+        max_log_lines: int = 1000,
+        on_progress: Optional[Callable[[str, int, int], None]] = None,
+        on_status: Optional[Callable[[str], None]] = None,
+        on_cards: Optional[Callable[[List[PreviewCard]], None]] = None,
+        on_log: Optional[Callable[[List[str]], None]] = None,
+    ):
+        self.root = root
+        self.interval_ms = max(1, int(1000 / fps))
+        self.on_progress = on_progress
+        self.on_status = on_status
+        self.on_cards = on_cards
+        self.on_log = on_log
+        self.recent: Deque[PreviewCard] = deque(maxlen=max(1, max_cards))
+        self.cards_total = 0
+        self._lock = threading.Lock()
+        self._progress: Dict[str, Tuple[int, int]] = {}
+        self._status: Optional[str] = None
+        self._cards: Deque[PreviewCard] = deque(maxlen=max(1, max_cards))
+        self._log: Deque[str] = deque(maxlen=max(1, max_log_lines))
+        self._calls: List[Tuple[Callable[..., Any], tuple]] = []
+        self._running = False
+
+    # --- beliebige Threads ----------------------------------------------
+
+    def post_progress(self, stage: str, done: int, total: int) -> None:
+        with self._lock:
+            self._progress[stage] = (done, total)
+
+    def post_status(self, text: str) -> None:
+        with self._lock:
+            self._status = text
+
+    def post_card(self, original: str, frage: str, antwort: str) -> None:
+        with self._lock:
+            self._cards.append(PreviewCard(original, frage, antwort))
+            self.cards_total += 1
+
+    def post_log(self, line: str) -> None:
+        with self._lock:
+            self._log.append(line)
+
+    def call(self, fn: Callable[..., Any], *args: Any) -> None:
+        """``fn(*args)`` beim nächsten Bild im Tk-Thread ausführen (Reihenfolge bleibt)."""
+        with self._lock:
+            self._calls.append((fn, args))
+
+    # --- Tk-Thread ---------------------------------------------------------
+
+    def start(self) -> "UiChannel":
+        self._running = True
+        self.root.after(self.interval_ms, self._tick)
+        return self
+
+    def stop(self) -> None:
+        """Beendet die Abfrage; der nächste Tick wendet Gesammeltes noch an."""
+        self._running = False
+
+    def _tick(self) -> None:
+        try:
+            self.flush()
+        except Exception:  # noqa: BLE001 - ein Fehler im Handler darf die Schleife nicht beenden
+            logger.exception("Fehler beim Aktualisieren der Oberfläche")
+        if self._running:
+            try:
+                self.root.after(self.interval_ms, self._tick)
+            except Exception:  # noqa: BLE001 - TclError: Fenster bereits geschlossen
+                self._running = False
+
+    def flush(self) -> None:
+        """Alle gesammelten Meldungen jetzt anwenden (nur im Tk-Thread aufrufen)."""
+        with self._lock:
+            progress, self._progress = self._progress, {}
+            status, self._status = self._status, None
+            cards = list(self._cards)
+            self._cards.clear()
+            lines = list(self._log)
+            self._log.clear()
+            calls, self._calls = self._calls, []
+        self.recent.extend(cards)
+        if progress and self.on_progress:
+            for stage, (done, total) in progress.items():
+                self.on_progress(stage, done, total)
+        if status is not None and self.on_status:
+            self.on_status(status)
+        if cards and self.on_cards:
+            self.on_cards(cards)
+        if lines and self.on_log:
+            self.on_log(lines)
+        for fn, args in calls:
+            fn(*args)
+
+
+def append_capped(widget: Any, text: str, max_lines: int) -> None:
+    """Hängt ``text`` an ein Text-Widget an und kürzt es vorne auf ``max_lines`` Zeilen."""
+    state = str(widget.cget("state"))
+    if state == "disabled":
+        widget.configure(state="normal")
+    widget.insert("end", text)
+    lines = int(widget.index("end-1c").split(".")[0])
+    if lines > max_lines:
+        widget.delete("1.0", f"{lines - max_lines + 1}.0")
+    widget.see("end")
+    if state == "disabled":
+        widget.configure(state="disabled")
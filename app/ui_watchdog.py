@@ -0,0 +1,142 @@
+"""Watchdog für die Tk-Ereignisschleife: misst Verzögerung und findet Blockaden.
+
+Die Oberfläche „hängt“, sobald im Tk-Thread lange gerechnet wird (z. B.
+PDF-Extraktion ohne Hintergrundthread). `UiWatchdog` plant alle
+``interval_ms`` einen ``after``-Tick und misst, wie viel später er tatsächlich
+läuft (Metrik ``ui_loop_lag_seconds``). Ein Hilfsthread prüft parallel, ob der
+letzte Tick länger als ``threshold_ms`` zurückliegt, und hält dann den Stack
+des Tk-Threads fest (``sys._current_frames``). Sobald die Schleife wieder
+läuft, wird die Blockade mit Dauer und Stack geloggt und in `stalls`
+gesammelt (Metrik ``ui_stalls_total``).
+
+Eingeschaltet wird er mit ``[ui] watchdog = true`` in ``config.toml``; er
+kostet dann einen Tick pro Intervall und einen schlafenden Thread.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+import traceback
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional
+
+from . import metrics
+from .logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+metrics.REGISTRY.describe("ui_loop_lag_seconds", "Verspätung der Watchdog-Ticks in der Tk-Schleife")
+metrics.REGISTRY.describe("ui_stalls_total", "Blockaden der Tk-Schleife über der Schwelle")
+
+
+@dataclass
+class Stall:
+    """Eine Blockade der Ereignisschleife."""
+
+    started: float  # time.time() des letzten pünktlichen Ticks
+    seconds: float
+    stack: str  # Stack des Tk-Threads während der Blockade
+
+
+class UiWatchdog:
+    """Misst die Latenz der Tk-Schleife und protokolliert Blockaden mit Stack.
+
+    Args:
+        root: Tk-Wurzel (bzw. jedes Objekt mit ``after(ms, fn)``).
+        interval_ms: Abstand der Ticks.
+        threshold_ms: ab dieser Dauer ohne Tick gilt die Schleife als blockiert.
+        on_stall: optionaler Callback je Blockade (im Tk-Thread).
+        thread: beobachteter Thread; Standard ist der aufrufende (Tk-)Thread.
+    """
+
+    def __init__(
+        self,
+        root: Any,
+        *,
+        interval_ms: int = 100,
+        threshold_ms: int = 500,
+        on_stall: Optional[Callable[[Stall], None]] = None,
+        thread: Optional[threading.Thread] = None,
+    ):
+        self.root = root
+        self.interval = interval_ms / 1000
+        self.threshold = threshold_ms / 1000
+        self.on_stall = on_stall
+        self.stalls: List[Stall] = []
+        self._ident = (thread or threading.current_thread()).ident
+        self._lock = threading.Lock()
+        self._last_tick = time.monotonic()
+        self._last_tick_wall = time.time()
+        self._stack: Optional[str] = None
+        self._ticks = 0
+        self._halt = threading.Event()
+        self._monitor: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_config(cls, root: Any) -> Optional["UiWatchdog"]:
+        """Gestarteter Watchdog gemäß ``[ui] watchdog`` oder ``None``."""
+        from .config import load_config
+
+        ui = load_config().get("ui", {})
+        if not ui.get("watchdog", False):
+            return None
+        return cls(
+            root,
+            interval_ms=int(ui.get("watchdog_interval_ms", 100)),
+            threshold_ms=int(ui.get("watchdog_threshold_ms", 500)),
+        ).start()
+
+    def start(self) -> "UiWatchdog":
+        self._last_tick = time.monotonic()
+        self.root.after(int(self.interval * 1000), self._tick)
+        self._monitor = threading.Thread(target=self._watch, name="ui-watchdog", daemon=True)
+        self._monitor.start()
+        return self
+
+    def stop(self) -> None:
+        self._halt.set()
+        if self._monitor is not None:
+            self._monitor.join()
+
+    def _tick(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            gap = now - self._last_tick
+            stack, self._stack = self._stack, None
+            started = self._last_tick_wall
+            self._last_tick = now
+            self._last_tick_wall = time.time()
+            self._ticks += 1
+        metrics.observe("ui_loop_lag_seconds", max(gap - self.interval, 0.0))
+        if gap >= self.threshold:
+            stall = Stall(started=started, seconds=gap, stack=stack or "")
+            self.stalls.append(stall)
+            metrics.inc("ui_stalls_total")
+            logger.warning(
+                "Tk-Schleife %.0f ms blockiert%s", gap * 1000,
+                f"; Stack des Tk-Threads:\n{stack}" if stack else "",
+            )
+            if self.on_stall is not None:
+                self.on_stall(stall)
+        if not self._halt.is_set():
+            try:
+                self.root.after(int(self.interval * 1000), self._tick)
+            except Exception:  # noqa: BLE001 - TclError: Fenster bereits geschlossen
+                self._halt.set()
+
+    def _watch(self) -> None:
+        # Prüft doppelt so oft wie getickt wird; der Stack wird einmal je
+        # Blockade genommen, sobald die Schwelle überschritten ist.
+        while not self._halt.wait(min(self.interval, self.threshold) / 2):
+            with self._lock:
+                overdue = time.monotonic() - self._last_tick >= self.threshold
+                if not overdue or self._stack is not None:
+                    continue
+                ticks = self._ticks
+            frame = sys._current_frames().get(self._ident)
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else ""
+            with self._lock:
+                if self._stack is None and self._ticks == ticks:  # Blockade dauert noch an
+                    self._stack = stack
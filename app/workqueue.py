@@ -0,0 +1,466 @@
+"""Verteilte Abarbeitung eines Skripts über eine gemeinsame SQLite-Warteschlange.
+
+Für sehr große Läufe reichen Rate-Limit und CPU eines Rechners nicht. Hier
+werden die Segment-Aufgaben von `LernkartenPipeline` (Klassifikation je
+Segment, Lernkarten je behaltenem Teilsegment) als Arbeitspakete in einer
+SQLite-Datei abgelegt, z. B. auf einem gemeinsamen Laufwerk:
+
+* Der **Koordinator** liest und segmentiert das PDF, legt je Segment eine
+  ``classify``-Aufgabe an, wartet und setzt am Ende die `CardRow`s in
+  Ursprungsreihenfolge zusammen.
+* **Worker** (Prozesse, gern auf mehreren Rechnern) holen sich Aufgaben per
+  Lease (``lease_until``), verlängern es per Heartbeat und tragen das Ergebnis
+  ein. Eine abgeschlossene Klassifikation erzeugt in derselben Transaktion die
+  ``qa``-Aufgaben ihrer behaltenen Teilsegmente.
+
+Abschlüsse sind idempotent: Läuft ein Lease ab (Worker abgestürzt oder
+hängend), übernimmt ein anderer Worker die Aufgabe; kommt das erste Ergebnis
+doch noch an, zählt nur der erste Abschluss. Fehlschläge werden bis
+``max_attempts`` wiederholt, danach liefert das Segment keine Karte (wie der
+Fallback in `LernkartenPipeline.run`)::
+
+    python -m app.workqueue submit skript.pdf --db /mnt/team/queue.sqlite --out karten.xlsx
+    python -m app.workqueue work --db /mnt/team/queue.sqlite      # auf jedem Rechner
+
+Standardmäßig nutzt die Datei das Rollback-Journal (``journal_mode=DELETE``),
+da WAL gemeinsamen Speicher auf *einem* Rechner voraussetzt. Leases rechnen
+mit ``time.time()``; die Uhren der Rechner sollten synchron laufen.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from .logging_utils import get_logger
+from .pipeline_models import CardRow, Segment
+
+logger = get_logger(__name__)
+
+_PENDING = ("queued", "leased")
+
+
+def segment_to_dict(s: Segment) -> Dict[str, Any]:
+    return {
+        "text": s.text,
+        "keep": s.keep,
+        "start_page": s.start_page,
+        "end_page": s.end_page,
+        "label": s.label or None,
+        "id": s.id,
+    }
+
+
+def segment_from_dict(d: Dict[str, Any]) -> Segment:
+    return Segment(text=d["text"], keep=d.get("keep", True), start_page=d.get("start_page"),
+                   end_page=d.get("end_page"), label=d.get("label") or "",
+                   id=d.get("id"))
+
+
+class WorkQueue:
+    """Aufgabentabelle mit Leases in einer (gemeinsam genutzten) SQLite-Datei.
+
+    Jede Methode öffnet eine eigene, kurze Transaktion; mehrere Prozesse und
+    Rechner können dieselbe Datei gleichzeitig verwenden.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        max_attempts: int = 3,
+        journal_mode: str = "DELETE",
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        # autocommit; Transaktionen werden explizit mit BEGIN IMMEDIATE geöffnet
+        self._db = sqlite3.connect(
+            str(self.path), check_same_thread=False, timeout=60, isolation_level=None
+        )
+        self._db.row_factory = sqlite3.Row
+        self._db.execute(f"PRAGMA journal_mode={journal_mode}")
+        with self._tx() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS runs ("
+                " run_id TEXT PRIMARY KEY, params TEXT NOT NULL, segments INTEGER NOT NULL,"
+                " created REAL NOT NULL)"
+            )
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS tasks ("
+                " run_id TEXT NOT NULL, kind TEXT NOT NULL, idx INTEGER NOT NULL,"
+                " sub INTEGER NOT NULL, payload TEXT NOT NULL, status TEXT NOT NULL,"
+                " worker TEXT, lease_until REAL, attempts INTEGER NOT NULL DEFAULT 0,"
+                " result TEXT, error TEXT, finished REAL,"
+                " PRIMARY KEY (run_id, kind, idx, sub))"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, lease_until)")
+
+    @contextmanager
+    def _tx(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._db
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    # --- Koordinator -----------------------------------------------------
+
+    def create_run(self, segments: Sequence[Segment], params: Dict[str, Any]) -> str:
+        run_id = uuid.uuid4().hex[:12]
+        with self._tx() as db:
+            db.execute(
+                "INSERT INTO runs (run_id, params, segments, created) VALUES (?, ?, ?, ?)",
+                (run_id, json.dumps(params), len(segments), time.time()),
+            )
+            db.executemany(
+                "INSERT INTO tasks (run_id, kind, idx, sub, payload, status)"
+                " VALUES (?, 'classify', ?, 0, ?, 'queued')",
+                [(run_id, i, json.dumps(segment_to_dict(s))) for i, s in enumerate(segments)],
+            )
+        return run_id
+
+    def run_params(self, run_id: str) -> Dict[str, Any]:
+        with self._lock:
+            row = self._db.execute("SELECT params FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        if row is None:
+            raise KeyError(run_id)
+        return json.loads(row["params"])
+
+    def counts(self, run_id: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+        """``{kind: {status: anzahl}}`` für einen Lauf bzw. alle Läufe."""
+        sql = "SELECT kind, status, COUNT(*) AS n FROM tasks"
+        args: tuple = ()
+        if run_id is not None:
+            sql += " WHERE run_id = ?"
+            args = (run_id,)
+        with self._lock:
+            rows = self._db.execute(sql + " GROUP BY kind, status", args).fetchall()
+        out: Dict[str, Dict[str, int]] = {}
+        for r in rows:
+            out.setdefault(r["kind"], {})[r["status"]] = r["n"]
+        return out
+
+    def pending(self, run_id: Optional[str] = None) -> int:
+        return sum(
+            n for by_status in self.counts(run_id).values()
+            for status, n in by_status.items() if status in _PENDING
+        )
+
+    def results(self, run_id: str, kind: str) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._db.execute(
+                "SELECT idx, sub, payload, status, result FROM tasks"
+                " WHERE run_id = ? AND kind = ? ORDER BY idx, sub",
+                (run_id, kind),
+            ).fetchall()
+
+    # --- Worker ------------------------------------------------------------
+
+    def claim(self, worker: str, lease_seconds: float = 60.0) -> Optional[Dict[str, Any]]:
+        """Nächste freie (oder verwaiste) Aufgabe leasen; ``qa`` vor ``classify``.
+
+        Kartenaufgaben zuerst abzuarbeiten hält die Zahl offener Teilsegmente
+        klein und liefert früh fertige Zeilen.
+        """
+        now = time.time()
+        with self._tx() as db:
+            row = db.execute(
+                "SELECT run_id, kind, idx, sub, payload, attempts FROM tasks"
+                " WHERE status = 'queued' OR (status = 'leased' AND lease_until < ?)"
+                " ORDER BY kind = 'classify', run_id, idx, sub LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                return None
+            db.execute(
+                "UPDATE tasks SET status = 'leased', worker = ?, lease_until = ?,"
+                " attempts = attempts + 1"
+                " WHERE run_id = ? AND kind = ? AND idx = ? AND sub = ?",
+                (worker, now + lease_seconds, row["run_id"], row["kind"], row["idx"], row["sub"]),
+            )
+        task = dict(row)
+        task["payload"] = json.loads(task["payload"])
+        task["attempts"] += 1
+        return task
+
+    @staticmethod
+    def _where(task: Dict[str, Any]) -> tuple:
+        return (task["run_id"], task["kind"], task["idx"], task["sub"])
+
+    def heartbeat(self, task: Dict[str, Any], worker: str, lease_seconds: float = 60.0) -> bool:
+        """Lease verlängern; ``False``, wenn die Aufgabe nicht mehr diesem Worker gehört."""
+        with self._tx() as db:
+            cur = db.execute(
+                "UPDATE tasks SET lease_until = ?"
+                " WHERE run_id = ? AND kind = ? AND idx = ? AND sub = ?"
+                " AND status = 'leased' AND worker = ?",
+                (time.time() + lease_seconds, *self._where(task), worker),
+            )
+        return cur.rowcount == 1
+
+    def complete(
+        self,
+        task: Dict[str, Any],
+        worker: str,
+        result: Any,
+        follow_up: Sequence[Dict[str, Any]] = (),
+    ) -> bool:
+        """Ergebnis eintragen und ``qa``-Folgeaufgaben anlegen (eine Transaktion).
+
+        Idempotent: Ist die Aufgabe schon abgeschlossen, bleibt alles unverändert
+        und ``False`` wird geliefert.
+        """
+        with self._tx() as db:
+            cur = db.execute(
+                "UPDATE tasks SET status = 'done', worker = ?, result = ?, error = NULL,"
+                " finished = ? WHERE run_id = ? AND kind = ? AND idx = ? AND sub = ?"
+                " AND status NOT IN ('done', 'failed')",
+                (worker, json.dumps(result), time.time(), *self._where(task)),
+            )
+            if cur.rowcount != 1:
+                return False
+            db.executemany(
+                "INSERT OR IGNORE INTO tasks (run_id, kind, idx, sub, payload, status)"
+                " VALUES (?, 'qa', ?, ?, ?, 'queued')",
+                [(task["run_id"], task["idx"], sub, json.dumps(p)) for sub, p in enumerate(follow_up)],
+            )
+        return True
+
+    def fail(self, task: Dict[str, Any], worker: str, error: str) -> str:
+        """Fehlschlag melden; liefert den neuen Status (``queued`` oder ``failed``)."""
+        status = "failed" if task["attempts"] >= self.max_attempts else "queued"
+        with self._tx() as db:
+            db.execute(
+                "UPDATE tasks SET status = ?, error = ?, lease_until = NULL,"
+                " finished = CASE WHEN ? = 'failed' THEN ? END"
+                " WHERE run_id = ? AND kind = ? AND idx = ? AND sub = ?"
+                " AND status = 'leased' AND worker = ?",
+                (status, error, status, time.time(), *self._where(task), worker),
+            )
+        return status
+
+
+class Worker:
+    """Holt Aufgaben aus einer `WorkQueue` und führt sie mit einer Pipeline aus."""
+
+    def __init__(
+        self,
+        queue: WorkQueue,
+        pipeline,
+        worker_id: str | None = None,
+        lease_seconds: float = 60.0,
+        poll_seconds: float = 0.5,
+    ):
+        self.queue = queue
+        self.pipe = pipeline
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:4]}"
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+        self._params: Dict[str, Dict[str, Any]] = {}
+
+    def _execute(self, task: Dict[str, Any]) -> tuple:
+        """Liefert ``(ergebnis, folgeaufgaben)``."""
+        seg = segment_from_dict(task["payload"])
+        if task["kind"] == "classify":
+            parts = self.pipe._classify_segment(seg)
+            for part in parts:
+                part.keep = self.pipe._passes_filters(part)
+            dicts = [segment_to_dict(p) for p in parts]
+            return dicts, [d for d in dicts if d["keep"]]
+        params = self._params.get(task["run_id"])
+        if params is None:
+            params = self._params[task["run_id"]] = self.queue.run_params(task["run_id"])
+        items = self.pipe.client.gen_qa_for_chunk(
+            seg.text[:8000],
+            self.pipe._n_questions(seg, int(params.get("max_questions_per_chunk", 8))),
+            params.get("language", "de"),
+        )
+        return [{"frage": x.frage, "antwort": x.antwort} for x in items], []
+
+    def process(self, task: Dict[str, Any]) -> bool:
+        """Eine Aufgabe mit Heartbeat ausführen; ``True``, wenn das Ergebnis zählte."""
+        done = threading.Event()
+
+        def beat() -> None:
+            while not done.wait(self.lease_seconds / 3):
+                if not self.queue.heartbeat(task, self.worker_id, self.lease_seconds):
+                    return  # Lease verloren; das Ergebnis wird ggf. verworfen
+
+        hb = threading.Thread(target=beat, name="workqueue-heartbeat", daemon=True)
+        hb.start()
+        try:
+            result, follow_up = self._execute(task)
+        except Exception as e:  # noqa: BLE001 - wird über attempts wiederholt
+            status = self.queue.fail(task, self.worker_id, f"{e.__class__.__name__}: {e}")
+            logger.warning("Aufgabe %s/%s/%s fehlgeschlagen (%s): %s",
+                           task["kind"], task["idx"], task["sub"], status, e)
+            return False
+        finally:
+            done.set()
+            hb.join()
+        return self.queue.complete(task, self.worker_id, result, follow_up)
+
+    def run(self, stop: Optional[threading.Event] = None, until_empty: bool = False) -> int:
+        """Arbeitet, bis ``stop`` gesetzt ist bzw. (``until_empty``) nichts mehr offen ist.
+
+        Liefert die Zahl der übernommenen Ergebnisse.
+        """
+        stop = stop or threading.Event()
+        n = 0
+        while not stop.is_set():
+            task = self.queue.claim(self.worker_id, self.lease_seconds)
+            if task is None:
+                if until_empty and self.queue.pending() == 0:
+                    break
+                stop.wait(self.poll_seconds)
+                continue
+            n += self.process(task)
+        return n
+
+
+def submit(queue: WorkQueue, pipeline, pdf: str, *, pages=None, chapters=None,
+           max_questions_per_chunk: int = 8, language: str = "de") -> str:
+    """PDF einlesen, segmentieren und die ``classify``-Aufgaben einstellen."""
+    segments = pipeline.load_and_segment(pdf, pages=pages, chapters=chapters)
+    return queue.create_run(
+        segments,
+        {"pdf": os.path.basename(pdf), "max_questions_per_chunk": max_questions_per_chunk,
+         "language": language},
+    )
+
+
+def wait(
+    queue: WorkQueue,
+    run_id: str,
+    *,
+    poll_seconds: float = 0.5,
+    timeout: float | None = None,
+    progress_cb: Optional[Callable[[str, int, int], None]] = None,
+) -> None:
+    """Blockiert, bis keine Aufgabe des Laufs mehr offen ist."""
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        counts = queue.counts(run_id)
+        if progress_cb:
+            for kind in ("classify", "qa"):
+                by_status = counts.get(kind, {})
+                total = sum(by_status.values())
+                progress_cb(kind, total - sum(by_status.get(s, 0) for s in _PENDING), total)
+        if not any(s in _PENDING for by in counts.values() for s in by):
+            return
+        if deadline is not None and time.monotonic() > deadline:
+            raise TimeoutError(f"Lauf {run_id} nach {timeout} s nicht fertig")
+        time.sleep(poll_seconds)
+
+
+def assemble(queue: WorkQueue, run_id: str) -> List[CardRow]:
+    """Fertige ``qa``-Ergebnisse als `CardRow`s in Ursprungsreihenfolge."""
+    from .pipeline import LernkartenPipeline
+
+    rows = []
+    for r in queue.results(run_id, "qa"):
+        if r["status"] != "done":
+            continue
+        items = json.loads(r["result"])
+        if items:
+            rows.append(LernkartenPipeline._card_row(
+                segment_from_dict(json.loads(r["payload"])),
+                [x["frage"] for x in items],
+                [x["antwort"] for x in items],
+            ))
+    return rows
+
+
+def _pipeline(args: argparse.Namespace):
+    from .cli import _config_defaults
+    from .config import load_api_key
+    from .openai_client import OpenAISettings
+    from .pipeline import LernkartenPipeline
+
+    d = _config_defaults()
+    return LernkartenPipeline(OpenAISettings(
+        api_key=load_api_key()[0] or "none",
+        classify_model=d["classify_model"],
+        qa_model=d["qa_model"],
+        base_url=getattr(args, "base_url", None),
+    ))
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m app.workqueue", description=__doc__.splitlines()[0])
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    s = sub.add_parser("submit", help="PDF einstellen, warten und Export schreiben")
+    s.add_argument("pdf")
+    s.add_argument("--db", required=True, help="gemeinsame SQLite-Datei")
+    s.add_argument("--out", help="Exportdatei (.xlsx, .csv, .jsonl); ohne: nur einstellen")
+    s.add_argument("--pages")
+    s.add_argument("--questions", type=int, default=8)
+    s.add_argument("--language", default="de")
+    s.add_argument("--timeout", type=float)
+    w = sub.add_parser("work", help="Aufgaben abarbeiten")
+    w.add_argument("--db", required=True)
+    w.add_argument("--base-url", help="anderer API-Endpunkt (z. B. Proxy oder Mock)")
+    w.add_argument("--lease", type=float, default=60.0, help="Lease-Dauer in Sekunden")
+    w.add_argument("--until-empty", action="store_true", help="beenden, wenn nichts mehr offen ist")
+    w.add_argument("--threads", type=int, default=1, help="Worker-Threads in diesem Prozess")
+    args = ap.parse_args(argv)
+
+    queue = WorkQueue(args.db)
+    pipe = _pipeline(args)
+    if args.cmd == "submit":
+        run_id = submit(queue, pipe, args.pdf, pages=args.pages,
+                        max_questions_per_chunk=args.questions, language=args.language)
+        print(json.dumps({"event": "submitted", "run_id": run_id}), flush=True)
+        if not args.out:
+            return 0
+        wait(queue, run_id, timeout=args.timeout)
+        rows = assemble(queue, run_id)
+        from .export_sinks import open_sink
+
+        sink = open_sink(args.out)
+        try:
+            for row in rows:
+                sink.write(row)
+        finally:
+            sink.close()
+        print(json.dumps({"event": "done", "run_id": run_id, "rows": len(rows),
+                          "out": str(sink.path), "tasks": queue.counts(run_id)}), flush=True)
+        return 0
+
+    from .cli import _stop_on_signals
+
+    stop = threading.Event()
+    workers = [Worker(queue, pipe, lease_seconds=args.lease) for _ in range(max(1, args.threads))]
+    with _stop_on_signals(stop):
+        threads = [
+            threading.Thread(target=w.run, args=(stop, args.until_empty), name=f"workqueue-{i}")
+            for i, w in enumerate(workers)
+        ]
+        for t in threads:
+            t.start()
+        while any(t.is_alive() for t in threads):
+            for t in threads:
+                t.join(0.2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,6 @@
+"""Benchmarks für den Lernkarten-Generator.
+
+Die Skripte werden aus dem Projektverzeichnis als Module gestartet, z. B.
+``python -m benchmarks.bench_excel_export``. Sie sind nicht Teil der
+Testsuite und schreiben ihre Ergebnisse als JSON.
+"""
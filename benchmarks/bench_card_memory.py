@@ -0,0 +1,154 @@
+"""Misst den Speicher je Karte für große Decks.
+
+Gemessen wird mit ``tracemalloc``, was ein Lauf nach der Kartenerzeugung im
+Speicher hält: die klassifizierten Segmente (``RunResult.labeled``) und die
+Karten::
+
+    python -m benchmarks.bench_card_memory --cards 100000 --out bench_cards.json
+
+Varianten:
+
+* ``legacy`` – frühere Modelle: Dataclasses mit ``__dict__``, ``label`` als
+  nachträglich gesetztes Attribut
+* ``slots``  – `pipeline_models` mit ``__slots__``, Karten als `CardRow`-Liste
+* ``store``  – wie ``slots``, Karten in `app.card_store.CardStore`
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import sys
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from app.card_store import CardStore
+from app.pipeline_models import CardRow, Segment
+
+VARIANTS = ("legacy", "slots", "store")
+QUESTIONS_PER_ROW = 2
+
+
+@dataclass
+class _LegacySegment:
+    text: str
+    keep: bool = True
+    start_page: Optional[int] = None
+    end_page: Optional[int] = None
+
+
+@dataclass
+class _LegacyCardRow:
+    original: str
+    fragen: List[str]
+    antworten: List[str]
+    labels: List[str]
+    source: str = ""
+    start_page: Optional[int] = None
+    end_page: Optional[int] = None
+
+
+def _texts(i: int):
+    original = f"{i}: " + "Die Photosynthese wandelt Lichtenergie in chemische Energie um. " * 6
+    fragen = [f"Frage {i}.{k}: Was leistet die Photosynthese?" for k in range(QUESTIONS_PER_ROW)]
+    antworten = [f"Antwort {i}.{k}: Sie erzeugt Glukose." for k in range(QUESTIONS_PER_ROW)]
+    return original, fragen, antworten
+
+
+def _legacy(n_rows: int):
+    segments, rows = [], []
+    for i in range(n_rows):
+        original, fragen, antworten = _texts(i)
+        seg = _LegacySegment(original, start_page=i // 10 + 1, end_page=i // 10 + 1)
+        seg.label = "Fakt"
+        segments.append(seg)
+        rows.append(_LegacyCardRow(
+            seg.text, fragen, antworten, [seg.label], f"S. {seg.start_page}",
+            seg.start_page, seg.end_page,
+        ))
+    return segments, rows
+
+
+def _slotted(n_rows: int):
+    for i in range(n_rows):
+        original, fragen, antworten = _texts(i)
+        page = i // 10 + 1
+        seg = Segment(original, start_page=page, end_page=page, label="Fakt", id=i)
+        yield seg, CardRow(
+            seg.text, fragen, antworten, [seg.label], f"S. {page}", page, page, seg.id
+        )
+
+
+def _slots(n_rows: int):
+    pairs = list(_slotted(n_rows))
+    return [s for s, _ in pairs], [r for _, r in pairs]
+
+
+def _store(n_rows: int):
+    segments: List[Segment] = []
+    store = CardStore()
+    for seg, row in _slotted(n_rows):
+        segments.append(seg)
+        store.add(row)
+    return segments, store
+
+
+BUILDERS: Dict[str, Callable[[int], object]] = {
+    "legacy": _legacy,
+    "slots": _slots,
+    "store": _store,
+}
+
+
+def _payload_bytes(n_rows: int) -> int:
+    total = 0
+    for i in range(n_rows):
+        original, fragen, antworten = _texts(i)
+        total += len(original.encode("utf-8"))
+        total += sum(len(t.encode("utf-8")) for t in fragen + antworten)
+    return total
+
+
+def measure(variant: str, n_cards: int) -> dict:
+    n_rows = max(1, n_cards // QUESTIONS_PER_ROW)
+    gc.collect()
+    tracemalloc.start()
+    kept = BUILDERS[variant](n_rows)
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    cards = n_rows * QUESTIONS_PER_ROW
+    payload = _payload_bytes(n_rows)
+    return {
+        "variant": variant,
+        "cards": cards,
+        "bytes_per_card": round(current / cards, 1),
+        # ohne die Textinhalte selbst (UTF-8-Länge), d. h. reiner Objekt-Overhead
+        "overhead_per_card": round((current - payload) / cards, 1),
+        "peak_mib": round(peak / 2**20, 1),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--cards", type=int, default=100_000)
+    ap.add_argument("--variants", nargs="+", choices=VARIANTS, default=list(VARIANTS))
+    ap.add_argument("--out", help="Ergebnisse zusätzlich als JSON schreiben")
+    args = ap.parse_args(argv)
+
+    results = []
+    for variant in args.variants:
+        res = measure(variant, args.cards)
+        results.append(res)
+        print(json.dumps(res))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""Vergleicht den Streaming-Export mit dem bisherigen pandas-Pfad.
+
+Jede Variante läuft in einem eigenen Prozess, damit Laufzeit und Spitzen-RSS
+(``ru_maxrss``) sauber getrennt sind::
+
+    python -m benchmarks.bench_excel_export --cards 100000 --out bench_excel.json
+
+Varianten:
+
+* ``stream``     – `excel_export.to_excel` (openpyxl ``write_only``/xlsxwriter)
+* ``stream_csv`` – `excel_export.write_csv_stream`
+* ``pandas``     – früherer Pfad: Liste von Dicts → ``DataFrame`` → ``to_excel``
+
+Fehlt eine Abhängigkeit, wird die Variante als ``skipped`` gemeldet.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Iterator
+
+from app.pipeline_models import CardRow
+
+VARIANTS = ("stream", "stream_csv", "pandas")
+QUESTIONS_PER_ROW = 8
+
+
+def synthetic_rows(n_cards: int) -> Iterator[CardRow]:
+    """Erzeugt ``n_cards`` Karten in Zeilen zu je ``QUESTIONS_PER_ROW`` Fragen."""
+    original = "Die Photosynthese wandelt Lichtenergie in chemische Energie um. " * 12
+    for i in range(0, n_cards, QUESTIONS_PER_ROW):
+        n = min(QUESTIONS_PER_ROW, n_cards - i)
+        yield CardRow(
+            original=f"{i}: {original}",
+            fragen=[f"Frage {i + k}: Was leistet die Photosynthese?" for k in range(n)],
+            antworten=[f"Antwort {i + k}: Sie erzeugt Glukose und Sauerstoff." for k in range(n)],
+            labels=["Fakt"],
+            source=f"S. {i // 40 + 1}",
+        )
+
+
+def _legacy_pandas(rows, out_path: str) -> None:
+    import pandas as pd
+
+    data = [
+        {
+            "Original": r.original,
+            "Frage": q,
+            "Antwort": a,
+            "Labels": ", ".join(r.labels),
+            "Quelle": r.source,
+        }
+        for r in rows
+        for q, a in zip(r.fragen, r.antworten)
+    ]
+    pd.DataFrame(data).to_excel(out_path, index=False)
+
+
+def _child(variant: str, n_cards: int, out_dir: str) -> dict:
+    from app import excel_export
+
+    start = time.perf_counter()
+    if variant == "stream":
+        excel_export.to_excel(synthetic_rows(n_cards), os.path.join(out_dir, "stream.xlsx"))
+    elif variant == "stream_csv":
+        excel_export.write_csv_stream(synthetic_rows(n_cards), os.path.join(out_dir, "stream.csv"))
+    else:
+        # Der alte Pfad erwartete eine fertige Liste.
+        _legacy_pandas(list(synthetic_rows(n_cards)), os.path.join(out_dir, "pandas.xlsx"))
+    seconds = time.perf_counter() - start
+    peak_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":  # macOS meldet Bytes
+        peak_kib //= 1024
+    return {
+        "variant": variant,
+        "cards": n_cards,
+        "seconds": round(seconds, 3),
+        "peak_rss_mib": round(peak_kib / 1024, 1),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--cards", type=int, default=100_000)
+    ap.add_argument("--variants", nargs="+", choices=VARIANTS, default=list(VARIANTS))
+    ap.add_argument("--out", help="Ergebnisse zusätzlich als JSON schreiben")
+    ap.add_argument("--child", choices=VARIANTS, help=argparse.SUPPRESS)
+    ap.add_argument("--dir", help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+
+    if args.child:
+        try:
+            print(json.dumps(_child(args.child, args.cards, args.dir)))
+        except ImportError as exc:
+            print(json.dumps({"variant": args.child, "skipped": str(exc)}))
+        return 0
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for variant in args.variants:
+            proc = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_excel_export", "--child", variant,
+                 "--cards", str(args.cards), "--dir", tmp],
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            res = json.loads(proc.stdout.strip().splitlines()[-1])
+            results.append(res)
+            print(json.dumps(res))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""Durchsatz der Exporter für große Decks.
+
+Misst `anki_export.to_apkg`, `analytics_export.to_parquet` und
+`analytics_export.to_jsonl` auf synthetischen Karten::
+
+    python -m benchmarks.bench_exporters --cards 300000 --out bench_exporters.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+from app.analytics_export import to_jsonl, to_parquet
+from app.anki_export import to_apkg
+
+from .bench_excel_export import synthetic_rows
+
+EXPORTERS = {
+    "apkg": (to_apkg, "deck.apkg"),
+    "parquet": (to_parquet, "karten.parquet"),
+    "jsonl": (to_jsonl, "karten.jsonl"),
+}
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--cards", type=int, default=300_000)
+    ap.add_argument("--formats", nargs="+", choices=sorted(EXPORTERS), default=sorted(EXPORTERS))
+    ap.add_argument("--out", help="Ergebnisse zusätzlich als JSON schreiben")
+    args = ap.parse_args(argv)
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in args.formats:
+            func, filename = EXPORTERS[name]
+            path = os.path.join(tmp, filename)
+            start = time.perf_counter()
+            try:
+                n = func(synthetic_rows(args.cards), path)
+            except ImportError as exc:
+                res = {"format": name, "skipped": str(exc)}
+            else:
+                seconds = time.perf_counter() - start
+                res = {
+                    "format": name,
+                    "cards": n,
+                    "seconds": round(seconds, 3),
+                    "cards_per_second": round(n / seconds),
+                    "file_mib": round(os.path.getsize(path) / 2**20, 1),
+                }
+            results.append(res)
+            print(json.dumps(res))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""Kaltstart-Budget: Importzeit der Einstiegsmodule.
+
+Startet für jedes Modul einen frischen Interpreter mit ``python -X importtime``,
+wertet die Ausgabe aus und prüft zweierlei:
+
+* die kumulierte Importzeit (ohne den Interpreter-Start selbst) bleibt unter
+  ``--budget-ms`` (Median über ``--runs`` Läufe);
+* keine der schweren Bibliotheken aus ``LAZY_MODULES`` wird beim Import geladen.
+
+Bei einer Überschreitung endet das Skript mit Exitcode 1::
+
+    python -m benchmarks.bench_import_time --budget-ms 350 --out import_time.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = ["app.pipeline", "app.cli", "app.main"]
+
+# Werden erst bei Bedarf geladen (erster API-Aufruf, erstes PDF, erster Export).
+LAZY_MODULES = [
+    "openai",
+    "httpx",
+    "pydantic",
+    "pypdf",
+    "pdfplumber",
+    "pdfminer",
+    "tiktoken",
+    "pandas",
+    "numpy",
+    "openpyxl",
+    "xlsxwriter",
+    "pyarrow",
+]
+
+# ``import time: self | cumulative | name`` (Zeiten in µs, Einrückung = Tiefe)
+Entry = Tuple[str, int, int, int]
+
+
+def parse_importtime(stderr: str) -> List[Entry]:
+    """Liefert ``(name, tiefe, self_us, cumulative_us)`` je Zeile der Ausgabe."""
+    entries: List[Entry] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # Kopfzeile
+        raw_name = parts[2].rstrip()
+        name = raw_name.lstrip()
+        depth = (len(raw_name) - len(name) - 1) // 2
+        entries.append((name, depth, int(parts[0]), int(parts[1])))
+    return entries
+
+
+def _run(code: str) -> List[Entry]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Import fehlgeschlagen ({code}):\n{proc.stderr[-2000:]}")
+    return parse_importtime(proc.stderr)
+
+
+def measure(module: str, startup: set) -> Dict[str, object]:
+    """Ein Lauf: kumulierte Zeit aller Top-Level-Importe, die nicht zum Interpreter-Start gehören."""
+    entries = [e for e in _run(f"import {module}") if e[0] not in startup]
+    total_us = sum(cum for _, depth, _, cum in entries if depth == 0)
+    loaded = sorted(
+        {m for m in LAZY_MODULES for name, *_ in entries if name == m or name.startswith(m + ".")}
+    )
+    top = sorted(entries, key=lambda e: e[2], reverse=True)[:10]
+    return {
+        "total_ms": total_us / 1000,
+        "lazy_loaded": loaded,
+        "top_self_ms": [(name, round(self_us / 1000, 1)) for name, _, self_us, _ in top],
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--budget-ms", type=float, default=350.0)
+    ap.add_argument("--out", help="Ergebnisse zusätzlich als JSON schreiben")
+    args = ap.parse_args(argv)
+
+    startup = {name for name, *_ in _run("pass")}
+    results = []
+    failed = False
+    for module in args.modules:
+        runs = [measure(module, startup) for _ in range(args.runs)]
+        median_ms = statistics.median(r["total_ms"] for r in runs)
+        lazy_loaded = sorted({m for r in runs for m in r["lazy_loaded"]})
+        ok = median_ms <= args.budget_ms and not lazy_loaded
+        failed |= not ok
+        res = {
+            "module": module,
+            "median_ms": round(median_ms, 1),
+            "min_ms": round(min(r["total_ms"] for r in runs), 1),
+            "budget_ms": args.budget_ms,
+            "lazy_loaded": lazy_loaded,
+            "top_self_ms": runs[-1]["top_self_ms"],
+            "ok": ok,
+        }
+        results.append(res)
+        print(json.dumps(res, ensure_ascii=False))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
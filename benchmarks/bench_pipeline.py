@@ -0,0 +1,187 @@
+"""Ende-zu-Ende-Durchsatz der Pipeline gegen den lokalen Mock-Server.
+
+Treibt `LernkartenPipeline` durch load_and_segment → classify →
+generate_cards → export_excel, ohne die echte API (und ohne Kosten). Jede
+Eingabe läuft in einem eigenen Prozess, damit der Spitzen-RSS je Dokument
+sauber gemessen wird; der Mock-Server (`benchmarks.mock_openai`) läuft im
+Elternprozess::
+
+    python -m benchmarks.bench_pipeline --synthetic-pages 10 40 --latency-ms 80 \\
+        --out bench_pipeline.json
+    python -m benchmarks.bench_pipeline --pdf skript.pdf --rate-429 0.05
+
+Gemeldet werden je Eingabe Sekunden pro Seite, Anfragen pro Seite, Karten pro
+Sekunde, die Dauer der einzelnen Stufen und der Spitzen-RSS. Die JSON-Datei
+enthält zusätzlich Git-Revision und Mock-Einstellungen, damit Läufe
+verschiedener Versionen vergleichbar sind.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+
+from .mock_openai import MockOpenAIServer, add_mock_arguments, config_from_args
+from .synthetic_pdf import synthetic_pages, write_pdf
+
+
+def _child(
+    pdf: str, base_url: str, questions: int, workers: int, out_dir: str, streaming: bool = False
+) -> dict:
+    from app import metrics
+    from app.config import GPT5_MINI, GPT5_NANO
+    from app.openai_client import OpenAISettings
+    from app.pipeline import LernkartenPipeline
+
+    settings = OpenAISettings(
+        api_key="mock", classify_model=GPT5_NANO, qa_model=GPT5_MINI, base_url=base_url
+    )
+    pipe = LernkartenPipeline(settings)
+    stages = {}
+
+    start = t = time.perf_counter()
+    segments = pipe.load_and_segment(pdf)
+    stages["load_and_segment"] = time.perf_counter() - t
+
+    if streaming:
+        # Klassifikation und QA überlappend (`LernkartenPipeline.run`)
+        t = time.perf_counter()
+        result = pipe.run(segments, max_questions_per_chunk=questions, max_workers=workers)
+        labeled, rows = result.labeled, result.rows
+        stages["run"] = time.perf_counter() - t
+    else:
+        t = time.perf_counter()
+        labeled = pipe.classify(segments)
+        stages["classify"] = time.perf_counter() - t
+
+        t = time.perf_counter()
+        kept = [s for s in labeled if s.keep]
+        rows = pipe.generate_cards(kept, questions, "de", max_workers=workers)
+        stages["generate_cards"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    pipe.export_excel(rows, os.path.join(out_dir, "karten.xlsx"))
+    stages["export"] = time.perf_counter() - t
+    seconds = time.perf_counter() - start
+
+    requests = {
+        stage: sum(
+            e["value"]
+            for e in metrics.REGISTRY.to_dict().get("openai_requests_total", [])
+            if e["labels"].get("stage") == stage
+        )
+        for stage in ("classify", "qa")
+    }
+    pages = max(pipe.page_count, 1)
+    cards = sum(len(r.fragen) for r in rows)
+    total_requests = sum(requests.values())
+    peak_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":  # macOS meldet Bytes
+        peak_kib //= 1024
+    return {
+        "input": os.path.basename(pdf),
+        "pages": pipe.page_count,
+        "segments": len(segments),
+        "classified_segments": len(labeled),
+        "cards": cards,
+        "requests": requests,
+        "seconds": round(seconds, 3),
+        "stage_seconds": {k: round(v, 3) for k, v in stages.items()},
+        "seconds_per_page": round(seconds / pages, 4),
+        "requests_per_page": round(total_requests / pages, 2),
+        "cards_per_second": round(cards / seconds, 2) if seconds > 0 else 0.0,
+        "peak_rss_mib": round(peak_kib / 1024, 1),
+    }
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--pdf", nargs="*", default=[], help="Beispiel-PDFs")
+    ap.add_argument(
+        "--synthetic-pages", nargs="*", type=int, default=None,
+        help="Seitenzahlen synthetischer Skripte (Standard: 10, wenn keine --pdf)",
+    )
+    ap.add_argument("--questions", type=int, default=4, help="max. Fragen je Segment")
+    ap.add_argument("--workers", type=int, default=3, help="Threads in generate_cards")
+    ap.add_argument(
+        "--streaming", action="store_true",
+        help="LernkartenPipeline.run statt classify → generate_cards nacheinander",
+    )
+    ap.add_argument("--out", help="Ergebnisse zusätzlich als JSON schreiben")
+    add_mock_arguments(ap)
+    ap.add_argument("--child", help=argparse.SUPPRESS)
+    ap.add_argument("--base-url", help=argparse.SUPPRESS)
+    ap.add_argument("--dir", help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+
+    if args.child:
+        res = _child(
+            args.child, args.base_url, args.questions, args.workers, args.dir, args.streaming
+        )
+        print(json.dumps(res, ensure_ascii=False))
+        return 0
+
+    synthetic = args.synthetic_pages
+    if synthetic is None:
+        synthetic = [] if args.pdf else [10]
+    mock_config = config_from_args(args)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp, MockOpenAIServer(mock_config) as server:
+        inputs = list(args.pdf)
+        for n in synthetic:
+            path = os.path.join(tmp, f"synthetisch_{n}s.pdf")
+            inputs.append(str(write_pdf(path, synthetic_pages(n, seed=n))))
+        for pdf in inputs:
+            before = server.stats
+            proc = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_pipeline", "--child", pdf,
+                 "--base-url", server.base_url, "--dir", tmp,
+                 "--questions", str(args.questions), "--workers", str(args.workers)]
+                + (["--streaming"] if args.streaming else []),
+                capture_output=True,
+                text=True,
+            )
+            if proc.returncode != 0:
+                raise RuntimeError(f"Benchmark für {pdf} fehlgeschlagen:\n{proc.stderr[-2000:]}")
+            res = json.loads(proc.stdout.strip().splitlines()[-1])
+            after = server.stats
+            res["mock"] = {k: after.get(k, 0) - before.get(k, 0) for k in after}
+            results.append(res)
+            print(json.dumps(res, ensure_ascii=False))
+    if args.out:
+        report = {
+            "revision": _git_revision(),
+            "python": sys.version.split()[0],
+            "mock_config": asdict(mock_config),
+            "questions": args.questions,
+            "workers": args.workers,
+            "streaming": args.streaming,
+            "results": results,
+        }
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
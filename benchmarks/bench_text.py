@@ -0,0 +1,209 @@
+"""Mikro-Benchmarks der Textverarbeitung ohne PDF und ohne API.
+
+Misst die reinen Python-Pfade zwischen Textextraktion und erster Anfrage auf
+synthetischen deutschsprachigen Skripten (`benchmarks.synthetic_pdf`):
+
+* ``normalize_whitespace``, ``segment_text`` und ``segment_pages`` (`pdf_ingest`)
+* ``split_into_chunks`` (`chunking`)
+* ``split_sentences`` – die Satztrennung in `LernkartenPipeline.classify`
+* ``is_outline_segment``/``looks_like_outline_list`` (`segment_filters`)
+* ``Tokenizer.count`` (`tokenizer_utils`)
+
+Je Fall und Korpusgröße zählt der beste von ``--repeat`` Läufen. Aus den
+Zeiten über alle Größen wird der Skalierungsexponent (Steigung im
+log-log-Diagramm Zeit über Zeichen) geschätzt; Werte über
+``--max-exponent`` deuten auf quadratisches Verhalten hin::
+
+    python -m benchmarks.bench_text --pages 10 100 1000 5000 --out bench_text.json
+    python -m benchmarks.bench_text --save-baseline
+    python -m benchmarks.bench_text --tolerance 0.25
+
+Ohne ``--save-baseline`` wird mit ``benchmarks/baselines/bench_text.json``
+verglichen (falls vorhanden); sinkt der Durchsatz eines Falls um mehr als
+``--tolerance`` oder skaliert ein Fall superlinear, endet das Skript mit
+Exit-Code 1. Die Baseline ist maschinenabhängig und sollte auf derselben
+Maschine neu geschrieben werden, bevor man Versionen vergleicht.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import math
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from app.chunking import split_into_chunks, split_sentences
+from app.pdf_ingest import normalize_whitespace, segment_pages, segment_text
+from app.segment_filters import is_outline_segment, looks_like_outline_list
+from app.tokenizer_utils import Tokenizer
+
+from .synthetic_pdf import synthetic_pages
+
+DEFAULT_PAGES = (10, 100, 1000, 5000)
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baselines" / "bench_text.json"
+
+
+class Corpus:
+    """Ein synthetisches Skript als Seitenliste, Volltext und fertige Segmente."""
+
+    def __init__(self, n_pages: int):
+        self.n_pages = n_pages
+        self.pages: List[Tuple[int, str]] = list(
+            enumerate(synthetic_pages(n_pages, seed=n_pages), 1)
+        )
+        self.text = "\n\n".join(txt for _, txt in self.pages)
+        self.segments = [chunk for chunk, _, _ in segment_pages(self.pages)]
+        self.paragraphs = [p for s in self.segments for p in s.split("\n\n") if p.strip()]
+
+
+def _filters(c: Corpus) -> int:
+    return sum(
+        1
+        for s in c.segments
+        if is_outline_segment(s) or looks_like_outline_list(s, "Aufzaehlung")
+    )
+
+
+def _tokenizer() -> Callable[[Corpus], int]:
+    tok = Tokenizer()
+    tok.count("")  # Encoding vorab laden, nicht mitmessen
+    return lambda c: sum(tok.count(s) for s in c.segments)
+
+
+CASES: Dict[str, Callable[[Corpus], object]] = {
+    "normalize_whitespace": lambda c: normalize_whitespace(c.text),
+    "segment_text": lambda c: segment_text(c.text),
+    "segment_pages": lambda c: segment_pages(c.pages),
+    "split_into_chunks": lambda c: split_into_chunks(c.text),
+    "split_sentences": lambda c: sum(len(split_sentences(p)) for p in c.paragraphs),
+    "segment_filters": _filters,
+}
+
+
+def _cases(names: Sequence[str]) -> Dict[str, Callable[[Corpus], object]]:
+    cases = {n: CASES[n] for n in names if n in CASES}
+    if "tokenizer_count" in names:
+        cases["tokenizer_count"] = _tokenizer()
+    return cases
+
+
+def best_of(func: Callable[[], object], repeat: int) -> float:
+    """Kürzeste Laufzeit aus ``repeat`` Läufen, ohne GC während der Messung."""
+    best = math.inf
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(max(1, repeat)):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+    finally:
+        if enabled:
+            gc.enable()
+    return best
+
+
+def scaling_exponent(points: Sequence[Tuple[float, float]]) -> float | None:
+    """Steigung der Ausgleichsgeraden durch ``(log größe, log zeit)``.
+
+    1.0 entspricht linearem Aufwand, 2.0 quadratischem. Punkte mit Zeit 0
+    werden ignoriert; bei weniger als zwei Punkten gibt es kein Ergebnis.
+    """
+    xy = [(math.log(x), math.log(y)) for x, y in points if x > 0 and y > 0]
+    if len(xy) < 2:
+        return None
+    mx = sum(x for x, _ in xy) / len(xy)
+    my = sum(y for _, y in xy) / len(xy)
+    var = sum((x - mx) ** 2 for x, _ in xy)
+    if var == 0:
+        return None
+    return sum((x - mx) * (y - my) for x, y in xy) / var
+
+
+def compare(results: Sequence[dict], baseline: dict, tolerance: float) -> List[str]:
+    """Fälle, deren Durchsatz mehr als ``tolerance`` unter der Baseline liegt."""
+    regressions = []
+    for res in results:
+        ref = baseline.get(res["case"], {}).get(str(res["pages"]))
+        if not ref:
+            continue
+        if res["chars_per_second"] < ref * (1 - tolerance):
+            regressions.append(
+                f"{res['case']} @ {res['pages']} Seiten: "
+                f"{res['chars_per_second']:.0f} statt {ref:.0f} Zeichen/s "
+                f"({res['chars_per_second'] / ref - 1:+.0%})"
+            )
+    return regressions
+
+
+def run(pages: Sequence[int], cases: Sequence[str], repeat: int) -> List[dict]:
+    funcs = _cases(cases)
+    results = []
+    for n in pages:
+        corpus = Corpus(n)
+        for name, func in funcs.items():
+            seconds = best_of(lambda: func(corpus), repeat)
+            res = {
+                "case": name,
+                "pages": n,
+                "chars": len(corpus.text),
+                "seconds": round(seconds, 6),
+                "pages_per_second": round(n / seconds, 1) if seconds > 0 else None,
+                "chars_per_second": round(len(corpus.text) / seconds) if seconds > 0 else 0,
+                "mb_per_second": round(len(corpus.text) / seconds / 1e6, 2) if seconds > 0 else None,
+            }
+            results.append(res)
+            print(json.dumps(res, ensure_ascii=False), flush=True)
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--pages", nargs="+", type=int, default=list(DEFAULT_PAGES))
+    ap.add_argument(
+        "--cases", nargs="+", choices=[*CASES, "tokenizer_count"],
+        default=[*CASES, "tokenizer_count"],
+    )
+    ap.add_argument("--repeat", type=int, default=3, help="Läufe je Messung (bester zählt)")
+    ap.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    ap.add_argument("--save-baseline", action="store_true", help="Ergebnis als Baseline speichern")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="erlaubter Durchsatzverlust")
+    ap.add_argument("--max-exponent", type=float, default=1.3, help="Grenze für superlineares Wachstum")
+    ap.add_argument("--out", help="Ergebnisse zusätzlich als JSON schreiben")
+    args = ap.parse_args(argv)
+
+    results = run(args.pages, args.cases, args.repeat)
+
+    failures: List[str] = []
+    scaling = {}
+    for name in dict.fromkeys(r["case"] for r in results):
+        exp = scaling_exponent([(r["chars"], r["seconds"]) for r in results if r["case"] == name])
+        scaling[name] = None if exp is None else round(exp, 2)
+        if exp is not None and exp > args.max_exponent:
+            failures.append(f"{name}: Skalierungsexponent {exp:.2f} > {args.max_exponent}")
+    print(json.dumps({"scaling_exponent": scaling}))
+
+    if args.save_baseline:
+        baseline: Dict[str, Dict[str, float]] = {}
+        for r in results:
+            baseline.setdefault(r["case"], {})[str(r["pages"])] = r["chars_per_second"]
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(baseline, indent=2) + "\n", encoding="utf-8")
+    elif args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        failures.extend(compare(results, baseline, args.tolerance))
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"results": results, "scaling_exponent": scaling}, f, indent=2)
+    for msg in failures:
+        print(f"REGRESSION: {msg}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,298 @@
+"""Lokaler Ersatz für die OpenAI-Chat-Completions-API.
+
+Beantwortet ``POST /v1/chat/completions`` mit plausiblen JSON-Antworten im
+Format, das `openai_client.OpenAIClient` erwartet (``GET /v1/models`` liefert
+eine leere Liste, für `OpenAIClient.warm`):
+
+* Klassifikation (System-Prompt enthält „Klassifizierer“) →
+  ``{"label": ..., "keep": true, "reason": "mock"}``
+* QA („Erzeuge N Lernkarten“) → Liste mit N ``{frage, antwort}``-Objekten
+
+Latenz, Token-Rate und Fehlerquoten sind über `MockConfig` einstellbar; mit
+``canned`` lassen sich feste Antworten je Stufe vorgeben. Der Server läuft als
+``ThreadingHTTPServer`` in einem Hintergrund-Thread::
+
+    with MockOpenAIServer(MockConfig(latency_ms=80)) as srv:
+        settings = OpenAISettings(api_key="mock", base_url=srv.base_url)
+
+oder eigenständig::
+
+    python -m benchmarks.mock_openai --port 8089 --latency-ms 150 --rate-429 0.05
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+_N_CARDS_RE = re.compile(r"Erzeuge (\d+) Lernkarten")
+_LABELS = ["Definition", "Fakt", "Beispiel", "Aufzaehlung"]
+
+
+@dataclass
+class MockConfig:
+    """Verhalten des Mock-Servers."""
+
+    latency_ms: float = 50.0  # Grundlatenz je Anfrage
+    latency_dist: str = "lognormal"  # "fixed", "uniform" (±jitter) oder "lognormal"
+    jitter: float = 0.5  # Streuung: Anteil bei uniform, sigma bei lognormal
+    output_tokens_per_second: float = 0.0  # >0: zusätzliche Verzögerung je Antwort-Token
+    rate_429: float = 0.0  # Anteil der Anfragen mit 429 (Rate Limit)
+    rate_5xx: float = 0.0  # Anteil der Anfragen mit 503
+    retry_after_s: float = 0.05  # Retry-After-Header bei 429
+    canned: Dict[str, Any] = field(default_factory=dict)  # "classify"/"qa" → feste Antwort
+    seed: int = 0
+
+
+def _tokens(text: str) -> int:
+    return max(1, math.ceil(len(text) / 4))
+
+
+class _Stats:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.counts: Dict[str, int] = {}
+
+    def inc(self, key: str) -> None:
+        with self.lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self.lock:
+            return dict(self.counts)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "_Server"
+    protocol_version = "HTTP/1.1"
+    # Header und Body gehen als getrennte Writes raus; ohne TCP_NODELAY kostet
+    # jede Keep-Alive-Antwort sonst ~40 ms Delayed-ACK-Wartezeit.
+    disable_nagle_algorithm = True
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 - API von http.server
+        pass
+
+    def _send(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self) -> None:  # noqa: N802 - API von http.server
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._send(400, {"error": {"message": "invalid JSON", "type": "invalid_request_error"}})
+            return
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send(404, {"error": {"message": f"unknown path {self.path}", "type": "not_found"}})
+            return
+        self.server.respond(self, payload)
+
+    def do_GET(self) -> None:  # noqa: N802 - API von http.server
+        # ``GET /v1/models`` dient `OpenAIClient.warm` nur zum Verbindungsaufbau
+        if not self.path.rstrip("/").endswith("/models"):
+            self._send(404, {"error": {"message": f"unknown path {self.path}", "type": "not_found"}})
+            return
+        self.server.stats.inc("models")
+        self._send(200, {"object": "list", "data": []})
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, addr, config: MockConfig):
+        super().__init__(addr, _Handler)
+        self.config = config
+        self.stats = _Stats()
+        self._rng = random.Random(config.seed)
+        self._rng_lock = threading.Lock()
+
+    def handle_error(self, request, client_address) -> None:
+        if isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            self.stats.inc("disconnects")  # Client hat die Anfrage abgebrochen
+            return
+        super().handle_error(request, client_address)
+
+    def _draw(self) -> tuple:
+        cfg = self.config
+        with self._rng_lock:
+            roll = self._rng.random()
+            if cfg.latency_dist == "fixed":
+                latency = cfg.latency_ms
+            elif cfg.latency_dist == "uniform":
+                latency = cfg.latency_ms * (1 + self._rng.uniform(-cfg.jitter, cfg.jitter))
+            else:
+                # Median = latency_ms, rechtsschief wie echte API-Latenzen
+                latency = cfg.latency_ms * self._rng.lognormvariate(0.0, cfg.jitter)
+            label = self._rng.choice(_LABELS)
+        return roll, max(0.0, latency) / 1000, label
+
+    def respond(self, handler: _Handler, payload: Dict[str, Any]) -> None:
+        cfg = self.config
+        roll, latency, label = self._draw()
+        self.stats.inc("requests")
+        time.sleep(latency)
+        if roll < cfg.rate_429:
+            self.stats.inc("429")
+            handler._send(
+                429,
+                {"error": {"message": "Rate limit reached (mock)", "type": "rate_limit_exceeded"}},
+                {"Retry-After": f"{cfg.retry_after_s:g}"},
+            )
+            return
+        if roll < cfg.rate_429 + cfg.rate_5xx:
+            self.stats.inc("5xx")
+            handler._send(
+                503, {"error": {"message": "Service unavailable (mock)", "type": "server_error"}}
+            )
+            return
+
+        messages = payload.get("messages") or []
+        system = next((m.get("content", "") for m in messages if m.get("role") == "system"), "")
+        user = next((m.get("content", "") for m in messages if m.get("role") == "user"), "")
+        stage = "classify" if "Klassifizierer" in system else "qa"
+        if stage in cfg.canned:
+            content = cfg.canned[stage]
+        elif stage == "classify":
+            content = {"label": label, "keep": True, "reason": "mock"}
+        else:
+            m = _N_CARDS_RE.search(user)
+            n = int(m.group(1)) if m else 3
+            content = [
+                {"frage": f"Mock-Frage {i + 1}?", "antwort": f"Mock-Antwort {i + 1}."}
+                for i in range(n)
+            ]
+        text = content if isinstance(content, str) else json.dumps(content, ensure_ascii=False)
+        prompt_tokens = sum(_tokens(m.get("content", "")) for m in messages)
+        completion_tokens = _tokens(text)
+        if cfg.output_tokens_per_second > 0:
+            time.sleep(completion_tokens / cfg.output_tokens_per_second)
+        self.stats.inc(f"ok_{stage}")
+        handler._send(
+            200,
+            {
+                "id": f"chatcmpl-mock-{uuid.uuid4().hex[:12]}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": payload.get("model", "mock"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": text},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                    "prompt_tokens_details": {"cached_tokens": 0},
+                },
+            },
+        )
+
+
+class MockOpenAIServer:
+    """Startet den Mock-Server in einem Hintergrund-Thread (Port 0 = frei wählen)."""
+
+    def __init__(self, config: Optional[MockConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self._server = _Server((host, port), config or MockConfig())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def config(self) -> MockConfig:
+        return self._server.config
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return self._server.stats.snapshot()
+
+    def start(self) -> "MockOpenAIServer":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="mock-openai", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "MockOpenAIServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def add_mock_arguments(ap: argparse.ArgumentParser) -> None:
+    """Gemeinsame Kommandozeilenoptionen für `MockConfig`."""
+    ap.add_argument("--latency-ms", type=float, default=50.0)
+    ap.add_argument("--latency-dist", choices=["fixed", "uniform", "lognormal"], default="lognormal")
+    ap.add_argument("--jitter", type=float, default=0.5)
+    ap.add_argument("--tokens-per-second", type=float, default=0.0)
+    ap.add_argument("--rate-429", type=float, default=0.0)
+    ap.add_argument("--rate-5xx", type=float, default=0.0)
+    ap.add_argument("--canned", help="JSON-Datei mit festen Antworten je Stufe (classify/qa)")
+    ap.add_argument("--seed", type=int, default=0)
+
+
+def config_from_args(args: argparse.Namespace) -> MockConfig:
+    canned = {}
+    if args.canned:
+        with open(args.canned, encoding="utf-8") as f:
+            canned = json.load(f)
+    return MockConfig(
+        latency_ms=args.latency_ms,
+        latency_dist=args.latency_dist,
+        jitter=args.jitter,
+        output_tokens_per_second=args.tokens_per_second,
+        rate_429=args.rate_429,
+        rate_5xx=args.rate_5xx,
+        canned=canned,
+        seed=args.seed,
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8089)
+    add_mock_arguments(ap)
+    args = ap.parse_args(argv)
+    server = MockOpenAIServer(config_from_args(args), host=args.host, port=args.port)
+    print(f"Mock-OpenAI unter {server.base_url} (Strg+C beendet)", flush=True)
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,108 @@
+"""Synthetische deutschsprachige Skript-PDFs für Benchmarks.
+
+`synthetic_pages` erzeugt reproduzierbare Seiten mit nummerierten
+Überschriften und Absätzen aus ganzen Sätzen; `write_pdf` schreibt sie ohne
+Zusatzpaket als einfache Text-PDF (Helvetica, WinAnsi), die pdfplumber und
+pypdf wie ein echtes Skript einlesen.
+"""
+
+from __future__ import annotations
+
+import random
+from pathlib import Path
+from typing import List, Sequence
+
+_SUBJECTS = [
+    "Die Zelle", "Das Enzym", "Der Stoffwechsel", "Die Membran", "Das Gesetz",
+    "Die Verwaltung", "Der Vertrag", "Die Bilanz", "Das Modell", "Die Hypothese",
+    "Der Algorithmus", "Die Funktion", "Das Experiment", "Die Theorie", "Der Markt",
+]
+_VERBS = [
+    "beschreibt", "reguliert", "beeinflusst", "bestimmt", "erklärt", "begrenzt",
+    "verändert", "ermöglicht", "erfordert", "verbindet",
+]
+_OBJECTS = [
+    "den Austausch von Stoffen", "die Verteilung der Ressourcen", "das Verhalten des Systems",
+    "die Wirkung äußerer Einflüsse", "den Ablauf der Reaktion", "die Haftung der Parteien",
+    "die Größe der Stichprobe", "die Stabilität des Gleichgewichts", "die Rechte Dritter",
+    "den Übergang zwischen Zuständen",
+]
+_TAILS = [
+    "unter definierten Bedingungen", "in der Regel", "nach geltender Auffassung",
+    "bei steigender Temperatur", "im Gegensatz zur älteren Lehre", "nur mittelbar",
+    "über mehrere Stufen", "gemäß Abschnitt 3", "auch ohne äußeren Anlass",
+]
+
+
+def _sentence(rng: random.Random) -> str:
+    return (
+        f"{rng.choice(_SUBJECTS)} {rng.choice(_VERBS)} {rng.choice(_OBJECTS)} "
+        f"{rng.choice(_TAILS)}."
+    )
+
+
+def synthetic_pages(
+    n_pages: int,
+    paragraphs_per_page: int = 3,
+    sentences_per_paragraph: int = 4,
+    seed: int = 0,
+) -> List[str]:
+    """Seitentexte mit Kapitelüberschriften (``"2.1 Titel"``) und Absätzen."""
+    rng = random.Random(seed)
+    pages = []
+    for no in range(1, n_pages + 1):
+        lines = [f"{(no - 1) // 4 + 1}.{(no - 1) % 4 + 1} {rng.choice(_SUBJECTS)[4:]}"]
+        for _ in range(paragraphs_per_page):
+            lines.append("")
+            lines.extend(_sentence(rng) for _ in range(sentences_per_paragraph))
+        pages.append("\n".join(lines))
+    return pages
+
+
+def _escape(line: str) -> bytes:
+    raw = line.encode("cp1252", errors="replace")
+    return raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+def write_pdf(path: str | Path, pages: Sequence[str], font_size: int = 10) -> Path:
+    """Schreibt ``pages`` (eine Zeichenkette je Seite, Zeilen per ``\\n``) als PDF."""
+    leading = font_size + 4
+    objects: List[bytes] = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"",  # Seitenbaum, unten gefüllt
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    ]
+    kids = []
+    for text in pages:
+        ops = [b"BT", b"/F1 %d Tf" % font_size, b"%d TL" % leading, b"50 800 Td"]
+        for line in text.split("\n"):
+            ops.append(b"(" + _escape(line) + b") Tj T*")
+        ops.append(b"ET")
+        stream = b"\n".join(ops)
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_no = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_no
+        )
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % k for k in kids),
+        len(kids),
+    )
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % i + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    path = Path(path)
+    path.write_bytes(bytes(out))
+    return path
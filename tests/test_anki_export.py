@@ -0,0 +1,57 @@
+import json
+import sqlite3
+import zipfile
+
+import pytest
+
+from app.analytics_export import to_jsonl, to_parquet
+from app.anki_export import note_guid, to_apkg
+from app.pipeline_models import CardRow
+
+
+def _rows():
+    yield CardRow("Original <1>", ["Was ist A?", "Was ist B?"], ["A", "B"], ["Definition"], "S. 1", 1, 1)
+    yield CardRow("Original 2", ["Was ist C?"], ["C"], [], "S. 2–3", 2, 3)
+
+
+def test_to_apkg_builds_collection(tmp_path):
+    out = tmp_path / "deck.apkg"
+    assert to_apkg(_rows(), out, deck_name="Bio") == 3
+
+    with zipfile.ZipFile(out) as zf:
+        assert set(zf.namelist()) == {"collection.anki2", "media"}
+        assert json.loads(zf.read("media")) == {}
+        zf.extract("collection.anki2", tmp_path)
+
+    conn = sqlite3.connect(tmp_path / "collection.anki2")
+    notes = conn.execute("SELECT guid, tags, flds, sfld FROM notes ORDER BY id").fetchall()
+    assert [n[3] for n in notes] == ["Was ist A?", "Was ist B?", "Was ist C?"]
+    assert notes[0][0] == note_guid("Bio", "Was ist A?", "A")
+    assert notes[0][1] == " Definition "
+    assert notes[0][2].split("\x1f") == ["Was ist A?", "A", "Original &lt;1&gt;", "S. 1"]
+    assert conn.execute("SELECT count(*) FROM cards").fetchone() == (3,)
+    decks = json.loads(conn.execute("SELECT decks FROM col").fetchone()[0])
+    assert "Bio" in {d["name"] for d in decks.values()}
+    conn.close()
+
+
+def test_note_guid_is_stable():
+    assert note_guid("Bio", "F", "A") == note_guid("Bio", "F", "A")
+    assert note_guid("Bio", "F", "A") != note_guid("Chemie", "F", "A")
+
+
+def test_to_jsonl_one_line_per_card(tmp_path):
+    out = tmp_path / "karten.jsonl"
+    assert to_jsonl(_rows(), out) == 3
+    recs = [json.loads(ln) for ln in out.read_text(encoding="utf-8").splitlines()]
+    assert [r["card_index"] for r in recs] == [0, 1, 2]
+    assert recs[2]["row_index"] == 1 and recs[2]["end_page"] == 3
+
+
+def test_to_parquet_round_trip(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    out = tmp_path / "karten.parquet"
+    assert to_parquet(_rows(), out, batch_size=2) == 3
+    table = pq.read_table(out)
+    assert table.column("frage").to_pylist() == ["Was ist A?", "Was ist B?", "Was ist C?"]
+    assert table.column("labels").to_pylist()[0] == ["Definition"]
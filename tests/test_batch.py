@@ -0,0 +1,87 @@
+import io
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app import batch
+from app.cache import ResponseCache
+from app.openai_client import OpenAIClient, OpenAISettings
+
+
+def _events(out):
+    return [json.loads(line) for line in out.getvalue().splitlines()]
+
+
+def test_response_cache_roundtrip(tmp_path):
+    cache = ResponseCache(tmp_path / "r.sqlite")
+    key = cache.key("m", [{"role": "user", "content": "x"}], temperature=0.2)
+    assert key != cache.key("m", [{"role": "user", "content": "x"}])
+    assert cache.get(key) is None
+    cache.put(key, '{"a": 1}', "m")
+    assert ResponseCache(tmp_path / "r.sqlite").get(key) == '{"a": 1}'
+
+
+def test_client_uses_cache_and_shares_usage(tmp_path, monkeypatch):
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs["model"])
+        usage = SimpleNamespace(prompt_tokens=10, completion_tokens=5, prompt_tokens_details=None)
+        msg = SimpleNamespace(content='{"label": "Fakt", "keep": true, "reason": ""}')
+        return SimpleNamespace(choices=[SimpleNamespace(message=msg)], usage=usage)
+
+    fake = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    client = OpenAIClient(OpenAISettings(api_key="x"), cache=ResponseCache(tmp_path / "r.sqlite"))
+    monkeypatch.setattr(client, "_client", fake)
+    a, b = client.for_owner("a"), client.for_owner("b")
+    assert a.classify_segment("Text")["label"] == "Fakt"
+    assert b.classify_segment("Text")["label"] == "Fakt"
+    assert len(calls) == 1
+    model = client.settings.classify_model
+    assert client.usage("a")[model]["input"] == 10
+    assert client.usage("b")[model] == {
+        "requests": 0, "cache_hits": 1, "input": 0, "output": 0, "cached": 0,
+    }
+
+
+def test_find_documents_smallest_first(tmp_path):
+    (tmp_path / "gross.pdf").write_bytes(b"x" * 100)
+    (tmp_path / "klein.pdf").write_bytes(b"x")
+    (tmp_path / "notiz.txt").write_text("x")
+    paths = batch.find_documents([str(tmp_path), str(tmp_path / "*.pdf")])
+    assert [p.name for p in paths] == ["klein.pdf", "gross.pdf"]
+
+
+def test_batch_against_mock_with_cache(tmp_path, monkeypatch):
+    pytest.importorskip("openai")
+    from benchmarks.mock_openai import MockConfig, MockOpenAIServer
+    from benchmarks.synthetic_pdf import synthetic_pages, write_pdf
+
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    src = tmp_path / "skripte"
+    src.mkdir()
+    write_pdf(src / "eins.pdf", synthetic_pages(1, seed=1))
+    write_pdf(src / "zwei.pdf", synthetic_pages(3, seed=2))
+    argv = [str(src), "--out-dir", str(tmp_path / "out"), "--format", "jsonl",
+            "--questions", "2", "--docs", "2", "--max-concurrent", "2", "--cache",
+            "--cache-path", str(tmp_path / "cache.sqlite")]
+    with MockOpenAIServer(MockConfig(latency_ms=1, latency_dist="fixed")) as srv:
+        argv += ["--base-url", srv.base_url]
+        out = io.StringIO()
+        assert batch.main(argv, stream=out) == batch.EXIT_OK
+        first = _events(out)
+        served = srv.stats["requests"]
+        out = io.StringIO()
+        assert batch.main(argv, stream=out) == batch.EXIT_OK
+        assert srv.stats["requests"] == served  # zweiter Lauf komplett aus dem Cache
+    docs = [e for e in first if e["event"] == "document"]
+    assert {d["doc"] for d in docs} == {"eins", "zwei"}
+    assert all(d["status"] == "ok" and d["cards"] > 0 for d in docs)
+    assert {e["doc"] for e in first if e["event"] == "progress"} == {"eins", "zwei"}
+    summary = first[-1]
+    assert summary["event"] == "summary" and summary["ok"] == 2
+    assert summary["requests"] == served and summary["tokens"]["input"] > 0
+    second = _events(out)[-1]
+    assert second["requests"] == 0 and second["cache_hits"] == served
+    assert (tmp_path / "out" / "eins.jsonl").exists()
@@ -0,0 +1,29 @@
+import json
+
+from benchmarks import bench_text
+
+
+def test_scaling_exponent_and_compare():
+    linear = [(n, n * 1e-6) for n in (10, 100, 1000)]
+    quadratic = [(n, n * n * 1e-9) for n in (10, 100, 1000)]
+    assert abs(bench_text.scaling_exponent(linear) - 1.0) < 1e-9
+    assert abs(bench_text.scaling_exponent(quadratic) - 2.0) < 1e-9
+    assert bench_text.scaling_exponent([(10, 0.1)]) is None
+
+    results = [{"case": "segment_text", "pages": 10, "chars_per_second": 70}]
+    assert bench_text.compare(results, {"segment_text": {"10": 80}}, 0.25) == []
+    assert len(bench_text.compare(results, {"segment_text": {"10": 100}}, 0.25)) == 1
+
+
+def test_main_saves_and_checks_baseline(tmp_path, capsys):
+    baseline = tmp_path / "baseline.json"
+    args = ["--pages", "2", "4", "--cases", "segment_text", "split_sentences",
+            "--repeat", "1", "--baseline", str(baseline)]
+    assert bench_text.main(args + ["--save-baseline", "--max-exponent", "10"]) == 0
+    saved = json.loads(baseline.read_text(encoding="utf-8"))
+    assert set(saved) == {"segment_text", "split_sentences"}
+    assert set(saved["segment_text"]) == {"2", "4"}
+
+    baseline.write_text(json.dumps({"segment_text": {"2": 1e15}}), encoding="utf-8")
+    assert bench_text.main(args + ["--max-exponent", "10"]) == 1
+    assert "REGRESSION: segment_text @ 2 Seiten" in capsys.readouterr().err
@@ -0,0 +1,113 @@
+import threading
+import time
+
+import pytest
+
+from benchmarks.mock_openai import MockConfig, MockOpenAIServer
+
+from app.cancel import CancelToken, Cancelled
+from app.openai_client import OpenAIClient, OpenAISettings
+from app.pipeline import LernkartenPipeline
+from app.pipeline_models import Segment
+from app.ratelimit import FairRateLimiter
+
+
+def _cancel_to_idle(fn, token, after=0.3):
+    """Ruft ``fn`` in einem Thread auf, bricht nach ``after`` ab; liefert (Fehler, Sekunden bis Ende)."""
+    outcome = {}
+
+    def target():
+        try:
+            fn()
+        except BaseException as e:  # noqa: BLE001 - wird im Test geprüft
+            outcome["error"] = e
+
+    t = threading.Thread(target=target)
+    t.start()
+    time.sleep(after)
+    cancelled_at = time.perf_counter()
+    token.cancel()
+    t.join(10)
+    assert not t.is_alive()
+    return outcome.get("error"), time.perf_counter() - cancelled_at
+
+
+def test_callbacks_run_once_and_immediately_after_cancel():
+    token = CancelToken()
+    calls = []
+    token.add_callback(lambda: calls.append("a"))
+    token.cancel()
+    token.cancel()
+    token.add_callback(lambda: calls.append("b"))
+    assert calls == ["a", "b"]
+    with pytest.raises(Cancelled, match="Abgebrochen"):
+        token.check()
+
+
+def test_cancel_closes_in_flight_request():
+    with MockOpenAIServer(MockConfig(latency_ms=5000, latency_dist="fixed")) as srv:
+        token = CancelToken()
+        client = OpenAIClient(OpenAISettings(api_key="mock", base_url=srv.base_url), cancel=token)
+        error, seconds = _cancel_to_idle(lambda: client.classify_segment("Text"), token)
+    assert isinstance(error, Cancelled)
+    assert seconds < 1.0
+
+
+def test_cancel_interrupts_retry_backoff():
+    config = MockConfig(latency_ms=1, latency_dist="fixed", rate_429=1.0, retry_after_s=20)
+    with MockOpenAIServer(config) as srv:
+        token = CancelToken()
+        client = OpenAIClient(OpenAISettings(api_key="mock", base_url=srv.base_url), cancel=token)
+        error, seconds = _cancel_to_idle(lambda: client.classify_segment("Text"), token)
+        assert srv.stats["429"] == 1  # kein weiterer Versuch nach dem Abbruch
+    assert isinstance(error, Cancelled)
+    assert seconds < 1.0
+
+
+def test_run_is_idle_shortly_after_cancel():
+    segments = [Segment(text=f"Satz {i}. Noch ein Satz.") for i in range(8)]
+    with MockOpenAIServer(MockConfig(latency_ms=2000, latency_dist="fixed")) as srv:
+        settings = OpenAISettings(api_key="mock", base_url=srv.base_url)
+        token = CancelToken()
+        pipe = LernkartenPipeline(settings, client=OpenAIClient(settings).with_cancel(token))
+        error, seconds = _cancel_to_idle(
+            lambda: pipe.run(segments, max_questions_per_chunk=1), token
+        )
+        requests = srv.stats["requests"]
+    assert isinstance(error, RuntimeError) and str(error) == "Abgebrochen"
+    assert seconds < 1.0
+    assert requests == 1  # nur die erste Klassifikation war unterwegs
+    assert not [t for t in threading.enumerate() if t.name.startswith("run-")]
+
+
+def test_cancel_on_shared_pool_spares_other_requests():
+    with MockOpenAIServer(MockConfig(latency_ms=1000, latency_dist="fixed")) as srv:
+        settings = OpenAISettings(api_key="mock", base_url=srv.base_url)
+        shared = OpenAIClient(settings)
+        token = CancelToken()
+        other = {}
+        t = threading.Thread(target=lambda: other.setdefault("data", shared.classify_segment("B")))
+        t.start()
+        error, seconds = _cancel_to_idle(
+            lambda: shared.with_cancel(token).classify_segment("A"), token
+        )
+        t.join(10)
+    assert isinstance(error, Cancelled) and seconds < 0.5
+    assert other["data"]["keep"] is True  # Anfrage ohne Token lief normal zu Ende
+
+
+def test_cancel_while_queued_for_rate_limit_slot():
+    with MockOpenAIServer(MockConfig(latency_ms=1, latency_dist="fixed")) as srv:
+        settings = OpenAISettings(api_key="mock", base_url=srv.base_url)
+        limiter = FairRateLimiter(max_concurrent=1)
+        limiter.acquire("anderes")  # Slot belegt: die Anfrage wartet in der Warteschlange
+        token = CancelToken()
+        client = OpenAIClient(settings, limiter=limiter, owner="doc", cancel=token)
+        error, seconds = _cancel_to_idle(lambda: client.classify_segment("Text"), token)
+        assert srv.stats.get("requests", 0) == 0
+        assert limiter._waiting == {} and not limiter._rotation
+        limiter.release()
+        # Das Ticket blockiert nachfolgende Anfragen nicht
+        assert OpenAIClient(settings, limiter=limiter).classify_segment("B")["keep"] is True
+    assert isinstance(error, Cancelled)
+    assert seconds < 0.5
@@ -0,0 +1,47 @@
+import dataclasses
+
+import pytest
+
+from app.card_store import CardStore
+from app.excel_export import iter_records
+from app.pipeline_models import CardRow, Segment
+from app.workqueue import segment_from_dict, segment_to_dict
+
+
+def _rows():
+    text = "Die Zelle ist die kleinste Einheit des Lebens. Ä-Ö-Ü ß"
+    return [
+        CardRow(text, ["F1", "F2 ✓"], ["A1", "A2"], ["Definition"], "S. 1", 1, 1, 0),
+        CardRow("Zweites Segment", ["F3"], ["A3"], [], "S. 2–3", 2, 3, 1),
+        CardRow(text, ["F4"], ["A4"], ["Fakt"], "S. 1", 1, 1, 0),
+    ]
+
+
+def test_store_roundtrip_matches_export_records():
+    rows = _rows()
+    store = CardStore(rows)
+
+    assert len(store) == 4
+    assert list(store.records()) == list(iter_records(rows))
+    assert store.card(1) == (rows[0].original, "F2 ✓", "A2")
+    assert list(store.rows()) == rows
+    # Originaltext je Segment nur einmal abgelegt
+    assert len(store._texts) == 2
+
+
+def test_models_use_slots_and_declare_label():
+    seg = Segment("Text", label="Fakt", id=3)
+    assert not hasattr(seg, "__dict__")
+    assert "label" in {f.name for f in dataclasses.fields(Segment)}
+    with pytest.raises(AttributeError):
+        seg.unbekannt = 1
+    assert segment_from_dict(segment_to_dict(seg)).label == "Fakt"
+    assert not hasattr(CardRow("o", [], [], []), "__dict__")
+
+
+def test_store_uses_less_memory_than_legacy_rows():
+    from benchmarks.bench_card_memory import measure
+
+    legacy = measure("legacy", 2000)["overhead_per_card"]
+    store = measure("store", 2000)["overhead_per_card"]
+    assert store < legacy / 1.5
@@ -1,10 +1,13 @@
 import re
 
 from app.chunking import (
+    chapter_matches,
     is_heading_like,
+    select_chapters,
     smart_split,
     split_by_sentences,
     split_into_chunks,
+    split_sentences,
     take_last_sentences,
 )
 from app.models import count_tokens_rough
@@ -48,3 +51,43 @@ def test_take_last_sentences_up_to_token_limit():
     approx = count_tokens_rough(sents[-1]) + count_tokens_rough(sents[-2])
     result = take_last_sentences(text, approx_tokens=approx)
     assert result == " ".join(sents[-2:])
+
+
+def test_chapter_matches_patterns():
+    assert chapter_matches("3", "3.*")
+    assert chapter_matches("3.2.1", "3.*")
+    assert not chapter_matches("31", "3.*")
+    assert chapter_matches("3.2", "3.2")
+    assert not chapter_matches("3.3", "3.2")
+    assert chapter_matches("4.1", "[34].*")
+
+
+def test_select_chapters_keeps_only_matching_sections():
+    pages = [
+        (1, "2 Grundlagen\nText zu zwei."),
+        (2, "Mehr zu zwei.\n3 Methoden\nText zu drei."),
+        (3, "3.1 Details\nNoch mehr.\n4 Ergebnisse\nText zu vier."),
+    ]
+    selected = select_chapters(pages, ["3.*"])
+    assert selected == [
+        (2, "3 Methoden\nText zu drei."),
+        (3, "3.1 Details\nNoch mehr."),
+    ]
+
+
+def test_select_chapters_ignores_numbered_body_lines():
+    pages = [(1, "3 Methoden\n2 Liter Wasser:\nText zu drei.\n4 Ergebnisse\nText zu vier.")]
+    assert select_chapters(pages, ["3"]) == [(1, "3 Methoden\n2 Liter Wasser:\nText zu drei.")]
+
+
+def test_split_sentences_bullets_and_sentence_ends():
+    assert split_sentences("1. Erstens\n2. Zweitens\n3) Drittens") == [
+        "1. Erstens",
+        "2. Zweitens",
+        "3) Drittens",
+    ]
+    assert split_sentences("Erster Satz. Zweiter\nSatz! dritter Teil? Ende.") == [
+        "Erster Satz.",
+        "Zweiter Satz! dritter Teil?",
+        "Ende.",
+    ]
@@ -0,0 +1,94 @@
+import io
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from app import cli
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _events(stream):
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_cli_does_not_import_gui_stack():
+    code = (
+        "import json, sys\n"
+        "import app.cli\n"
+        "print(json.dumps(sorted(sys.modules)))\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    loaded = set(json.loads(out))
+    assert not {"tkinter", "ttkbootstrap", "app.main", "app.gui", "app.theme"} & loaded
+
+    proc = subprocess.run(
+        [sys.executable, "-m", "app", "--help"], cwd=ROOT, capture_output=True, text=True
+    )
+    assert proc.returncode == 0 and "--out-dir" in proc.stdout
+
+
+def test_cli_missing_file_exit_code(tmp_path):
+    out = io.StringIO()
+    assert cli.main([str(tmp_path / "fehlt.pdf")], stream=out) == cli.EXIT_INPUT
+    assert _events(out)[-1]["event"] == "error"
+
+
+@pytest.mark.parametrize("extra", [[], ["--columnar", "--anki"]])
+def test_cli_full_run_against_mock(tmp_path, monkeypatch, extra):
+    pytest.importorskip("openai")
+    from benchmarks.mock_openai import MockConfig, MockOpenAIServer
+    from benchmarks.synthetic_pdf import synthetic_pages, write_pdf
+
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    pdf = write_pdf(tmp_path / "skript.pdf", synthetic_pages(2))
+    out = io.StringIO()
+    with MockOpenAIServer(MockConfig(latency_ms=1, latency_dist="fixed")) as srv:
+        code = cli.main(
+            [str(pdf), "--out", str(tmp_path / "karten.jsonl"), "--base-url", srv.base_url,
+             "--questions", "2", *extra],
+            stream=out,
+        )
+    assert code == cli.EXIT_OK
+    events = _events(out)
+    assert [e["event"] for e in events[:2]] == ["start", "segmented"]
+    assert {e["stage"] for e in events if e["event"] == "progress"} == {"classify", "qa"}
+    done = events[-1]
+    assert done["event"] == "done" and done["cards"] > 0
+    assert len((tmp_path / "karten.jsonl").read_text(encoding="utf-8").splitlines()) == done["rows"]
+    if "--anki" in extra:
+        assert Path(done["anki"]).stat().st_size > 0
+
+
+@pytest.mark.parametrize("status, expected", [(401, cli.EXIT_AUTH), (400, cli.EXIT_ERROR)])
+def test_cli_no_cards_exit_code_by_error_class(tmp_path, monkeypatch, status, expected):
+    pytest.importorskip("openai")
+    from types import SimpleNamespace
+
+    from app import metrics
+    from app.openai_client import OpenAIClient
+    from benchmarks.mock_openai import MockConfig, MockOpenAIServer
+    from benchmarks.synthetic_pdf import synthetic_pages, write_pdf
+
+    def failing_qa(self, *args, **kwargs):
+        err = SimpleNamespace(status_code=status)
+        metrics.inc("openai_errors_total", model="mock", error=metrics.error_class(err))
+        raise RuntimeError(f"HTTP {status}")
+
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.setattr(OpenAIClient, "gen_qa_for_chunk", failing_qa)
+    metrics.REGISTRY.reset()
+    pdf = write_pdf(tmp_path / "skript.pdf", synthetic_pages(1))
+    out = io.StringIO()
+    with MockOpenAIServer(MockConfig(latency_ms=1, latency_dist="fixed")) as srv:
+        code = cli.main(
+            [str(pdf), "--out", str(tmp_path / "karten.jsonl"), "--base-url", srv.base_url],
+            stream=out,
+        )
+    assert code == expected
+    assert _events(out)[-1]["type"] == "NoCards"
@@ -0,0 +1,58 @@
+import csv
+
+import pytest
+
+import app.excel_export as excel_export
+from app.pipeline_models import CardRow
+
+
+def _rows():
+    yield CardRow("Original A", ["F1", "F2"], ["A1", "A2"], ["Fakt"], source="S. 1")
+    yield CardRow("Original B\x0c", ["F3"], ["A3"], [], source="S. 2")
+
+
+def test_to_excel_csv_fallback_from_iterator(monkeypatch, tmp_path):
+    def no_xlsx(rows, out_path):
+        raise ImportError("kein XLSX-Writer")
+
+    monkeypatch.setattr(excel_export, "write_xlsx_stream", no_xlsx)
+    excel_export.to_excel(_rows(), str(tmp_path / "out.xlsx"))
+
+    with (tmp_path / "out.csv").open(encoding="utf-8", newline="") as f:
+        records = list(csv.reader(f))
+    assert records[0] == excel_export.COLUMNS
+    assert [r[1] for r in records[1:]] == ["F1", "F2", "F3"]
+    assert records[3][4] == "S. 2"
+
+
+def test_to_excel_empty_iterator_touches_file(tmp_path):
+    out = tmp_path / "leer.xlsx"
+    excel_export.to_excel(iter([]), str(out))
+    assert out.exists() and out.stat().st_size == 0
+
+
+def test_write_xlsx_stream_openpyxl(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    out = tmp_path / "out.xlsx"
+    assert excel_export.write_xlsx_stream(_rows(), out) == 3
+
+    ws = openpyxl.load_workbook(out).active
+    values = [[c.value for c in row] for row in ws.iter_rows()]
+    assert values[0] == excel_export.COLUMNS
+    assert values[3][0] == "Original B"
+
+
+def test_openpyxl_writes_original_once_per_card(tmp_path):
+    pytest.importorskip("openpyxl")
+    import zipfile
+
+    out = tmp_path / "out.xlsx"
+    excel_export.write_xlsx_stream(_rows(), out)
+    with zipfile.ZipFile(out) as zf:
+        sheet = next(zf.read(n) for n in zf.namelist() if n.startswith("xl/worksheets/"))
+        assert not any(n.endswith("sharedStrings.xml") for n in zf.namelist()) or (
+            b"Original A" not in zf.read("xl/sharedStrings.xml")
+        )
+    # Inline-Strings: je Frage eine Kopie, keine Shared-Strings-Tabelle
+    assert sheet.count(b"Original A") == 2
+    assert sheet.count(b"Original B") == 1
@@ -0,0 +1,98 @@
+import csv
+import json
+
+import pytest
+
+import app.export_sinks as export_sinks
+from app.export_sinks import CsvSink, JsonlSink, XlsxSink, open_sink
+from app.pipeline_models import CardRow
+
+
+def _row(i):
+    return CardRow(f"Original {i}", [f"F{i}a", f"F{i}b"], [f"A{i}a", f"A{i}b"], ["Fakt"], source=f"S. {i}")
+
+
+def test_csv_sink_is_readable_before_close(tmp_path):
+    path = tmp_path / "karten.csv"
+    sink = CsvSink(path, flush_every=1)
+    sink.write(_row(1))
+
+    with path.open(encoding="utf-8", newline="") as f:
+        records = list(csv.reader(f))
+    assert records[0][0] == "Original"
+    assert [r[1] for r in records[1:]] == ["F1a", "F1b"]
+
+    sink.write(_row(2))
+    sink.close()
+    assert sink.rows_written == 4
+    with pytest.raises(ValueError):
+        sink.write(_row(3))
+
+
+def test_jsonl_sink_writes_one_object_per_card(tmp_path):
+    path = tmp_path / "karten.jsonl"
+    with open_sink(path) as sink:
+        assert isinstance(sink, JsonlSink)
+        sink.write(_row(1))
+    lines = [json.loads(ln) for ln in path.read_text(encoding="utf-8").splitlines()]
+    assert [ln["Frage"] for ln in lines] == ["F1a", "F1b"]
+    assert lines[0]["Quelle"] == "S. 1"
+
+
+def test_xlsx_sink_finalizes_on_close(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    path = tmp_path / "karten.xlsx"
+    sink = XlsxSink(path, flush_every=1)
+    sink.write(_row(1))
+    assert sink.spool_path.exists() and not path.exists()
+    sink.close()
+
+    assert not sink.spool_path.exists()
+    ws = openpyxl.load_workbook(path).active
+    assert [c.value for c in next(ws.iter_rows())] == ["Original", "Frage", "Antwort", "Labels", "Quelle"]
+    assert ws.max_row == 3
+
+
+def test_xlsx_sink_keeps_csv_without_writer(monkeypatch, tmp_path):
+    def no_writer(records, out_path):
+        raise ImportError("kein XLSX-Writer")
+
+    monkeypatch.setattr(export_sinks, "write_xlsx_records", no_writer)
+    sink = XlsxSink(tmp_path / "karten.xlsx")
+    sink.write(_row(1))
+    sink.close()
+    assert sink.path == tmp_path / "karten.csv"
+    assert sink.path.exists()
+
+
+def test_open_sink_rejects_unknown_suffix(tmp_path):
+    with pytest.raises(ValueError):
+        open_sink(tmp_path / "karten.txt")
+
+
+def test_xlsx_sink_sorts_by_segment_on_close(monkeypatch, tmp_path):
+    written = []
+    monkeypatch.setattr(
+        export_sinks, "write_xlsx_records", lambda records, out_path: written.extend(records)
+    )
+    sink = XlsxSink(tmp_path / "karten.xlsx", flush_every=1)
+    for i in (2, 0, 1):
+        row = _row(i)
+        row.segment_id = i
+        sink.write(row)
+    with sink.spool_path.open(encoding="utf-8", newline="") as f:
+        assert [r[0] for r in list(csv.reader(f))[1:]] == ["2", "2", "0", "0", "1", "1"]
+    sink.close()
+
+    assert [r[1] for r in written] == ["F0a", "F0b", "F1a", "F1b", "F2a", "F2b"]
+    assert list(written[0]) == ["Original 0", "F0a", "A0a", "Fakt", "S. 0"]
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".jsonl"])
+def test_reopened_sink_replaces_previous_run(tmp_path, suffix):
+    path = tmp_path / f"karten{suffix}"
+    for _ in range(2):  # z. B. zweiter CLI-Lauf oder neu gestarteter Dienst-Job
+        with open_sink(path) as sink:
+            sink.write(_row(1))
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == (3 if suffix == ".csv" else 2)  # ggf. Kopfzeile + zwei Karten
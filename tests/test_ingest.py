@@ -0,0 +1,136 @@
+import functools
+import threading
+
+import pytest
+
+from app.cancel import CancelToken, Cancelled
+from app.ingest import BackgroundJob, ingest_pdf
+
+
+def _pdf(tmp_path, n=4):
+    from benchmarks.synthetic_pdf import synthetic_pages, write_pdf
+
+    return str(write_pdf(tmp_path / "skript.pdf", synthetic_pages(n)))
+
+
+def test_ingest_reports_stages_in_order(tmp_path):
+    events = []
+    result = ingest_pdf(_pdf(tmp_path), progress_cb=lambda *e: events.append(e))
+
+    stages = [stage for stage, _, _ in events]
+    assert stages.index("pages") < stages.index("segments") < stages.index("tokens")
+    assert ("pages", 4, 4) in events
+    assert events[-1] == ("tokens", len(result.segments), len(result.segments))
+    assert result.page_count == 4
+    assert len(result.token_counts) == len(result.segments) > 0
+    assert result.avg_tokens > 0
+
+
+def test_ingest_stops_when_cancelled_during_pages(tmp_path):
+    token = CancelToken()
+    seen = []
+
+    def progress(stage, done, total):
+        seen.append((stage, done))
+        if done == 2:
+            token.cancel()
+
+    with pytest.raises(Cancelled):
+        ingest_pdf(_pdf(tmp_path), progress_cb=progress, token=token)
+    # Nach dem Abbruch wird keine weitere Seite gemeldet
+    assert seen == [("pages", 1), ("pages", 2)]
+
+
+def test_ingest_reports_and_cancels_ocr_pages(monkeypatch, tmp_path):
+    import app.ocr as ocr
+    import app.pdf_ingest as pdf_ingest
+
+    ocr_cfg = {"enabled": True, "workers": 1}
+    monkeypatch.setattr(pdf_ingest, "load_config", lambda: {"ocr": ocr_cfg})
+    monkeypatch.setattr(ocr, "ocr_pages", functools.partial(ocr.ocr_pages, cache_dir=None))
+    monkeypatch.setattr(
+        pdf_ingest, "extract_pages_from_pdf", lambda path, numbers, cb: [(1, ""), (2, ""), (3, "")]
+    )
+    monkeypatch.setattr(
+        ocr, "_render_pages", lambda path, numbers, res: ((n, b"%d" % n) for n in numbers)
+    )
+    monkeypatch.setattr(ocr, "_ocr_png", lambda png, language: "Text " + png.decode())
+    token = CancelToken()
+    events = []
+
+    def progress(stage, done, total):
+        events.append((stage, done, total))
+        if stage == "ocr" and done == 1:
+            token.cancel()
+
+    with pytest.raises(Cancelled):
+        ingest_pdf(_pdf(tmp_path), progress_cb=progress, token=token)
+    assert events == [("ocr", 1, 3)]
+
+
+def test_background_job_drops_superseded_result():
+    posted = []
+    job = BackgroundJob(lambda fn, *args: posted.append((fn, args)))
+    release = threading.Event()
+    results = []
+
+    def slow(token):
+        release.wait(5)
+        return "alt"
+
+    first = job.submit(slow, results.append)
+    second_done = threading.Event()
+
+    def fast(token):
+        second_done.set()
+        return "neu"
+
+    job.submit(fast, results.append)
+    assert first.cancelled
+    second_done.wait(5)
+    release.set()
+    for _ in range(100):
+        if len(posted) == 2:
+            break
+        threading.Event().wait(0.01)
+
+    # Zustellung erfolgt erst im "UI-Thread", hier: beim Abarbeiten von posted
+    for fn, args in posted:
+        fn(*args)
+    assert results == ["neu"]
+    assert not job.busy
+
+
+def test_background_job_cancel_and_errors():
+    job = BackgroundJob(lambda fn, *args: fn(*args))
+    errors = []
+    done = threading.Event()
+
+    def boom(token):
+        try:
+            raise ValueError("kaputt")
+        finally:
+            done.set()
+
+    job.submit(boom, lambda r: None, errors.append)
+    done.wait(5)
+    for _ in range(100):
+        if errors:
+            break
+        threading.Event().wait(0.01)
+    assert isinstance(errors[0], ValueError)
+
+    results = []
+    started = threading.Event()
+
+    def waits(token):
+        started.set()
+        token.wait(5)
+        token.check()
+        return "nie"
+
+    job.submit(waits, results.append)
+    started.wait(5)
+    job.cancel()
+    threading.Event().wait(0.05)
+    assert results == []
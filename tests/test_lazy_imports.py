@@ -0,0 +1,59 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from benchmarks.bench_import_time import LAZY_MODULES, parse_importtime
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_core_modules_do_not_import_heavy_dependencies() -> None:
+    code = (
+        "import json, sys\n"
+        "import app.pipeline, app.export_sinks, app.cost, app.labeling\n"
+        "print(json.dumps(sorted(sys.modules)))\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    loaded = set(json.loads(out))
+    assert not [m for m in LAZY_MODULES if m in loaded]
+
+
+def test_parse_importtime() -> None:
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   app.config\n"
+        "import time:       300 |        420 | app.pipeline\n"
+    )
+    assert parse_importtime(stderr) == [
+        ("app.config", 1, 120, 120),
+        ("app.pipeline", 0, 300, 420),
+    ]
+
+
+def test_tokenizer_lazy_load_is_thread_safe(monkeypatch) -> None:
+    import threading
+    import time
+    import types
+
+    from app.tokenizer_utils import Tokenizer
+
+    class Enc:
+        def encode(self, text):
+            return [0] * 1000
+
+    def get_encoding(name):
+        time.sleep(0.05)  # Laden dauert; andere Threads kommen in der Zwischenzeit an
+        return Enc()
+
+    monkeypatch.setitem(sys.modules, "tiktoken", types.SimpleNamespace(get_encoding=get_encoding))
+    tok = Tokenizer()
+    counts = []
+    threads = [threading.Thread(target=lambda: counts.append(tok.count("kurz"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert counts == [1000] * 8
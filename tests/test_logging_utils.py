@@ -0,0 +1,65 @@
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import app.logging_utils as lu
+from app.openai_client import OpenAIClient, OpenAISettings
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _wait_for_lines(path, n, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if path.exists():
+            lines = path.read_text(encoding="utf-8").splitlines()
+            if len(lines) >= n:
+                return lines
+        time.sleep(0.01)
+    raise AssertionError(f"{path} enthält keine {n} Zeilen")
+
+
+def test_get_logger_routes_through_queue():
+    # eigener Prozess, damit pytest-Handler am Root-Logger nicht stören
+    code = (
+        "import logging, logging.handlers\n"
+        "from app.logging_utils import get_logger\n"
+        "get_logger('a'); get_logger('b')\n"
+        "print([type(h).__name__ for h in logging.getLogger().handlers])\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    assert out.strip() == "['QueueHandler']"
+
+
+def test_request_log_records_chat_calls(tmp_path):
+    class FakeCompletions:
+        def create(self, **kwargs):
+            return SimpleNamespace(
+                choices=[SimpleNamespace(message=SimpleNamespace(content='{"label": "Fakt"}'))],
+                usage=SimpleNamespace(prompt_tokens=42, completion_tokens=7),
+            )
+
+    client = OpenAIClient(OpenAISettings(api_key="test", classify_model="m-klein"))
+    client._client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions()))
+
+    path = lu.enable_request_log(str(tmp_path / "requests.jsonl"))
+    try:
+        assert client.classify_segment("Ein Satz.") == {"label": "Fakt"}
+        lines = _wait_for_lines(path, 1)
+    finally:
+        lu.disable_request_log()
+
+    rec = json.loads(lines[0])
+    assert rec["model"] == "m-klein"
+    assert rec["stage"] == "classify"
+    assert rec["prompt_tokens"] == 42
+    assert rec["completion_tokens"] == 7
+    assert rec["retries"] == 0
+    assert rec["status"] == "ok"
+    assert rec["request_id"] and rec["latency_ms"] >= 0
+    assert not lu.request_log_enabled()
@@ -0,0 +1,109 @@
+import json
+from types import SimpleNamespace
+
+import app.openai_client as oc
+from app import metrics
+from app.metrics import MetricsRegistry
+
+
+def test_histogram_quantiles_and_exports(tmp_path):
+    reg = MetricsRegistry()
+    for ms in range(1, 101):
+        reg.observe("latency_seconds", ms / 100, model="m")
+    reg.inc("requests_total", model="m", stage="qa")
+    reg.inc("requests_total", 2, model="m", stage="qa")
+
+    summary = reg.histogram("latency_seconds", model="m").summary()
+    assert summary["count"] == 100
+    assert summary["p50"] == 0.5 and summary["p95"] == 0.95 and summary["p99"] == 0.99
+    assert reg.counter("requests_total", stage="qa", model="m") == 3
+
+    prom = reg.to_prometheus()
+    assert 'requests_total{model="m",stage="qa"} 3' in prom
+    assert 'latency_seconds_bucket{model="m",le="0.5"} 50' in prom
+    assert 'latency_seconds_bucket{model="m",le="+Inf"} 100' in prom
+
+    data = json.loads(reg.dump(tmp_path / "m.json").read_text(encoding="utf-8"))
+    assert data["requests_total"][0]["value"] == 3
+    assert reg.dump(tmp_path / "m.prom").read_text(encoding="utf-8") == prom
+
+
+def test_chat_records_requests_tokens_and_retries(monkeypatch):
+    monkeypatch.setattr(oc.time, "sleep", lambda s: None)
+    reg = metrics.REGISTRY
+
+    class RateLimited(oc.OpenAIError):
+        status_code = 429
+        retry_after = 1
+
+    calls = {"count": 0}
+
+    class FakeCompletions:
+        def create(self, **kwargs):
+            calls["count"] += 1
+            if calls["count"] == 1:
+                raise RateLimited("slow down")
+            usage = SimpleNamespace(
+                prompt_tokens=100,
+                completion_tokens=20,
+                prompt_tokens_details=SimpleNamespace(cached_tokens=64),
+            )
+            return SimpleNamespace(
+                choices=[SimpleNamespace(message=SimpleNamespace(content="[]"))], usage=usage
+            )
+
+    client = oc.OpenAIClient(oc.OpenAISettings(api_key="test", qa_model="m-metrics"))
+    client._client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions()))
+
+    before = {
+        "ok": reg.counter("openai_requests_total", model="m-metrics", stage="qa", status="ok"),
+        "429": reg.counter("openai_errors_total", model="m-metrics", error="429"),
+        "retries": reg.counter("openai_retries_total", model="m-metrics"),
+        "cached": reg.counter("openai_tokens_total", model="m-metrics", stage="qa", kind="cached"),
+    }
+    assert client.gen_qa_for_chunk("Text", 1) == []
+
+    assert reg.counter("openai_requests_total", model="m-metrics", stage="qa", status="ok") == (
+        before["ok"] + 1
+    )
+    assert reg.counter("openai_errors_total", model="m-metrics", error="429") == before["429"] + 1
+    assert reg.counter("openai_retries_total", model="m-metrics") == before["retries"] + 1
+    assert (
+        reg.counter("openai_tokens_total", model="m-metrics", stage="qa", kind="cached")
+        == before["cached"] + 64
+    )
+    assert reg.histogram("openai_request_seconds", model="m-metrics", stage="qa").count >= 1
+
+
+def test_error_class():
+    assert metrics.error_class(SimpleNamespace(status_code=503)) == "5xx"
+    assert metrics.error_class(SimpleNamespace(status_code=401)) == "auth"
+    assert metrics.error_class(SimpleNamespace(status_code=404)) == "auth"
+    assert metrics.error_class(SimpleNamespace(status_code=400)) == "4xx"
+    assert metrics.error_class(ValueError("x")) == "ValueError"
+
+
+def test_signal_dump_does_not_block_on_held_lock(tmp_path, monkeypatch):
+    import os
+    import signal
+    import threading
+
+    import pytest
+
+    if not hasattr(signal, "SIGUSR1"):
+        pytest.skip("kein SIGUSR1")
+    monkeypatch.setattr(metrics, "DEFAULT_DUMP_DIR", tmp_path)
+    previous = signal.getsignal(signal.SIGUSR1)
+    try:
+        assert metrics.install_signal_dump("json")
+        handled = threading.Event()
+        with metrics.REGISTRY._lock:  # Signal trifft mitten in inc()/observe()
+            os.kill(os.getpid(), signal.SIGUSR1)
+            handled.set()  # ohne Deadlock erreicht
+        assert handled.is_set()
+        for t in threading.enumerate():
+            if t.name == "metrics-dump":
+                t.join(5)
+    finally:
+        signal.signal(signal.SIGUSR1, previous)
+    assert list(tmp_path.glob("metrics_snapshot_*.json"))
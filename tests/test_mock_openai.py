@@ -0,0 +1,69 @@
+import json
+import urllib.error
+import urllib.request
+from types import SimpleNamespace
+
+import pytest
+
+from app.openai_client import OpenAIClient, OpenAISettings, _retry_after
+from app.pdf_ingest import extract_pages_from_pdf
+from benchmarks.mock_openai import MockConfig, MockOpenAIServer
+from benchmarks.synthetic_pdf import synthetic_pages, write_pdf
+
+
+def _post(url, payload):
+    req = urllib.request.Request(
+        url + "/chat/completions",
+        data=json.dumps(payload).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(req, timeout=5) as resp:
+        return json.loads(resp.read())
+
+
+def test_mock_answers_qa_and_injects_429():
+    payload = {
+        "model": "gpt-5-mini",
+        "messages": [
+            {"role": "system", "content": "Du erstellst Lernkarten"},
+            {"role": "user", "content": "Erzeuge 3 Lernkarten (Frage/Antwort) zum Text"},
+        ],
+    }
+    with MockOpenAIServer(MockConfig(latency_ms=0, latency_dist="fixed")) as srv:
+        body = _post(srv.base_url, payload)
+    items = json.loads(body["choices"][0]["message"]["content"])
+    assert len(items) == 3 and {"frage", "antwort"} <= set(items[0])
+    assert body["usage"]["completion_tokens"] > 0
+
+    with MockOpenAIServer(MockConfig(latency_ms=0, rate_429=1.0, retry_after_s=0.25)) as srv:
+        with pytest.raises(urllib.error.HTTPError) as exc:
+            _post(srv.base_url, payload)
+        assert srv.stats["429"] == 1
+    assert exc.value.code == 429
+    assert exc.value.headers["Retry-After"] == "0.25"
+
+
+def test_client_talks_to_mock_via_base_url():
+    pytest.importorskip("openai")
+    canned = {"classify": {"label": "Definition", "keep": False}}
+    with MockOpenAIServer(MockConfig(latency_ms=0, canned=canned)) as srv:
+        client = OpenAIClient(OpenAISettings(api_key="mock", base_url=srv.base_url))
+        assert client.classify_segment("Ein Satz.") == {"label": "Definition", "keep": False}
+        assert len(client.gen_qa_for_chunk("Text", 2)) == 2
+
+
+def test_retry_after_header():
+    resp = SimpleNamespace(headers={"retry-after": "1.5"})
+    assert _retry_after(SimpleNamespace(response=resp)) == 1.5
+    resp = SimpleNamespace(headers={"retry-after-ms": "250"})
+    assert _retry_after(SimpleNamespace(response=resp)) == 0.25
+    assert _retry_after(SimpleNamespace(retry_after=2)) == 2.0
+    assert _retry_after(ValueError()) is None
+
+
+def test_synthetic_pdf_is_readable(tmp_path):
+    pages = synthetic_pages(2, seed=1)
+    path = write_pdf(tmp_path / "s.pdf", pages)
+    extracted = extract_pages_from_pdf(str(path))
+    assert [no for no, _ in extracted] == [1, 2]
+    assert extracted[1][1].splitlines()[0] == pages[1].splitlines()[0]
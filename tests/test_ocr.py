@@ -0,0 +1,114 @@
+import threading
+import time
+
+import pytest
+
+import app.ocr as ocr
+
+
+def _fake_render(path, page_numbers, resolution):
+    for no in page_numbers:
+        yield no, f"bild-{no}".encode()
+
+
+def test_ocr_pages_uses_cache(monkeypatch, tmp_path):
+    calls = []
+
+    def fake_ocr(png, language):
+        calls.append(png)
+        return png.decode().replace("bild", "text")
+
+    monkeypatch.setattr(ocr, "_render_pages", _fake_render)
+    monkeypatch.setattr(ocr, "_ocr_png", fake_ocr)
+
+    texts, stats = ocr.ocr_pages("dummy.pdf", [3, 1], workers=1, cache_dir=tmp_path)
+    assert texts == {1: "text-1", 3: "text-3"}
+    assert stats.pages == 2 and stats.cached == 0
+
+    texts, stats = ocr.ocr_pages("dummy.pdf", [1, 3], workers=1, cache_dir=tmp_path)
+    assert texts == {1: "text-1", 3: "text-3"}
+    assert stats.cached == 2
+    assert len(calls) == 2
+
+
+def test_fill_empty_pages_only_touches_textless_pages(monkeypatch, tmp_path):
+    requested = []
+
+    def fake_ocr_pages(path, numbers, **kwargs):
+        requested.extend(numbers)
+        return {no: f"ocr {no}" for no in numbers}, ocr.OcrStats(pages=len(numbers))
+
+    monkeypatch.setattr(ocr, "ocr_pages", fake_ocr_pages)
+
+    pages = [(1, "Text"), (2, "  "), (3, "")]
+    assert ocr.fill_empty_pages("dummy.pdf", pages) == [(1, "Text"), (2, "ocr 2"), (3, "ocr 3")]
+    assert requested == [2, 3]
+
+
+def test_fill_empty_pages_without_dependencies(monkeypatch, caplog):
+    def missing(path, numbers, **kwargs):
+        raise ImportError("pytesseract missing")
+
+    monkeypatch.setattr(ocr, "ocr_pages", missing)
+    pages = [(1, "")]
+    with caplog.at_level("WARNING"):
+        assert ocr.fill_empty_pages("dummy.pdf", pages) == pages
+    assert any("OCR nicht verfügbar" in r.message for r in caplog.records)
+
+
+def test_ocr_pages_reports_progress_and_stops_on_cancel(monkeypatch):
+    from app.cancel import CancelToken, Cancelled
+
+    monkeypatch.setattr(ocr, "_render_pages", _fake_render)
+    monkeypatch.setattr(ocr, "_ocr_png", lambda png, language: png.decode())
+    token = CancelToken()
+    events = []
+
+    def progress(done, total):
+        events.append((done, total))
+        if done == 2:
+            token.cancel()
+
+    with pytest.raises(Cancelled):
+        ocr.ocr_pages(
+            "dummy.pdf", [1, 2, 3, 4], workers=1, cache_dir=None,
+            progress_cb=progress, token=token,
+        )
+    assert events == [(1, 4), (2, 4)]
+
+
+def test_ocr_pages_cancel_drops_pending_pool_pages(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from app.cancel import CancelToken, Cancelled
+
+    started, release = [], threading.Event()
+
+    def slow_ocr(png, language):
+        started.append(png)
+        release.wait(5)
+        return png.decode()
+
+    monkeypatch.setattr(ocr, "_render_pages", _fake_render)
+    monkeypatch.setattr(ocr, "_ocr_png", slow_ocr)
+    monkeypatch.setattr(ocr, "ProcessPoolExecutor", ThreadPoolExecutor)
+    token = CancelToken()
+    threading.Timer(0.1, token.cancel).start()
+    t0 = time.perf_counter()
+    with pytest.raises(Cancelled):
+        ocr.ocr_pages("dummy.pdf", range(1, 9), workers=2, cache_dir=None, token=token)
+    assert time.perf_counter() - t0 < 1.0  # nicht auf laufende Seiten gewartet
+    release.set()
+    time.sleep(0.05)
+    assert len(started) == 2  # ausstehende Seiten wurden nie begonnen
+
+
+def test_fill_empty_pages_passes_cancel_through(monkeypatch):
+    from app.cancel import Cancelled
+
+    def cancelled(path, numbers, **kwargs):
+        raise Cancelled()
+
+    monkeypatch.setattr(ocr, "ocr_pages", cancelled)
+    with pytest.raises(Cancelled):
+        ocr.fill_empty_pages("dummy.pdf", [(1, "")])
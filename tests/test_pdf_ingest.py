@@ -1,5 +1,6 @@
 import pytest
-from app.pdf_ingest import segment_text, extract_text_from_pdf
+import app.pdf_ingest as pdf_ingest
+from app.pdf_ingest import parse_page_range, segment_pages, segment_text, extract_text_from_pdf
 
 
 def test_segment_text_headings_and_blank_lines():
@@ -38,6 +39,74 @@ def test_segment_text_respects_min_max_length():
     assert second == "C" * 50
 
 
+def test_segment_pages_tracks_page_spans():
+    pages = [
+        (1, "A" * 60),
+        (2, "B" * 60 + "\n\nEINLEITUNG\n\n" + "C" * 120),
+        (3, ""),
+        (4, "D" * 30),
+    ]
+    segments = segment_pages(pages, min_len=100, max_len=200)
+    assert segments == [
+        ("A" * 60 + "\n\n" + "B" * 60, 1, 2),
+        ("EINLEITUNG", 2, 2),
+        ("C" * 120, 2, 2),
+        ("D" * 30, 4, 4),
+    ]
+    # Texte stimmen mit der seitenlosen Variante ueberein
+    joined = "\n\n".join(txt for _, txt in pages)
+    assert [s for s, _, _ in segments] == segment_text(joined, min_len=100, max_len=200)
+
+
+def test_parse_page_range():
+    assert parse_page_range("3-5, 1; 5") == [1, 3, 4, 5]
+    with pytest.raises(ValueError):
+        parse_page_range("5-3")
+    with pytest.raises(ValueError):
+        parse_page_range("abc")
+
+
+def test_load_pages_only_parses_selection(monkeypatch):
+    requested = []
+
+    def fake_extract(path, page_numbers=None, progress_cb=None):
+        requested.append(page_numbers)
+        return [(n, f"3 Kapitel\nSeite {n}") for n in page_numbers]
+
+    monkeypatch.setattr(pdf_ingest, "extract_pages_from_pdf", fake_extract)
+    monkeypatch.setattr(pdf_ingest, "_outline_pages", lambda path, chapters: [("3", 4, 6)])
+
+    pages = pdf_ingest.load_pages("dummy.pdf", pages="5-9", chapters=["3"])
+
+    assert requested == [[5, 6]]
+    assert [no for no, _ in pages] == [5, 6]
+
+
+def test_load_pages_chapter_heading_before_range(monkeypatch):
+    texts = {
+        4: "2.3 Ende von zwei\nRest.\n3 Methoden\nEinleitung zu drei.",
+        5: "Fließtext zu drei.\n2 Liter Wasser:\nweiter im Kapitel.",
+        6: "Schluss von drei.\n4 Ergebnisse\nText zu vier.",
+    }
+    monkeypatch.setattr(
+        pdf_ingest,
+        "extract_pages_from_pdf",
+        lambda path, page_numbers=None, progress_cb=None: [(n, texts[n]) for n in page_numbers],
+    )
+    monkeypatch.setattr(pdf_ingest, "_outline_pages", lambda path, chapters: [("3", 4, 6)])
+
+    # Die Überschrift "3 Methoden" steht auf Seite 4, gelesen werden nur 5–6
+    pages = pdf_ingest.load_pages("dummy.pdf", pages="5-6", chapters=["3"], ocr=False)
+    assert pages == [
+        (5, "Fließtext zu drei.\n2 Liter Wasser:\nweiter im Kapitel."),
+        (6, "Schluss von drei."),
+    ]
+
+    # Mit Seite 4 beginnt die Auswahl erst an der Überschrift
+    pages = pdf_ingest.load_pages("dummy.pdf", pages="4-6", chapters=["3"], ocr=False)
+    assert pages[0] == (4, "3 Methoden\nEinleitung zu drei.")
+
+
 def test_extract_text_fallback_to_pypdf(monkeypatch, caplog):
     import builtins
     import sys
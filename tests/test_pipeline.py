@@ -59,6 +59,71 @@ def test_generate_cards_reports_all_segments(monkeypatch):
     assert all(isinstance(r, CardRow) for r in rows)
 
 
+def test_generate_cards_carries_page_span(monkeypatch):
+    settings = OpenAISettings(api_key="test")
+    pipeline = LernkartenPipeline(settings)
+
+    monkeypatch.setattr(pipeline.tok, "count", lambda text: 100)
+    monkeypatch.setattr(
+        pipeline.client,
+        "gen_qa_for_chunk",
+        lambda text, n_questions, language: [QAItem("f", "a")],
+    )
+
+    segments = [
+        Segment("eins", start_page=3, end_page=3),
+        Segment("zwei", start_page=4, end_page=6),
+    ]
+    rows = pipeline.generate_cards(segments, max_questions_per_chunk=1, language="de")
+
+    assert [r.source for r in rows] == ["S. 3", "S. 4–6"]
+    assert [(r.start_page, r.end_page) for r in rows] == [(3, 3), (4, 6)]
+
+
+def test_classify_keeps_page_span(monkeypatch):
+    settings = OpenAISettings(api_key="test")
+    pipeline = LernkartenPipeline(settings)
+
+    monkeypatch.setattr(
+        pipeline.client,
+        "classify_segment",
+        lambda text: {"label": "Fakt", "keep": True},
+    )
+
+    out = pipeline.classify([Segment("Erster Satz. Zweiter Satz.", start_page=7, end_page=8)])
+
+    assert len(out) == 1
+    assert (out[0].start_page, out[0].end_page) == (7, 8)
+
+
+def test_generate_cards_feeds_sink(monkeypatch):
+    settings = OpenAISettings(api_key="test")
+    pipeline = LernkartenPipeline(settings)
+
+    monkeypatch.setattr(pipeline.tok, "count", lambda text: 100)
+    monkeypatch.setattr(
+        pipeline.client,
+        "gen_qa_for_chunk",
+        lambda text, n_questions, language: [QAItem("f", "a")],
+    )
+
+    class ListSink:
+        def __init__(self):
+            self.rows = []
+
+        def write(self, row):
+            self.rows.append(row)
+
+    sink = ListSink()
+    segments = [Segment(f"Segment {i}") for i in range(5)]
+    rows = pipeline.generate_cards(
+        segments, max_questions_per_chunk=1, language="de", max_workers=2, sink=sink
+    )
+
+    assert len(sink.rows) == 5
+    assert sorted(r.original for r in sink.rows) == [r.original for r in rows]
+
+
 def test_generate_cards_skips_empty_items(monkeypatch):
     settings = OpenAISettings(api_key="test")
     pipeline = LernkartenPipeline(settings)
@@ -0,0 +1,102 @@
+import time
+
+import pytest
+
+from app.openai_client import OpenAISettings
+from app.pipeline import LernkartenPipeline
+from app.pipeline_models import QAItem, Segment
+
+
+def _pipeline(monkeypatch, delay=0.0):
+    pipeline = LernkartenPipeline(OpenAISettings(api_key="test"))
+    monkeypatch.setattr(pipeline.tok, "count", lambda text: 100)
+    log = []
+
+    def classify(sentence):
+        time.sleep(delay)
+        log.append(("classify", time.perf_counter()))
+        return {"label": "Fakt", "keep": True}
+
+    def gen_qa(text, n_questions, language):
+        log.append(("qa", time.perf_counter()))
+        time.sleep(delay)
+        return [QAItem(f"Frage zu {text}?", "Antwort")]
+
+    monkeypatch.setattr(pipeline.client, "classify_segment", classify)
+    monkeypatch.setattr(pipeline.client, "gen_qa_for_chunk", gen_qa)
+    return pipeline, log
+
+
+def test_run_overlaps_classification_and_qa(monkeypatch):
+    pipeline, log = _pipeline(monkeypatch, delay=0.02)
+    segments = [Segment(f"Satz {i}.", start_page=i, end_page=i) for i in range(1, 11)]
+    progress = []
+
+    start = time.perf_counter()
+    result = pipeline.run(
+        segments, max_workers=2, progress_cb=lambda *a: progress.append(a)
+    )
+    wall = time.perf_counter() - start
+
+    assert [r.original for r in result.rows] == [f"Satz {i}." for i in range(1, 11)]
+    first_qa = min(t for kind, t in log if kind == "qa")
+    last_classify = max(t for kind, t in log if kind == "classify")
+    assert first_qa < last_classify
+    # nacheinander: 10 × 20 ms Klassifikation + 5 × 20 ms QA (2 Worker)
+    assert wall < 0.3
+    assert ("classify", 10, 10) in progress and progress[-1][0] == "qa"
+
+
+def test_run_review_gate_and_filters(monkeypatch):
+    pipeline, log = _pipeline(monkeypatch)
+    segments = [Segment("Erster Punkt."), Segment("Inhaltsverzeichnis Kapitel."), Segment("Letzter Punkt.")]
+
+    def review(labeled):
+        assert not any(kind == "qa" for kind, _ in log)
+        assert [s.keep for s in labeled] == [True, False, True]
+        labeled[0].keep = False
+        return True
+
+    result = pipeline.run(segments, review_cb=review)
+    assert [r.original for r in result.rows] == ["Letzter Punkt."]
+    assert len(result.labeled) == 3
+
+    with pytest.raises(RuntimeError, match="Abgebrochen"):
+        pipeline.run(segments, review_cb=lambda labeled: False)
+
+
+def test_run_from_pdf_exports(tmp_path, monkeypatch):
+    from benchmarks.synthetic_pdf import synthetic_pages, write_pdf
+
+    pytest.importorskip("pdfplumber")
+    pdf = write_pdf(tmp_path / "skript.pdf", synthetic_pages(2))
+    pipeline, _ = _pipeline(monkeypatch)
+
+    result = pipeline.run(str(pdf), out_dir=str(tmp_path), max_questions_per_chunk=2)
+    assert result.rows and result.out_path.startswith(str(tmp_path / "skript_"))
+    assert (tmp_path / result.out_path).exists()
+
+
+def test_run_into_card_store_keeps_order_and_exports(tmp_path, monkeypatch):
+    import random
+
+    from app.card_store import CardStore
+    from app.excel_export import iter_records
+
+    pipeline, _ = _pipeline(monkeypatch)
+    rng = random.Random(1)
+
+    def gen_qa(text, n_questions, language):
+        time.sleep(rng.random() * 0.01)  # QA-Ergebnisse kommen durcheinander an
+        return [] if text == "Satz 3." else [QAItem(f"Frage zu {text}?", "Antwort")]
+
+    monkeypatch.setattr(pipeline.client, "gen_qa_for_chunk", gen_qa)
+    segments = [Segment(f"Satz {i}.", start_page=i, end_page=i) for i in range(1, 13)]
+    plain = pipeline.run(segments, max_workers=4)
+
+    out = tmp_path / "karten.csv"
+    result = pipeline.run(segments, max_workers=4, store=CardStore(), out_path=str(out))
+    assert result.rows == [] and len(result.store) == result.card_count == 11
+    assert list(result.store.records()) == list(iter_records(plain.rows))
+    assert [r.original for r in result.iter_rows()] == [r.original for r in plain.rows]
+    assert out.exists()
@@ -0,0 +1,116 @@
+import json
+import pstats
+
+from app import profiling
+from app.openai_client import OpenAISettings
+from app.pipeline import LernkartenPipeline
+from app.pipeline_models import QAItem, Segment
+
+
+def _pipeline(monkeypatch):
+    pipeline = LernkartenPipeline(OpenAISettings(api_key="test"))
+    monkeypatch.setattr(pipeline.tok, "count", lambda text: 100)
+
+    def fake_qa(text, n_questions, language):
+        return [QAItem(f"Frage zu {text}?", "Antwort")]
+
+    monkeypatch.setattr(pipeline.client, "gen_qa_for_chunk", fake_qa)
+    return pipeline
+
+
+def test_profile_run_writes_stage_reports_without_changing_rows(tmp_path, monkeypatch):
+    pipeline = _pipeline(monkeypatch)
+    segments = [Segment(text=f"Segment {i}") for i in range(6)]
+    plain = pipeline.generate_cards(segments, 1, "de", max_workers=3)
+
+    out = tmp_path / "profil"
+    with profiling.profile_run(out, top_n=5, sampling=True) as prof:
+        assert profiling.active() is prof
+        rows = pipeline.generate_cards(segments, 1, "de", max_workers=3)
+        pipeline.export_excel(rows, str(tmp_path / "karten.xlsx"))
+    assert profiling.active() is None
+    assert rows == plain
+
+    for name in ("generate_cards", "export_excel"):
+        assert pstats.Stats(str(out / f"{name}.pstats")).total_calls > 0
+        assert "Top 5 Allokationen" in (out / f"{name}_alloc.txt").read_text(encoding="utf-8")
+        assert (out / f"{name}.folded").exists()
+    summary = json.loads((out / "summary.json").read_text(encoding="utf-8"))
+    assert [r["stage"] for r in summary] == ["generate_cards", "export_excel"]
+    assert summary[0]["worker_threads"] == 6
+    assert "generate_cards" in (out / "summary.txt").read_text(encoding="utf-8")
+
+    # Worker-Profile landen in der Stufe: fake_qa taucht in den Statistiken auf.
+    funcs = {f for _, _, f in pstats.Stats(str(out / "generate_cards.pstats")).stats}
+    assert "fake_qa" in funcs
+
+
+def test_profile_dir_next_to_export(tmp_path):
+    assert profiling.profile_dir_for(tmp_path / "Karten_2024.xlsx") == tmp_path / "Karten_2024_profil"
+
+
+def test_profile_run_splits_overlapping_stages_of_run(tmp_path, monkeypatch):
+    pipeline = _pipeline(monkeypatch)
+
+    def fake_classify(sentence):
+        return {"label": "Fakt", "keep": True}
+
+    monkeypatch.setattr(pipeline.client, "classify_segment", fake_classify)
+    segments = [Segment(text=f"Segment {i}. Noch ein Satz {i}.") for i in range(5)]
+
+    out = tmp_path / "profil"
+    with profiling.profile_run(out, top_n=5):
+        result = pipeline.run(segments, out_path=str(tmp_path / "karten.xlsx"), max_workers=2)
+    assert len(result.rows) == 5
+
+    summary = {r["stage"]: r for r in json.loads((out / "summary.json").read_text(encoding="utf-8"))}
+    assert {"classify", "qa", "export_excel"} <= set(summary)
+    assert summary["qa"]["worker_threads"] == 2
+    if profiling._SHARED_CPROFILE:
+        return  # ab 3.12 ein cProfile je Prozess, siehe nächster Test
+    classify_funcs = {f for _, _, f in pstats.Stats(str(out / "classify.pstats")).stats}
+    qa_funcs = {f for _, _, f in pstats.Stats(str(out / "qa.pstats")).stats}
+    assert "fake_classify" in classify_funcs and "fake_classify" not in qa_funcs
+    assert "fake_qa" in qa_funcs and "fake_qa" not in classify_funcs
+
+
+def test_profile_run_with_one_cprofile_per_process(tmp_path, monkeypatch):
+    # Verhalten ab Python 3.12: jedes weitere cProfile.enable() schlägt fehl
+    import cProfile
+
+    monkeypatch.setattr(profiling, "_SHARED_CPROFILE", True)
+    real_enable = cProfile.Profile.enable
+    enabled = []
+
+    class OneProfile(cProfile.Profile):
+        def enable(self, *args, **kwargs):
+            if enabled:
+                raise ValueError("Another profiling tool is already active")
+            enabled.append(self)
+            real_enable(self, *args, **kwargs)
+
+        def disable(self):
+            if self in enabled:
+                enabled.remove(self)
+            super().disable()
+
+    monkeypatch.setattr(cProfile, "Profile", OneProfile)
+    pipeline = _pipeline(monkeypatch)
+    monkeypatch.setattr(
+        pipeline.client, "classify_segment", lambda sentence: {"label": "Fakt", "keep": True}
+    )
+    segments = [Segment(text=f"Segment {i}. Noch ein Satz {i}.") for i in range(6)]
+
+    out = tmp_path / "profil"
+    with profiling.profile_run(out, top_n=5):
+        result = pipeline.run(segments, max_workers=3)
+        rows = pipeline.generate_cards(segments, 1, "de", max_workers=3)
+    assert len(result.rows) == 6 and len(rows) == 6
+
+    summary = {r["stage"]: r for r in json.loads((out / "summary.json").read_text(encoding="utf-8"))}
+    assert summary["qa"]["calls"] > 0 and summary["qa"]["worker_threads"] == 3
+    # Die gleichzeitige Klassifikation läuft ohne cProfile, dafür mit Stichproben
+    assert summary["classify"]["calls"] is None
+    assert summary["classify"]["samples"] is not None
+    assert (out / "classify.folded").exists() and not (out / "classify.pstats").exists()
+    assert summary["generate_cards"]["worker_threads"] == 6
@@ -0,0 +1,90 @@
+import threading
+import time
+
+import pytest
+
+from app.cancel import CancelToken, Cancelled
+from app.ratelimit import FairRateLimiter
+
+
+def test_limiter_caps_concurrency():
+    lim = FairRateLimiter(max_concurrent=2)
+    peak = []
+    lock = threading.Lock()
+
+    def work():
+        with lim.slot("doc"):
+            with lock:
+                peak.append(lim.active)
+            time.sleep(0.01)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert max(peak) <= 2 and len(peak) == 8
+
+
+def test_limiter_serves_owners_round_robin():
+    lim = FairRateLimiter(max_concurrent=1)
+    order = []
+    lim.acquire("gross")  # Slot belegt, alle weiteren warten
+
+    def work(owner):
+        with lim.slot(owner):
+            order.append(owner)
+
+    threads = [threading.Thread(target=work, args=("gross",)) for _ in range(4)]
+    threads.append(threading.Thread(target=work, args=("klein",)))
+    for t in threads:
+        t.start()
+        time.sleep(0.01)  # feste Reihenfolge in der Warteschlange
+    lim.release()
+    for t in threads:
+        t.join()
+    # das kleine Dokument kommt nach einer Anfrage des großen dran, nicht nach vier
+    assert order.index("klein") == 1
+
+
+def test_limiter_requests_per_minute_and_pause():
+    now = [0.0]
+    lim = FairRateLimiter(max_concurrent=5, requests_per_minute=60, clock=lambda: now[0])
+    for _ in range(60):
+        lim.acquire("a")
+        lim.release()
+    assert lim._requests.wait_time(1) == 1.0
+    now[0] += 1.0
+    assert lim._requests.wait_time(1) == 0.0
+    lim.pause(5)
+    assert lim._paused_until == 6.0
+
+
+def test_limiter_cancel_removes_ticket_and_keeps_rotation():
+    lim = FairRateLimiter(max_concurrent=1)
+    lim.acquire("a")
+    token = CancelToken()
+    order, errors = [], []
+
+    def wait(owner, cancel=None):
+        try:
+            with lim.slot(owner, cancel=cancel):
+                order.append(owner)
+        except Cancelled as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=wait, args=("b", token))]
+    threads[0].start()
+    time.sleep(0.05)
+    threads.append(threading.Thread(target=wait, args=("c",)))
+    threads[1].start()
+    time.sleep(0.05)
+    token.cancel()
+    threads[0].join(1)
+    assert not threads[0].is_alive() and len(errors) == 1
+    assert list(lim._rotation) == ["c"] and "b" not in lim._waiting
+    lim.release()
+    threads[1].join(1)
+    assert order == ["c"] and lim._waiting == {}
+    with pytest.raises(Cancelled):
+        lim.acquire("d", cancel=token)  # schon abgebrochen: gar nicht erst anstellen
@@ -20,3 +20,47 @@ def test_safe_request_retries(monkeypatch):
     result = oc.safe_request(flaky)
     assert result == "ok"
     assert sleeps == [2]
+
+
+def test_safe_request_reports_retries(monkeypatch):
+    monkeypatch.setattr(oc.time, "sleep", lambda s: None)
+
+    class DummyError(oc.OpenAIError):
+        status_code = 503
+
+    seen = []
+    calls = {"count": 0}
+
+    def flaky(*args, **kwargs):
+        calls["count"] += 1
+        if calls["count"] < 3:
+            raise DummyError("busy")
+        return "ok"
+
+    result = oc.safe_request(flaky, on_retry=lambda n, e, s: seen.append((n, type(e), s)))
+    assert result == "ok"
+    assert [n for n, _, _ in seen] == [1, 2]
+    assert all(t is DummyError for _, t, _ in seen)
+
+
+def test_safe_request_cancel_interrupts_backoff():
+    import threading
+    import time
+
+    import pytest
+
+    from app.cancel import CancelToken, Cancelled
+
+    class DummyError(oc.OpenAIError):
+        status_code = 429
+        retry_after = 20
+
+    def always_limited(*args, **kwargs):
+        raise DummyError("slow down")
+
+    token = CancelToken()
+    threading.Timer(0.1, token.cancel).start()
+    started = time.perf_counter()
+    with pytest.raises(Cancelled):
+        oc.safe_request(always_limited, cancel=token)
+    assert time.perf_counter() - started < 2
@@ -0,0 +1,102 @@
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from app.service import JobStore, ServiceServer, build_service
+
+
+def _request(method, url, data=None):
+    req = urllib.request.Request(url, data=data, method=method)
+    with urllib.request.urlopen(req, timeout=10) as resp:
+        body = resp.read()
+        return resp.status, body
+
+
+def _wait_done(url, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = json.loads(_request("GET", url)[1])
+        if job["status"] in ("done", "error", "cancelled"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError("Job nicht fertig geworden")
+
+
+def test_jobstore_claim_and_requeue(tmp_path):
+    store = JobStore(tmp_path / "jobs.sqlite")
+    first = store.submit("a.pdf", {"questions": 2})
+    store.submit("b.pdf", {})
+    assert store.claim()["id"] == first
+    store.close()
+
+    store = JobStore(tmp_path / "jobs.sqlite")  # "Neustart"
+    assert store.get(first)["status"] == "running"
+    assert store.requeue_running() == 1
+    assert store.claim()["id"] == first
+    assert store.claim()["pdf_path"] == "b.pdf"
+    assert store.claim() is None
+    store.finish(first, "done", result={"cards": 3})
+    assert store.get(first)["result"] == {"cards": 3}
+
+
+def test_jobstore_claim_is_exclusive_across_connections(tmp_path):
+    stores = [JobStore(tmp_path / "jobs.sqlite") for _ in range(4)]
+    ids = {stores[0].submit(f"{i}.pdf", {}) for i in range(20)}
+    claimed, lock = [], threading.Lock()
+
+    def worker(store):
+        while (job := store.claim()) is not None:
+            assert job["status"] == "running" and job["started"]
+            with lock:
+                claimed.append(job["id"])
+
+    threads = [threading.Thread(target=worker, args=(s,)) for s in stores]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(30)
+    assert sorted(claimed) == sorted(ids)  # jeder Job genau einmal
+    for store in stores:
+        store.close()
+
+
+def test_service_end_to_end_against_mock(tmp_path, monkeypatch):
+    pytest.importorskip("openai")
+    from benchmarks.mock_openai import MockConfig, MockOpenAIServer
+    from benchmarks.synthetic_pdf import synthetic_pages, write_pdf
+
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    pdf = write_pdf(tmp_path / "skript.pdf", synthetic_pages(2)).read_bytes()
+    data_dir = tmp_path / "dienst"
+    with MockOpenAIServer(MockConfig(latency_ms=1, latency_dist="fixed")) as mock:
+        service = build_service(data_dir, workers=2, base_url=mock.base_url, cache=False)
+        with ServiceServer(service, port=0) as srv:
+            assert json.loads(_request("GET", srv.url + "/health")[1])["status"] == "ok"
+            with pytest.raises(urllib.error.HTTPError) as err:
+                _request("POST", srv.url + "/jobs", b"kein pdf")
+            assert err.value.code == 400
+
+            status, body = _request("POST", srv.url + "/jobs?questions=2&format=jsonl&name=skript", pdf)
+            assert status == 201
+            job = json.loads(body)
+            job = _wait_done(f"{srv.url}/jobs/{job['id']}")
+            assert job["status"] == "done" and job["result"]["cards"] > 0
+            status, export = _request("GET", f"{srv.url}/jobs/{job['id']}/export")
+            assert len(export.decode("utf-8").splitlines()) == job["result"]["rows"]
+
+        # Job, der beim Beenden noch "running" war, läuft nach dem Neustart weiter
+        store = JobStore(data_dir / "jobs.sqlite")
+        pending = store.submit(str(tmp_path / "skript.pdf"), {"questions": 1, "format": "csv"})
+        assert store.claim()["id"] == pending
+        store.close()
+        service = build_service(data_dir, workers=1, base_url=mock.base_url, cache=False)
+        with ServiceServer(service, port=0) as srv:
+            job = _wait_done(f"{srv.url}/jobs/{pending}")
+            assert job["status"] == "done"
+            listed = json.loads(_request("GET", srv.url + "/jobs")[1])
+            assert {j["id"] for j in listed} >= {pending}
+            assert all("pdf_path" not in j for j in listed)
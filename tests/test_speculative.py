@@ -0,0 +1,69 @@
+from benchmarks.mock_openai import MockConfig, MockOpenAIServer
+
+from app.openai_client import OpenAIClient, OpenAISettings
+from app.pipeline import LernkartenPipeline
+from app.pipeline_models import Segment
+from app.speculative import SpeculativeClassifier
+
+
+def _segments(n):
+    return [
+        Segment(text=f"Satz {i} erklärt den Begriff {i}. Das ist ein Beispiel.", start_page=i, end_page=i)
+        for i in range(1, n + 1)
+    ]
+
+
+def test_speculative_results_are_reused_by_run():
+    segments = _segments(6)
+    with MockOpenAIServer(MockConfig(latency_ms=5, latency_dist="fixed")) as srv:
+        settings = OpenAISettings(api_key="mock", base_url=srv.base_url)
+        client = OpenAIClient(settings)
+        spec = SpeculativeClassifier(client, segments, max_segments=4, max_usd=1.0).start()
+        spec._thread.join(10)
+        before = dict(srv.stats)
+        pre = spec.take(segments, settings)
+        result = LernkartenPipeline(settings, client=client).run(
+            segments, max_questions_per_chunk=1, preclassified=pre
+        )
+        after = dict(srv.stats)
+
+    assert sorted(pre) == [0, 1, 2, 3]
+    assert before["models"] == 1  # Pool vorgewärmt
+    # Der Lauf stellt nur noch Anfragen für die zwei übrigen Segmente (je 2 Sätze)
+    assert after["ok_classify"] - before["ok_classify"] == 4
+    assert {r.start_page for r in result.rows} == set(range(1, 7))
+    assert client.usage("speculative")[settings.classify_model]["requests"] == 8
+
+
+def test_speculative_respects_spend_cap_and_stale_segments():
+    segments = _segments(5)
+    with MockOpenAIServer(MockConfig(latency_ms=1, latency_dist="fixed")) as srv:
+        settings = OpenAISettings(api_key="mock", base_url=srv.base_url)
+        spec = SpeculativeClassifier(
+            OpenAIClient(settings), segments, max_segments=5, max_usd=1e-9
+        ).start()
+        spec._thread.join(10)
+        # Schon der zweite Satz des ersten Segments überschreitet die Grenze
+        assert spec.take(segments) == {}
+
+        spec = SpeculativeClassifier(OpenAIClient(settings), segments, max_segments=2).start()
+        assert spec.take(list(segments)) == {}  # andere Segmentliste → nichts übernehmen
+
+
+def test_speculative_caps_requests_within_one_long_segment():
+    long = [Segment(" ".join(f"Satz {i} erklärt den Begriff {i}." for i in range(12)), 1, 1)]
+    with MockOpenAIServer(MockConfig(latency_ms=1, latency_dist="fixed")) as srv:
+        settings = OpenAISettings(api_key="mock", base_url=srv.base_url)
+        spec = SpeculativeClassifier(OpenAIClient(settings), long, max_segments=1, max_usd=1e-9)
+        spec.start()._thread.join(10)
+        per_request = spec.spent_usd()
+        assert srv.stats["ok_classify"] == 1
+        assert spec.take(long) == {}  # angebrochenes Segment wird verworfen
+
+        spec = SpeculativeClassifier(
+            OpenAIClient(settings), long, max_segments=1, max_usd=3.5 * per_request
+        )
+        spec.start()._thread.join(10)
+        assert srv.stats["ok_classify"] == 1 + 3
+        assert spec.spent_usd() <= spec.max_usd
+        assert spec.take(long) == {}
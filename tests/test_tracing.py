@@ -0,0 +1,65 @@
+import json
+
+import app.openai_client as oc
+from app import tracing
+from app.openai_client import OpenAISettings
+from app.pipeline import LernkartenPipeline
+from app.pipeline_models import QAItem, Segment
+
+
+def test_span_is_noop_without_trace():
+    assert tracing.active() is None
+    assert tracing.span("x") is tracing.span("y")
+    with tracing.span("x") as sp:
+        sp.set(n=1)
+
+
+def test_trace_run_writes_chrome_trace(tmp_path, monkeypatch):
+    pipeline = LernkartenPipeline(OpenAISettings(api_key="test"))
+    monkeypatch.setattr(pipeline.tok, "count", lambda text: 100)
+    monkeypatch.setattr(
+        pipeline.client,
+        "gen_qa_for_chunk",
+        lambda text, n_questions, language: [QAItem("f", "a")],
+    )
+    segments = [Segment(text=f"Segment {i}") for i in range(5)]
+
+    out = tmp_path / "trace.json"
+    with tracing.trace_run("test", path=out) as tracer:
+        assert tracing.active() is tracer
+        pipeline.generate_cards(segments, 1, "de", max_workers=2)
+    assert tracing.active() is None
+
+    events = json.loads(out.read_text(encoding="utf-8"))["traceEvents"]
+    spans = [e for e in events if e["ph"] == "X"]
+    names = [e["name"] for e in spans]
+    assert names.count("queue_wait") == 5
+    assert "generate_cards" in names and "test" in names
+    assert all(e["dur"] >= 0 for e in spans)
+    assert any(e["ph"] == "M" and e["name"] == "thread_name" for e in events)
+
+
+def test_safe_request_traces_retry_sleep(tmp_path, monkeypatch):
+    monkeypatch.setattr(oc.time, "sleep", lambda s: None)
+
+    class DummyError(oc.OpenAIError):
+        status_code = 503
+        retry_after = 0.5
+
+    calls = {"count": 0}
+
+    def flaky(*args, **kwargs):
+        calls["count"] += 1
+        if calls["count"] == 1:
+            raise DummyError("busy")
+        return "ok"
+
+    out = tmp_path / "trace.json"
+    with tracing.trace_run("retry", path=out):
+        assert oc.safe_request(flaky) == "ok"
+
+    spans = [e for e in json.loads(out.read_text())["traceEvents"] if e["ph"] == "X"]
+    attempts = [e for e in spans if e["name"] == "attempt"]
+    assert [e["args"].get("error") for e in attempts] == ["DummyError", None]
+    sleeps = [e for e in spans if e["name"] == "retry_sleep"]
+    assert sleeps and sleeps[0]["args"]["seconds"] == 0.5
@@ -0,0 +1,117 @@
+import pytest
+
+from benchmarks.mock_openai import MockConfig, MockOpenAIServer
+
+from app import models, transport
+from app.openai_client import OpenAIClient, OpenAISettings
+from app.ratelimit import FairRateLimiter
+
+
+def test_registry_shares_one_client_per_key_and_url():
+    a = transport.shared_openai("k1", "http://127.0.0.1:1/v1")
+    assert transport.shared_openai("k1", "http://127.0.0.1:1/v1") is a
+    assert transport.shared_openai("k2", "http://127.0.0.1:1/v1") is not a
+    assert transport.shared_openai("k1", "http://127.0.0.1:2/v1") is not a
+
+    settings = OpenAISettings(api_key="k1", base_url="http://127.0.0.1:1/v1")
+    assert OpenAIClient(settings)._get_client() is a
+    # Mehr Parallelität als der bestehende Pool → größerer Pool ersetzt ihn
+    bigger = OpenAIClient(settings, limiter=FairRateLimiter(max_concurrent=64))._get_client()
+    assert bigger is not a
+    assert OpenAIClient(settings)._get_client() is bigger
+
+
+def test_models_path_uses_shared_client_and_safe_request(monkeypatch):
+    config = MockConfig(latency_ms=1, latency_dist="fixed", rate_5xx=0.5, seed=3)
+    with MockOpenAIServer(config) as srv:
+        monkeypatch.setenv("OPENAI_API_KEY", "mock")
+        monkeypatch.setenv("OPENAI_BASE_URL", srv.base_url)
+        monkeypatch.setattr("app.openai_client._request_config", lambda: (10, 8, 0.0))
+        for _ in range(4):
+            res = models.call_json_chat("m", "Klassifizierer", "Text")
+            assert res["data"]["keep"] is True
+        stats = dict(srv.stats)
+    assert models._get_openai_client() is transport.shared_openai("mock", srv.base_url)
+    assert stats.get("5xx", 0) > 0  # Fehler wurden von safe_request wiederholt
+    assert stats["ok_classify"] == 4
+
+
+def test_clear_closes_replaced_and_current_clients():
+    settings = OpenAISettings(api_key="k3", base_url="http://127.0.0.1:1/v1")
+    small_client = OpenAIClient(settings)
+    small = small_client._get_client()
+    bigger = OpenAIClient(settings, limiter=FairRateLimiter(max_concurrent=64))._get_client()
+    assert bigger is not small and not small.is_closed()  # noch in Benutzung
+
+    transport.clear()
+    assert small.is_closed() and bigger.is_closed()
+    # Vorhandene OpenAIClients holen sich danach einen neuen Pool
+    fresh = small_client._get_client()
+    assert fresh is not small and not fresh.is_closed()
+
+
+def test_http_client_without_private_backend(monkeypatch):
+    from types import SimpleNamespace
+
+    httpx = transport._httpx()
+    fake = SimpleNamespace(
+        HTTPTransport=lambda **kwargs: SimpleNamespace(),  # kein ``_pool``
+        Limits=httpx.Limits,
+        Timeout=httpx.Timeout,
+        Client=lambda transport, timeout: ("client", transport),
+    )
+    monkeypatch.setattr(transport, "_httpx", lambda: fake)
+    client, _ = transport.http_client(2)
+    assert client == "client"
+
+
+def test_http2_pool_has_no_socket_abort(monkeypatch):
+    from types import SimpleNamespace
+
+    httpx = transport._httpx()
+    seen = {}
+
+    def fake_transport(**kwargs):
+        seen.update(kwargs)
+        return SimpleNamespace(_pool=SimpleNamespace(_network_backend="original"))
+
+    fake = SimpleNamespace(
+        HTTPTransport=fake_transport,
+        Limits=httpx.Limits,
+        Timeout=httpx.Timeout,
+        Client=lambda transport, timeout: transport,
+    )
+    monkeypatch.setattr(transport, "_httpx", lambda: fake)
+    monkeypatch.setattr(transport, "_http2_available", lambda: True)
+    settings = {"max_connections": 4, "keepalive_expiry": 60.0}
+
+    monkeypatch.setattr(transport, "_http_settings", lambda: {**settings, "http2": True})
+    h2_client = transport.http_client()
+    assert seen["http2"] is True
+    # Eine HTTP/2-Verbindung trägt Anfragen mehrerer Tokens → kein shutdown je Socket
+    assert h2_client._pool._network_backend == "original"
+
+    monkeypatch.setattr(transport, "_http_settings", lambda: {**settings, "http2": False})
+    h1_client = transport.http_client()
+    assert isinstance(h1_client._pool._network_backend, transport._AbortableBackend)
+
+
+def test_http2_client_with_h2_skips_socket_abort():
+    pytest.importorskip("h2")
+    # Mit echtem h2: Client bauen und prüfen, dass kein abbrechbares Backend hängt
+    from app import config
+
+    original = config.load_config
+
+    def with_http2():
+        cfg = dict(original())
+        cfg["models"] = {**cfg.get("models", {}), "http2": True}
+        return cfg
+
+    config.load_config = with_http2
+    try:
+        client = transport.http_client(2)
+    finally:
+        config.load_config = original
+    backend = client._transport._pool._network_backend
+    assert not isinstance(backend, transport._AbortableBackend)
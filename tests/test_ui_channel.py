@@ -0,0 +1,100 @@
+import threading
+
+from app.ui_channel import UiChannel, append_capped
+
+
+class FakeRoot:
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, ms, fn):
+        self.scheduled.append(fn)
+
+    def tick(self):
+        fns, self.scheduled = self.scheduled, []
+        for fn in fns:
+            fn()
+
+
+class FakeText:
+    def __init__(self):
+        self.lines = [""]
+        self.state = "disabled"
+
+    def cget(self, key):
+        return self.state
+
+    def configure(self, state):
+        self.state = state
+
+    def insert(self, index, text):
+        assert self.state == "normal"
+        parts = text.split("\n")
+        self.lines[-1] += parts[0]
+        self.lines.extend(parts[1:])
+
+    def index(self, index):
+        return f"{len(self.lines)}.0"
+
+    def delete(self, start, end):
+        del self.lines[: int(end.split(".")[0]) - 1]
+
+    def see(self, index):
+        pass
+
+
+def test_progress_is_coalesced_and_cards_capped():
+    root = FakeRoot()
+    seen = {"progress": [], "cards": [], "log": []}
+    ui = UiChannel(
+        root,
+        max_cards=5,
+        on_progress=lambda *a: seen["progress"].append(a),
+        on_cards=lambda cards: seen["cards"].append(cards),
+        on_log=lambda lines: seen["log"].append(lines),
+    ).start()
+
+    def produce():
+        for i in range(1, 1001):
+            ui.post_progress("qa", i, 1000)
+            ui.post_card("orig", f"F{i}", f"A{i}")
+
+    threads = [threading.Thread(target=produce) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    ui.post_log("eins")
+    ui.post_log("zwei")
+    root.tick()
+
+    assert seen["progress"] == [("qa", 1000, 1000)]
+    assert len(seen["cards"]) == 1 and len(seen["cards"][0]) == 5
+    assert seen["log"] == [["eins", "zwei"]]
+    assert ui.cards_total == 4000 and len(ui.recent) == 5
+    assert len(root.scheduled) == 1  # nächstes Bild geplant
+
+    root.tick()  # nichts Neues → keine Handleraufrufe
+    assert len(seen["progress"]) == 1 and len(seen["cards"]) == 1
+    ui.stop()
+    root.tick()
+    assert root.scheduled == []
+
+
+def test_calls_run_in_order_on_tick():
+    root = FakeRoot()
+    ui = UiChannel(root).start()
+    out = []
+    ui.call(out.append, 1)
+    ui.call(out.append, 2)
+    assert out == []
+    root.tick()
+    assert out == [1, 2]
+
+
+def test_append_capped_keeps_last_lines():
+    w = FakeText()
+    for i in range(50):
+        append_capped(w, f"Zeile {i}\n", 10)
+    assert w.lines[-2] == "Zeile 49" and len(w.lines) <= 10
+    assert w.state == "disabled"
@@ -0,0 +1,45 @@
+import heapq
+import itertools
+import time
+
+from app.ui_watchdog import UiWatchdog
+
+
+class LoopRoot:
+    """Minimale Ereignisschleife mit ``after`` wie Tk (läuft im Test-Thread)."""
+
+    def __init__(self):
+        self._queue = []
+        self._seq = itertools.count()
+
+    def after(self, ms, fn):
+        heapq.heappush(self._queue, (time.monotonic() + ms / 1000, next(self._seq), fn))
+
+    def run_for(self, seconds):
+        end = time.monotonic() + seconds
+        while time.monotonic() < end:
+            if self._queue and self._queue[0][0] <= time.monotonic():
+                heapq.heappop(self._queue)[2]()
+            else:
+                time.sleep(0.002)
+
+
+def blocking_work():
+    time.sleep(0.3)
+
+
+def test_watchdog_reports_stall_with_stack():
+    root = LoopRoot()
+    seen = []
+    dog = UiWatchdog(root, interval_ms=20, threshold_ms=150, on_stall=seen.append).start()
+    try:
+        root.run_for(0.1)
+        assert dog.stalls == []
+        root.after(0, blocking_work)
+        root.run_for(0.5)  # Blockade (0,3 s) plus folgende Ticks
+    finally:
+        dog.stop()
+    assert len(dog.stalls) == 1 and seen == dog.stalls
+    stall = dog.stalls[0]
+    assert 0.25 <= stall.seconds < 1.0
+    assert "blocking_work" in stall.stack
@@ -0,0 +1,69 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from app.pipeline_models import Segment
+from app.workqueue import WorkQueue, assemble, submit, wait
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_expired_lease_is_reclaimed_and_first_result_wins(tmp_path):
+    q = WorkQueue(tmp_path / "q.sqlite", max_attempts=2)
+    run = q.create_run([Segment("Erster Absatz."), Segment("Zweiter Absatz.")], {})
+    stale = q.claim("a", lease_seconds=-1)  # sofort abgelaufen
+    again = q.claim("b")
+    assert (stale["idx"], again["idx"]) == (0, 0)
+    assert not q.heartbeat(stale, "a")
+    assert q.complete(again, "b", [], follow_up=[{"text": "Zweiter Absatz.", "keep": True}])
+    assert not q.complete(stale, "a", [])  # verspätetes Ergebnis wird ignoriert
+    qa = q.claim("b")
+    assert (qa["kind"], qa["idx"], qa["sub"]) == ("qa", 0, 0)  # qa vor classify
+    assert q.fail(qa, "b", "boom") == "queued"
+    assert q.fail(q.claim("b"), "b", "boom") == "failed"
+    assert q.counts(run) == {"classify": {"done": 1, "queued": 1}, "qa": {"failed": 1}}
+    assert q.pending(run) == 1
+
+
+def test_several_worker_processes_against_mock(tmp_path, monkeypatch):
+    pytest.importorskip("openai")
+    from benchmarks.mock_openai import MockConfig, MockOpenAIServer
+    from benchmarks.synthetic_pdf import synthetic_pages, write_pdf
+
+    from app.openai_client import OpenAISettings
+    from app.pipeline import LernkartenPipeline
+
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    pdf = write_pdf(tmp_path / "skript.pdf", synthetic_pages(3))
+    db = tmp_path / "queue.sqlite"
+    q = WorkQueue(db)
+    run = submit(q, LernkartenPipeline(OpenAISettings(api_key="none")), str(pdf),
+                 max_questions_per_chunk=2)
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    with MockOpenAIServer(MockConfig(latency_ms=5, latency_dist="fixed")) as srv:
+        procs = [
+            subprocess.Popen(
+                [sys.executable, "-m", "app.workqueue", "work", "--db", str(db),
+                 "--base-url", srv.base_url, "--until-empty"],
+                cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+            for _ in range(3)
+        ]
+        try:
+            wait(q, run, poll_seconds=0.1, timeout=120)
+        finally:
+            for p in procs:
+                p.wait(timeout=60)
+    assert all(p.returncode == 0 for p in procs)
+    counts = q.counts(run)
+    assert set(counts) == {"classify", "qa"}
+    assert all(set(by) == {"done"} for by in counts.values())
+    workers = {r[0] for r in q._db.execute("SELECT DISTINCT worker FROM tasks")}
+    assert len(workers) > 1
+    rows = assemble(q, run)
+    assert len(rows) == counts["qa"]["done"] and all(r.fragen for r in rows)
+    pages = [r.start_page for r in rows]
+    assert pages == sorted(pages)